@@ -0,0 +1,161 @@
+"""
+요청별 쿼리 예산 / N+1 감지
+- 역할: 뷰 하나가 실행하는 SQL을 기록해서 예산(최대 쿼리 수) 초과와 같은 모양 쿼리 반복(N+1)을 잡아냄
+- 담당: 팀원 B
+
+예산 선언
+- 클래스 기반 뷰: query_budget = 7
+- ModelAdmin: query_budget = 8 (목록 화면 changelist에 적용)
+- 세션/사용자 조회 쿼리도 포함한 요청 전체 쿼리 수 (assertNumQueries와 같은 기준)
+
+개발 서버 (QUERY_BUDGET_ENABLED, 기본값 DEBUG)
+- QueryBudgetMiddleware가 응답 헤더 X-Query-Count를 붙이고, 예산 초과/N+1이면 경고 로그
+
+테스트
+- QueryBudgetTestMixin.assertQueryBudget(url)로 예산과 N+1을 함께 검사
+"""
+
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import Resolver404, resolve
+
+
+logger = logging.getLogger(__name__)
+
+# IN (%s, %s, ...) 처럼 값 개수만 다른 쿼리는 같은 모양으로 봄
+PLACEHOLDER_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+# 트랜잭션 제어 구문은 세지 않음 (atomic()마다 생기는 SAVEPOINT 등)
+TRANSACTION_CONTROL = re.compile(r'^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT|BEGIN|COMMIT|ROLLBACK)\b', re.I)
+
+
+def query_shape(sql):
+    """쿼리 모양: 파라미터 자리표시자 목록을 하나로 접은 SQL"""
+    return PLACEHOLDER_LIST.sub('(...)', sql)
+
+
+def repeat_threshold():
+    """같은 모양 쿼리가 이 횟수 이상이면 N+1로 봄"""
+    return getattr(settings, 'QUERY_REPEAT_THRESHOLD', 3)
+
+
+class QueryRecorder:
+    """
+    연결에서 실행되는 SQL 기록 (connection.execute_wrapper)
+    - 예:
+        with QueryRecorder().record() as recorder:
+            ...
+        recorder.count, recorder.repeated()
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not TRANSACTION_CONTROL.match(sql):
+            self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def record(self):
+        with connections[self.using].execute_wrapper(self):
+            yield self
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def repeated(self, threshold=None):
+        """threshold번 이상 반복된 쿼리 모양 [(모양, 횟수), ...]"""
+        threshold = threshold or repeat_threshold()
+        counts = Counter(query_shape(sql) for sql in self.queries)
+        return [(shape, n) for shape, n in counts.most_common() if n >= threshold]
+
+
+def view_query_budget(path):
+    """
+    URL 경로 → 그 뷰에 선언된 쿼리 예산 (없으면 None)
+    - 클래스 기반 뷰: view_class.query_budget
+    - 관리자 목록 화면: ModelAdmin.query_budget
+    """
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    view_class = getattr(match.func, 'view_class', None)
+    if view_class is not None:
+        return getattr(view_class, 'query_budget', None)
+    model_admin = getattr(match.func, 'model_admin', None)
+    if model_admin is not None and match.url_name and match.url_name.endswith('_changelist'):
+        return getattr(model_admin, 'query_budget', None)
+    return None
+
+
+class QueryBudgetMiddleware:
+    """
+    개발용: 요청마다 쿼리 수를 세고 예산 초과/N+1을 경고
+    - QUERY_BUDGET_ENABLED가 꺼져 있으면(운영 기본값) 미들웨어 목록에서 빠짐
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+
+        budget = view_query_budget(request.path_info)
+        response['X-Query-Count'] = str(recorder.count)
+        if budget is not None and recorder.count > budget:
+            logger.warning(
+                '쿼리 예산 초과: %s %s (%d/%d)', request.method, request.path, recorder.count, budget
+            )
+        for shape, n in recorder.repeated():
+            logger.warning('N+1 의심: %s %s 같은 쿼리 %d번\n%s', request.method, request.path, n, shape)
+        return response
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase용: 뷰의 쿼리 예산과 N+1 검사
+    - self.client로 요청하므로 로그인 등은 테스트에서 먼저 처리
+    """
+
+    def assertQueryBudget(self, url, budget=None, threshold=None, **extra):
+        """
+        GET url 실행 후
+        - 쿼리 수 <= budget (없으면 뷰에 선언된 query_budget, 선언도 없으면 실패)
+        - 같은 모양 쿼리가 threshold번 이상 반복되지 않음
+        응답을 반환
+        """
+        path = url.split('?', 1)[0]
+        if budget is None:
+            budget = view_query_budget(path)
+        self.assertIsNotNone(budget, f'{path}: 뷰에 query_budget이 선언되어 있지 않습니다')
+
+        with QueryRecorder().record() as recorder:
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200, f'{url}: {response.status_code}')
+
+        # N+1이 원인이면 예산 초과보다 반복 쿼리를 먼저 보여줌
+        repeated = recorder.repeated(threshold)
+        self.assertFalse(
+            repeated,
+            f'{url}: 같은 모양 쿼리 반복 (N+1)\n'
+            + '\n'.join(f'{n}번: {shape}' for shape, n in repeated),
+        )
+        queries = '\n'.join(f'{i}. {sql}' for i, sql in enumerate(recorder.queries, 1))
+        self.assertLessEqual(
+            recorder.count, budget,
+            f'{url}: 쿼리 {recorder.count}개 (예산 {budget}개)\n{queries}',
+        )
+        return response
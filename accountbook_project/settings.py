@@ -1,5 +1,7 @@
 from pathlib import Path
 import os
+
+from django.core.exceptions import ImproperlyConfigured
 # import dj_database_url  # 배포용 (Fly.io)
 BASE_DIR = Path(__file__).resolve().parent.parent
 from dotenv import load_dotenv
@@ -30,6 +32,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # 요청별 쿼리 수/N+1 경고 (개발용, QUERY_BUDGET_ENABLED일 때만 동작)
+    'accountbook_project.query_budget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -123,6 +127,72 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# 거래 일괄 가져오기(CSV) 설정
+TRANSACTION_IMPORT_BATCH_SIZE = 2000   # 한 번에 검증/INSERT할 행 수
+TRANSACTION_IMPORT_ASYNC = True        # False: 요청 안에서 바로 처리 (테스트용)
+
+# 거래 JSON API (transactions/api.py)
+TRANSACTION_API_BATCH_LIMIT = 100      # 일괄 변경 요청 하나에 담을 수 있는 최대 항목 수 (생성+수정+삭제)
+TRANSACTION_API_PAGE_SIZE = 50         # 목록 기본 개수 (?limit=, 최대 TRANSACTION_API_MAX_PAGE_SIZE)
+TRANSACTION_API_MAX_PAGE_SIZE = 200
+
+# 증분 동기화 (transactions/sync.py)
+TRANSACTION_SYNC_PAGE_SIZE = 500       # 동기화 요청 한 번에 내려줄 최대 변경 수 (사용자/공통 범위 각각)
+TRANSACTION_SYNC_MAX_PAGE_SIZE = 2000
+SYNC_TOMBSTONE_DAYS = 90               # 삭제 기록(툼스톤) 보관 기간, 이보다 오래 동기화하지 않은 앱은 전체를 다시 받음
+
+# 멱등 키 (transactions/idempotency.py): 거래 생성 재시도 시 중복 방지
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24     # 키 보관 시간(초), 지나면 같은 키도 새 요청으로 처리
+
+# 영수증 업로드 (transactions/uploads.py): 조각 단위로 받으므로 크게 올려도 요청당 메모리는 일정
+RECEIPT_MAX_UPLOAD_SIZE = 5 * 1024 * 1024  # 5MB
+
+# 영수증 파일 삭제 (transactions/storage.py): 커밋 후 작업 스레드에서 (False: 커밋 직후 바로, 테스트용)
+RECEIPT_DELETE_ASYNC = True
+
+# 영수증 다운로드 (transactions/downloads.py)
+# None: sendfile로 전송, 'x-accel': nginx X-Accel-Redirect, 'x-sendfile': Apache/lighttpd X-Sendfile
+RECEIPT_DOWNLOAD_OFFLOAD = None
+RECEIPT_DOWNLOAD_ACCEL_PREFIX = '/protected-media/'  # nginx internal location (MEDIA_ROOT를 가리킴)
+
+# 영수증 썸네일 (transactions/thumbnails.py)
+RECEIPT_THUMBNAIL_SIZES = {'small': 200, 'medium': 800}  # 긴 변 픽셀 (small: 관리자 목록, medium: 거래 상세)
+RECEIPT_THUMBNAIL_WORKERS = 2          # 프로세스마다 썸네일을 만드는 스레드 수
+RECEIPT_THUMBNAIL_ASYNC = True         # False: 업로드 요청 안에서 바로 생성 (테스트용)
+
+# 캐시 설정 (사용자별 데이터 버전 캐시: transactions/cache.py)
+# - CACHE_BACKEND=locmem: 프로세스 메모리 (DEBUG 기본값, 개발 서버/테스트처럼 프로세스 1개일 때만)
+#   데이터 버전도 프로세스마다 따로 있어서 워커가 여러 개면 다른 워커의 변경을 모르고
+#   USER_CACHE_TIMEOUT 동안 옛 대시보드/계좌 요약을 보여 줌 → DEBUG가 아니면 쓸 수 없음
+# - CACHE_BACKEND=file: 파일 캐시 (운영 기본값, 서버 1대의 여러 워커 프로세스가 같은 캐시 공유)
+#   incr가 원자적이지 않아 동시에 올린 버전 하나가 사라질 수 있음
+#   → 캐시 키에 DB 동기화 커서를 함께 넣으므로 커밋된 변경은 항상 새 키로 (transactions/cache.py)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem' if DEBUG else 'file')
+if CACHE_BACKEND == 'locmem' and not DEBUG:
+    raise ImproperlyConfigured(
+        'CACHE_BACKEND=locmem은 프로세스 1개(DEBUG)에서만 쓸 수 있습니다. '
+        '워커가 여러 개면 CACHE_BACKEND=file을 쓰세요.'
+    )
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', str(BASE_DIR / '.cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'accountbook',
+        }
+    }
+USER_CACHE_TIMEOUT = 600   # 대시보드/계좌 요약 캐시 유지 시간(초), 데이터가 바뀌면 즉시 무효화됨
+
+# 쿼리 예산 / N+1 감지 (accountbook_project/query_budget.py)
+QUERY_BUDGET_ENABLED = DEBUG   # 응답 헤더 X-Query-Count + 예산 초과/N+1 경고 로그
+QUERY_REPEAT_THRESHOLD = 3     # 같은 모양 쿼리가 이 횟수 이상이면 N+1로 봄
+
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/login/'
 LOGIN_URL = '/login/'
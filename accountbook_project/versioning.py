@@ -0,0 +1,88 @@
+"""
+낙관적 동시성 제어 (버전 컬럼)
+- 역할: 수정 화면을 연 뒤 다른 곳에서 먼저 바뀐 행을 모르고 덮어쓰지 않도록 (마지막 저장이 조용히 이기는 문제)
+- 담당: 팀원 B
+
+동작
+- VersionedModel을 상속한 모델은 version 컬럼을 가짐 (처음 1, 저장할 때마다 +1)
+- save()의 UPDATE: UPDATE ... SET ..., version = n + 1 WHERE id = ... AND version = n
+  → 행을 미리 잠그지(SELECT ... FOR UPDATE) 않고, 그 사이 다른 저장이 있었으면 0행 → StaleObjectError
+  → 그 사이 삭제된 행도 StaleObjectError (Django 기본 동작처럼 다시 INSERT하지 않음)
+- 수정 화면(VersionedUpdateMixin): 화면을 열 때의 버전을 hidden 필드(version)로 보내고 그 버전으로 저장
+  → 그 사이 다른 곳에서 수정되었으면 409 + 최신 내용으로 폼을 다시 표시 (입력한 내용으로 덮어쓰지 않음)
+- save()를 거치지 않는 queryset.update()/bulk_update()도 같은 행을 바꾸면 version을 +1 해야 함
+  (예: 미분류 일괄 분류, 거래 일괄 수정)
+  단, 계좌 잔액처럼 수정 화면이 증감(F 식)으로만 반영하는 값은 버전을 올리지 않음 (거래마다 계좌 수정 화면이 충돌하지 않도록)
+"""
+
+from django.db import models
+from django.db import transaction as db_transaction
+
+
+class StaleObjectError(Exception):
+    """읽은 뒤 다른 곳에서 먼저 저장된 행 (버전이 다름)"""
+
+    def __init__(self, instance):
+        super().__init__(f'{instance._meta.label} {instance.pk}: 버전 {instance.version}이(가) 최신이 아닙니다.')
+        self.instance = instance
+
+
+class VersionedModel(models.Model):
+    """버전이 같을 때만 UPDATE 하는 모델 (추상 모델)"""
+
+    version = models.PositiveIntegerField(default=1, editable=False, verbose_name='버전')
+
+    class Meta:
+        abstract = True
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        expected = self.version
+        # update_fields로 일부만 저장해도 버전은 항상 올림
+        field = self._meta.get_field('version')
+        values = [value for value in values if value[0] is not field] + [(field, None, expected + 1)]
+        if super()._do_update(base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update):
+            self.version = expected + 1
+            return True
+        if not self._state.adding or base_qs.filter(pk=pk_val).exists():
+            # DB에서 읽은 인스턴스인데 행이 없음 = 그 사이 다른 곳에서 삭제됨
+            # → 다시 INSERT하면 삭제 때 되돌린 금액을 한 번 더 되돌리게 되므로 거절
+            raise StaleObjectError(self)
+        return False  # pk를 직접 지정한 새 인스턴스 → Django 기본 동작 (INSERT)
+
+
+class VersionedUpdateMixin:
+    """
+    UpdateView용 낙관적 동시성 제어
+    - 템플릿: <input type="hidden" name="version" value="{{ version }}">, {{ conflict }}가 있으면 안내 문구
+    - version을 보내지 않은 요청(이전 화면)은 확인 없이 저장
+    """
+    conflict_message = '다른 곳에서 먼저 수정되었습니다. 최신 내용을 불러왔으니 확인 후 다시 수정하세요.'
+
+    def posted_version(self):
+        value = self.request.POST.get('version', '')
+        return int(value) if value.isdigit() else self.object.version
+
+    def get_context_data(self, **kwargs):
+        # 검증 오류로 다시 보여 줄 때도 처음 화면의 버전 유지
+        kwargs.setdefault('version', self.posted_version() if self.request.method == 'POST' else self.object.version)
+        return super().get_context_data(**kwargs)
+
+    def form_valid(self, form):
+        form.instance.version = self.posted_version()
+        try:
+            with db_transaction.atomic():
+                return super().form_valid(form)
+        except StaleObjectError:
+            return self.conflict_response()
+
+    def conflict_response(self):
+        self.object = self.get_object()
+        kwargs = self.get_form_kwargs()
+        kwargs.pop('data', None)
+        kwargs.pop('files', None)
+        return self.render_to_response(
+            self.get_context_data(
+                form=self.get_form_class()(**kwargs), version=self.object.version, conflict=self.conflict_message
+            ),
+            status=409,
+        )
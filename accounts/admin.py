@@ -36,9 +36,12 @@ class AccountAdmin(admin.ModelAdmin):
         'created_at',
         'updated_at',
         'masked_account_display',
+        'opening_balance',
+        'version',
     ]
     
     list_per_page = 20
+    query_budget = 6  # 목록 화면 최대 쿼리 수
     
     def masked_account_display(self, obj):
         """
@@ -52,10 +55,10 @@ class AccountAdmin(admin.ModelAdmin):
             'fields': ('user', 'name', 'bank_name')
         }),
         ('계좌 정보', {
-            'fields': ('account_number', 'masked_account_display', 'balance', 'is_active')
+            'fields': ('account_number', 'masked_account_display', 'balance', 'opening_balance', 'is_active')
         }),
         ('생성/수정 정보', {
-            'fields': ('created_at', 'updated_at'),
+            'fields': ('created_at', 'updated_at', 'version'),
             'classes': ('collapse',),  # 기본적으로 접혀있음
         }),
     )
\ No newline at end of file
@@ -7,12 +7,15 @@
 from django.db import models
 from django.contrib.auth.models import User  # Django 기본 User 모델 사용
 
+from accountbook_project.versioning import VersionedModel
 
-class Account(models.Model):
+
+class Account(VersionedModel):
     """
     계좌 모델
     - 사용자가 보유한 계좌 정보를 저장
     - 거래(Transaction)가 발생하는 기준 단위
+    - version: 수정할 때마다 +1 (accountbook_project/versioning.py), 거래 반영/잔액 대사로 잔액만 바뀔 때는 그대로
     """
     
     # 1. 관계 필드: 누구의 계좌인가?
@@ -50,6 +53,17 @@ class Account(models.Model):
         verbose_name='잔액'
     )
     
+    opening_balance = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name='기준 잔액'
+    )
+    # 거래 내역과 무관한 시작 잔액: balance = opening_balance + 거래 합계(수입 - 지출)
+    # - 계좌 생성 시 입력한 잔액으로 설정, 사용자가 잔액을 직접 수정하면 그만큼 조정
+    # - NULL: 기능 도입 이전 계좌 (reconcile_balances 첫 실행 시 현재 잔액 기준으로 채움)
+    
     # 4. 활성화 상태
     is_active = models.BooleanField(
         default=True,
@@ -69,6 +83,15 @@ class Account(models.Model):
         verbose_name_plural = '계좌 목록'   # Admin 복수형 이름
     
     
+    def save(self, *args, **kwargs):
+        """
+        계좌 생성 시 입력한 잔액을 기준 잔액(opening_balance)으로 기록
+        """
+        if self._state.adding and self.opening_balance is None:
+            self.opening_balance = self.balance
+        super().save(*args, **kwargs)
+    
+    
     def __str__(self):
         """
         객체를 문자열로 표현 (Admin, Shell에서 보이는 이름)
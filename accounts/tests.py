@@ -5,10 +5,15 @@ accounts/tests.py
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils import timezone
 from decimal import Decimal
+from datetime import timedelta
+
+from accountbook_project.query_budget import QueryBudgetTestMixin
 
 from .models import Account
 from .forms import AccountForm
+from transactions.models import Transaction
 
 
 # ============================================
@@ -235,6 +240,26 @@ class AccountViewTest(TestCase):
         self.assertContains(response, '내 계좌')
         self.assertNotContains(response, '남의 계좌')
 
+    def test_account_list_summary_cache_invalidated(self):
+        """계좌 목록 요약은 캐시되지만 거래/계좌가 바뀌면 바로 반영"""
+        url = reverse('accounts:account_list')
+        self.assertEqual(self.client.get(url).context['net_assets'], Decimal('100000'))
+
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type='OUT',
+            amount=Decimal('3000'),
+            occurred_at=timezone.now(),
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.context['total_expense'], Decimal('3000'))
+        self.assertEqual(response.context['net_assets'], Decimal('97000'))
+
+        self.account.is_active = False
+        self.account.save()
+        self.assertEqual(self.client.get(url).context['net_assets'], 0)
+
     def test_account_create(self):
         """계좌 생성"""
         data = {
@@ -256,6 +281,27 @@ class AccountViewTest(TestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    def test_account_detail_balance_history(self):
+        """계좌 상세 잔액 추이 + 날짜별 잔액 조회"""
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type='OUT',
+            amount=Decimal('3000'),
+            occurred_at=timezone.now(),
+        )
+        yesterday = timezone.localdate() - timedelta(days=1)
+        response = self.client.get(
+            reverse('accounts:account_detail', kwargs={'pk': self.account.pk})
+            + f'?days=90&date={yesterday.isoformat()}'
+        )
+        self.assertEqual(response.status_code, 200)
+        history = response.context['balance_history']
+        self.assertEqual(len(history), 90)
+        self.assertEqual(history[-2]['balance'], 100000.0)
+        self.assertEqual(history[-1]['balance'], 97000.0)
+        self.assertEqual(response.context['lookup_balance'], Decimal('100000'))
+
     def test_account_detail_other_user_404(self):
         """다른 사용자 계좌 조회 시 404"""
         response = self.client.get(
@@ -279,6 +325,91 @@ class AccountViewTest(TestCase):
         self.account.refresh_from_db()
         self.assertEqual(self.account.name, '수정된 계좌')
 
+    def test_account_update_adjusts_opening_balance(self):
+        """잔액 외 항목만 수정하면 기준 잔액 유지, 잔액을 직접 고치면 기준 잔액도 조정"""
+        url = reverse('accounts:account_update', kwargs={'pk': self.account.pk})
+        data = {
+            'name': '내 계좌',
+            'bank_name': '국민은행',
+            'account_number': '110-123-456789',
+            'balance': '100000',
+        }
+        Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT',
+            amount=Decimal('3000'), occurred_at=timezone.now(),
+        )
+        self.client.post(url, {**data, 'balance': '97000', 'name': '이름만 수정'})
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('97000'))
+        self.assertEqual(self.account.opening_balance, Decimal('100000'))
+
+        self.client.post(url, {**data, 'balance': '150000'})
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('150000'))
+        self.assertEqual(self.account.opening_balance, Decimal('153000'))
+
+    def test_account_update_stale_version_conflicts(self):
+        """화면을 연 뒤 다른 곳에서 계좌를 수정했으면 409, 저장하지 않음"""
+        url = reverse('accounts:account_update', kwargs={'pk': self.account.pk})
+        context = self.client.get(url).context
+        data = {
+            'name': '내 계좌', 'bank_name': '국민은행', 'account_number': '110-123-456789',
+            'balance': '100000', 'version': context['version'], 'shown_balance': context['shown_balance'],
+        }
+        other = Account.objects.get(pk=self.account.pk)  # 다른 화면에서 먼저 저장
+        other.name = '먼저 수정'
+        other.save()
+
+        response = self.client.post(url, {**data, 'name': '늦은 수정'})
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, '다른 곳에서 먼저 수정되었습니다', status_code=409)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.name, '먼저 수정')
+        # 최신 내용과 버전으로 다시 표시 → 그대로 다시 저장하면 반영
+        self.assertEqual(response.context['form']['name'].value(), '먼저 수정')
+        self.assertEqual(response.context['version'], self.account.version)
+        response = self.client.post(url, {
+            **data, 'name': '다시 수정', 'version': response.context['version'],
+            'shown_balance': response.context['shown_balance'],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.name, '다시 수정')
+        self.assertEqual(self.account.version, context['version'] + 2)
+
+    def test_account_update_after_transactions_keeps_their_balance(self):
+        """화면을 연 뒤 거래로 잔액만 바뀐 경우는 충돌 아님: 거래 반영분은 유지하고 화면에서 바꾼 만큼만 반영"""
+        url = reverse('accounts:account_update', kwargs={'pk': self.account.pk})
+        context = self.client.get(url).context
+        data = {
+            'name': '내 계좌', 'bank_name': '국민은행', 'account_number': '110-123-456789',
+            'balance': '100000', 'version': context['version'], 'shown_balance': context['shown_balance'],
+        }
+        # 화면을 연 뒤 거래가 들어와 잔액이 97000이 됨 → 옛 잔액 100000으로 덮어쓰면 안 됨
+        Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT',
+            amount=Decimal('3000'), occurred_at=timezone.now(),
+        )
+        response = self.client.post(url, {**data, 'name': '이름만 수정'})
+        self.assertEqual(response.status_code, 302)
+        self.account.refresh_from_db()
+        self.assertEqual((self.account.name, self.account.balance), ('이름만 수정', Decimal('97000')))
+        self.assertEqual(self.account.opening_balance, Decimal('100000'))
+
+        # 97000을 보고 107000으로 고침 (+10000) → 그 사이 거래(-2000)도 유지
+        context = self.client.get(url).context
+        Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT',
+            amount=Decimal('2000'), occurred_at=timezone.now(),
+        )
+        response = self.client.post(url, {
+            **data, 'balance': '107000', 'version': context['version'], 'shown_balance': context['shown_balance'],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('105000'))
+        self.assertEqual(self.account.opening_balance, Decimal('110000'))
+
     def test_account_delete_soft_delete(self):
         """계좌 삭제 시 소프트 삭제(비활성화)"""
         response = self.client.post(
@@ -294,3 +425,26 @@ class AccountViewTest(TestCase):
             reverse('accounts:account_delete', kwargs={'pk': self.other_account.pk})
         )
         self.assertEqual(response.status_code, 404)
+
+
+# ============================================
+# 4. 쿼리 예산 테스트
+# ============================================
+
+class AccountQueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    """계좌 목록: 계좌가 많아도 선언된 쿼리 예산 안, N+1 없음"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='budget', password='testpass123')
+        for i in range(5):
+            account = Account.objects.create(
+                user=self.user, name=f'계좌{i}', bank_name='은행', account_number=f'900-{i}',
+            )
+            Transaction.objects.create(
+                user=self.user, account=account, tx_type='IN',
+                amount=Decimal('1000'), occurred_at=timezone.now(),
+            )
+
+    def test_account_list_budget(self):
+        self.client.login(username='budget', password='testpass123')
+        self.assertQueryBudget(reverse('accounts:account_list'))
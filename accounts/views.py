@@ -11,11 +11,18 @@ from django.contrib.auth import login, logout
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views import View
-from django.db.models import Sum
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+from datetime import timedelta
 
 from .models import Account
 from .forms import AccountForm
+from accountbook_project.versioning import VersionedUpdateMixin
 from transactions.models import Transaction
+from transactions.checkpoints import balance_history, balance_on
+from transactions.periods import parse_day
+from transactions.cache import cached_for_user
 
 
 # ============================================
@@ -95,6 +102,7 @@ class AccountListView(LoginRequiredMixin, ListView):
     model = Account
     template_name = 'accounts/account_list.html'
     context_object_name = 'accounts'  # 템플릿에서 {{ accounts }}로 사용
+    query_budget = 6  # 세션/사용자 + 계좌 목록 + 캐시 키의 동기화 커서 + 요약 2개 (캐시가 비어 있을 때)
 
     def get_queryset(self):
         """
@@ -107,21 +115,23 @@ class AccountListView(LoginRequiredMixin, ListView):
         )
 
     def get_context_data(self, **kwargs):
-        """총 수입, 총 지출, 순자산 계산"""
+        """총 수입, 총 지출, 순자산 (사용자별 데이터 버전 캐시)"""
         context = super().get_context_data(**kwargs)
+        context.update(cached_for_user(
+            self.request.user.pk, 'account-summary', self.get_summary
+        ))
+        return context
 
-        # 사용자의 모든 거래 조회
-        transactions = Transaction.objects.filter(user=self.request.user)
-
-        # 총 수입
-        total_income = transactions.filter(tx_type='IN').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-
-        # 총 지출
-        total_expense = transactions.filter(tx_type='OUT').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+    def get_summary(self):
+        """총 수입, 총 지출, 순자산 계산"""
+        # 사용자의 모든 거래에서 총 수입/총 지출을 한 번에 집계
+        # (user로 시작하는 복합 인덱스 사용, 타입별로 두 번 훑지 않음)
+        totals = Transaction.objects.filter(user=self.request.user).aggregate(
+            income=Sum('amount', filter=Q(tx_type='IN')),
+            expense=Sum('amount', filter=Q(tx_type='OUT')),
+        )
+        total_income = totals['income'] or 0
+        total_expense = totals['expense'] or 0
 
 
         # 총 순자산 = 모든 계좌의 balance 합계
@@ -133,13 +143,11 @@ class AccountListView(LoginRequiredMixin, ListView):
             total=Sum('balance')
         )['total'] or 0
 
-        context.update({
+        return {
             'total_income': total_income,
             'total_expense': total_expense,
             'net_assets': net_assets,
-        })
-
-        return context
+        }
 
 
 
@@ -175,19 +183,57 @@ class AccountDetailView(LoginRequiredMixin, DetailView):
     template_name = 'accounts/account_detail.html'
     context_object_name = 'account'
     
+    # 잔액 추이 그래프 기간 선택지 (일)
+    HISTORY_DAYS_CHOICES = [30, 90, 365]
+
     def get_queryset(self):
         """본인 계좌만 접근 가능"""
         return Account.objects.filter(user=self.request.user)
+
+    def get_context_data(self, **kwargs):
+        """
+        잔액 추이 그래프 + 특정 날짜 잔액 조회
+        - 거래를 훑지 않고 일별 잔액 체크포인트(DailyBalance)만 읽음
+        """
+        context = super().get_context_data(**kwargs)
+        account = self.object
+
+        # 1. 잔액 추이 (?days=90)
+        try:
+            days = int(self.request.GET.get('days', 30))
+        except ValueError:
+            days = 30
+        if days not in self.HISTORY_DAYS_CHOICES:
+            days = 30
+        end = timezone.localdate()
+        start = end - timedelta(days=days - 1)
+        context['history_days'] = days
+        context['history_days_choices'] = self.HISTORY_DAYS_CHOICES
+        context['balance_history'] = [
+            {'date': day.isoformat(), 'balance': float(balance)}
+            for day, balance in balance_history(account, start, end)
+        ]
+
+        # 2. 특정 날짜 잔액 (?date=2026-01-15)
+        lookup_date = parse_day(self.request.GET.get('date'))
+        if lookup_date:
+            context['lookup_date'] = lookup_date
+            context['lookup_balance'] = balance_on(account, lookup_date)
+
+        return context
     
     # 예: GET /accounts/1/ → 1번 계좌 상세
+    #     GET /accounts/1/?days=90&date=2026-01-15 → 90일 추이 + 1월 15일 잔액
     # 다른 사람의 계좌 번호로 접근하면 404 에러
 
 
-class AccountUpdateView(LoginRequiredMixin, UpdateView):
+class AccountUpdateView(LoginRequiredMixin, VersionedUpdateMixin, UpdateView):
     """
     계좌 수정 뷰
     - GET: 계좌 수정 폼 (기존 데이터 포함)
     - POST: 계좌 정보 수정
+    - 화면을 연 뒤 다른 곳에서 계좌를 수정했으면 409 (VersionedUpdateMixin)
+    - 거래로 잔액만 바뀐 경우는 충돌이 아님: 잔액은 화면에서 바꾼 만큼만 반영
     """
     model = Account
     form_class = AccountForm
@@ -197,6 +243,40 @@ class AccountUpdateView(LoginRequiredMixin, UpdateView):
     def get_queryset(self):
         """본인 계좌만 수정 가능"""
         return Account.objects.filter(user=self.request.user)
+
+    def shown_balance(self, form):
+        """
+        화면을 열 때 보여 준 잔액 (hidden 필드 shown_balance)
+        - 보내지 않은 요청(이전 화면)이나 잘못된 값이면 지금 DB 잔액
+        """
+        value = form.data.get('shown_balance', '')
+        try:
+            shown = form.fields['balance'].to_python(value)
+        except ValidationError:
+            shown = None
+        return form.initial['balance'] if shown is None else shown
+
+    def get_context_data(self, **kwargs):
+        # 검증 오류로 다시 보여 줄 때도 처음 화면의 잔액 유지 (충돌 화면은 최신 잔액)
+        form = kwargs.get('form')
+        if form is not None and form.is_bound:
+            kwargs.setdefault('shown_balance', self.shown_balance(form))
+        else:
+            kwargs.setdefault('shown_balance', self.object.balance)
+        return super().get_context_data(**kwargs)
+
+    def form_valid(self, form):
+        """
+        잔액은 화면에서 바꾼 만큼만 F 식으로 반영하고 기준 잔액(opening_balance)도 같은 만큼 조정
+        - 화면을 연 뒤 들어온 거래의 잔액 변경을 옛 잔액으로 덮어쓰지 않음 (계좌 버전도 올리지 않음, balance.py)
+        - 기준 잔액도 조정 → reconcile_balances가 사용자가 맞춘 잔액을 되돌리지 않음
+        """
+        account = form.instance
+        delta = account.balance - self.shown_balance(form)
+        account.balance = F('balance') + delta
+        if account.opening_balance is not None:
+            account.opening_balance = F('opening_balance') + delta
+        return super().form_valid(form)
     
     # 예: GET /accounts/1/update/ → 1번 계좌 수정 폼
     #     POST /accounts/1/update/ → 계좌 수정 후 목록으로
@@ -8,6 +8,8 @@ transactions.Attachment 사용
 from django.contrib import admin
 from django.utils.html import format_html
 from transactions.models import Attachment  # ← 변경!
+from transactions.storage import release
+from transactions.thumbnails import schedule_thumbnails
 
 
 @admin.register(Attachment)
@@ -30,6 +32,7 @@ class DashboardAttachmentAdmin(admin.ModelAdmin):  # ← 클래스명 변경 (
     list_filter = [
         'uploaded_at',
         'content_type',
+        'thumbnail_status',
     ]
 
     search_fields = [
@@ -43,9 +46,11 @@ class DashboardAttachmentAdmin(admin.ModelAdmin):  # ← 클래스명 변경 (
         'size',
         'content_type',
         'file_preview',
+        'thumbnail_status',
     ]
 
     list_per_page = 20
+    query_budget = 6
 
     def file_type_display(self, obj):
         """
@@ -74,7 +79,21 @@ class DashboardAttachmentAdmin(admin.ModelAdmin):  # ← 클래스명 변경 (
     def file_preview(self, obj):
         """
         파일 미리보기 (이미지인 경우)
+        - 썸네일이 있으면 작은 썸네일, 없으면(생성 전/실패) 원본
         """
+        preview = obj.small_preview
+        if preview:
+            return format_html(
+                '<a href="{}" target="_blank">'
+                '<picture><source type="image/webp" srcset="{}">'
+                '<img src="{}" width="{}" height="{}" loading="lazy" /></picture>'
+                '</a>',
+                obj.file.url,
+                preview['webp'],
+                preview['jpeg'],
+                preview['width'],
+                preview['height'],
+            )
         if obj.is_image():
             return format_html(
                 '<a href="{}" target="_blank">'
@@ -91,12 +110,25 @@ class DashboardAttachmentAdmin(admin.ModelAdmin):  # ← 클래스명 변경 (
         return '-'
     file_preview.short_description = '미리보기'
 
+    def save_model(self, request, obj, form, change):
+        """파일을 바꾸면 이전 파일 참조를 놓고(storage.py) 썸네일을 새로 만듦"""
+        previous = None
+        if change and 'file' in form.changed_data:
+            previous = Attachment.objects.filter(pk=obj.pk).values_list('file', flat=True).first()
+            obj.thumbnails = {}
+            obj.thumbnail_status = 'PENDING' if obj.is_image() else 'NONE'
+        super().save_model(request, obj, form, change)
+        if previous and previous != obj.file.name:
+            release(previous)
+        if 'file' in form.changed_data:
+            schedule_thumbnails(obj)
+
     fieldsets = (
         ('기본 정보', {
             'fields': ('user', 'transaction')
         }),
         ('파일 정보', {
-            'fields': ('file', 'original_name', 'size', 'content_type', 'file_preview')
+            'fields': ('file', 'original_name', 'size', 'content_type', 'file_preview', 'thumbnail_status')
         }),
         ('업로드 정보', {
             'fields': ('uploaded_at',),
@@ -6,6 +6,7 @@ transactions.Attachment 사용
 """
 
 from django import forms
+from transactions.forms import validate_receipt_file
 from transactions.models import Attachment  # ← 변경!
 
 
@@ -13,7 +14,7 @@ class AttachmentForm(forms.ModelForm):
     """
     영수증 업로드 폼
     - 파일 필드만 포함
-    - 확장자 제한: .jpg, .jpeg, .png, .pdf
+    - 확장자/크기/내용 검사: transactions.forms.validate_receipt_file
     """
     class Meta:
         model = Attachment
@@ -29,4 +30,8 @@ class AttachmentForm(forms.ModelForm):
         }
         help_texts = {
             'file': '허용 형식: JPG, PNG, PDF (최대 5MB)'
-        }
\ No newline at end of file
+        }
+
+    def clean_file(self):
+        file = self.cleaned_data.get('file')
+        return validate_receipt_file(file) if file else file
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+대시보드 성능 측정
+- 사용법: python manage.py benchmark_dashboard --rows 50000 --repeat 5
+- 임시 사용자/계좌에 한 달치 거래를 만든 뒤 대시보드를 여러 번 렌더링하고 마지막에 모두 롤백
+
+출력:
+- 대시보드 한 번 렌더링에 쓰인 쿼리 수와 응답 시간 (최소/중앙값)
+- baseline: 이전 방식처럼 그 달 거래를 하나씩 읽어 달력을 채우는 데 걸리는 시간
+"""
+
+import random
+import statistics
+import time
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db import transaction as db_transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import Account
+from dashboard.views import DashboardView
+from transactions.models import Category, Transaction
+from transactions.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = '거래가 많은 달의 대시보드 쿼리 수/응답 시간 측정'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000, help='한 달치 거래 수')
+        parser.add_argument('--repeat', type=int, default=5, help='렌더링 반복 횟수')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = max(options['repeat'], 1)
+
+        with db_transaction.atomic():
+            user = User.objects.create_user(username=f'bench-dashboard-{time.time_ns()}')
+            account = Account.objects.create(
+                user=user, name='벤치마크', bank_name='벤치', account_number='000-000-00000000'
+            )
+            month_start = timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            self._generate(user, account, month_start, rows)
+
+            request = RequestFactory().get('/dashboard/', {'month': month_start.strftime('%Y-%m')})
+            request.user = user
+            view = DashboardView.as_view()
+
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    view(request).render()
+                    timings.append(time.perf_counter() - start)
+
+            # baseline: 이전 방식 (거래를 하나씩 읽어 float 변환 후 날짜별 합산)
+            start = time.perf_counter()
+            daily_data = defaultdict(lambda: {'income': 0, 'expense': 0})
+            month_transactions = Transaction.objects.filter(
+                user=user, occurred_at__year=month_start.year, occurred_at__month=month_start.month
+            )
+            for tx in month_transactions:
+                key = 'income' if tx.tx_type == 'IN' else 'expense'
+                daily_data[tx.occurred_at.day][key] += float(tx.amount)
+            baseline = time.perf_counter() - start
+
+            db_transaction.set_rollback(True)  # 측정용 데이터는 남기지 않음
+
+        self.stdout.write(
+            f'dashboard ({rows:,}건/월): 쿼리 {len(ctx.captured_queries)}개, '
+            f'최소 {min(timings) * 1000:.1f}ms / 중앙값 {statistics.median(timings) * 1000:.1f}ms'
+        )
+        self.stdout.write(f'baseline (거래 {rows:,}건 하나씩 달력 집계): {baseline * 1000:.1f}ms')
+
+    def _generate(self, user, account, month_start, rows):
+        rng = random.Random(0)
+        categories = [
+            Category.objects.create(name=f'벤치{i}', type='OUT', user=user) for i in range(8)
+        ]
+        days = 28
+        objs = []
+        for i in range(rows):
+            income = rng.random() < 0.2
+            objs.append(Transaction(
+                user=user,
+                account=account,
+                category=None if income else rng.choice(categories),
+                tx_type='IN' if income else 'OUT',
+                amount=Decimal(rng.randint(1, 100000)),
+                occurred_at=month_start + timedelta(minutes=rng.randint(0, days * 24 * 60 - 1)),
+                merchant=f'가게{i % 500}',
+            ))
+        Transaction.objects.bulk_create(objs, batch_size=1000)
+        rebuild_rollups(user.pk)
@@ -3,11 +3,16 @@ dashboard/tests.py
 대시보드 앱 테스트 - 뷰, 통계, 권한
 """
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.db import connection
 from django.urls import reverse
 from django.utils import timezone
 from decimal import Decimal
+from unittest import mock
+from datetime import datetime, timezone as dt_timezone
 
+from accountbook_project.query_budget import QueryBudgetTestMixin
 from accounts.models import Account
 from transactions.models import Transaction, Category
 
@@ -150,3 +155,344 @@ class DashboardViewTest(TestCase):
         )
         response = self.client.get(reverse('dashboard:dashboard'))
         self.assertEqual(response.context['total_income'], 0)
+
+    def test_dashboard_reads_monthly_rollups(self):
+        """월 통계는 월별 집계에서 읽고, 거래 수가 늘어도 쿼리 수는 같음"""
+        category = Category.objects.create(name='식비', type='OUT')
+        url = reverse('dashboard:dashboard') + '?month=2026-03'
+
+        def create(count):
+            for _ in range(count):
+                Transaction.objects.create(
+                    user=self.user,
+                    account=self.account,
+                    category=category,
+                    tx_type='OUT',
+                    amount=Decimal('1000'),
+                    occurred_at=timezone.make_aware(datetime(2026, 3, 10, 12, 0)),
+                )
+
+        create(1)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        create(30)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(response.context['total_expense'], Decimal('31000'))
+        self.assertEqual(response.context['transaction_count'], 31)
+        summary = list(response.context['category_summary'])
+        self.assertEqual(summary[0]['category__name'], '식비')
+        self.assertEqual(summary[0]['count'], 31)
+        week = next(w for w in response.context['calendar_weeks'] if any(d and d['day'] == 10 for d in w))
+        self.assertEqual(next(d for d in week if d and d['day'] == 10)['expense'], 31000.0)
+
+    def test_dashboard_nonexistent_month_param(self):
+        """존재하지 않는 월 파라미터 시 현재 월 사용"""
+        response = self.client.get(reverse('dashboard:dashboard') + '?month=2026-13')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['month'], timezone.now().month)
+
+    def test_dashboard_query_count(self):
+        """월 합계 + 날짜별 합계 1번, 카테고리 통계 1번 (세션/사용자 조회 포함 7번)"""
+        for day in range(1, 6):
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                tx_type='OUT' if day % 2 else 'IN',
+                amount=Decimal('1000'),
+                occurred_at=timezone.make_aware(datetime(2026, 3, day, 12, 0)),
+            )
+        with self.assertNumQueries(8):
+            response = self.client.get(reverse('dashboard:dashboard') + '?month=2026-03')
+        self.assertEqual(response.context['total_income'], Decimal('2000'))
+        self.assertEqual(response.context['total_expense'], Decimal('3000'))
+        self.assertEqual(response.context['transaction_count'], 5)
+
+    def test_dashboard_days_bucketed_in_seoul_time(self):
+        """달력 날짜는 Asia/Seoul 기준 (UTC 3월 9일 16시 = 서울 3월 10일 1시)"""
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type='IN',
+            amount=Decimal('5000'),
+            occurred_at=datetime(2026, 3, 9, 16, 0, tzinfo=dt_timezone.utc),
+        )
+        response = self.client.get(reverse('dashboard:dashboard') + '?month=2026-03')
+        days = {d['day']: d for week in response.context['calendar_weeks'] for d in week if d}
+        self.assertEqual(days[9]['income'], 0)
+        self.assertEqual(days[10]['income'], Decimal('5000'))
+
+    def test_dashboard_stats_cached_until_data_changes(self):
+        """같은 달을 다시 보면 캐시 사용, 거래가 바뀌면 바로 다시 계산"""
+        url = reverse('dashboard:dashboard') + '?month=2026-03'
+        tx = Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type='OUT',
+            amount=Decimal('1000'),
+            occurred_at=timezone.make_aware(datetime(2026, 3, 5, 12, 0)),
+        )
+        self.client.get(url)
+        # 세션/사용자/계좌 목록 + 캐시 키의 동기화 커서 조회만 (월 통계 쿼리 없음)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.context['total_expense'], Decimal('1000'))
+
+        tx.amount = Decimal('2500')
+        tx.save()
+        response = self.client.get(url)
+        self.assertEqual(response.context['total_expense'], Decimal('2500'))
+
+        tx.delete()
+        response = self.client.get(url)
+        self.assertEqual(response.context['total_expense'], 0)
+
+
+class TrendTest(TestCase):
+    """12개월 추이 (trends.build_trend + 추이 페이지/JSON)"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='trenduser', password='testpass123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='추이계좌',
+            bank_name='테스트은행',
+            account_number='555-555-555555',
+            balance=Decimal('0')
+        )
+        self.food = Category.objects.create(user=self.user, name='식비')
+        self.client.login(username='trenduser', password='testpass123')
+
+    def _tx(self, month, tx_type, amount, category=None, account=None, year=2026):
+        return Transaction.objects.create(
+            user=self.user,
+            account=account or self.account,
+            category=category,
+            tx_type=tx_type,
+            amount=Decimal(amount),
+            occurred_at=timezone.make_aware(datetime(year, month, 10, 12, 0)),
+        )
+
+    def test_build_trend_values(self):
+        """12개월 라벨, 이동평균, 전월 대비, 저축률 (수입 없는 달은 None)"""
+        from .trends import build_trend
+        self._tx(1, 'IN', '1000')
+        self._tx(1, 'OUT', '400', self.food)
+        self._tx(2, 'IN', '2000')
+        self._tx(3, 'OUT', '600', self.food)
+
+        trend = build_trend(self.user, datetime(2026, 3, 1).date())
+        self.assertEqual(len(trend['months']), 12)
+        self.assertEqual(trend['months'][0], '2025-04')
+        self.assertEqual(trend['months'][-1], '2026-03')
+        self.assertEqual(trend['income'][-3:], [1000.0, 2000.0, 0.0])
+        self.assertEqual(trend['income_moving_average'][-1], 1000.0)
+        self.assertEqual(trend['income_change'][-3:], [1000.0, 1000.0, -2000.0])
+        self.assertEqual(trend['savings_rate'][-3:], [60.0, 100.0, None])
+        self.assertEqual(trend['categories'][0]['name'], '식비')
+        self.assertEqual(trend['categories'][0]['totals'][-3:], [400.0, 0.0, 600.0])
+        self.assertEqual(trend['summary']['net'], 2000.0)
+        self.assertEqual(trend['summary']['savings_rate'], 66.7)
+
+    def test_build_trend_single_query(self):
+        """기간 전체를 월별 집계 쿼리 1번으로 조회"""
+        from .trends import build_trend
+        self._tx(3, 'OUT', '600', self.food)
+        with self.assertNumQueries(1):
+            build_trend(self.user, datetime(2026, 3, 1).date())
+
+    def test_trend_account_filter(self):
+        """계좌 선택 시 그 계좌 거래만"""
+        other = Account.objects.create(
+            user=self.user, name='다른계좌', bank_name='테스트은행',
+            account_number='666-666-666666', balance=Decimal('0'),
+        )
+        self._tx(3, 'IN', '1000')
+        self._tx(3, 'IN', '5000', account=other)
+        response = self.client.get(
+            reverse('dashboard:trend_data') + f'?month=2026-03&account={other.pk}'
+        )
+        self.assertEqual(response.json()['income'][-1], 5000.0)
+
+    def test_trend_page(self):
+        """추이 페이지 표시 (표는 최근 달부터)"""
+        self._tx(3, 'IN', '1000')
+        response = self.client.get(reverse('dashboard:trend') + '?month=2026-03')
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'dashboard/trend.html')
+        self.assertEqual(response.context['trend_rows'][0][0], '2026-03')
+        self.assertContains(response, 'trend-data')
+
+    def test_trend_login_required(self):
+        """비로그인 시 접근 불가"""
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('dashboard:trend')).status_code, 302)
+        self.assertEqual(self.client.get(reverse('dashboard:trend_data')).status_code, 302)
+
+
+class DashboardDataTest(TestCase):
+    """대시보드 JSON + ETag 조건부 응답"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='datauser', password='testpass123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='데이터계좌',
+            bank_name='테스트은행',
+            account_number='777-777-777777',
+            balance=Decimal('0')
+        )
+        self.tx = Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type='IN',
+            amount=Decimal('3000'),
+            occurred_at=timezone.make_aware(datetime(2026, 3, 5, 12, 0)),
+        )
+        self.client.login(username='datauser', password='testpass123')
+        self.url = reverse('dashboard:dashboard_data') + '?month=2026-03'
+
+    def test_json_response(self):
+        """통계 JSON과 검증 헤더"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(Decimal(data['total_income']), Decimal('3000'))
+        self.assertEqual(data['transaction_count'], 1)
+        self.assertEqual(data['recent_transactions'][0]['id'], self.tx.pk)
+        self.assertEqual(len(data['calendar']), 31)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_not_modified_without_aggregates(self):
+        """If-None-Match가 맞으면 304 (세션/사용자 + 동기화 카운터 조회만)"""
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since_alone_is_not_304(self):
+        """수정 시각 검증은 하지 않음: 오래된 거래를 지워도 If-Modified-Since만으로 304가 나가지 않도록"""
+        old = Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT', amount=Decimal('500'),
+            occurred_at=timezone.make_aware(datetime(2026, 3, 1, 9, 0)),
+        )
+        self.client.get(self.url)
+        old.delete()
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['transaction_count'], 1)
+
+    def test_etag_changes_with_category_and_bulk_updates(self):
+        """카테고리 이름/유형 변경, save()를 거치지 않는 일괄 수정(reconcile 등)도 ETag 변경"""
+        from transactions.models import Category
+
+        category = Category.objects.create(user=self.user, name='월급', type='IN')
+        self.tx.category = category
+        self.tx.save()
+        etag = self.client.get(self.url)['ETag']
+
+        category.name = '급여'
+        category.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['recent_transactions'][0]['category'], '급여')
+
+        etag = response['ETag']
+        category.type = 'OUT'
+        category.save()
+        self.assertNotEqual(self.client.get(self.url)['ETag'], etag)
+
+        # 잔액 검증/복구: queryset.update()로 고침 (reconcile.py)
+        from transactions.reconcile import verify_account
+
+        Account.objects.filter(pk=self.account.pk).update(balance=Decimal('1'), opening_balance=Decimal('0'))
+        etag = self.client.get(self.url)['ETag']
+        self.assertIsNotNone(verify_account(self.account.pk, repair=True))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_does_not_depend_on_process_cache(self):
+        """ETag는 DB 값 → 캐시(데이터 버전)가 다른 워커에서도 같은 ETag, 다른 워커의 변경도 바로 반영"""
+        from django.core.cache import cache
+
+        etag = self.client.get(self.url)['ETag']
+        cache.clear()  # 데이터 버전이 없는 다른 워커
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with mock.patch('transactions.cache._bump'):  # 이 워커의 캐시 버전은 그대로
+            self.tx.amount = Decimal('4000')
+            self.tx.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.json()['total_income']), Decimal('4000'))
+
+    def test_etag_changes_with_data(self):
+        """거래 수정/삭제, 계좌 수정, 다른 월/계좌 파라미터 → ETag 변경"""
+        etags = {self.client.get(self.url)['ETag']}
+
+        self.tx.amount = Decimal('4000')
+        self.tx.save()
+        etags.add(self.client.get(self.url)['ETag'])
+
+        self.tx.delete()
+        etags.add(self.client.get(self.url)['ETag'])
+
+        self.account.name = '새이름'
+        self.account.save()
+        etags.add(self.client.get(self.url)['ETag'])
+
+        etags.add(self.client.get(reverse('dashboard:dashboard_data') + '?month=2026-04')['ETag'])
+        etags.add(self.client.get(self.url + f'&account={self.account.pk}')['ETag'])
+        self.assertEqual(len(etags), 6)
+
+    def test_stale_etag_gets_full_response(self):
+        """데이터가 바뀐 뒤 예전 ETag로 요청하면 200 + 새 값"""
+        etag = self.client.get(self.url)['ETag']
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type='IN',
+            amount=Decimal('1000'),
+            occurred_at=timezone.make_aware(datetime(2026, 3, 6, 12, 0)),
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.json()['total_income']), Decimal('4000'))
+
+    def test_login_required(self):
+        """비로그인 시 접근 불가"""
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+
+class DashboardQueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    """대시보드: 거래/카테고리가 많아도 선언된 쿼리 예산 안, N+1 없음"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='budget', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='901-1',
+        )
+        for i in range(6):
+            category = Category.objects.create(user=self.user, name=f'카테고리{i}', type='OUT')
+            Transaction.objects.create(
+                user=self.user, account=self.account, category=category, tx_type='OUT',
+                amount=Decimal('1000'), merchant=f'가게{i}',
+                occurred_at=timezone.make_aware(datetime(2026, 3, i + 1, 12, 0)),
+            )
+
+    def test_dashboard_budget(self):
+        self.client.login(username='budget', password='testpass123')
+        response = self.assertQueryBudget(reverse('dashboard:dashboard') + '?month=2026-03')
+        self.assertEqual(response.context['transaction_count'], 6)
@@ -0,0 +1,120 @@
+# dashboard/trends.py
+"""
+12개월 추이 통계
+담당: 팀원 C
+
+- 월별 집계(transactions.MonthlyRollup)에서 기간 전체를 GROUP BY 쿼리 한 번으로 읽고
+- 이동평균/전월 대비 증감/저축률은 NumPy 배열 연산으로 한 번에 계산
+  (월마다 대시보드 집계를 12번 반복하지 않음)
+"""
+
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+from django.db.models import Sum
+
+from transactions.models import MonthlyRollup
+
+
+TREND_MONTHS = 12             # 화면에 보여줄 개월 수
+MOVING_AVERAGE_WINDOW = 3     # 이동평균 기간 (개월)
+TOP_CATEGORIES = 5            # 카테고리별 추이에 표시할 지출 상위 카테고리 수
+
+
+def month_starts(end, count):
+    """end(그 달 1일)까지 count개월의 1일 목록 (오래된 달부터)"""
+    months = []
+    year, month = end.year, end.month
+    for _ in range(count):
+        months.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return months[::-1]
+
+
+def moving_average(values, window):
+    """
+    이동평균 (누적합 차이로 한 번에 계산)
+    - 앞쪽 window-1개는 있는 달만으로 평균
+    """
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (cumsum[ends] - cumsum[starts]) / (ends - starts)
+
+
+def _to_list(values):
+    """JSON 직렬화용: NaN → None, 소수 둘째 자리 반올림"""
+    return [None if np.isnan(v) else round(float(v), 2) for v in values]
+
+
+def build_trend(user, end, account_id=None, months=TREND_MONTHS):
+    """
+    end(그 달 1일)까지 months개월 추이 (JSON으로 바로 보낼 수 있는 dict)
+
+    처리 순서:
+    1. 이동평균/전월 대비 계산용으로 앞의 몇 개월을 더 읽음
+    2. 월 x 거래 타입 x 카테고리 합계를 쿼리 한 번으로 조회
+    3. 수입/지출/카테고리별 지출을 월 배열에 채움
+    4. NumPy로 순수입, 저축률, 이동평균, 전월 대비 증감 계산 후 표시 기간만 잘라냄
+    """
+    extra = max(MOVING_AVERAGE_WINDOW - 1, 1)  # 전월 대비 계산에 최소 1개월 필요
+    all_months = month_starts(end, months + extra)
+    position = {month: i for i, month in enumerate(all_months)}
+
+    rollups = MonthlyRollup.objects.filter(
+        user=user,
+        account__is_active=True,
+        month__gte=all_months[0],
+        month__lte=all_months[-1],
+    )
+    if account_id:
+        rollups = rollups.filter(account_id=account_id)
+    rows = rollups.values('month', 'tx_type', 'category__name').annotate(
+        total=Sum('total')
+    ).order_by()
+
+    income = np.zeros(len(all_months))
+    expense = np.zeros(len(all_months))
+    categories = defaultdict(lambda: np.zeros(len(all_months)))
+    for row in rows:
+        i = position[row['month']]
+        total = float(row['total'])
+        if row['tx_type'] == 'IN':
+            income[i] += total
+        else:
+            expense[i] += total
+            categories[row['category__name'] or '미분류'][i] += total
+
+    net = income - expense
+    with np.errstate(divide='ignore', invalid='ignore'):
+        savings_rate = np.where(income > 0, net / income * 100, np.nan)
+
+    shown = slice(extra, None)
+    top = sorted(
+        categories.items(), key=lambda item: item[1][shown].sum(), reverse=True
+    )[:TOP_CATEGORIES]
+
+    return {
+        'months': [month.strftime('%Y-%m') for month in all_months[shown]],
+        'income': _to_list(income[shown]),
+        'expense': _to_list(expense[shown]),
+        'net': _to_list(net[shown]),
+        'savings_rate': _to_list(savings_rate[shown]),
+        'income_moving_average': _to_list(moving_average(income, MOVING_AVERAGE_WINDOW)[shown]),
+        'expense_moving_average': _to_list(moving_average(expense, MOVING_AVERAGE_WINDOW)[shown]),
+        'income_change': _to_list(np.diff(income)[extra - 1:]),
+        'expense_change': _to_list(np.diff(expense)[extra - 1:]),
+        'categories': [
+            {'name': name, 'totals': _to_list(values[shown])} for name, values in top
+        ],
+        'summary': {
+            'income': round(float(income[shown].sum()), 2),
+            'expense': round(float(expense[shown].sum()), 2),
+            'net': round(float(net[shown].sum()), 2),
+            'savings_rate': (
+                round(float(net[shown].sum() / income[shown].sum() * 100), 1)
+                if income[shown].sum() > 0 else None
+            ),
+        },
+    }
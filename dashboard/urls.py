@@ -12,6 +12,13 @@ app_name = 'dashboard'
 urlpatterns = [
     # 대시보드 메인
     path('', views.DashboardView.as_view(), name='dashboard'),
+
+    # 대시보드 JSON (ETag/Last-Modified 조건부 응답)
+    path('data/', views.DashboardDataView.as_view(), name='dashboard_data'),
+
+    # 12개월 추이 (페이지 / JSON)
+    path('trend/', views.TrendView.as_view(), name='trend'),
+    path('trend/data/', views.TrendDataView.as_view(), name='trend_data'),
     
     # 영수증 업로드 (transaction_id 필요)
     path('upload/<int:transaction_id>/', views.UploadReceiptView.as_view(), name='upload_receipt'),
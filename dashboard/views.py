@@ -9,16 +9,53 @@ transactions.Attachment 사용
 from django.views.generic import TemplateView, CreateView, DeleteView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
-from django.http import FileResponse, Http404
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.db.models import Sum, Count, Q
-from datetime import datetime
+from django.db.models.functions import TruncDay
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from datetime import date, datetime
+import hashlib
+from zoneinfo import ZoneInfo
 import calendar
 from collections import defaultdict
 
-from transactions.models import Transaction, Category, Attachment  
+from transactions.models import Transaction, Category, Attachment, MonthlyRollup
+from transactions.periods import month_range
+from transactions.sync import current_cursor
+from transactions.cache import cached_for_user
+from transactions.downloads import receipt_response
+from transactions.thumbnails import schedule_thumbnails
+from transactions.uploads import StreamingReceiptUploadMixin
 from accounts.models import Account  
 from .forms import AttachmentForm
+from .trends import build_trend
+
+
+# 달력/일별 통계의 날짜 기준 (DB 세션 시간대와 무관하게 한국 날짜로 묶음)
+SEOUL_TZ = ZoneInfo('Asia/Seoul')
+
+
+def parse_month(value):
+    """
+    month 파라미터('2026-02') → (2026, 2)
+    - 없거나 잘못된 형식/존재하지 않는 월(예: 2026-13)이면 현재 월
+    """
+    if value:
+        try:
+            year, month = map(int, value.split('-'))
+            date(year, month, 1)
+            return year, month
+        except (ValueError, AttributeError):
+            pass
+    now = datetime.now()
+    return now.year, now.month
+
+
+def parse_account(value):
+    """account 파라미터 → 계좌 id 문자열 (숫자가 아니면 None = 전체 계좌)"""
+    return value if value and value.isdigit() else None
 
 
 class DashboardView(LoginRequiredMixin, TemplateView):
@@ -28,6 +65,21 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     - 카테고리별 지출 비율
     """
     template_name = 'dashboard/dashboard.html'
+    query_budget = 8  # 세션/사용자 + 계좌 목록 + 캐시 키의 동기화 커서 + 월 통계 4개 (캐시가 비어 있을 때)
+
+    def get_month_transactions(self, year, month):
+        """
+        선택된 월의 거래 (활성 계좌만)
+        - occurred_at__year/__month 대신 반열린 구간 [1일 0시, 다음 달 1일 0시) 로 조회
+          → (user, occurred_at) / (user, account, occurred_at) 인덱스 범위 검색
+        """
+        start, end = month_range(year, month)
+        return Transaction.objects.filter(
+            user=self.request.user,
+            account__is_active=True,
+            occurred_at__gte=start,
+            occurred_at__lt=end,
+        )
     
     def get_context_data(self, **kwargs):
         """
@@ -36,72 +88,89 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         처리 순서:
         1. 계좌 존재 여부 확인
         2. 월 파라미터 파싱 (URL에서 month 파라미터 추출)
-        3. 거래 필터링 (선택된 월 및 계좌 기준)
-        4. 수입/지출 집계
-        5. 순합 계산
-        6. 카테고리별 통계 생성
-        7. 달력 데이터 생성
-        8. 최근 거래 내역 조회
+        3~8. 월 통계 (get_month_stats) - 사용자별 데이터 버전 캐시에서 읽음
+           거래/계좌/카테고리가 바뀌면 버전이 올라가서 바로 다시 계산됨 (transactions/cache.py)
         """
         context = super().get_context_data(**kwargs)
 
         # ===== 1단계: 계좌 존재 여부 확인 =====
-        # 사용자가 활성 계좌를 가지고 있는지 확인
-        has_account = Account.objects.filter(
-            user=self.request.user,
-            is_active=True
-        ).exists()
+        # 사용자의 활성 계좌 목록 조회 (드롭다운 표시용, 존재 여부 확인 겸용)
+        accounts = list(Account.objects.filter(user=self.request.user, is_active=True))
 
-        if not has_account:
+        if not accounts:
             # 계좌가 없으면 계좌 생성 안내 페이지로 변경
             self.template_name = 'accounts/make_your_account.html'
             return context
 
         # ===== 2단계: 월 파라미터 파싱 =====
-        # URL에서 month 파라미터를 읽어 연도와 월을 추출
         # 예: ?month=2026-02 → year=2026, month=2
-        month_param = self.request.GET.get('month')
-        if month_param:
-            try:
-                year, month = map(int, month_param.split('-'))
-            except (ValueError, AttributeError):
-                # 잘못된 형식이면 현재 월을 기본값으로 사용
-                now = datetime.now()
-                year, month = now.year, now.month
-        else:
-            # 파라미터가 없으면 현재 월을 사용
-            now = datetime.now()
-            year, month = now.year, now.month
+        year, month = parse_month(self.request.GET.get('month'))
+        account_id = parse_account(self.request.GET.get('account'))
 
-        # ===== 3단계: 거래 필터링 =====
-        # URL에서 계좌 ID 파라미터 추출
-        account_id = self.request.GET.get('account')
+        # ===== 3~8단계: 월 통계 (캐시) =====
+        stats = self.get_cached_stats(year, month, account_id)
 
+        context.update({
+            'year': year,
+            'month': month,
+            'accounts': accounts,
+            'selected_account_id': account_id,
+            **stats,
+        })
+        return context
+
+    def get_cached_stats(self, year, month, account_id):
+        """월 통계를 사용자별 데이터 버전 캐시에서 읽음 (없으면 get_month_stats로 계산)"""
+        return cached_for_user(
+            self.request.user.pk,
+            f'dashboard:{year}-{month:02d}:{account_id or "all"}',
+            lambda: self.get_month_stats(year, month, account_id),
+        )
+
+    def get_month_stats(self, year, month, account_id):
+        """
+        선택된 월/계좌의 통계 (캐시에 저장되므로 쿼리셋이 아닌 값으로 반환)
+
+        처리 순서:
+        3. 거래 필터링 (선택된 월 및 계좌 기준)
+        4. 날짜별 수입/지출/건수 집계 (쿼리 1번) → 월 합계도 여기서 계산
+        5. 순합 계산
+        6. 카테고리별 통계 생성 (월별 집계 테이블, 쿼리 1번)
+        7. 달력 데이터 생성
+        8. 최근 거래 내역 조회
+        """
+        # ===== 3단계: 거래 필터링 =====
         # 선택된 월의 모든 거래 조회 (활성 계좌만)
-        transactions = Transaction.objects.filter(
+        transactions = self.get_month_transactions(year, month)
+
+        # 선택된 월의 월별 집계 (transactions.MonthlyRollup, 거래 저장 시 자동 갱신)
+        # → 카테고리 통계는 그 달 거래가 몇 건이든 (계좌 x 카테고리 x 타입) 개수만큼의 행만 읽음
+        rollups = MonthlyRollup.objects.filter(
             user=self.request.user,
             account__is_active=True,
-            occurred_at__year=year,
-            occurred_at__month=month
+            month=date(year, month, 1)
         )
 
         # 특정 계좌가 선택된 경우 해당 계좌 거래만 필터링
         if account_id:
             transactions = transactions.filter(account_id=account_id)
+            rollups = rollups.filter(account_id=account_id)
 
-        # 사용자의 활성 계좌 목록 조회 (드롭다운 표시용)
-        accounts = Account.objects.filter(user=self.request.user, is_active=True)
-        
         # ===== 4단계: 수입/지출 집계 =====
-        # 선택된 월의 총 수입 계산 (tx_type='IN')
-        income = transactions.filter(tx_type='IN').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-
-        # 선택된 월의 총 지출 계산 (tx_type='OUT')
-        expense = transactions.filter(tx_type='OUT').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        # 날짜별(Asia/Seoul 기준) 수입/지출/건수를 조건부 집계 쿼리 한 번으로 계산
+        # → 결과는 최대 31행, 월 합계는 이 행들을 더해서 구함 (추가 쿼리 없음)
+        daily_totals = list(
+            transactions.annotate(
+                day=TruncDay('occurred_at', tzinfo=SEOUL_TZ)
+            ).values('day').annotate(
+                income=Sum('amount', filter=Q(tx_type='IN'), default=0),
+                expense=Sum('amount', filter=Q(tx_type='OUT'), default=0),
+                count=Count('id'),
+            ).order_by()
+        )
+        income = sum(row['income'] for row in daily_totals)
+        expense = sum(row['expense'] for row in daily_totals)
+        transaction_count = sum(row['count'] for row in daily_totals)
 
         # ===== 5단계: 순합 계산 =====
         # 계좌 잔액 합계 (계좌 필터 적용)
@@ -126,15 +195,16 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         balance = account_balance
         
         # 카테고리별 통계 (지출만)
-        category_summary = transactions.filter(
+        category_summary = rollups.filter(
             tx_type='OUT',
             category__isnull=False
         ).values(
             'category__name'
         ).annotate(
-            total=Sum('amount'),
-            count=Count('id')
+            total=Sum('total'),
+            count=Sum('count')
         ).order_by('-total')[:5]  # Top 5 - 지출 높은 순으로 정렬
+        category_summary = list(category_summary)
 
         # 카테고리별 비율 계산 (차트용)
         if category_summary:
@@ -146,15 +216,10 @@ class DashboardView(LoginRequiredMixin, TemplateView):
                 stat['percentage'] = stat['expense_ratio']
 
         # ===== 달력 데이터 생성 =====
-        # 날짜별 수입/지출 계산
+        # 4단계에서 구한 날짜별 합계를 그대로 사용
         daily_data = defaultdict(lambda: {'income': 0, 'expense': 0})
-
-        for transaction in transactions:
-            day = transaction.occurred_at.day
-            if transaction.tx_type == 'IN':
-                daily_data[day]['income'] += float(transaction.amount)
-            else:
-                daily_data[day]['expense'] += float(transaction.amount)
+        for row in daily_totals:
+            daily_data[row['day'].day] = row
 
         # 달력 구조 생성 (주 단위로)
         cal = calendar.monthcalendar(year, month)
@@ -175,27 +240,135 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         # ===========================
 
         # 최근 거래 내역 (최대 4개)
-        recent_transactions = transactions.order_by('-occurred_at')[:4]
+        recent_transactions = list(
+            transactions.select_related('category').order_by('-occurred_at')[:4]
+        )
 
-        context.update({
-            'year': year,
-            'month': month,
+        return {
             'total_income': income,
             'total_expense': expense,
             'balance': balance,
-            'transaction_count': transactions.count(),
+            'transaction_count': transaction_count,
             'category_summary': category_summary,
             'calendar_weeks': calendar_weeks,
-            'accounts': accounts,
-            'selected_account_id': account_id,
             'recent_transactions': recent_transactions,
+        }
+
+
+class DashboardDataView(DashboardView):
+    """
+    대시보드 JSON (폴링/새로고침용)
+    - 예: GET /dashboard/data/?month=2026-02&account=1
+    - 파라미터는 DashboardView와 같음
+
+    조건부 응답:
+    - ETag: 사용자/공통 동기화 변경 번호(transactions/sync.py, SyncCounter)로 만든 강한 ETag
+      → 거래/계좌/카테고리 저장·삭제, 일괄 수정(queryset.update 포함)마다 번호가 올라가므로 바뀜
+      → DB 값이므로 워커 프로세스가 여러 개여도 같은 데이터면 같은 ETag, 커밋된 변경만 반영
+    - If-None-Match가 맞으면 집계 없이 304 (카운터 조회 1번)
+    - Last-Modified는 보내지 않음: 수정 시각으로는 삭제/카테고리 변경을 알 수 없어 오래된 304가 나감
+    """
+
+    def get_etag(self, year, month, account_id):
+        """
+        ETag 계산
+        - 월/계좌 파라미터 포함: 파라미터가 없으면 현재 월이므로 달이 바뀌면 ETag도 바뀜
+        """
+        user = self.request.user
+        signature = ':'.join(str(value) for value in (
+            user.pk, year, month, account_id, current_cursor(user.pk),
+        ))
+        return quote_etag(hashlib.sha1(signature.encode()).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        year, month = parse_month(request.GET.get('month'))
+        account_id = parse_account(request.GET.get('account'))
+        etag = self.get_etag(year, month, account_id)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            stats = self.get_cached_stats(year, month, account_id)
+            response = JsonResponse({
+                'year': year,
+                'month': month,
+                'account': int(account_id) if account_id else None,
+                'total_income': stats['total_income'],
+                'total_expense': stats['total_expense'],
+                'balance': stats['balance'],
+                'transaction_count': stats['transaction_count'],
+                'category_summary': stats['category_summary'],
+                'calendar': [
+                    day for week in stats['calendar_weeks'] for day in week if day
+                ],
+                'recent_transactions': [
+                    {
+                        'id': tx.pk,
+                        'tx_type': tx.tx_type,
+                        'amount': tx.amount,
+                        'occurred_at': tx.occurred_at,
+                        'merchant': tx.merchant,
+                        'category': tx.category.name if tx.category else None,
+                    }
+                    for tx in stats['recent_transactions']
+                ],
+            })
+
+        # 304 응답에도 같은 검증값을 붙임 (클라이언트가 다음 요청에 그대로 사용)
+        response.headers['ETag'] = etag
+        # 매번 서버에 검증 요청을 보내도록 (다른 사용자와 공유 캐시 금지)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class TrendView(LoginRequiredMixin, TemplateView):
+    """
+    12개월 추이 페이지
+    - 선택한 달까지 12개월의 수입/지출, 이동평균, 저축률, 카테고리별 지출 추이
+    - 계산은 dashboard/trends.py (월별 집계 쿼리 1번 + NumPy)
+    """
+    template_name = 'dashboard/trend.html'
+
+    def get_trend(self):
+        """사용자별 데이터 버전 캐시 (대시보드와 같은 방식)"""
+        year, month = parse_month(self.request.GET.get('month'))
+        account_id = parse_account(self.request.GET.get('account'))
+        trend = cached_for_user(
+            self.request.user.pk,
+            f'trend:{year}-{month:02d}:{account_id or "all"}',
+            lambda: build_trend(self.request.user, date(year, month, 1), account_id),
+        )
+        return year, month, account_id, trend
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        year, month, account_id, trend = self.get_trend()
+        context.update({
+            'year': year,
+            'month': month,
+            'accounts': Account.objects.filter(user=self.request.user, is_active=True),
+            'selected_account_id': account_id,
+            'trend': trend,
+            'trend_rows': list(zip(
+                trend['months'], trend['income'], trend['expense'],
+                trend['income_change'], trend['expense_change'], trend['savings_rate'],
+            ))[::-1],  # 표는 최근 달부터
         })
         return context
 
 
-class UploadReceiptView(LoginRequiredMixin, CreateView):
+class TrendDataView(TrendView):
+    """
+    12개월 추이 JSON
+    - 예: GET /dashboard/trend/data/?month=2026-02&account=1
+    """
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(self.get_trend()[3])
+
+
+class UploadReceiptView(StreamingReceiptUploadMixin, LoginRequiredMixin, CreateView):
     """
     영수증 업로드 뷰
+    - 파일은 조각 단위로 받으며 검사 (transactions/uploads.py)
     """
     model = Attachment
     form_class = AttachmentForm
@@ -235,8 +408,16 @@ class UploadReceiptView(LoginRequiredMixin, CreateView):
         )
         
         form.instance.transaction = transaction
-        
-        return super().form_valid(form)
+
+        # 파일 정보 (content_type은 검사에서 확인한 실제 형식)
+        uploaded_file = form.cleaned_data['file']
+        form.instance.original_name = uploaded_file.name
+        form.instance.size = uploaded_file.size
+        form.instance.content_type = uploaded_file.content_type
+
+        response = super().form_valid(form)
+        schedule_thumbnails(self.object)
+        return response
 
 
 class DeleteReceiptView(LoginRequiredMixin, DeleteView):
@@ -258,6 +439,8 @@ class DeleteReceiptView(LoginRequiredMixin, DeleteView):
 class DownloadReceiptView(LoginRequiredMixin, View):
     """
     영수증 다운로드 뷰
+    - 파일 전송은 앞단 서버(X-Accel-Redirect/X-Sendfile) 또는 sendfile에 맡김 (transactions/downloads.py)
+    - Range 요청 지원 → PDF 뷰어가 필요한 부분만 받음 (?inline=1: 브라우저에서 바로 열기)
     """
     def get(self, request, *args, **kwargs):
         attachment_id = kwargs.get('pk')
@@ -274,10 +457,4 @@ class DownloadReceiptView(LoginRequiredMixin, View):
             raise Http404("파일을 찾을 수 없습니다.")
         
         # 파일 다운로드
-        response = FileResponse(
-            attachment.file.open('rb'),
-            content_type=attachment.content_type
-        )
-        response['Content-Disposition'] = f'attachment; filename="{attachment.original_name}"'
-        
-        return response
\ No newline at end of file
+        return receipt_response(request, attachment, as_attachment=request.GET.get('inline') != '1')
\ No newline at end of file
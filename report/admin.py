@@ -15,6 +15,7 @@ class InquiryAdmin(admin.ModelAdmin):
     list_filter = ['status', 'is_read', 'created_at']
     search_fields = ['name', 'email', 'content']
     readonly_fields = ['created_at', 'updated_at']
+    query_budget = 5  # 목록 화면 최대 쿼리 수
 
     fieldsets = (
         ('문의 정보', {
@@ -60,3 +61,4 @@ class FAQAdmin(admin.ModelAdmin):
     search_fields = ['question', 'answer']
     list_editable = ['order', 'is_active']
     readonly_fields = ['created_at', 'updated_at']
+    query_budget = 5
@@ -5,7 +5,7 @@ transactions/admin.py
 """
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Category, Transaction
+from .models import Category, CategoryRule, Transaction, ImportJob, MonthlyRollup, SyncChange, IdempotencyKey, ReceiptBlob
 
 
 @admin.register(Category)
@@ -16,6 +16,7 @@ class CategoryAdmin(admin.ModelAdmin):
     list_filter = ['type']
     search_fields = ['name']
     list_per_page = 30
+    query_budget = 5  # 목록 화면 최대 쿼리 수 (세션/사용자 포함, accountbook_project/query_budget.py)
     
     def type_badge(self, obj):
         """유형 뱃지 (색상 표시)"""
@@ -33,6 +34,20 @@ class CategoryAdmin(admin.ModelAdmin):
     type_badge.short_description = '유형'
 
 
+@admin.register(CategoryRule)
+class CategoryRuleAdmin(admin.ModelAdmin):
+    """자동 분류 규칙 Admin"""
+
+    list_display = ['id', 'user', 'pattern', 'match_type', 'category', 'priority', 'is_active']
+    list_filter = ['match_type', 'is_active']
+    search_fields = ['user__username', 'pattern']
+    list_per_page = 30
+    query_budget = 5
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'category')
+
+
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     """거래 Admin (하이브리드 버전)"""
@@ -68,10 +83,11 @@ class TransactionAdmin(admin.ModelAdmin):
     date_hierarchy = 'occurred_at'
     
     # 🔒 읽기 전용: 준호님 버전
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at', 'version']
     
     # 📄 페이지당 항목: 준호님 버전 (30개)
     list_per_page = 30
+    query_budget = 8
     
     # 🚀 자동완성: 내 버전 (선택사항)
     autocomplete_fields = ['category']
@@ -85,7 +101,7 @@ class TransactionAdmin(admin.ModelAdmin):
             'fields': ('tx_type', 'amount', 'occurred_at', 'merchant', 'memo')
         }),
         ('생성/수정 정보', {
-            'fields': ('created_at', 'updated_at'),
+            'fields': ('created_at', 'updated_at', 'version'),
             'classes': ('collapse',),
         }),
     )
@@ -165,6 +181,114 @@ class TransactionAdmin(admin.ModelAdmin):
                 obj.user = request.user
         super().save_model(request, obj, form, change)
 
+    def delete_queryset(self, request, queryset):
+        """
+        선택 삭제: 한 건씩 Transaction.delete() → 잔액/집계 복원, 동기화 툼스톤 기록
+        (queryset.delete()는 모델의 delete()를 거치지 않음)
+        """
+        for obj in queryset:
+            obj.delete()
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    """거래 가져오기(CSV) 작업 Admin"""
+
+    list_display = ['id', 'user', 'account', 'original_name', 'status',
+                    'imported_rows', 'error_rows', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['user__username', 'original_name']
+    readonly_fields = ['total_rows', 'processed_rows', 'imported_rows',
+                       'error_rows', 'errors', 'created_at', 'finished_at']
+    list_per_page = 30
+    query_budget = 5
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'account')
+
+
+@admin.register(MonthlyRollup)
+class MonthlyRollupAdmin(admin.ModelAdmin):
+    """월별 거래 집계 Admin (거래 저장 시 자동 갱신 → 조회 전용, 삭제 불가)"""
+
+    list_display = ['id', 'user', 'account', 'month', 'category', 'tx_type', 'total', 'count']
+    list_filter = ['tx_type', 'month']
+    search_fields = ['user__username', 'account__name']
+    list_per_page = 30
+    query_budget = 5
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'account', 'category')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # 지우면 대시보드/추이 통계가 거래와 어긋남 (다시 맞추려면 rebuild_rollups)
+        return False
+
+
+@admin.register(SyncChange)
+class SyncChangeAdmin(admin.ModelAdmin):
+    """동기화 변경 기록 Admin (거래/계좌/카테고리 변경 시 자동 기록 → 조회 전용)"""
+
+    list_display = ['id', 'user', 'kind', 'object_id', 'seq', 'deleted', 'changed_at']
+    list_filter = ['kind', 'deleted']
+    search_fields = ['user__username']
+    list_per_page = 30
+    query_budget = 5
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    """멱등 키 Admin (거래 생성 시 자동 저장 → 조회 전용)"""
+
+    list_display = ['id', 'user', 'key', 'status_code', 'created_at', 'expires_at']
+    search_fields = ['user__username', 'key']
+    readonly_fields = ['body']
+    list_per_page = 30
+    query_budget = 5
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ReceiptBlob)
+class ReceiptBlobAdmin(admin.ModelAdmin):
+    """영수증 파일 Admin (첨부파일 저장/삭제 시 자동 관리 → 조회 전용, 삭제 불가)"""
+
+    list_display = ['id', 'name', 'size', 'ref_count', 'created_at']
+    search_fields = ['sha256', 'name']
+    list_per_page = 30
+    query_budget = 5
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 
 # ============================================
 # 버전별 특징 요약
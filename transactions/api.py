@@ -0,0 +1,491 @@
+"""
+거래 JSON API
+- 역할: 모바일 앱 등 프로그램에서 거래 조회 + 여러 거래를 한 번에 생성/수정/삭제
+- 담당: 팀원 B
+
+엔드포인트 (로그인 세션 필요, POST는 X-CSRFToken 헤더 필요)
+- GET  /transactions/api/transactions/?account=1&tx_type=OUT&limit=50&fields=id,amount,merchant
+  → {"results": [...], "next_cursor": "...", "previous_cursor": null}
+  필터는 거래 목록 화면과 같음 (filters.py), 다음 페이지는 ?cursor=next_cursor (pagination.py)
+- GET  /transactions/api/transactions/<id>/?fields=...
+- POST /transactions/api/transactions/batch/?fields=...
+  {"create": [{"account": 1, "tx_type": "OUT", "amount": "4500", "occurred_at": "2026-01-05T09:30:00+09:00",
+               "merchant": "스타벅스", "category": 3}],
+   "update": [{"id": 10, "amount": "5000", "version": 3}],  ← 보낸 필드만 수정
+   "delete": [11, 12]}
+  → {"created": [...], "updated": [...], "deleted": [11, 12]}
+  수정 항목의 version: 받아 둔 거래의 버전, 그 사이 다른 곳에서 수정되었으면 409 (생략하면 확인하지 않음)
+  Idempotency-Key 헤더를 붙이면 재전송해도 한 번만 처리 (idempotency.py)
+
+- GET  /transactions/api/sync/?cursor=...&limit=500
+  → {"reset": false, "cursor": "...", "has_more": false,
+     "transactions": [...], "accounts": [...], "categories": [...],
+     "deleted": {"transactions": [id, ...], "accounts": [...], "categories": [...]}}
+  마지막 동기화 이후 바뀐 것만 (sync.py), 처음에는 cursor 없이 → 전체
+  has_more면 받은 cursor로 바로 다시 요청, reset이면 로컬 데이터를 버리고 cursor 없이 다시
+
+fields: 응답에 넣을 필드 (쉼표 구분, 생략 시 전체) → 목록은 해당 컬럼만 조회
+
+일괄 변경 (apply_batch)
+- 모든 항목을 먼저 검증 → 하나라도 틀리면 아무것도 저장하지 않고 400 + 항목별 오류
+- 하나의 DB 트랜잭션 안에서 bulk_create / bulk_update / DELETE를 한 번씩
+- 잔액/체크포인트/월별 집계는 변경분을 모아 Transaction._apply_changes에 한 번에 전달
+  → 계좌마다 잔액 UPDATE 한 번 (항목 수와 무관)
+- 생성할 때 카테고리를 생략하면 자동 분류 (categorizer.py)
+"""
+
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views import View
+
+from accounts.models import Account
+
+from .autocomplete import invalidate_merchants
+from .cache import bump_data_version
+from .categorizer import Categorizer
+from .filters import filter_transactions
+from .forms import TransactionForm, validate_amount
+from .idempotency import MAX_KEY_LENGTH, IdempotencyConflict, fingerprint, replay, run_once, valid_key
+from .models import Category, Transaction
+from .pagination import KeysetPaginator
+from .sync import PAGE_SIZE as SYNC_PAGE_SIZE
+from .sync import ACCOUNT, CATEGORY, TRANSACTION, InvalidCursor, changes_since
+
+
+BATCH_LIMIT = getattr(settings, 'TRANSACTION_API_BATCH_LIMIT', 100)
+PAGE_SIZE = getattr(settings, 'TRANSACTION_API_PAGE_SIZE', 50)
+MAX_PAGE_SIZE = getattr(settings, 'TRANSACTION_API_MAX_PAGE_SIZE', 200)
+MAX_SYNC_PAGE_SIZE = getattr(settings, 'TRANSACTION_SYNC_MAX_PAGE_SIZE', 2000)
+
+
+def _datetime(value):
+    return timezone.localtime(value).isoformat() if value else None
+
+
+# 응답 필드 → (조회할 모델 필드, 값 변환)
+FIELDS = {
+    'id': ('id', lambda tx: tx.pk),
+    'account': ('account', lambda tx: tx.account_id),
+    'category': ('category', lambda tx: tx.category_id),
+    'tx_type': ('tx_type', lambda tx: tx.tx_type),
+    'amount': ('amount', lambda tx: f'{tx.amount:.2f}'),  # 소수점 둘째 자리까지 (DB 값과 같은 표기)
+    'occurred_at': ('occurred_at', lambda tx: _datetime(tx.occurred_at)),
+    'merchant': ('merchant', lambda tx: tx.merchant),
+    'memo': ('memo', lambda tx: tx.memo),
+    'created_at': ('created_at', lambda tx: _datetime(tx.created_at)),
+    'updated_at': ('updated_at', lambda tx: _datetime(tx.updated_at)),
+    'version': ('version', lambda tx: tx.version),
+}
+
+ACCOUNT_FIELDS = {
+    'id': lambda account: account.pk,
+    'name': lambda account: account.name,
+    'bank_name': lambda account: account.bank_name,
+    'account_number': lambda account: account.masked_account_number,  # 화면 출력용이므로 마스킹
+    'balance': lambda account: f'{account.balance:.2f}',
+    'is_active': lambda account: account.is_active,
+    'updated_at': lambda account: _datetime(account.updated_at),
+    'version': lambda account: account.version,
+}
+
+CATEGORY_FIELDS = {
+    'id': lambda category: category.pk,
+    'name': lambda category: category.name,
+    'type': lambda category: category.type,
+    'shared': lambda category: category.user_id is None,
+}
+
+# 동기화 응답의 종류별 키
+SYNC_KEYS = {TRANSACTION: 'transactions', ACCOUNT: 'accounts', CATEGORY: 'categories'}
+
+# 생성/수정 요청에서 받을 수 있는 필드
+WRITABLE_FIELDS = ('account', 'category', 'tx_type', 'amount', 'occurred_at', 'merchant', 'memo')
+REQUIRED_FIELDS = ('account', 'tx_type', 'amount', 'occurred_at')
+
+
+STALE_VERSION = '다른 곳에서 먼저 수정된 거래입니다. 최신 내용을 받은 뒤 다시 수정하세요.'
+
+
+class ApiError(Exception):
+    """요청 자체가 잘못된 경우 (400 등, 항목별 검증 오류와 구분)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_fields(value):
+    """?fields=id,amount → ['id', 'amount'] (생략 시 전체)"""
+    if not value:
+        return list(FIELDS)
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown or not fields:
+        raise ApiError(f"알 수 없는 필드: {', '.join(unknown)} (사용 가능: {', '.join(FIELDS)})")
+    return fields
+
+
+def serialize(tx, fields):
+    return {name: FIELDS[name][1](tx) for name in fields}
+
+
+def only_fields(queryset, fields, *extra):
+    """응답에 필요한 컬럼만 조회 (+ 정렬/커서에 쓰는 extra)"""
+    return queryset.only(*{FIELDS[name][0] for name in fields}, *extra)
+
+
+def tracked_values(tx):
+    return {name: getattr(tx, name) for name in Transaction.TRACKED_FIELDS}
+
+
+class BatchValidator:
+    """
+    일괄 변경 항목 검증
+    - 필드 규칙은 TransactionForm과 같음 (form.fields[...].clean, validate_amount)
+    - 계좌/카테고리는 처음에 한 번씩만 조회 → 항목마다 DB를 조회하지 않음
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.fields = TransactionForm(user=user).fields
+        self.accounts = {account.pk: account for account in Account.objects.filter(user=user, is_active=True)}
+        self.categories = {
+            category.pk: category
+            for category in Category.objects.filter(Q(user=user) | Q(user__isnull=True))
+        }
+        self._categorizer = None
+
+    @property
+    def categorizer(self):
+        if self._categorizer is None:
+            self._categorizer = Categorizer(self.user.pk)
+        return self._categorizer
+
+    def _lookup(self, objects, value, message):
+        try:
+            return objects[int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError(message)
+
+    def clean(self, item, partial=False):
+        """
+        항목(dict) → 검증된 값 dict, 틀리면 ValidationError({필드: [메시지]})
+        - partial: 수정 (보낸 필드만 검사)
+        """
+        if not isinstance(item, dict):
+            raise ValidationError({'__all__': ['객체 형식이어야 합니다.']})
+
+        errors = {}
+        unknown = set(item) - set(WRITABLE_FIELDS) - ({'id', 'version'} if partial else set())
+        for name in sorted(unknown):
+            errors[name] = ['알 수 없는 필드입니다.']
+
+        names = [name for name in WRITABLE_FIELDS if name in item or (not partial and name in REQUIRED_FIELDS)]
+        cleaned = {}
+        for name in names:
+            value = item.get(name)
+            try:
+                if name == 'account':
+                    if value is None:
+                        raise ValidationError('필수 항목입니다.')
+                    cleaned['account_id'] = self._lookup(self.accounts, value, '계좌를 찾을 수 없습니다.').pk
+                elif name == 'category':
+                    cleaned['category_id'] = None if value in (None, '') else self._lookup(
+                        self.categories, value, '카테고리를 찾을 수 없습니다.'
+                    ).pk
+                else:
+                    cleaned[name] = self.fields[name].clean(value)
+                    if name == 'amount':
+                        cleaned[name] = validate_amount(cleaned[name])
+            except ValidationError as e:
+                errors[name] = e.messages
+        if errors:
+            raise ValidationError(errors)
+        return cleaned
+
+    def check_category(self, tx):
+        """카테고리 타입(수입/지출/공통)이 거래 타입과 맞는지"""
+        category = self.categories.get(tx.category_id)
+        if category and category.type not in (tx.tx_type, 'BOTH'):
+            raise ValidationError({'category': [f"'{category.name}'는 {tx.tx_type} 거래에 쓸 수 없습니다."]})
+
+
+def _item_id(item):
+    value = item.get('id') if isinstance(item, dict) else item
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).isdigit():
+        return None
+    return int(value)
+
+
+def apply_batch(user, create=(), update=(), delete=()):
+    """
+    여러 거래를 한 번에 생성/수정/삭제
+    - 반환값: (생성한 거래 목록, 수정한 거래 목록, 삭제한 id 목록, 오류 목록)
+      오류가 하나라도 있으면 아무것도 저장하지 않음
+    - 오류: [{"op": "create"|"update"|"delete", "index": 0, "errors": {필드: [메시지]}}, ...]
+      수정 항목의 version이 현재 버전과 다르면 {"version": [...]} (STALE_VERSION)
+    """
+    validator = BatchValidator(user)
+    errors = []
+
+    def fail(op, index, error):
+        errors.append({'op': op, 'index': index, 'errors': error.message_dict if hasattr(error, 'error_dict') else {
+            '__all__': error.messages
+        }})
+
+    with db_transaction.atomic():
+        # 수정/삭제할 거래를 id 순서로 잠그고 한 번에 읽음
+        update_ids = [_item_id(item) for item in update]
+        delete_ids = [_item_id(item) for item in delete]
+        existing = {
+            tx.pk: tx for tx in Transaction.objects.select_for_update().filter(
+                user=user, pk__in=[pk for pk in update_ids + delete_ids if pk is not None]
+            ).order_by('pk')
+        }
+        seen = set()
+
+        def target(op, index, pk):
+            if pk is None:
+                fail(op, index, ValidationError({'id': ['거래 id가 필요합니다.']}))
+            elif pk in seen:
+                fail(op, index, ValidationError({'id': ['같은 거래가 요청에 두 번 들어 있습니다.']}))
+            elif pk not in existing:
+                fail(op, index, ValidationError({'id': ['거래를 찾을 수 없습니다.']}))
+            else:
+                seen.add(pk)
+                return existing[pk]
+            return None
+
+        created = []
+        for index, item in enumerate(create):
+            try:
+                tx = Transaction(user=user, **validator.clean(item))
+                if 'category' not in item:
+                    tx.category_id = validator.categorizer.suggest(tx.merchant, tx.tx_type)
+                validator.check_category(tx)
+                created.append(tx)
+            except ValidationError as e:
+                fail('create', index, e)
+
+        updated, old_values = [], []
+        for index, (item, pk) in enumerate(zip(update, update_ids)):
+            tx = target('update', index, pk)
+            if tx is None:
+                continue
+            try:
+                values = validator.clean(item, partial=True)
+                if 'version' in item:
+                    version = item['version']
+                    if isinstance(version, bool) or not isinstance(version, int):
+                        raise ValidationError({'version': ['정수여야 합니다.']})
+                    if version != tx.version:
+                        raise ValidationError({'version': [STALE_VERSION]})
+                old = tracked_values(tx)
+                for name, value in values.items():
+                    setattr(tx, name, value)
+                validator.check_category(tx)
+                updated.append(tx)
+                old_values.append(old)
+            except ValidationError as e:
+                fail('update', index, e)
+
+        deleted = []
+        for index, pk in enumerate(delete_ids):
+            tx = target('delete', index, pk)
+            if tx is not None:
+                deleted.append(tx)
+
+        if errors:
+            return [], [], [], errors
+
+        Transaction.objects.bulk_create(created)
+        if updated:
+            now = timezone.now()
+            for tx in updated:
+                tx.updated_at = now
+                tx.version += 1  # 잠근 행이므로 그대로 +1 (versioning.py)
+            Transaction.objects.bulk_update(
+                updated,
+                ['account', 'category', 'tx_type', 'amount', 'occurred_at', 'merchant', 'memo', 'updated_at', 'version'],
+            )
+        if deleted:
+            Transaction.objects.filter(pk__in=[tx.pk for tx in deleted]).delete()
+
+        # 잔액/체크포인트/월별 집계: 되돌릴 값(-1) + 새 값(+1)을 모아서 한 번에 (동기화 변경 기록 포함)
+        Transaction._apply_changes(
+            [(-1, old) for old in old_values]
+            + [(-1, tracked_values(tx)) for tx in deleted]
+            + [(1, tracked_values(tx)) for tx in created + updated],
+            synced=[(TRANSACTION, tx.pk, False) for tx in created + updated]
+            + [(TRANSACTION, tx.pk, True) for tx in deleted],
+        )
+        # bulk_create/bulk_update는 post_save 시그널이 없음
+        bump_data_version(user.pk)
+        invalidate_merchants(user.pk)
+
+    return created, updated, [tx.pk for tx in deleted], []
+
+
+# ============================================
+# 뷰
+# ============================================
+
+class ApiLoginRequiredMixin:
+    """로그인하지 않았으면 로그인 페이지로 보내는 대신 401 JSON"""
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': '로그인이 필요합니다.'}, status=401)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as e:
+            return JsonResponse({'error': e.message}, status=e.status)
+
+
+class TransactionApiListView(ApiLoginRequiredMixin, View):
+    """
+    거래 목록 (GET)
+    - 거래 목록 화면과 같은 필터, 커서 페이지네이션 (전체 건수는 세지 않음)
+    """
+    query_budget = 3  # 세션/사용자 + 거래 페이지
+
+    def get(self, request):
+        fields = parse_fields(request.GET.get('fields'))
+        try:
+            limit = min(max(int(request.GET.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            raise ApiError('limit은 숫자여야 합니다.')
+
+        queryset = filter_transactions(
+            Transaction.objects.filter(user=request.user, account__is_active=True), request.GET
+        )
+        # 커서에 쓰는 정렬 키(occurred_at, id)는 항상 조회
+        page = KeysetPaginator(only_fields(queryset, fields, 'occurred_at'), limit).page(
+            request.GET.get('cursor')
+        )
+        return JsonResponse({
+            'results': [serialize(tx, fields) for tx in page],
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+        })
+
+
+class TransactionApiDetailView(ApiLoginRequiredMixin, View):
+    """거래 하나 (GET, 본인 거래만)"""
+    query_budget = 3
+
+    def get(self, request, pk):
+        fields = parse_fields(request.GET.get('fields'))
+        tx = only_fields(Transaction.objects.filter(user=request.user, pk=pk), fields).first()
+        if tx is None:
+            return JsonResponse({'error': '거래를 찾을 수 없습니다.'}, status=404)
+        return JsonResponse(serialize(tx, fields))
+
+
+class TransactionApiBatchView(ApiLoginRequiredMixin, View):
+    """
+    거래 일괄 생성/수정/삭제 (POST)
+    - 요청 하나에 항목 BATCH_LIMIT개까지, 전부 성공하거나 전부 취소
+    - Idempotency-Key 헤더: 같은 키로 다시 보내면 처음 응답을 그대로 (다시 처리하지 않음, idempotency.py)
+    """
+
+    def post(self, request):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return self._apply(request)
+        if not valid_key(key):
+            raise ApiError(f'Idempotency-Key는 공백 없는 {MAX_KEY_LENGTH}자 이하 문자열이어야 합니다.')
+        request_fingerprint = fingerprint(request.get_full_path(), request.body)
+        try:
+            return replay(request.user.pk, key, request_fingerprint) or run_once(
+                request.user.pk, key, request_fingerprint, lambda: self._apply(request)
+            )
+        except IdempotencyConflict:
+            return JsonResponse({'error': '같은 Idempotency-Key로 내용이 다른 요청을 보냈습니다.'}, status=422)
+
+    def _apply(self, request):
+        fields = parse_fields(request.GET.get('fields'))
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            raise ApiError('JSON 형식이 아닙니다.')
+        if not isinstance(payload, dict):
+            raise ApiError('JSON 객체여야 합니다.')
+
+        ops = {}
+        for op in ('create', 'update', 'delete'):
+            ops[op] = payload.get(op) or []
+            if not isinstance(ops[op], list):
+                raise ApiError(f'{op}는 목록이어야 합니다.')
+        total = sum(len(items) for items in ops.values())
+        if not total:
+            raise ApiError('create, update, delete 중 하나 이상이 필요합니다.')
+        if total > BATCH_LIMIT:
+            raise ApiError(f'요청 하나에 최대 {BATCH_LIMIT}개까지 처리할 수 있습니다. ({total}개)')
+
+        created, updated, deleted, errors = apply_batch(request.user, **ops)
+        if errors:
+            # 버전 충돌이 있으면 409: 클라이언트가 최신 거래를 다시 받아야 함
+            stale = any(STALE_VERSION in error['errors'].get('version', ()) for error in errors)
+            return JsonResponse({'errors': errors}, status=409 if stale else 400)
+        return JsonResponse({
+            'created': [serialize(tx, fields) for tx in created],
+            'updated': [serialize(tx, fields) for tx in updated],
+            'deleted': deleted,
+        })
+
+
+class SyncApiView(ApiLoginRequiredMixin, View):
+    """
+    증분 동기화 (GET)
+    - 커서 이후 바뀐 거래/계좌/카테고리 + 삭제된 id (sync.changes_since)
+    - 조회 수: 카운터 1 + 변경 기록 2 + 종류별 객체 1씩 → 바뀐 양에만 비례
+    """
+    query_budget = 8  # 세션/사용자 + 카운터 + 변경 기록(사용자/공통) + 거래/계좌/카테고리
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.GET.get('limit', SYNC_PAGE_SIZE)), 1), MAX_SYNC_PAGE_SIZE)
+        except ValueError:
+            raise ApiError('limit은 숫자여야 합니다.')
+        try:
+            result = changes_since(request.user.pk, request.GET.get('cursor'), limit)
+        except InvalidCursor:
+            raise ApiError('잘못된 cursor입니다.')
+
+        changed = result['changed']
+        response = {
+            'reset': result['reset'],
+            'cursor': result['cursor'],
+            'has_more': result['has_more'],
+            'transactions': [],
+            'accounts': [],
+            'categories': [],
+            'deleted': {key: result['deleted'].get(kind, []) for kind, key in SYNC_KEYS.items()},
+        }
+        if changed.get(TRANSACTION):
+            response['transactions'] = [
+                serialize(tx, FIELDS) for tx in Transaction.objects.filter(
+                    user=request.user, pk__in=changed[TRANSACTION]
+                ).order_by('pk')
+            ]
+        if changed.get(ACCOUNT):
+            response['accounts'] = [
+                {name: value(account) for name, value in ACCOUNT_FIELDS.items()}
+                for account in Account.objects.filter(user=request.user, pk__in=changed[ACCOUNT]).order_by('pk')
+            ]
+        if changed.get(CATEGORY):
+            response['categories'] = [
+                {name: value(category) for name, value in CATEGORY_FIELDS.items()}
+                for category in Category.objects.filter(
+                    Q(user=request.user) | Q(user__isnull=True), pk__in=changed[CATEGORY]
+                ).order_by('pk')
+            ]
+        return JsonResponse(response)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TransactionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'transactions'
+
+    def ready(self):
+        from . import signals  # noqa: F401 (시그널 연결)
+        from .search import install_search
+
+        # 검색용 트리거/인덱스 (PostgreSQL)
+        post_migrate.connect(install_search, sender=self)
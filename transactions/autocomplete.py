@@ -0,0 +1,209 @@
+"""
+가맹점 자동완성
+- 역할: 거래 입력 폼의 가맹점 칸에서 사용자가 전에 쓴 가맹점을 자주 쓴 순으로 추천
+- 담당: 팀원 B
+
+접두어 색인 (MerchantIndex)
+- 사용자별로 가맹점 → 사용 횟수를 모아 "접두어 → 자주 쓴 순 가맹점 목록"을 미리 만들어 둠
+  → 입력할 때마다 DB를 조회하지 않고 dict 조회 한 번
+- 한글은 자모 단위로 색인: 입력 중인 글자("스타벅" 입력 중의 "스타버", "스탑")도 접두어로 일치
+- 초성 검색: "ㅅㅌㅂㅅ" → "스타벅스 강남점"
+- 가맹점 이름의 단어마다 색인: "강남" → "스타벅스 강남점" (공백은 무시)
+
+색인 보관
+- 프로세스 메모리에 사용자별 색인을 최근 사용 순으로 MAX_CACHED_USERS명까지 보관 (처음 조회할 때 만듦)
+- 색인 리비전은 Django 캐시에 저장 → 다른 프로세스에서 거래가 바뀌면 다음 조회 때 다시 만듦
+- 거래 추가/수정/삭제, CSV 가져오기: 리비전만 올림 (invalidate_merchants → 다음 조회 때 다시 만듦)
+  색인을 그 자리에서 고치지 않음: 파일 캐시의 incr는 읽기/쓰기가 따로라 두 워커가 같은 리비전을 만들 수 있음
+  → 리비전 증가 하나를 잃어도 값은 바뀌므로 다시 만들면 둘 다 반영됨 (커밋 뒤에 올리므로 DB에 이미 있음)
+"""
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.db.models import Count
+
+
+MAX_SUGGESTIONS = 10
+# 색인할 접두어 최대 길이(자모 수), 이보다 긴 검색어는 이 길이의 후보 중에서 다시 거름
+MAX_PREFIX = 16
+MAX_CACHED_USERS = getattr(settings, 'MERCHANT_INDEX_CACHED_USERS', 128)
+
+REVISION_KEY = 'merchant-index:{}'
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSEONG = ' ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ'
+# 겹자모는 입력 순서대로 풀어서 비교 ("달" 다음 "닭", "고" 다음 "과")
+COMPOUND_JAMO = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ',
+    'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+}
+
+
+def normalize(text):
+    """비교용 문자열: NFC(맥 입력 대비), 소문자, 공백 제거"""
+    return ''.join(unicodedata.normalize('NFC', text or '').lower().split())
+
+
+def jamo(text):
+    """
+    한글 음절을 자모로 분해
+    - 예: '스타벅' → 'ㅅㅡㅌㅏㅂㅓㄱ', 한글이 아닌 문자는 그대로
+    """
+    result = []
+    for char in text:
+        code = ord(char) - HANGUL_BASE
+        if 0 <= code <= HANGUL_LAST - HANGUL_BASE:
+            result.append(CHOSEONG[code // 588])
+            result.append(JUNGSEONG[code % 588 // 28])
+            if code % 28:
+                result.append(JONGSEONG[code % 28])
+        else:
+            result.append(char)
+    return ''.join(COMPOUND_JAMO.get(char, char) for char in result)
+
+
+def choseong(text):
+    """
+    한글 음절을 초성으로
+    - 예: '스타벅스' → 'ㅅㅌㅂㅅ', 한글이 아닌 문자는 그대로
+    """
+    return ''.join(
+        CHOSEONG[(ord(char) - HANGUL_BASE) // 588] if HANGUL_BASE <= ord(char) <= HANGUL_LAST else char
+        for char in text
+    )
+
+
+def search_keys(merchant):
+    """
+    가맹점 이름으로 찾을 수 있는 전체 키 (단어마다 자모 / 초성)
+    - 예: '스타벅스 강남점' → 'ㅅㅡㅌㅏ...ㅈㅓㅁ', 'ㄱㅏㅇㄴㅏㅁㅈㅓㅁ', 'ㅅㅌㅂㅅㄱㄴㅈ', 'ㄱㄴㅈ'
+    """
+    words = unicodedata.normalize('NFC', merchant).lower().split()
+    keys = set()
+    for i in range(len(words)):
+        rest = ''.join(words[i:])
+        keys.add(jamo(rest))
+        keys.add(choseong(rest))
+    return keys
+
+
+class MerchantIndex:
+    """
+    사용자 한 명의 가맹점 접두어 색인
+    - counts: {가맹점: 사용 횟수}
+    - top: {접두어: [가맹점, ...]} 자주 쓴 순 (같으면 이름순) 최대 MAX_SUGGESTIONS개
+      가장 긴 접두어(MAX_PREFIX)는 잘라내지 않음 → 더 긴 검색어는 여기서 다시 거름
+    """
+
+    def __init__(self, counts=None):
+        self.counts = dict(counts or {})
+        self.top = {}
+        for merchant in sorted(self.counts, key=self._rank):
+            for prefix in self._prefixes(merchant):
+                bucket = self.top.setdefault(prefix, [])
+                if len(bucket) < MAX_SUGGESTIONS or len(prefix) == MAX_PREFIX:
+                    bucket.append(merchant)
+
+    def _rank(self, merchant):
+        return (-self.counts[merchant], merchant)
+
+    def _prefixes(self, merchant):
+        return {key[:i] for key in search_keys(merchant) for i in range(1, min(len(key), MAX_PREFIX) + 1)}
+
+    def suggest(self, query, limit=MAX_SUGGESTIONS):
+        """
+        검색어로 시작하는 가맹점 (자주 쓴 순)
+        - [(가맹점, 사용 횟수), ...]
+        """
+        key = jamo(normalize(query))
+        if not key:
+            return []
+        candidates = self.top.get(key[:MAX_PREFIX], ())
+        if len(key) > MAX_PREFIX:
+            candidates = [
+                merchant for merchant in candidates
+                if any(k.startswith(key) for k in search_keys(merchant))
+            ]
+        return [(merchant, self.counts[merchant]) for merchant in candidates[:limit]]
+
+
+# ============================================
+# 사용자별 색인 보관 (프로세스 메모리 + 캐시의 리비전)
+# ============================================
+
+_indexes = OrderedDict()  # {user_id: (리비전, MerchantIndex)} 최근 사용 순
+_lock = threading.Lock()
+
+
+def _revision(user_id):
+    key = REVISION_KEY.format(user_id)
+    revision = cache.get(key)
+    if revision is None:
+        # 처음이거나 캐시에서 밀려난 경우: 이전 리비전과 겹치지 않도록 현재 시각으로 시작
+        cache.add(key, time.time_ns(), timeout=None)
+        revision = cache.get(key)
+    return revision
+
+
+def _bump(user_id):
+    try:
+        cache.incr(REVISION_KEY.format(user_id))
+    except ValueError:
+        cache.set(REVISION_KEY.format(user_id), time.time_ns(), timeout=None)
+
+
+def build_merchant_index(user_id):
+    """DB에서 사용자의 가맹점별 거래 수를 한 번에 모아 색인 생성"""
+    from .models import Transaction
+
+    counts = Transaction.objects.filter(user_id=user_id).exclude(merchant='').values_list(
+        'merchant'
+    ).annotate(n=Count('id')).order_by()
+    return MerchantIndex(dict(counts))
+
+
+def get_merchant_index(user_id):
+    """
+    사용자 색인 (없거나 다른 곳에서 바뀌었으면 새로 만듦)
+    - 리비전을 DB 조회보다 먼저 읽음 → 만드는 도중에 바뀌면 다음 조회 때 다시 만듦
+    """
+    revision = _revision(user_id)
+    with _lock:
+        entry = _indexes.get(user_id)
+        if entry and entry[0] == revision:
+            _indexes.move_to_end(user_id)
+            return entry[1]
+
+    index = build_merchant_index(user_id)
+    with _lock:
+        _indexes[user_id] = (revision, index)
+        _indexes.move_to_end(user_id)
+        while len(_indexes) > MAX_CACHED_USERS:
+            _indexes.popitem(last=False)
+    return index
+
+
+def suggest_merchants(user_id, query, limit=MAX_SUGGESTIONS):
+    return get_merchant_index(user_id).suggest(query, limit)
+
+
+def invalidate_merchants(user_id):
+    """
+    거래 추가/수정/삭제, 일괄 가져오기: 다음 조회 때 색인을 다시 만들도록 리비전을 올림
+    - DB 트랜잭션 안이면 커밋된 뒤 한 번 더 올림 (cache.bump_data_version과 같은 이유)
+    """
+    _bump(user_id)
+    with _lock:
+        _indexes.pop(user_id, None)
+    if db_transaction.get_connection().in_atomic_block:
+        db_transaction.on_commit(lambda: _bump(user_id))
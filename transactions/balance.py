@@ -0,0 +1,84 @@
+"""
+계좌 잔액 유지 엔진
+- 역할: 거래 생성/수정/삭제 시 계좌 잔액을 DB에서 원자적으로 갱신
+- 담당: 팀원 B
+
+잔액을 파이썬에서 읽고 고쳐 쓰지 않고,
+계좌별 증감액(delta)만 모아서 F() 식으로 한 번에 반영한다.
+→ 동시에 여러 거래가 같은 계좌에 들어와도 잔액이 유실되지 않음
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import Case, DecimalField, F, When
+
+
+def signed_amount(tx_type, amount):
+    """
+    거래 타입에 따른 부호 있는 금액
+    - 수입(IN): +amount
+    - 지출(OUT): -amount
+    """
+    amount = Decimal(str(amount))
+    return amount if tx_type == 'IN' else -amount
+
+
+def signed_amount_expression():
+    """
+    SQL 집계용 부호 있는 금액 식 (수입 +amount, 지출 -amount)
+    - 예: Sum(signed_amount_expression())
+    """
+    return Case(
+        When(tx_type='IN', then=F('amount')),
+        default=-F('amount'),
+        output_field=DecimalField(),
+    )
+
+
+def collect_deltas(rows):
+    """
+    (account_id, tx_type, amount) 목록을 계좌별 증감액으로 합산
+
+    예: [(1, 'IN', 1000), (1, 'OUT', 300), (2, 'OUT', 500)]
+        → {1: Decimal('700'), 2: Decimal('-500')}
+    """
+    deltas = defaultdict(Decimal)
+    for account_id, tx_type, amount in rows:
+        deltas[account_id] += signed_amount(tx_type, amount)
+    return deltas
+
+
+def apply_balance_deltas(deltas):
+    """
+    계좌별 증감액을 잔액에 반영
+
+    처리 로직:
+    1. 0인 증감액은 건너뜀
+    2. 대상 계좌를 id 순서로 잠금 (select_for_update)
+       - 항상 같은 순서로 잠가서 교착 상태(deadlock) 방지
+    3. UPDATE ... SET balance = balance + delta (F 식) 로 반영
+       - 계좌 버전은 올리지 않음: 계좌 수정 화면은 잔액을 바꾼 만큼만 F 식으로 반영하므로
+         거래가 들어와도 열어 둔 화면이 충돌(409)하지 않음 (accounts/views.py AccountUpdateView)
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    from accounts.models import Account  # 순환 import 방지
+
+    # 호출한 쪽의 atomic 블록에 합류 (불필요한 SAVEPOINT 생략)
+    with db_transaction.atomic(savepoint=False):
+        account_ids = sorted(deltas)
+        if len(account_ids) > 1:
+            # 여러 계좌를 동시에 바꿀 때만 잠금 순서를 고정
+            # (단일 계좌는 UPDATE 자체가 행 잠금을 잡음)
+            list(
+                Account.objects.select_for_update()
+                .filter(pk__in=account_ids)
+                .order_by('pk')
+                .values_list('pk', flat=True)
+            )
+        for account_id in account_ids:
+            Account.objects.filter(pk=account_id).update(balance=F('balance') + deltas[account_id])
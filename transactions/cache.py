@@ -0,0 +1,79 @@
+"""
+사용자별 데이터 버전 캐시
+- 역할: 대시보드/계좌 요약처럼 무거운 집계 결과를 사용자 단위로 캐시
+- 담당: 팀원 B
+
+캐시 키 = 이름 + 사용자 id + 동기화 커서 + 사용자 데이터 버전 + 공통 데이터 버전
+- 동기화 커서(sync.current_cursor): DB의 SyncCounter 번호 → 커밋된 변경마다 원자적으로 올라감
+  파일 캐시의 incr는 읽기/쓰기가 따로라 동시에 올리면 하나가 사라질 수 있음 → 커밋된 변경은 커서로 구분
+- 데이터 버전(캐시): 거래/계좌/카테고리가 바뀌면 올림 (signals.py)
+  커밋 전 값이나 롤백된 값, 삭제 후 다시 쓰인 사용자 id처럼 커서로 구분되지 않는 경우용
+- 이전 키는 다시 읽히지 않고 만료 → 키를 검색해서 지울 필요가 없으므로 locmem/파일/Redis 등 어떤 백엔드에서도 동작
+  단, 데이터 버전도 캐시에 있으므로 워커 프로세스끼리 공유하는 백엔드여야 함 (locmem은 DEBUG에서만, settings.py)
+- 공통 데이터 버전: 모든 사용자가 쓰는 공통 카테고리(user=None)가 바뀔 때 올림
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+
+
+VERSION_KEY = 'data-version:{}'
+GLOBAL = 'global'
+
+
+def _version(owner):
+    key = VERSION_KEY.format(owner)
+    version = cache.get(key)
+    if version is None:
+        # 처음이거나 캐시에서 밀려난 경우: 이전 버전들과 겹치지 않도록 현재 시각으로 시작
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(owner):
+    key = VERSION_KEY.format(owner)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_data_version(user_id=None):
+    """
+    사용자(user_id) 또는 공통 데이터(None)의 버전을 올림
+    - DB 트랜잭션 안이면 지금 한 번, 커밋된 뒤 한 번 더 올림
+      (커밋 전에 다른 요청이 바뀌기 전 데이터를 새 버전 키로 캐시했을 수 있으므로)
+    """
+    owner = GLOBAL if user_id is None else user_id
+    _bump(owner)
+    if db_transaction.get_connection().in_atomic_block:
+        db_transaction.on_commit(lambda: _bump(owner))
+
+
+def data_version(user_id):
+    """
+    동기화 커서 + 사용자 데이터 버전 + 공통 데이터 버전 문자열 (커서 조회 쿼리 1번)
+    - 사용자가 볼 수 있는 데이터(거래/계좌/카테고리/공통 카테고리)가 바뀌면 항상 바뀜
+    - 커서를 값을 만들기 전에 읽음 → 그 사이 커밋된 변경은 더 새 값이 옛 키로 저장될 뿐
+    - 예: cached_for_user의 캐시 키
+    """
+    from .sync import current_cursor
+
+    return f'{current_cursor(user_id)}:{_version(user_id)}:{_version(GLOBAL)}'
+
+
+def cached_for_user(user_id, name, builder, timeout=None):
+    """
+    name으로 구분되는 사용자별 캐시 값 반환, 없으면 builder()로 만들어 저장
+    - 예: cached_for_user(user.pk, 'dashboard:2026-02:all', lambda: {...})
+    """
+    key = f'{name}:{user_id}:{data_version(user_id)}'
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout or getattr(settings, 'USER_CACHE_TIMEOUT', 600))
+    return value
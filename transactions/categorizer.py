@@ -0,0 +1,207 @@
+"""
+거래 자동 분류
+- 역할: 카테고리 없는(미분류) 거래에 카테고리 지정 (거래 생성, CSV 가져오기, 미분류 일괄 분류)
+- 담당: 팀원 B
+
+분류 기준 (가맹점 이름, 대소문자/앞뒤 공백 무시)
+1. 사용자 규칙 (CategoryRule, 우선순위 순): "스타벅스" 포함 → 카페
+2. 거래 내역에서 배운 분류: 같은 가맹점 + 같은 거래 타입에 가장 많이 쓴 카테고리
+- 카테고리 타입(수입/지출/공통)이 거래 타입과 맞지 않으면 지정하지 않음
+
+일괄 분류 (categorize_uncategorized)
+- 거래 행이 아니라 미분류 거래의 서로 다른 (가맹점, 거래 타입)만 분류
+- 가맹점 → 카테고리를 CASE 식 하나로 묶어 UPDATE (가맹점 UPDATE_CHUNK_SIZE개마다 한 번)
+  → 거래 수와 무관하게 UPDATE 몇 번
+- 월별 집계: 방금 바꾼 행을 (계좌, 월, 카테고리) 단위로 집계 쿼리 한 번 → 미분류 행에서 빼고 카테고리 행에 더함
+- 동기화: 바꾼 행의 id를 한 번 더 읽어 변경으로 기록 (sync.py)
+"""
+
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction as db_transaction
+from django.db.models import Case, Count, DateField, F, Max, Q, Sum, Value, When
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .cache import bump_data_version
+from .rollups import apply_rollup_deltas
+from .sync import TRANSACTION, record_changes
+
+
+# UPDATE 한 번에 넣을 가맹점 수 (가맹점이 WHERE/CASE에 두 번씩 들어감, SQLite 파라미터 개수 제한 대비)
+UPDATE_CHUNK_SIZE = 2000
+
+
+def merchant_key(merchant):
+    """비교용 가맹점 이름 (대소문자/앞뒤 공백 무시, iexact와 같은 기준)"""
+    return (merchant or '').strip().upper()
+
+
+class Categorizer:
+    """
+    사용자 한 명의 분류기 (규칙 + 거래 내역을 한 번만 읽어 두고 행마다 DB 조회 없이 분류)
+    - merchant: 이 가맹점 하나만 분류할 거면 지정 → 거래 내역도 그 가맹점만 조회 (거래 생성)
+    - 예: Categorizer(user.pk).suggest('스타벅스 강남점', 'OUT') → 카테고리 id 또는 None
+    """
+
+    def __init__(self, user_id, merchant=None):
+        from .models import CategoryRule  # 순환 import 방지
+
+        self.rules = [
+            (rule.match_type, merchant_key(rule.pattern), rule.category)
+            for rule in CategoryRule.objects.filter(
+                user_id=user_id, is_active=True
+            ).select_related('category')
+        ]
+        self.history = self._learn(user_id, merchant)
+
+    def _learn(self, user_id, merchant=None):
+        """
+        {(가맹점 키, 거래 타입): 가장 많이 쓴 카테고리 id}
+        - 집계 쿼리 1번, 같은 가맹점의 표기 차이(대소문자 등)는 합쳐서 셈
+        - 횟수가 같으면 나중에 만든 카테고리
+        """
+        from .models import Transaction
+
+        rows = Transaction.objects.filter(
+            user_id=user_id, category__isnull=False
+        ).exclude(merchant='')
+        if merchant is not None:
+            rows = rows.filter(merchant__iexact=merchant.strip())
+
+        counts = defaultdict(int)
+        for name, tx_type, category_id, n in rows.values_list(
+            'merchant', 'tx_type', 'category_id'
+        ).annotate(n=Count('id')).order_by():
+            counts[(merchant_key(name), tx_type, category_id)] += n
+
+        best = {}
+        for (key, tx_type, category_id), n in counts.items():
+            current = best.get((key, tx_type))
+            if current is None or (n, category_id) > current:
+                best[(key, tx_type)] = (n, category_id)
+        return {key: category_id for key, (n, category_id) in best.items()}
+
+    def suggest(self, merchant, tx_type):
+        """가맹점 + 거래 타입 → 카테고리 id (없으면 None)"""
+        key = merchant_key(merchant)
+        if not key:
+            return None
+        for match_type, pattern, category in self.rules:
+            if category.type not in (tx_type, 'BOTH'):
+                continue
+            if (
+                (match_type == 'exact' and key == pattern)
+                or (match_type == 'startswith' and key.startswith(pattern))
+                or (match_type == 'contains' and pattern in key)
+            ):
+                return category.pk
+        return self.history.get((key, tx_type))
+
+
+def _chunks(groups):
+    """
+    {(카테고리, 거래 타입): [가맹점, ...]} → UPDATE 한 번에 넣을 만큼씩 나눈 [((카테고리, 거래 타입), [가맹점, ...]), ...]
+    - 한 번에 가맹점 UPDATE_CHUNK_SIZE개까지 (SQLite 파라미터 개수 제한 대비)
+    """
+    chunk, size = [], 0
+    for key, merchants in groups.items():
+        for i in range(0, len(merchants), UPDATE_CHUNK_SIZE):
+            part = merchants[i:i + UPDATE_CHUNK_SIZE]
+            if size + len(part) > UPDATE_CHUNK_SIZE and chunk:
+                yield chunk
+                chunk, size = [], 0
+            chunk.append((key, part))
+            size += len(part)
+    if chunk:
+        yield chunk
+
+
+def suggest_category(user_id, merchant, tx_type):
+    """거래 하나의 카테고리 추천 (거래 생성 시, 쿼리 2번)"""
+    if not merchant_key(merchant):
+        return None
+    return Categorizer(user_id, merchant=merchant).suggest(merchant, tx_type)
+
+
+def categorize_uncategorized(user_id):
+    """
+    사용자의 미분류 거래 전체를 한 번에 분류
+    - 반환값: {카테고리 id: 분류한 거래 수}
+
+    처리 로직:
+    1. 미분류 거래의 서로 다른 (가맹점, 거래 타입)을 읽어 분류 → (카테고리, 거래 타입)별 가맹점 묶음
+    2. 가맹점 묶음마다 CASE 식 UPDATE (category IS NULL 조건 유지 → 그 사이 사용자가 직접 분류한 거래는 건너뜀)
+       updated_at을 이번 실행 시각으로 표시 (3단계 집계와 동기화 변경 기록에서 이 행들을 찾는 표시)
+    3. 표시된 행을 (계좌, 월, 카테고리, 거래 타입)별로 집계해서 월별 집계를 미분류 → 카테고리로 옮김
+       (UPDATE한 행은 커밋까지 잠겨 있으므로 집계 결과가 UPDATE한 행과 정확히 같음)
+    4. 표시된 행을 동기화 변경으로 기록 (record_changes → 대시보드 ETag도 바뀜)
+    """
+    from .models import Transaction
+
+    categorizer = Categorizer(user_id)
+    uncategorized = Transaction.objects.filter(
+        user_id=user_id, category__isnull=True
+    ).exclude(merchant='')
+
+    groups = defaultdict(list)
+    for merchant, tx_type in uncategorized.values_list('merchant', 'tx_type').distinct().order_by():
+        category_id = categorizer.suggest(merchant, tx_type)
+        if category_id is not None:
+            groups[(category_id, tx_type)].append(merchant)
+    if not groups:
+        return {}
+
+    with db_transaction.atomic():
+        # 실행 중에 추가되는 거래는 다음 실행에서 (집계 표시가 섞이지 않도록)
+        last_id = uncategorized.aggregate(last=Max('id'))['last']
+        if last_id is None:
+            return {}
+        stamp = timezone.now()
+        for chunk in _chunks(groups):
+            # 가맹점 묶음 전체를 UPDATE 한 번에: category_id = CASE WHEN 가맹점 IN (...) THEN 카테고리 ... END
+            uncategorized.filter(
+                reduce(or_, (Q(tx_type=tx_type, merchant__in=merchants) for (_, tx_type), merchants in chunk))
+            ).filter(id__lte=last_id).update(
+                category_id=Case(*[
+                    When(tx_type=tx_type, merchant__in=merchants, then=Value(category_id))
+                    for (category_id, tx_type), merchants in chunk
+                ]),
+                updated_at=stamp,
+                version=F('version') + 1,  # 열어 둔 수정 화면이 분류를 되돌리지 않도록 (versioning.py)
+            )
+
+        marked = Transaction.objects.filter(
+            user_id=user_id,
+            id__lte=last_id,
+            updated_at=stamp,
+            category_id__in={category_id for category_id, _ in groups},
+        )
+        moved = marked.annotate(
+            month=TruncMonth('occurred_at', output_field=DateField())
+        ).values(
+            'account_id', 'month', 'category_id', 'tx_type'
+        ).annotate(
+            total=Sum('amount'),
+            count=Count('id'),
+        ).order_by()
+
+        deltas = defaultdict(lambda: [0, 0])
+        result = defaultdict(int)
+        for row in moved:
+            for category_id, sign in ((None, -1), (row['category_id'], 1)):
+                key = (user_id, row['account_id'], row['month'], category_id, row['tx_type'])
+                deltas[key][0] += sign * row['total']
+                deltas[key][1] += sign * row['count']
+            result[row['category_id']] += row['count']
+        apply_rollup_deltas(deltas)
+        if result:
+            bump_data_version(user_id)  # update()는 post_save 시그널이 없음
+            # 동기화 변경: 방금 분류한 거래 (표시된 행의 id만 읽음)
+            record_changes(user_id, [
+                (TRANSACTION, pk, False) for pk in marked.values_list('id', flat=True).order_by()
+            ])
+
+    return dict(result)
@@ -0,0 +1,226 @@
+"""
+계좌 일별 잔액 체크포인트 (DailyBalance) 관리
+- 역할: 거래 변경 시 체크포인트 증분 갱신, 과거 시점 잔액 조회, 전체 재계산
+- 담당: 팀원 B
+
+"X일의 잔액"을 구할 때 거래를 전부 훑지 않고
+체크포인트 행 몇 개만 읽도록 하기 위한 모듈
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import Case, DecimalField, F, Q, Subquery, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .balance import signed_amount_expression
+from .periods import local_midnight
+
+
+def collect_checkpoint_deltas(changes):
+    """
+    거래 변경분을 (계좌, 날짜)별 증감액으로 합산
+
+    changes: [(부호, 거래 값 dict), ...]  (Transaction._apply_changes 참고)
+    → {(account_id, date): Decimal}
+    """
+    deltas = defaultdict(Decimal)
+    for sign, values in changes:
+        amount = Decimal(str(values['amount']))
+        if values['tx_type'] != 'IN':
+            amount = -amount
+        day = timezone.localdate(values['occurred_at'])
+        deltas[(values['account_id'], day)] += sign * amount
+    return deltas
+
+
+def _previous_totals(account_id, days):
+    """
+    체크포인트가 없는 날짜들(오름차순) 각각의 직전 체크포인트 누적값 (쿼리 1번)
+    - 첫 날짜 직전 체크포인트 1행 + 첫 날짜 ~ 마지막 날짜 사이 체크포인트만 읽음
+    """
+    from .models import DailyBalance  # 순환 import 방지
+
+    checkpoints = DailyBalance.objects.filter(account_id=account_id)
+    floor = checkpoints.filter(date__lt=days[0]).order_by('-date').values('date')[:1]
+    rows = checkpoints.filter(date__lt=days[-1]).filter(
+        Q(date__gte=days[0]) | Q(date=Subquery(floor))
+    ).order_by('date').values_list('date', 'running_total')
+
+    totals = {}
+    rows = iter(rows)
+    row = next(rows, None)
+    running = 0
+    for day in days:
+        while row is not None and row[0] < day:
+            running = row[1]
+            row = next(rows, None)
+        totals[day] = running
+    return totals
+
+
+def apply_checkpoint_deltas(deltas):
+    """
+    (계좌, 날짜)별 증감액을 체크포인트에 반영
+
+    처리 로직:
+    1. 대상 계좌를 id 순서로 잠금 (select_for_update)
+       - 잔액 증감이 0인 계좌(같은 계좌 안에서 날짜만 바꾼 수정 등)는 잔액 UPDATE가 잠그지 않으므로
+         여기서 직접 잠가야 같은 계좌의 체크포인트 갱신이 직렬화됨
+    2. 없는 (계좌, 날짜) 체크포인트를 직전 체크포인트의 누적값으로 한 번에 생성
+       (확인 1번 + 계좌별 직전값 조회 1번 + bulk_create 1번, ignore_conflicts: 이미 있으면 그대로 둠)
+    3. 계좌별 UPDATE 1번으로 첫 날짜 이후 모든 체크포인트에 누적 증감액을 더함
+       - running_total += CASE WHEN date >= 마지막 날짜 THEN 전체 합 ... WHEN date >= 첫 날짜 THEN 첫 증감액 END
+       - net_amount += CASE WHEN date = 날짜 THEN 그 날짜 증감액 END
+    → 일괄 변경(api.apply_batch)의 날짜 수와 관계없이 쿼리 수는 계좌 수에만 비례
+    """
+    from accounts.models import Account  # 순환 import 방지
+    from .models import DailyBalance
+
+    by_account = defaultdict(dict)
+    for (account_id, day), delta in deltas.items():
+        if delta:
+            by_account[account_id][day] = delta
+    if not by_account:
+        return
+
+    # 호출한 쪽의 atomic 블록에 합류 (불필요한 SAVEPOINT 생략)
+    with db_transaction.atomic(savepoint=False):
+        account_ids = sorted(by_account)
+        # 잔액 UPDATE와 같은 순서로 잠금 → 교착 상태(deadlock) 방지
+        list(
+            Account.objects.select_for_update()
+            .filter(pk__in=account_ids)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+        existing = set(
+            DailyBalance.objects.filter(
+                account_id__in=account_ids,
+                date__in={day for days in by_account.values() for day in days},
+            ).values_list('account_id', 'date')
+        )
+        objs = []
+        for account_id in account_ids:
+            missing = sorted(day for day in by_account[account_id] if (account_id, day) not in existing)
+            if missing:
+                previous = _previous_totals(account_id, missing)
+                objs += [
+                    DailyBalance(account_id=account_id, date=day, running_total=previous[day])
+                    for day in missing
+                ]
+        if objs:
+            DailyBalance.objects.bulk_create(objs, ignore_conflicts=True)
+
+        zero = Value(0, output_field=DecimalField())
+        for account_id in account_ids:
+            days = sorted(by_account[account_id].items())
+            cumulative = []
+            total = Decimal(0)
+            for day, delta in days:
+                total += delta
+                cumulative.append(When(date__gte=day, then=Value(total, output_field=DecimalField())))
+            DailyBalance.objects.filter(account_id=account_id, date__gte=days[0][0]).update(
+                running_total=F('running_total') + Case(*reversed(cumulative), default=zero),
+                net_amount=F('net_amount') + Case(
+                    *[When(date=day, then=Value(delta, output_field=DecimalField())) for day, delta in days],
+                    default=zero,
+                ),
+            )
+
+
+def rebuild_checkpoints(account_id, since=None):
+    """
+    거래 내역에서 체크포인트를 다시 계산 (집계 쿼리 1번 + bulk_create)
+    - since 없음: 계좌 전체 재계산 (백필)
+    - since 있음: since 날짜 이후만 재계산 (거래 일괄 가져오기)
+    """
+    from .models import DailyBalance, Transaction
+
+    with db_transaction.atomic(savepoint=False):
+        transactions = Transaction.objects.filter(account_id=account_id)
+        checkpoints = DailyBalance.objects.filter(account_id=account_id)
+        running = Decimal(0)
+
+        if since:
+            transactions = transactions.filter(occurred_at__gte=local_midnight(since))
+            running = checkpoints.filter(date__lt=since).order_by('-date').values_list(
+                'running_total', flat=True
+            ).first() or Decimal(0)
+            checkpoints = checkpoints.filter(date__gte=since)
+        checkpoints.delete()
+
+        daily = transactions.annotate(
+            day=TruncDate('occurred_at')
+        ).values('day').annotate(
+            net=Sum(signed_amount_expression())
+        ).order_by('day')
+
+        objs = []
+        for row in daily:
+            running += row['net']
+            objs.append(DailyBalance(
+                account_id=account_id,
+                date=row['day'],
+                net_amount=row['net'],
+                running_total=running,
+            ))
+        DailyBalance.objects.bulk_create(objs, batch_size=1000)
+        return len(objs)
+
+
+def refresh_checkpoints_for(transactions):
+    """
+    bulk_create로 저장한 거래들(Transaction.save()를 거치지 않음)의 체크포인트 갱신
+    - 계좌별로 가장 이른 거래 날짜부터 재계산
+    """
+    since = {}
+    for tx in transactions:
+        day = timezone.localdate(tx.occurred_at)
+        since[tx.account_id] = min(since.get(tx.account_id, day), day)
+    for account_id, day in since.items():
+        rebuild_checkpoints(account_id, since=day)
+
+
+def _opening_balance(account):
+    """거래가 하나도 없던 시점의 잔액 = 현재 잔액 - 최신 누적 증감액"""
+    latest = account.daily_balances.order_by('-date').values_list(
+        'running_total', flat=True
+    ).first()
+    return account.balance - (latest or 0)
+
+
+def balance_on(account, day):
+    """
+    day 날짜 마감 시점의 계좌 잔액 (체크포인트 2행 조회)
+    """
+    running = account.daily_balances.filter(date__lte=day).order_by('-date').values_list(
+        'running_total', flat=True
+    ).first()
+    return _opening_balance(account) + (running or 0)
+
+
+def balance_history(account, start, end):
+    """
+    start ~ end 기간의 일별 마감 잔액 [(date, balance), ...] (쿼리 3번)
+    - 거래가 없던 날은 전날 잔액을 그대로 사용
+    """
+    opening = _opening_balance(account)
+    running = account.daily_balances.filter(date__lt=start).order_by('-date').values_list(
+        'running_total', flat=True
+    ).first() or 0
+    totals = dict(
+        account.daily_balances.filter(date__range=(start, end)).values_list('date', 'running_total')
+    )
+
+    history = []
+    day = start
+    while day <= end:
+        running = totals.get(day, running)
+        history.append((day, opening + running))
+        day += timedelta(days=1)
+    return history
@@ -0,0 +1,146 @@
+"""
+영수증 다운로드 응답
+- 역할: 권한 확인 뒤 파일 전송은 앞단 웹 서버/커널에 맡겨 Python 워커가 전송 내내 묶이지 않도록
+- 담당: 팀원 B
+
+전송 방식 (RECEIPT_DOWNLOAD_OFFLOAD)
+- 'x-accel': nginx X-Accel-Redirect → RECEIPT_DOWNLOAD_ACCEL_PREFIX + 파일 경로 (nginx의 internal location)
+  예) location /protected-media/ { internal; alias /srv/accountbook/media/; }
+- 'x-sendfile': Apache(mod_xsendfile)/lighttpd X-Sendfile → 파일 절대 경로
+- None(기본): FileResponse → gunicorn 등 wsgi.file_wrapper를 지원하는 서버가 os.sendfile로 전송 (복사 없음)
+  Range 요청도 파일 위치를 옮기고 길이만 제한해 같은 방식으로 전송
+- 앞단 전송이면 Range/조건부 요청도 앞단 서버가 처리 (여기서는 헤더만 붙임)
+
+검증값 / 부분 전송
+- ETag: 내용 해시 경로(storage.py)면 SHA-256 그대로, 기존 경로면 크기 + 수정 시각
+- If-None-Match / If-Modified-Since → 304, If-Match / If-Unmodified-Since → 412
+- Range: bytes=a-b, a-, -n 한 구간만 206 (여러 구간은 전체를 200으로), 범위 밖이면 416
+- If-Range가 현재 ETag/Last-Modified와 다르면 Range를 무시하고 전체 전송
+"""
+
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def _etag(name, stat):
+    digest = os.path.splitext(os.path.basename(name))[0]
+    if SHA256_RE.match(digest):
+        return quote_etag(digest)
+    return quote_etag(f'{stat.st_size:x}-{int(stat.st_mtime):x}')
+
+
+def parse_range(header, size):
+    """
+    Range 헤더 → (시작, 끝) (끝 포함), 한 구간이 아니면 None, 만족할 수 없으면 False
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        length = int(last)  # 마지막 n바이트
+        return (max(size - length, 0), size - 1) if length and size else False
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    """If-Range가 없거나 현재 파일과 같으면 True (강한 비교: 약한 ETag는 불일치)"""
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith('"'):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+class _RangeFile:
+    """
+    파일의 한 구간만 읽히는 래퍼
+    - fileno()를 그대로 내주므로 gunicorn의 sendfile은 현재 위치부터 Content-Length만큼 전송
+    - file_wrapper가 없는 서버(개발 서버/테스트)는 read()로 구간까지만 읽음
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def receipt_response(request, attachment, as_attachment=True):
+    """첨부파일 하나의 다운로드 응답 (권한 확인은 호출한 쪽에서)"""
+    storage = attachment.file.storage
+    name = attachment.file.name
+    try:
+        path = storage.path(name)
+        stat = os.stat(path)
+    except (FileNotFoundError, NotImplementedError):
+        raise Http404('파일을 찾을 수 없습니다.')
+
+    size = stat.st_size
+    etag = _etag(name, stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    offload = getattr(settings, 'RECEIPT_DOWNLOAD_OFFLOAD', None)
+
+    if response is not None:
+        pass  # 304/412
+    elif offload == 'x-accel':
+        response = HttpResponse(content_type=attachment.content_type)
+        prefix = getattr(settings, 'RECEIPT_DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = quote(prefix.rstrip('/') + '/' + name)
+    elif offload == 'x-sendfile':
+        response = HttpResponse(content_type=attachment.content_type)
+        response['X-Sendfile'] = path
+    else:
+        byte_range = None
+        if request.META.get('HTTP_RANGE') and _if_range_matches(request, etag, last_modified):
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+        elif byte_range:
+            start, end = byte_range
+            response = FileResponse(
+                _RangeFile(open(path, 'rb'), start, end - start + 1),
+                status=206, content_type=attachment.content_type,
+            )
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=attachment.content_type)
+
+    if response.status_code in (200, 206):
+        response['Content-Disposition'] = content_disposition_header(as_attachment, attachment.original_name)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # 본인만 받을 수 있는 파일 → 공유 캐시 금지, 매번 검증 (파일 교체 시 바로 반영)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,89 @@
+"""
+거래 내보내기(CSV) 스트리밍
+- 역할: 필터링된 거래를 엑셀에서 바로 열 수 있는 CSV로 한 줄씩 내보냄
+- 담당: 팀원 B
+
+처리 흐름:
+1. 거래 목록과 같은 필터의 쿼리셋에서 필요한 컬럼만 values_list로 읽음 (모델 객체를 만들지 않음)
+2. iterator(chunk_size=EXPORT_CHUNK_SIZE)로 조금씩 가져옴
+   (PostgreSQL은 서버 측 커서 → 전체 결과를 메모리에 올리지 않음)
+3. 한 행씩 CSV 문자열로 만들어 StreamingHttpResponse로 바로 전송
+   → 거래 수와 무관하게 메모리 일정
+
+엑셀 호환
+- 맨 앞에 UTF-8 BOM → 엑셀이 한글을 깨뜨리지 않고 UTF-8로 인식
+- 헤더는 가져오기(importer.HEADER_ALIASES)가 읽을 수 있는 한글 이름 → 내보낸 파일을 그대로 다시 가져올 수 있음
+- =, +, -, @로 시작하는 가맹점/메모는 앞에 '를 붙여 수식으로 실행되지 않게 함 (CSV 인젝션 방지)
+"""
+
+import csv
+
+from django.conf import settings
+from django.utils import timezone
+
+
+EXPORT_CHUNK_SIZE = getattr(settings, 'TRANSACTION_EXPORT_CHUNK_SIZE', 2000)
+
+BOM = '\ufeff'
+
+# (CSV 헤더, values_list 필드)
+EXPORT_COLUMNS = [
+    ('거래일시', 'occurred_at'),
+    ('구분', 'tx_type'),
+    ('금액', 'amount'),
+    ('계좌', 'account__name'),
+    ('카테고리', 'category__name'),
+    ('가맹점', 'merchant'),
+    ('메모', 'memo'),
+]
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """csv.writer용 가짜 파일: write()가 받은 문자열을 그대로 돌려줌 (버퍼에 쌓지 않음)"""
+
+    def write(self, value):
+        return value
+
+
+def csv_safe(value):
+    """엑셀이 수식으로 해석할 수 있는 텍스트 앞에 ' 추가"""
+    if value and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def export_rows(queryset):
+    """
+    쿼리셋 → CSV 행(list) 제너레이터 (헤더 포함)
+    - 정렬은 쿼리셋 그대로 (거래 목록/검색 결과와 같은 순서)
+    """
+    tx_types = dict(queryset.model.TX_TYPE_CHOICES)
+    current_tz = timezone.get_current_timezone()
+
+    yield [header for header, _ in EXPORT_COLUMNS]
+    rows = queryset.values_list(*[field for _, field in EXPORT_COLUMNS])
+    for occurred_at, tx_type, amount, account, category, merchant, memo in rows.iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    ):
+        yield [
+            timezone.localtime(occurred_at, current_tz).strftime('%Y-%m-%d %H:%M:%S'),
+            tx_types.get(tx_type, tx_type),
+            amount,
+            account,
+            category or '',
+            csv_safe(merchant),
+            csv_safe(memo),
+        ]
+
+
+def stream_csv(queryset):
+    """
+    쿼리셋 → CSV 문자열 조각 제너레이터 (StreamingHttpResponse에 그대로 넘김)
+    - 첫 조각은 BOM, 이후 한 행씩
+    """
+    writer = csv.writer(Echo())
+    yield BOM
+    for row in export_rows(queryset):
+        yield writer.writerow(row)
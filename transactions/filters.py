@@ -0,0 +1,47 @@
+"""
+거래 목록 필터
+- 역할: 거래 목록 화면, CSV 내보내기, JSON API가 같은 조건으로 거래를 거름
+- 담당: 팀원 B
+
+지원하는 조건 (GET 파라미터)
+- account=1, category=2, tx_type=IN|OUT
+- start_date=2026-01-01&end_date=2026-01-31 (양 끝 날짜 포함)
+- q=카페 (가맹점/메모 검색, search.py)
+"""
+
+from .periods import day_range, filter_occurred_between, parse_day
+from .search import search_transactions
+
+
+def filter_transactions(queryset, params):
+    """
+    params(request.GET 등)의 조건으로 거래 쿼리셋을 거름
+    - 잘못된 값은 무시 (예: tx_type=ALL)
+    """
+    # 1. 계좌 필터 (?account=1)
+    account_id = params.get('account')
+    if account_id and str(account_id).isdigit():
+        queryset = queryset.filter(account_id=account_id)
+
+    # 2. 카테고리 필터 (?category=2)
+    category_id = params.get('category')
+    if category_id and str(category_id).isdigit():
+        queryset = queryset.filter(category_id=category_id)
+
+    # 3. 입출금 타입 필터 (?tx_type=OUT)
+    tx_type = params.get('tx_type')
+    if tx_type in ['IN', 'OUT']:
+        queryset = queryset.filter(tx_type=tx_type)
+
+    # 4. 기간 필터 (?start_date=2026-01-01&end_date=2026-01-31, 양 끝 날짜 포함)
+    # 반열린 구간 [시작일 0시, 종료일 다음날 0시) → (user, occurred_at) 인덱스 범위 검색
+    start, end = day_range(parse_day(params.get('start_date')), parse_day(params.get('end_date')))
+    queryset = filter_occurred_between(queryset, start, end)
+
+    # 5. 키워드 검색 (?q=카페)
+    # 메모 또는 가맹점에서 검색 (PostgreSQL: 전문 검색 인덱스 + 관련도 순 정렬, search.py)
+    q = params.get('q', '').strip()
+    if q:
+        queryset = search_transactions(queryset, q)
+
+    return queryset
@@ -5,12 +5,71 @@
 """
 
 from django import forms
-from .models import Transaction, Attachment, Category
+from .models import Transaction, Attachment, Category, CategoryRule
+from .uploads import HEADER_SIZE, INVALID_TYPE_MESSAGE, detect_content_type, max_receipt_size
 from accounts.models import Account
 from django.core.exceptions import ValidationError
 import os
 
 
+def validate_amount(amount):
+    """
+    금액 유효성 검사 (TransactionForm, 거래 일괄 가져오기 공용)
+    """
+    if amount <= 0:
+        raise ValidationError('금액은 0보다 커야 합니다.')
+
+    # 최대 금액 제한 (선택사항)
+    if amount > 10000000000:  # 100억
+        raise ValidationError('금액이 너무 큽니다. 확인해주세요.')
+
+    return amount
+
+
+# 허용할 영수증 파일 확장자
+RECEIPT_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.pdf']
+
+
+def validate_receipt_file(file):
+    """
+    영수증 파일 유효성 검사 (AttachmentForm, 거래 생성 화면의 영수증 공용)
+    - 스트리밍 업로드(uploads.py)는 받으면서 확인한 형식/크기 사용 → 파일을 다시 읽지 않음
+    - 그 밖의 파일은 앞부분(매직 바이트)만 읽어 형식 확인
+    - content_type은 실제 형식으로 맞춤 (브라우저가 보낸 값을 쓰지 않음)
+    """
+    # 1. 확장자 검사
+    ext = os.path.splitext(file.name)[1].lower()
+    # os.path.splitext('receipt.jpg') → ('receipt', '.jpg')
+
+    if ext not in RECEIPT_EXTENSIONS:
+        raise ValidationError(
+            f'허용되지 않는 파일 형식입니다. '
+            f'({", ".join(RECEIPT_EXTENSIONS)} 만 가능)'
+        )
+
+    # 2. 파일 크기 검사 (스트리밍 업로드는 제한을 넘은 뒤에도 크기는 끝까지 셈)
+    max_size = max_receipt_size()
+    if file.size > max_size:
+        raise ValidationError(
+            f'파일 크기는 {max_size / (1024 * 1024):.0f}MB를 초과할 수 없습니다. '
+            f'(현재: {file.size / (1024 * 1024):.1f}MB)'
+        )
+
+    # 3. 파일 내용 검사 (매직 바이트)
+    if hasattr(file, 'upload_error'):
+        if file.upload_error:
+            raise ValidationError(file.upload_error)
+    else:
+        header = file.read(HEADER_SIZE)
+        file.seek(0)  # 파일 포인터 초기화
+        content_type = detect_content_type(header)
+        if content_type is None:
+            raise ValidationError(INVALID_TYPE_MESSAGE)
+        file.content_type = content_type
+
+    return file
+
+
 class TransactionForm(forms.ModelForm):
     """
     거래 생성/수정 폼
@@ -70,7 +129,8 @@ class TransactionForm(forms.ModelForm):
             }),
             'merchant': forms.TextInput(attrs={
                 'class': 'form-control',
-                'placeholder': '예: 스타벅스 강남점'
+                'placeholder': '예: 스타벅스 강남점',
+                'autocomplete': 'off'  # 브라우저 자동완성 대신 가맹점 추천 목록 사용
             }),
             'memo': forms.Textarea(attrs={
                 'class': 'form-control',
@@ -94,16 +154,68 @@ class TransactionForm(forms.ModelForm):
         """
         금액 유효성 검사
         """
-        amount = self.cleaned_data.get('amount')
-        
-        if amount <= 0:
-            raise ValidationError('금액은 0보다 커야 합니다.')
-        
-        # 최대 금액 제한 (선택사항)
-        if amount > 10000000000:  # 100억
-            raise ValidationError('금액이 너무 큽니다. 확인해주세요.')
-        
-        return amount
+        return validate_amount(self.cleaned_data.get('amount'))
+
+
+class TransactionImportForm(forms.Form):
+    """
+    거래 일괄 가져오기(CSV) 폼
+    - 은행 거래내역 CSV를 선택한 계좌로 가져옴
+    """
+
+    ENCODING_CHOICES = [
+        ('utf-8-sig', 'UTF-8'),
+        ('cp949', 'CP949 (국내 은행 엑셀/CSV)'),
+    ]
+
+    # 최대 파일 크기 (50MB)
+    MAX_FILE_SIZE = 50 * 1024 * 1024
+
+    account = forms.ModelChoiceField(
+        queryset=Account.objects.none(),  # __init__에서 본인 계좌로 설정
+        label='계좌',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+
+    file = forms.FileField(
+        label='CSV 파일',
+        help_text='헤더: occurred_at, tx_type, amount, merchant, memo, category',
+        widget=forms.FileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv'
+        })
+    )
+
+    encoding = forms.ChoiceField(
+        choices=ENCODING_CHOICES,
+        initial='utf-8-sig',
+        label='인코딩',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if user:
+            self.fields['account'].queryset = Account.objects.filter(
+                user=user,
+                is_active=True
+            )
+
+    def clean_file(self):
+        """
+        파일 유효성 검사 (확장자, 크기)
+        """
+        file = self.cleaned_data.get('file')
+
+        if os.path.splitext(file.name)[1].lower() != '.csv':
+            raise ValidationError('CSV 파일만 업로드 가능합니다.')
+
+        if file.size > self.MAX_FILE_SIZE:
+            raise ValidationError(
+                f'파일 크기는 {self.MAX_FILE_SIZE // (1024 * 1024)}MB를 초과할 수 없습니다.'
+            )
+
+        return file
 
 
 class TransactionFilterForm(forms.Form):
@@ -178,14 +290,9 @@ class TransactionFilterForm(forms.Form):
 class AttachmentForm(forms.ModelForm):
     """
     영수증 파일 업로드 폼
+    - 최대 크기: settings.RECEIPT_MAX_UPLOAD_SIZE (기본 5MB)
     """
     
-    # 허용할 파일 확장자
-    ALLOWED_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.pdf']
-    
-    # 최대 파일 크기 (5MB)
-    MAX_FILE_SIZE = 5 * 1024 * 1024  # 바이트 단위
-    
     class Meta:
         model = Attachment
         fields = ['file']
@@ -201,49 +308,23 @@ class AttachmentForm(forms.ModelForm):
             'file': '영수증 파일',
         }
         
-        help_texts = {
-            'file': 'JPG, PNG, PDF 파일만 업로드 가능 (최대 5MB)',
-        }
-    
-    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['file'].help_text = (
+            f'JPG, PNG, PDF 파일만 업로드 가능 (최대 {max_receipt_size() / (1024 * 1024):.0f}MB)'
+        )
+
     def clean_file(self):
         """
-        파일 유효성 검사
+        파일 유효성 검사 (validate_receipt_file)
+        - 이미지 전체를 PIL로 열지 않음: 손상된 이미지는 썸네일 생성에서 '실패'로 표시 (thumbnails.py)
         """
         file = self.cleaned_data.get('file')
         
         if not file:
             return file
         
-        # 1. 확장자 검사
-        ext = os.path.splitext(file.name)[1].lower()
-        # os.path.splitext('receipt.jpg') → ('receipt', '.jpg')
-        
-        if ext not in self.ALLOWED_EXTENSIONS:
-            raise ValidationError(
-                f'허용되지 않는 파일 형식입니다. '
-                f'({", ".join(self.ALLOWED_EXTENSIONS)} 만 가능)'
-            )
-        
-        # 2. 파일 크기 검사
-        if file.size > self.MAX_FILE_SIZE:
-            max_size_mb = self.MAX_FILE_SIZE / (1024 * 1024)
-            raise ValidationError(
-                f'파일 크기는 {max_size_mb:.0f}MB를 초과할 수 없습니다. '
-                f'(현재: {file.size / (1024 * 1024):.1f}MB)'
-            )
-        
-        # 3. 파일 내용 검증 (선택사항)
-        # 실제로 이미지 파일인지 확인
-        if ext in ['.jpg', '.jpeg', '.png']:
-            try:
-                from PIL import Image
-                Image.open(file).verify()
-                file.seek(0)  # 파일 포인터 초기화
-            except:
-                raise ValidationError('유효하지 않은 이미지 파일입니다.')
-        
-        return file
+        return validate_receipt_file(file)
 
 
 class CategoryForm(forms.ModelForm):
@@ -256,6 +337,39 @@ class CategoryForm(forms.ModelForm):
         }
 
 
+class CategoryRuleForm(forms.ModelForm):
+    """
+    자동 분류 규칙 생성 폼
+    - 카테고리는 본인 + 공통 카테고리만 선택 가능
+    """
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if user:
+            from django.db.models import Q
+            self.fields['category'].queryset = Category.objects.filter(
+                Q(user=user) | Q(user__isnull=True)
+            ).order_by('name')
+
+    class Meta:
+        model = CategoryRule
+        fields = ['pattern', 'match_type', 'category', 'priority']
+        widgets = {
+            'pattern': forms.TextInput(attrs={'class': 'form-control', 'placeholder': '예: 스타벅스'}),
+            'match_type': forms.Select(attrs={'class': 'form-control'}),
+            'category': forms.Select(attrs={'class': 'form-control'}),
+            'priority': forms.NumberInput(attrs={'class': 'form-control', 'min': 0}),
+        }
+        help_texts = {
+            'priority': '여러 규칙이 일치하면 숫자가 작은 규칙이 먼저 적용됩니다.',
+        }
+
+    def clean_pattern(self):
+        pattern = self.cleaned_data['pattern'].strip()
+        if not pattern:
+            raise ValidationError('가맹점 패턴을 입력해주세요.')
+        return pattern
+
+
 
 # ========================================
 # 템플릿 사용 예시
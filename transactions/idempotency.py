@@ -0,0 +1,137 @@
+"""
+멱등 키 (Idempotency Key)
+- 역할: 재시도(더블 클릭, 모바일 네트워크 재전송)로 같은 거래 생성 요청이 여러 번 와도 한 번만 처리
+- 담당: 팀원 B
+
+키 전달
+- 거래 입력 폼: 화면을 열 때마다 새 키를 hidden 필드(idempotency_key)로 넣음
+- API (거래 일괄 변경): Idempotency-Key 헤더
+
+처리 흐름
+1. 저장된 결과가 있으면 (캐시 → 없으면 키 테이블) 그대로 응답 → 폼 검증/거래/잔액은 건드리지 않음
+   같은 키에 다른 요청 내용이면 IdempotencyConflict
+2. 처음이면 거래를 만든 DB 트랜잭션 안에서 응답(상태 코드, 본문, 이동 주소)과 함께 키 행을 INSERT
+   → 같은 키로 동시에 들어온 요청은 유니크 인덱스에서 기다렸다가 충돌 → 자기 변경은 롤백하고 먼저 커밋된 결과를 응답
+3. 커밋된 뒤 결과를 캐시에도 저장 (다음 재시도는 DB 조회 없이)
+- 키는 IDEMPOTENCY_KEY_TTL초 뒤 만료, purge_idempotency_keys로 정리
+"""
+
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.db import transaction as db_transaction
+from django.http import HttpResponse
+from django.utils import timezone
+
+
+TTL = getattr(settings, 'IDEMPOTENCY_KEY_TTL', 60 * 60 * 24)
+MAX_KEY_LENGTH = 100
+CACHE_KEY = 'idempotency:{}:{}'
+
+
+class IdempotencyConflict(Exception):
+    """같은 키로 내용이 다른 요청"""
+
+
+def valid_key(key):
+    """사용할 수 있는 키인지 (1~100자, 공백/제어 문자 없음)"""
+    return bool(key) and len(key) <= MAX_KEY_LENGTH and key.isprintable() and not any(c.isspace() for c in key)
+
+
+def fingerprint(*parts):
+    """요청 내용 해시 (같은 키로 다른 요청이 왔는지 구분)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _to_response(stored):
+    response = HttpResponse(
+        stored['body'], status=stored['status_code'], content_type=stored['content_type'] or None
+    )
+    if stored['location']:
+        response['Location'] = stored['location']
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _stored(response):
+    """응답 → 저장할 값 (스트리밍 응답은 쓰지 않음)"""
+    return {
+        'status_code': response.status_code,
+        'content_type': response.get('Content-Type', ''),
+        'location': response.get('Location', ''),
+        'body': response.content.decode(response.charset or 'utf-8'),
+    }
+
+
+def replay(user_id, key, request_fingerprint):
+    """
+    저장된 결과가 있으면 그 응답, 없으면 None
+    - 캐시에 있으면 DB 조회 없음
+    - IdempotencyConflict: 같은 키로 내용이 다른 요청
+    """
+    from .models import IdempotencyKey
+
+    stored = cache.get(CACHE_KEY.format(user_id, key))
+    if stored is None:
+        record = IdempotencyKey.objects.filter(
+            user_id=user_id, key=key, expires_at__gt=timezone.now()
+        ).values('fingerprint', 'status_code', 'content_type', 'location', 'body', 'expires_at').first()
+        if record is None:
+            return None
+        stored = record
+        _remember(user_id, key, stored)
+    if stored['fingerprint'] != request_fingerprint:
+        raise IdempotencyConflict(key)
+    return _to_response(stored)
+
+
+def _remember(user_id, key, stored):
+    timeout = int((stored['expires_at'] - timezone.now()).total_seconds())
+    if timeout > 0:
+        cache.set(CACHE_KEY.format(user_id, key), stored, timeout)
+
+
+def run_once(user_id, key, request_fingerprint, action):
+    """
+    action()을 키당 한 번만 실행하고 응답 반환 (이미 실행된 키면 저장된 응답)
+    - action: 변경을 수행하고 HttpResponse를 반환하는 함수, 이 함수의 DB 변경과 키 저장은 한 트랜잭션
+    - 먼저 replay()로 확인한 뒤 호출 (여기서는 다시 조회하지 않음)
+    """
+    from .models import IdempotencyKey
+
+    now = timezone.now()
+    try:
+        with db_transaction.atomic():
+            response = action()
+            record = IdempotencyKey.objects.create(
+                user_id=user_id, key=key, fingerprint=request_fingerprint,
+                expires_at=now + timedelta(seconds=TTL), **_stored(response),
+            )
+    except IntegrityError:
+        # 같은 키가 먼저 커밋됨 (동시 재시도) 또는 만료된 키 행이 남아 있음
+        expired = IdempotencyKey.objects.filter(user_id=user_id, key=key, expires_at__lte=now).delete()[0]
+        if expired:
+            return run_once(user_id, key, request_fingerprint, action)
+        response = replay(user_id, key, request_fingerprint)
+        if response is None:
+            raise  # 키 충돌이 아닌 다른 무결성 오류
+        return response
+
+    stored = {**_stored(response), 'fingerprint': request_fingerprint, 'expires_at': record.expires_at}
+    db_transaction.on_commit(lambda: _remember(user_id, key, stored))
+    return response
+
+
+def purge_expired():
+    """만료된 키 삭제 → 삭제한 개수"""
+    from .models import IdempotencyKey
+
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,266 @@
+"""
+거래 일괄 가져오기(CSV) 파이프라인
+- 역할: 업로드된 은행 거래내역 CSV를 배치 단위로 검증/저장
+- 담당: 팀원 B
+
+처리 흐름:
+1. CSV를 한 줄씩 스트리밍으로 읽어 BATCH_SIZE 행씩 묶음 (파일 전체를 메모리에 올리지 않음)
+2. 각 행을 TransactionForm의 필드 규칙으로 검증 (금액, 거래일시, 거래 타입, 카테고리 범위)
+3. 유효한 행은 bulk_create로 한 번에 INSERT (Transaction.save()를 거치지 않음)
+4. 계좌별 증감액을 합산해 배치당 계좌 잔액을 한 번만 UPDATE
+   (일별 잔액 체크포인트는 배치의 가장 이른 날짜부터 재계산, 월별 집계는 키별로 한 번씩 갱신)
+   새 거래와 계좌는 동기화 변경으로 한 번에 기록 (sync.py)
+5. 배치가 끝날 때마다 ImportJob 진행 상황 갱신
+"""
+
+import codecs
+import csv
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from .autocomplete import invalidate_merchants
+from .balance import apply_balance_deltas, collect_deltas
+from .cache import bump_data_version
+from .categorizer import Categorizer
+from .checkpoints import refresh_checkpoints_for
+from .forms import TransactionForm, validate_amount
+from .models import ImportJob, Transaction
+from .rollups import apply_rollup_deltas, collect_rollup_deltas
+from .sync import ACCOUNT, TRANSACTION, record_changes
+
+
+BATCH_SIZE = getattr(settings, 'TRANSACTION_IMPORT_BATCH_SIZE', 2000)
+
+# ImportJob.errors에 저장할 최대 오류 개수 (나머지는 error_rows 개수로만 집계)
+MAX_STORED_ERRORS = 100
+
+# 은행 CSV에서 자주 쓰는 한글 헤더 → 필드명
+HEADER_ALIASES = {
+    '거래일시': 'occurred_at',
+    '거래일자': 'occurred_at',
+    '날짜': 'occurred_at',
+    '구분': 'tx_type',
+    '거래구분': 'tx_type',
+    '금액': 'amount',
+    '거래금액': 'amount',
+    '가맹점': 'merchant',
+    '거래처': 'merchant',
+    '적요': 'merchant',
+    '메모': 'memo',
+    '카테고리': 'category',
+}
+
+TX_TYPE_ALIASES = {
+    'IN': 'IN',
+    '입금': 'IN',
+    '수입': 'IN',
+    'OUT': 'OUT',
+    '출금': 'OUT',
+    '지출': 'OUT',
+}
+
+
+class RowValidator:
+    """
+    CSV 한 행을 검증해서 Transaction 객체로 변환
+    - TransactionForm과 같은 필드 규칙(form.fields[...].clean)과 금액 규칙(validate_amount) 사용
+    - 카테고리는 TransactionForm과 같은 범위(본인 + 공통)를 한 번만 조회해서 이름으로 매칭
+      → 행마다 DB를 조회하지 않음
+    - 카테고리 칸이 비어 있으면 자동 분류 (categorizer.py, 규칙/거래 내역도 처음에 한 번만 조회)
+    """
+
+    def __init__(self, user, account):
+        self.user = user
+        self.account = account
+        self.fields = TransactionForm(user=user).fields
+
+        self.categories = {}
+        for category in self.fields['category'].queryset:
+            # 같은 이름이면 공통 카테고리보다 본인 카테고리 우선
+            if category.user_id or category.name not in self.categories:
+                self.categories[category.name] = category
+        self.categorizer = Categorizer(user.pk)
+
+    def build(self, row):
+        """
+        검증에 성공하면 저장 전 Transaction 객체 반환, 실패하면 ValidationError
+        """
+        errors = []
+
+        def clean(name, value):
+            try:
+                return self.fields[name].clean(value)
+            except ValidationError as e:
+                errors.append(f"{name}: {' '.join(e.messages)}")
+                return None
+
+        raw_amount = (row.get('amount') or '').replace(',', '').strip()
+        raw_type = (row.get('tx_type') or '').strip().upper()
+
+        # 구분 컬럼이 없으면 금액 부호로 판단 (예: -15000 → 출금)
+        if not raw_type and raw_amount:
+            raw_type = 'OUT' if raw_amount.startswith('-') else 'IN'
+        raw_amount = raw_amount.lstrip('-+')
+
+        tx_type = clean('tx_type', TX_TYPE_ALIASES.get(raw_type, raw_type))
+        amount = clean('amount', raw_amount)
+        if amount is not None:
+            try:
+                amount = validate_amount(amount)
+            except ValidationError as e:
+                errors.append(f"amount: {' '.join(e.messages)}")
+        occurred_at = clean('occurred_at', (row.get('occurred_at') or '').strip())
+        merchant = clean('merchant', (row.get('merchant') or '').strip())
+        memo = clean('memo', (row.get('memo') or '').strip())
+
+        category = None
+        category_name = (row.get('category') or '').strip()
+        if category_name:
+            category = self.categories.get(category_name)
+            if category is None:
+                errors.append(f"category: '{category_name}' 카테고리가 없습니다.")
+            elif tx_type and category.type not in (tx_type, 'BOTH'):
+                errors.append(f"category: '{category_name}'는 {tx_type} 거래에 쓸 수 없습니다.")
+
+        if errors:
+            raise ValidationError(errors)
+
+        category_id = category.pk if category else self.categorizer.suggest(merchant, tx_type)
+        return Transaction(
+            user=self.user,
+            account=self.account,
+            category_id=category_id,
+            tx_type=tx_type,
+            amount=amount,
+            occurred_at=occurred_at,
+            merchant=merchant,
+            memo=memo,
+        )
+
+
+def normalize_header(name):
+    name = (name or '').strip()
+    return HEADER_ALIASES.get(name, name.lower())
+
+
+def count_rows(fieldfile):
+    """진행률 표시용 전체 행 수 (헤더 제외, 줄바꿈 개수 기준)"""
+    lines = 0
+    last = b''
+    with fieldfile.open('rb') as f:
+        for chunk in f.chunks():
+            lines += chunk.count(b'\n')
+            last = chunk
+    if last and not last.endswith(b'\n'):
+        lines += 1  # 마지막 줄에 줄바꿈이 없는 경우
+    return max(lines - 1, 0)
+
+
+def iter_rows(fieldfile, encoding):
+    """
+    CSV를 한 줄씩 읽어 (줄 번호, dict) 를 반환하는 제너레이터
+    - codecs 리더로 조금씩 디코딩하므로 파일 크기와 무관하게 메모리 일정
+    """
+    with fieldfile.open('rb') as f:
+        reader = csv.reader(codecs.getreader(encoding)(f))
+        header = [normalize_header(h) for h in next(reader, [])]
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue  # 빈 줄
+            yield reader.line_num, dict(zip(header, row))
+
+
+def import_batch(job, validator, batch):
+    """
+    한 배치 처리: 검증 → bulk_create → 계좌별 잔액 1회 UPDATE → 체크포인트/월별 집계 → 진행 상황 저장
+    - 한 배치는 하나의 DB 트랜잭션 (거래 INSERT와 잔액 반영이 항상 함께 커밋됨)
+    """
+    transactions, errors = [], []
+    for line_num, row in batch:
+        try:
+            transactions.append(validator.build(row))
+        except ValidationError as e:
+            errors.append({'row': line_num, 'error': ' / '.join(e.messages)})
+
+    with db_transaction.atomic():
+        Transaction.objects.bulk_create(transactions, batch_size=500)
+        apply_balance_deltas(collect_deltas(
+            (tx.account_id, tx.tx_type, tx.amount) for tx in transactions
+        ))
+        refresh_checkpoints_for(transactions)
+        apply_rollup_deltas(collect_rollup_deltas(
+            (1, {f: getattr(tx, f) for f in Transaction.TRACKED_FIELDS}) for tx in transactions
+        ))
+        if transactions:
+            bump_data_version(job.user_id)  # bulk_create는 post_save 시그널이 없음
+            invalidate_merchants(job.user_id)
+            # 동기화 변경: 새 거래 + 잔액이 바뀐 계좌 (카운터는 마지막에 잠금, sync.py)
+            record_changes(job.user_id, [(TRANSACTION, tx.pk, False) for tx in transactions] + [
+                (ACCOUNT, job.account_id, False)
+            ])
+
+        job.processed_rows += len(batch)
+        job.imported_rows += len(transactions)
+        job.error_rows += len(errors)
+        job.errors = (job.errors + errors)[:MAX_STORED_ERRORS]
+        job.save(update_fields=['processed_rows', 'imported_rows', 'error_rows', 'errors'])
+
+
+def run_import_job(job_id):
+    """
+    ImportJob 한 건을 처음부터 끝까지 처리
+    - 처리 후 업로드한 CSV 파일은 삭제
+    """
+    job = ImportJob.objects.select_related('user', 'account').get(pk=job_id)
+    job.status = 'RUNNING'
+    job.total_rows = count_rows(job.file)
+    job.save(update_fields=['status', 'total_rows'])
+
+    try:
+        validator = RowValidator(job.user, job.account)
+        batch = []
+        for line_num, row in iter_rows(job.file, job.encoding):
+            batch.append((line_num, row))
+            if len(batch) >= BATCH_SIZE:
+                import_batch(job, validator, batch)
+                batch = []
+        if batch:
+            import_batch(job, validator, batch)
+        job.status = 'DONE'
+    except (UnicodeDecodeError, csv.Error) as e:
+        job.status = 'FAILED'
+        job.errors = (job.errors + [{'row': None, 'error': f'파일을 읽을 수 없습니다: {e}'}])[:MAX_STORED_ERRORS]
+    finally:
+        if job.status == 'RUNNING':
+            job.status = 'FAILED'  # 예상하지 못한 예외
+        job.file.delete(save=False)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'errors', 'file', 'finished_at'])
+
+    return job
+
+
+def _run_in_thread(job_id):
+    try:
+        run_import_job(job_id)
+    finally:
+        connection.close()  # 스레드 전용 DB 연결 정리
+
+
+def start_import(job):
+    """
+    가져오기 시작
+    - TRANSACTION_IMPORT_ASYNC=True: 커밋 후 백그라운드 스레드에서 처리 (요청은 바로 응답)
+    - False: 현재 요청 안에서 바로 처리 (테스트/관리 명령어용)
+    """
+    if getattr(settings, 'TRANSACTION_IMPORT_ASYNC', True):
+        db_transaction.on_commit(
+            lambda: threading.Thread(target=_run_in_thread, args=(job.pk,), daemon=True).start()
+        )
+    else:
+        run_import_job(job.pk)
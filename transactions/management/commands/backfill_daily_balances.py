@@ -0,0 +1,35 @@
+"""
+일별 잔액 체크포인트(DailyBalance) 백필
+- 사용법: python manage.py backfill_daily_balances [--account 1 --account 2]
+- 기존 거래 내역으로 계좌별 체크포인트를 처음부터 다시 만듦 (여러 번 실행해도 결과 동일)
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import Account
+from transactions.checkpoints import rebuild_checkpoints
+
+
+class Command(BaseCommand):
+    help = '거래 내역으로 계좌별 일별 잔액 체크포인트를 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--account', type=int, action='append', dest='accounts',
+                            help='대상 계좌 id (여러 번 지정 가능, 생략 시 전체 계좌)')
+
+    def handle(self, *args, **options):
+        account_ids = Account.objects.order_by('pk').values_list('pk', flat=True)
+        if options['accounts']:
+            account_ids = account_ids.filter(pk__in=options['accounts'])
+
+        start = time.perf_counter()
+        accounts = checkpoints = 0
+        for account_id in account_ids.iterator():
+            checkpoints += rebuild_checkpoints(account_id)
+            accounts += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'계좌 {accounts:,}개, 체크포인트 {checkpoints:,}개 생성 ({time.perf_counter() - start:.2f}s)'
+        ))
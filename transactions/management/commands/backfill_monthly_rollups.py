@@ -0,0 +1,35 @@
+"""
+월별 거래 집계(MonthlyRollup) 백필
+- 사용법: python manage.py backfill_monthly_rollups [--user 1 --user 2]
+- 기존 거래 내역으로 사용자별 월별 집계를 처음부터 다시 만듦 (여러 번 실행해도 결과 동일)
+"""
+
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from transactions.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = '거래 내역으로 사용자별 월별 집계를 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='대상 사용자 id (여러 번 지정 가능, 생략 시 전체 사용자)')
+
+    def handle(self, *args, **options):
+        user_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+        if options['users']:
+            user_ids = user_ids.filter(pk__in=options['users'])
+
+        start = time.perf_counter()
+        users = rollups = 0
+        for user_id in user_ids.iterator():
+            rollups += rebuild_rollups(user_id)
+            users += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'사용자 {users:,}명, 월별 집계 {rollups:,}개 생성 ({time.perf_counter() - start:.2f}s)'
+        ))
@@ -0,0 +1,37 @@
+"""
+동기화 변경 기록(SyncChange) 백필
+- 사용법: python manage.py backfill_sync_changes [--user 1 --user 2]
+- 기능 도입 이전의 거래/계좌/카테고리를 변경으로 기록 → 처음 동기화하는 앱이 전체를 받을 수 있음
+  (여러 번 실행해도 결과 동일, 이미 기록된 객체는 번호만 새로 받음)
+"""
+
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from transactions.sync import backfill_changes, backfill_shared_changes
+
+
+class Command(BaseCommand):
+    help = '기존 거래/계좌/카테고리를 동기화 변경으로 기록합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='대상 사용자 id (여러 번 지정 가능, 생략 시 전체 사용자 + 공통 카테고리)')
+
+    def handle(self, *args, **options):
+        user_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+        if options['users']:
+            user_ids = user_ids.filter(pk__in=options['users'])
+
+        start = time.perf_counter()
+        users = 0
+        objects = 0 if options['users'] else backfill_shared_changes()
+        for user_id in user_ids.iterator():
+            objects += backfill_changes(user_id)
+            users += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'사용자 {users:,}명, 객체 {objects:,}개 기록 ({time.perf_counter() - start:.2f}s)'
+        ))
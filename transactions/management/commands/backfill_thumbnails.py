@@ -0,0 +1,101 @@
+"""
+영수증 썸네일 백필
+- 사용법: python manage.py backfill_thumbnails [--workers 4] [--retry-failed] [--force]
+- 기능 도입 이전 영수증(썸네일 상태 '대기')의 썸네일을 여러 스레드에서 생성
+- 같은 파일을 쓰는 영수증은 한 묶음: 한 번만 만들고 나머지는 결과(경로/상태)를 복사
+  (썸네일 파일도 공유하므로 묶음 하나는 작업 스레드 하나에서만 → 같은 경로에 동시에 저장하지 않음)
+- --retry-failed: 실패했던 영수증도 다시, --force: 이미 만든 영수증도 전부 다시 (크기 설정을 바꾼 경우)
+"""
+
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from transactions.models import Attachment
+from transactions.thumbnails import generate_thumbnails, logger
+
+
+def render_blob(ids, force=False):
+    """
+    같은 파일을 쓰는 첨부파일 묶음의 썸네일 생성 → 첨부파일별 결과 상태 목록
+    - 첫 첨부파일만 만들고, 결과를 나머지에 복사
+    - 그 사이 첫 첨부파일이 삭제되었거나 파일이 바뀌었으면(None) 다음 첨부파일로 다시
+    """
+    results = []
+    for index, pk in enumerate(ids):
+        status = generate_thumbnails(pk, force=force)
+        if status is None:
+            results.append(None)
+            continue
+        source = Attachment.objects.filter(pk=pk).values('file', 'thumbnails').first()
+        rest = ids[index + 1:]
+        if source is None or not rest:
+            return results + [status] + [None] * len(rest)
+        rows = Attachment.objects.filter(pk__in=rest, file=source['file'])
+        if status == 'DONE':
+            copied = rows.update(thumbnails=source['thumbnails'], thumbnail_status='DONE')
+        else:
+            copied = rows.update(thumbnail_status=status)
+        return results + [status] * (1 + copied) + [None] * (len(rest) - copied)
+    return results
+
+
+def render_blob_in_worker(ids, force=False):
+    """작업 스레드에서 실행 (예외는 로그로 남기고, 스레드 전용 DB 연결 정리)"""
+    try:
+        return render_blob(ids, force=force)
+    except Exception:
+        logger.exception('영수증 썸네일 생성 중 오류 (첨부파일 %s)', ids)
+        return ['FAILED'] * len(ids)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = '썸네일이 없는 영수증의 썸네일을 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='작업 스레드 수 (1이면 현재 스레드에서 처리)')
+        parser.add_argument('--retry-failed', action='store_true', help='실패했던 영수증도 다시 생성')
+        parser.add_argument('--force', action='store_true', help='이미 만든 썸네일도 다시 생성')
+
+    def handle(self, *args, **options):
+        statuses = ['PENDING']
+        if options['retry_failed'] or options['force']:
+            statuses.append('FAILED')
+        if options['force']:
+            statuses.append('DONE')
+        # 이미지가 아닌 첨부파일(기능 도입 이전 PDF 등)은 상태만 정리
+        Attachment.objects.filter(thumbnail_status='PENDING').exclude(
+            content_type__startswith='image/'
+        ).update(thumbnail_status='NONE')
+        blobs = defaultdict(list)
+        rows = (
+            Attachment.objects.filter(thumbnail_status__in=statuses, content_type__startswith='image/')
+            .order_by('pk').values_list('pk', 'file')
+        )
+        for pk, name in rows:
+            blobs[name].append(pk)
+        groups = list(blobs.values())
+
+        start = time.perf_counter()
+        force = options['force']
+        workers = max(options['workers'], 1)
+        if workers == 1 or len(groups) <= 1:
+            results = [render_blob(ids, force=force) for ids in groups]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(partial(render_blob_in_worker, force=force), groups))
+        results = [status for group in results for status in group]
+
+        done, failed = results.count('DONE'), results.count('FAILED')
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(
+            f'영수증 {len(results):,}개 중 {done:,}개 생성, {failed:,}개 실패 ({time.perf_counter() - start:.2f}s)'
+        ))
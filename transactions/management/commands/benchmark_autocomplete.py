@@ -0,0 +1,128 @@
+"""
+가맹점 자동완성 조회 시간 측정
+- 사용법: python manage.py benchmark_autocomplete --merchants 5000 --rows 100000 --lookups 20000
+- 임시 사용자에게 가맹점 이름이 다양한 거래를 만든 뒤 검색어별 응답 시간을 재고 마지막에 모두 롤백
+
+출력:
+- 색인 만들기: 처음 조회 때 한 번 (DB 집계 쿼리 + 접두어 색인 생성)
+- 색인 조회: autocomplete.suggest_merchants (캐시의 리비전 확인 포함), 중앙값/p99
+- DB 조회: 키 입력마다 거래를 istartswith + GROUP BY로 조회하는 방식 (비교용, --db-lookups 만큼만)
+"""
+
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db import transaction as db_transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from accounts.models import Account
+from transactions.autocomplete import choseong, get_merchant_index, suggest_merchants
+from transactions.models import Transaction
+
+
+BRANDS = [
+    '스타벅스', '투썸플레이스', '이디야커피', '메가커피', '빽다방', '파리바게뜨', '뚜레쥬르', '배스킨라빈스',
+    'GS25', 'CU', '세븐일레븐', '이마트24', '이마트', '홈플러스', '롯데마트', '올리브영', '다이소',
+    '맥도날드', '버거킹', '롯데리아', '맘스터치', '서브웨이', '교촌치킨', 'BBQ', 'bhc', '김밥천국',
+    '본죽', '한솥도시락', '쿠팡', '배달의민족', '요기요', '카카오택시', '티머니', '코레일', 'SK주유소',
+    'GS칼텍스', 'CGV', '메가박스', '교보문고', '알라딘', '무신사', '유니클로', '약국', '정형외과',
+]
+AREAS = [
+    '강남', '역삼', '선릉', '삼성', '잠실', '송파', '건대', '성수', '왕십리', '홍대', '합정', '신촌', '이대',
+    '종로', '광화문', '시청', '을지로', '명동', '서울역', '용산', '이태원', '여의도', '영등포', '구로',
+    '신림', '사당', '교대', '서초', '양재', '판교', '분당', '수원', '인천', '부평', '일산', '김포', '부산',
+    '해운대', '대구', '광주', '대전', '울산', '제주', '춘천', '청주', '전주', '포항', '창원', '천안', '안양',
+]
+
+
+class Command(BaseCommand):
+    help = '가맹점 자동완성 조회 시간 측정 (접두어 색인 vs 키 입력마다 DB 조회)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--merchants', type=int, default=5000, help='서로 다른 가맹점 수')
+        parser.add_argument('--rows', type=int, default=100000, help='거래 수')
+        parser.add_argument('--lookups', type=int, default=20000, help='색인 조회 횟수')
+        parser.add_argument('--db-lookups', type=int, default=200, help='비교용 DB 조회 횟수')
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        merchants = [f'{brand} {area}{suffix}' for suffix in ('점', '2호점', '역점', '본점')
+                     for area in AREAS for brand in BRANDS][:options['merchants']]
+
+        with db_transaction.atomic():
+            user = User.objects.create_user(username=f'bench-merchant-{time.time_ns()}')
+            account = Account.objects.create(
+                user=user, name='벤치마크', bank_name='벤치', account_number='000-000-00000003'
+            )
+            self._generate(rng, user, account, merchants, options['rows'])
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE transactions_transaction')
+
+            start = time.perf_counter()
+            index = get_merchant_index(user.pk)
+            self.stdout.write(
+                f'색인 만들기: 가맹점 {len(index.counts):,}개, 접두어 {len(index.top):,}개, '
+                f'{(time.perf_counter() - start) * 1000:.1f}ms'
+            )
+
+            queries = [self._query(rng, rng.choice(merchants)) for _ in range(options['lookups'])]
+            self._report('색인 조회', queries, lambda q: suggest_merchants(user.pk, q))
+
+            def db_lookup(q):
+                return list(
+                    Transaction.objects.filter(user=user, merchant__istartswith=q)
+                    .values('merchant').annotate(n=Count('id')).order_by('-n', 'merchant')[:10]
+                )
+            # DB는 초성/입력 중인 글자를 찾을 수 없으므로 완성된 글자 검색어만 사용
+            plain = [merchant[:rng.randint(1, 4)] for merchant in rng.sample(merchants, k=min(
+                options['db_lookups'], len(merchants)
+            ))]
+            self._report('DB 조회', plain, db_lookup)
+
+            db_transaction.set_rollback(True)  # 측정용 데이터는 남기지 않음
+
+    def _query(self, rng, merchant):
+        """실제 입력처럼: 앞 몇 글자 / 초성 / 두 번째 단어 앞 몇 글자"""
+        kind = rng.random()
+        if kind < 0.6:
+            return merchant[:rng.randint(1, 4)]
+        if kind < 0.8:
+            return choseong(merchant.split()[0])[:rng.randint(1, 3)]
+        return merchant.split()[-1][:rng.randint(1, 2)]
+
+    def _report(self, label, queries, lookup):
+        timings = []
+        for q in queries:
+            start = time.perf_counter()
+            lookup(q)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        p99 = timings[min(int(len(timings) * 0.99), len(timings) - 1)]
+        self.stdout.write(
+            f'{label}: {len(timings):,}회 중앙값 {statistics.median(timings) * 1e6:.0f}µs, '
+            f'p99 {p99 * 1e6:.0f}µs'
+        )
+
+    def _generate(self, rng, user, account, merchants, rows):
+        """가맹점 사용 빈도는 몇 곳에 몰리도록 (앞쪽 가맹점일수록 자주)"""
+        now = timezone.now()
+        weights = [1 / (i + 1) for i in range(len(merchants))]
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=user,
+                account=account,
+                tx_type='OUT',
+                amount=Decimal(rng.randint(1, 100000)),
+                occurred_at=now - timedelta(minutes=rng.randint(0, 365 * 24 * 60)),
+                merchant=merchant,
+            )
+            for merchant in rng.choices(merchants, weights=weights, k=rows)
+        ], batch_size=1000)
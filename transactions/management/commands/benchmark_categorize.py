@@ -0,0 +1,101 @@
+"""
+미분류 거래 일괄 자동 분류 성능 측정
+- 사용법: python manage.py benchmark_categorize --rows 300000 --merchants 2000
+- 임시 사용자에게 일부는 분류된(학습용) 거래, 나머지는 미분류 거래를 만든 뒤
+  categorize_uncategorized를 한 번 실행하고 마지막에 모두 롤백
+
+출력:
+- 분류한 거래 수, 소요 시간, 실행한 쿼리 수
+- 월별 집계 확인: 증분 갱신 결과가 처음부터 다시 계산한 값과 같은지
+"""
+
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db import transaction as db_transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import Account
+from transactions.categorizer import categorize_uncategorized
+from transactions.models import Category, CategoryRule, MonthlyRollup, Transaction
+from transactions.rollups import rebuild_rollups
+
+
+GENERATE_BATCH = 10000
+
+
+class Command(BaseCommand):
+    help = '미분류 거래 일괄 자동 분류 시간 측정'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=300000, help='미분류 거래 수')
+        parser.add_argument('--merchants', type=int, default=2000, help='서로 다른 가맹점 수')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        rng = random.Random(0)
+        merchants = [f'가게{i}' for i in range(options['merchants'])]
+
+        with db_transaction.atomic():
+            user = User.objects.create_user(username=f'bench-categorize-{time.time_ns()}')
+            account = Account.objects.create(
+                user=user, name='벤치마크', bank_name='벤치', account_number='000-000-00000004'
+            )
+            categories = [
+                Category.objects.create(user=user, name=f'분류{i}', type='OUT') for i in range(20)
+            ]
+            # 가맹점 80%는 거래 내역으로 학습, 일부는 규칙으로
+            history = {merchant: rng.choice(categories) for merchant in merchants[:len(merchants) * 4 // 5]}
+            CategoryRule.objects.create(user=user, category=categories[0], pattern='가게1', match_type='startswith')
+
+            self._generate(rng, user, account, [(m, c) for m, c in history.items()], len(history) * 3)
+            self._generate(rng, user, account, [(m, None) for m in merchants], rows)
+            rebuild_rollups(user.pk)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE transactions_transaction')
+
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                result = categorize_uncategorized(user.pk)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'미분류 {rows:,}건 중 {sum(result.values()):,}건 분류, '
+                f'{elapsed:.2f}초, 쿼리 {len(queries):,}개'
+            )
+
+            incremental = self._rollups(user)
+            rebuild_rollups(user.pk)
+            self.stdout.write(f'월별 집계 확인: {"일치" if incremental == self._rollups(user) else "불일치"}')
+
+            db_transaction.set_rollback(True)  # 측정용 데이터는 남기지 않음
+
+    def _rollups(self, user):
+        return {
+            (row.account_id, row.month, row.category_id, row.tx_type): (row.total, row.count)
+            for row in MonthlyRollup.objects.filter(user=user)
+            if row.count
+        }
+
+    def _generate(self, rng, user, account, choices, rows):
+        now = timezone.now()
+        for offset in range(0, rows, GENERATE_BATCH):
+            objs = []
+            for _ in range(min(GENERATE_BATCH, rows - offset)):
+                merchant, category = rng.choice(choices)
+                objs.append(Transaction(
+                    user=user,
+                    account=account,
+                    category=category,
+                    tx_type='OUT',
+                    amount=Decimal(rng.randint(1, 100000)),
+                    occurred_at=now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60)),
+                    merchant=merchant,
+                ))
+            Transaction.objects.bulk_create(objs, batch_size=1000)
@@ -0,0 +1,119 @@
+"""
+거래 CSV 내보내기 성능 측정
+- 사용법: python manage.py benchmark_export --rows 1000000
+- 임시 사용자/계좌에 거래를 만든 뒤 내보내기 응답을 끝까지 읽고 마지막에 모두 롤백
+
+출력:
+- streaming: 내보내기 뷰와 같은 방식 (exporter.stream_csv, 서버 측 커서 + 한 행씩)
+- 이전 방식: 모델 객체를 전부 읽어 CSV를 메모리에서 만든 뒤 한 번에 응답 (--baseline-rows 만큼만)
+- 각각 응답 크기, 소요 시간, 초당 행 수, 파이썬 메모리 최대 사용량(tracemalloc)
+"""
+
+import csv
+import io
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from accounts.models import Account
+from transactions.exporter import stream_csv
+from transactions.models import Transaction
+
+
+GENERATE_BATCH = 10000
+
+
+class Command(BaseCommand):
+    help = '거래 CSV 내보내기 시간/메모리 측정 (스트리밍 vs 메모리에서 한 번에 생성)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='거래 수')
+        parser.add_argument(
+            '--baseline-rows', type=int, default=100000,
+            help='이전 방식으로 내보낼 거래 수 (0이면 생략, 메모리를 많이 쓰므로 기본은 일부만)',
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        baseline_rows = min(options['baseline_rows'], rows)
+
+        with db_transaction.atomic():
+            user = User.objects.create_user(username=f'bench-export-{time.time_ns()}')
+            account = Account.objects.create(
+                user=user, name='벤치마크', bank_name='벤치', account_number='000-000-00000002'
+            )
+            self._generate(user, account, rows)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE transactions_transaction')
+
+            queryset = Transaction.objects.filter(
+                user=user, account__is_active=True
+            ).order_by('-occurred_at', '-id')
+
+            self._report('streaming', rows, lambda: sum(
+                len(chunk.encode()) for chunk in stream_csv(queryset)
+            ))
+            if baseline_rows:
+                self._report('이전 방식', baseline_rows, lambda: self._build_in_memory(
+                    queryset.select_related('account', 'category')[:baseline_rows]
+                ))
+
+            db_transaction.set_rollback(True)  # 측정용 데이터는 남기지 않음
+
+    def _report(self, label, rows, func):
+        """시간은 그냥 한 번, 메모리는 tracemalloc을 켜고 한 번 더 (tracemalloc이 실행을 크게 느리게 함)"""
+        start = time.perf_counter()
+        size = func()
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f'{label}: {rows:,}건 {size / 1024 / 1024:.1f}MB, {elapsed:.2f}초 '
+            f'({rows / elapsed if elapsed else 0:,.0f}건/초), 메모리 최대 {peak / 1024 / 1024:.1f}MB'
+        )
+
+    def _build_in_memory(self, queryset):
+        """이전 방식: 모델 객체 전체 → StringIO → 한 번에 응답 본문"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for tx in list(queryset):
+            writer.writerow([
+                timezone.localtime(tx.occurred_at).strftime('%Y-%m-%d %H:%M:%S'),
+                tx.get_tx_type_display(),
+                tx.amount,
+                tx.account.name,
+                tx.category.name if tx.category else '',
+                tx.merchant,
+                tx.memo,
+            ])
+        return len(buffer.getvalue().encode())
+
+    def _generate(self, user, account, rows):
+        """GENERATE_BATCH건씩 만들어 저장 (생성 단계도 메모리 일정)"""
+        rng = random.Random(0)
+        now = timezone.now()
+        for offset in range(0, rows, GENERATE_BATCH):
+            Transaction.objects.bulk_create([
+                Transaction(
+                    user=user,
+                    account=account,
+                    tx_type='OUT',
+                    amount=Decimal(rng.randint(1, 100000)),
+                    occurred_at=now - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+                    merchant=f'가게{i % 500}',
+                    memo='벤치마크',
+                )
+                for i in range(offset, min(offset + GENERATE_BATCH, rows))
+            ], batch_size=1000)
@@ -0,0 +1,94 @@
+"""
+거래 일괄 가져오기 성능 측정
+- 사용법: python manage.py benchmark_import --rows 100000 --baseline-rows 2000
+- 임시 사용자/계좌에 가져온 뒤 마지막에 모두 롤백 (DB에 데이터가 남지 않음)
+
+비교 대상:
+- baseline: 한 행씩 Transaction.save() (TransactionCreateView와 같은 경로)
+- pipeline: importer.py (배치 검증 + bulk_create + 계좌당 잔액 UPDATE 1회)
+"""
+
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from accounts.models import Account
+from transactions.importer import run_import_job
+from transactions.models import ImportJob, Transaction
+
+
+class Command(BaseCommand):
+    help = 'CSV 거래 가져오기 성능 측정 (한 행씩 save() vs 일괄 가져오기)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='가져올 행 수')
+        parser.add_argument('--baseline-rows', type=int, default=2000,
+                            help='한 행씩 저장 방식으로 측정할 행 수 (결과는 --rows 기준으로 환산)')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        baseline_rows = options['baseline_rows']
+
+        with db_transaction.atomic():
+            user = User.objects.create_user(username=f'bench-import-{time.time_ns()}')
+            account = Account.objects.create(
+                user=user, name='벤치마크', bank_name='벤치', account_number='000-000-00000000'
+            )
+
+            # 1. baseline: 한 행씩 save()
+            start = time.perf_counter()
+            now = timezone.now()
+            for i in range(baseline_rows):
+                Transaction.objects.create(
+                    user=user, account=account, tx_type='OUT',
+                    amount=Decimal(i % 10000 + 1), occurred_at=now, merchant=f'가게{i}',
+                )
+            baseline = time.perf_counter() - start
+            per_row = baseline / baseline_rows if baseline_rows else 0
+
+            # 2. pipeline: CSV 가져오기
+            job = ImportJob.objects.create(
+                user=user,
+                account=account,
+                file=ContentFile(self._make_csv(rows), name='bench.csv'),
+                original_name='bench.csv',
+            )
+            start = time.perf_counter()
+            job = run_import_job(job.pk)
+            pipeline = time.perf_counter() - start
+
+            account.refresh_from_db()
+            expected = Decimal(0) - sum(
+                (Decimal(i % 10000 + 1) for i in range(baseline_rows)), Decimal(0)
+            ) - sum((Decimal(i % 10000 + 1) for i in range(rows)), Decimal(0))
+            balance_ok = account.balance == expected
+
+            db_transaction.set_rollback(True)  # 측정용 데이터는 남기지 않음
+
+        self.stdout.write(
+            f'baseline (save() x {baseline_rows:,}): {baseline:.2f}s '
+            f'→ {rows:,}행 환산 {per_row * rows:.1f}s ({per_row * 1000:.2f}ms/행)'
+        )
+        self.stdout.write(
+            f'pipeline ({job.imported_rows:,}/{rows:,}행): {pipeline:.2f}s '
+            f'({rows / pipeline:,.0f}행/초)'
+        )
+        if pipeline:
+            self.stdout.write(f'speedup: x{per_row * rows / pipeline:.1f}')
+        self.stdout.write(self.style.SUCCESS('잔액 일치') if balance_ok else self.style.ERROR('잔액 불일치'))
+
+    def _make_csv(self, rows):
+        rng = random.Random(0)
+        base = timezone.localtime().replace(microsecond=0)
+        lines = ['occurred_at,tx_type,amount,merchant,memo']
+        for i in range(rows):
+            occurred_at = (base - timedelta(minutes=rng.randint(0, 60 * 24 * 365))).strftime('%Y-%m-%d %H:%M')
+            lines.append(f'{occurred_at},OUT,{i % 10000 + 1},가게{i % 500},메모{i}')
+        return '\n'.join(lines).encode('utf-8')
@@ -0,0 +1,105 @@
+"""
+거래 목록 페이지네이션 성능 측정
+- 사용법: python manage.py benchmark_transaction_list --rows 100000 --repeat 5
+- 임시 사용자/계좌에 거래를 만든 뒤 앞/중간/끝 페이지를 읽고 마지막에 모두 롤백
+
+출력 (깊이별 최소/중앙값):
+- offset: 이전 방식 (Paginator + ?page=N, 매번 COUNT(*) 포함)
+- keyset: 커서 방식 (pagination.KeysetPaginator, 건수 제외)
+"""
+
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from accounts.models import Account
+from transactions.models import Transaction
+from transactions.pagination import NEXT, KeysetPaginator, encode_cursor
+
+
+PER_PAGE = 20
+
+
+class Command(BaseCommand):
+    help = '거래 목록의 깊은 페이지 조회 시간 측정 (OFFSET vs 키셋)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='거래 수')
+        parser.add_argument('--repeat', type=int, default=5, help='페이지당 반복 횟수')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = max(options['repeat'], 1)
+
+        with db_transaction.atomic():
+            user = User.objects.create_user(username=f'bench-list-{time.time_ns()}')
+            account = Account.objects.create(
+                user=user, name='벤치마크', bank_name='벤치', account_number='000-000-00000001'
+            )
+            self._generate(user, account, rows)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE transactions_transaction')  # 실제 운영처럼 통계가 있는 상태
+
+            queryset = Transaction.objects.filter(
+                user=user, account__is_active=True
+            ).select_related('account', 'category')
+            last_page = max((rows - 1) // PER_PAGE + 1, 1)
+
+            for page_number in sorted({1, last_page // 2 or 1, last_page}):
+                offset = self._time(repeat, lambda: list(
+                    Paginator(queryset, PER_PAGE).page(page_number).object_list
+                ))
+                cursor = self._cursor_before(queryset, (page_number - 1) * PER_PAGE)
+                keyset = self._time(repeat, lambda: list(
+                    KeysetPaginator(queryset, PER_PAGE).page(cursor).object_list
+                ))
+                self.stdout.write(
+                    f'page {page_number:>6,} / {last_page:,}: '
+                    f'offset 최소 {min(offset) * 1000:.1f}ms 중앙값 {statistics.median(offset) * 1000:.1f}ms | '
+                    f'keyset 최소 {min(keyset) * 1000:.1f}ms 중앙값 {statistics.median(keyset) * 1000:.1f}ms'
+                )
+
+            db_transaction.set_rollback(True)  # 측정용 데이터는 남기지 않음
+
+    def _time(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    def _cursor_before(self, queryset, position):
+        """position번째 행 바로 앞 행의 커서 (첫 페이지면 None, 측정 시간에는 포함하지 않음)"""
+        if position == 0:
+            return None
+        values = queryset.order_by('-occurred_at', '-pk').values_list(
+            'occurred_at', 'pk'
+        )[position - 1]
+        return encode_cursor(values, NEXT)
+
+    def _generate(self, user, account, rows):
+        rng = random.Random(0)
+        now = timezone.now()
+        objs = [
+            Transaction(
+                user=user,
+                account=account,
+                tx_type='OUT',
+                amount=Decimal(rng.randint(1, 100000)),
+                occurred_at=now - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+                merchant=f'가게{i % 500}',
+            )
+            for i in range(rows)
+        ]
+        Transaction.objects.bulk_create(objs, batch_size=1000)
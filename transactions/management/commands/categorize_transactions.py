@@ -0,0 +1,45 @@
+"""
+미분류 거래 일괄 자동 분류
+- 사용법: python manage.py categorize_transactions [--user 1 --user 2] [--dry-run]
+- 규칙(CategoryRule) + 거래 내역으로 사용자별 미분류 거래를 분류 (transactions/categorizer.py)
+- --dry-run: 분류할 거래 수만 출력하고 저장하지 않음
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+
+from transactions.categorizer import categorize_uncategorized
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = '규칙과 거래 내역으로 미분류 거래에 카테고리를 지정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='대상 사용자 id (여러 번 지정 가능, 생략 시 미분류 거래가 있는 전체 사용자)')
+        parser.add_argument('--dry-run', action='store_true', help='저장하지 않고 결과만 출력')
+
+    def handle(self, *args, **options):
+        user_ids = Transaction.objects.filter(
+            category__isnull=True
+        ).values_list('user_id', flat=True).distinct().order_by('user_id')
+        if options['users']:
+            user_ids = user_ids.filter(user_id__in=options['users'])
+
+        start = time.perf_counter()
+        users = categorized = 0
+        for user_id in list(user_ids):
+            # 사용자마다 따로 커밋 (--dry-run이면 사용자마다 롤백)
+            with db_transaction.atomic():
+                categorized += sum(categorize_uncategorized(user_id).values())
+                if options['dry_run']:
+                    db_transaction.set_rollback(True)
+            users += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'사용자 {users:,}명, 거래 {categorized:,}건 {"분류 가능" if options["dry_run"] else "분류"} '
+            f'({time.perf_counter() - start:.2f}s)'
+        ))
@@ -0,0 +1,57 @@
+"""
+기존 영수증 파일을 내용 주소 저장소로 옮김
+- 사용법: python manage.py dedupe_receipts  (내용 주소 저장소 도입 후 한 번)
+- receipts/%Y/%m/%d/ 에 따로 저장된 파일을 receipts/ab/cd/<해시> 로 옮기면서 같은 내용끼리 합침 (storage.py)
+- 옮긴 뒤 기존 파일과 썸네일은 삭제, 썸네일은 backfill_thumbnails로 다시 생성
+- 중간에 멈춰도 다시 실행하면 남은 파일만 처리
+"""
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+from django.db.models import Sum
+
+from transactions.models import Attachment, ReceiptBlob
+from transactions.storage import receipt_storage, release
+
+
+class Command(BaseCommand):
+    help = '기존 영수증 파일을 내용 주소 저장소로 옮겨 중복을 합칩니다.'
+
+    def handle(self, *args, **options):
+        blob_bytes = ReceiptBlob.objects.aggregate(total=Sum('size'))['total'] or 0
+        legacy = (
+            Attachment.objects.exclude(file__in=ReceiptBlob.objects.values('name'))
+            .order_by('pk').values_list('pk', 'file')
+        )
+
+        moved = missing = legacy_bytes = 0
+        for pk, name in legacy.iterator():
+            if not default_storage.exists(name):
+                missing += 1
+                continue
+            size = default_storage.size(name)
+            with db_transaction.atomic():
+                attachment = Attachment.objects.select_for_update().filter(pk=pk, file=name).first()
+                if attachment is None:  # 그 사이 삭제되었거나 파일이 바뀜
+                    continue
+                with default_storage.open(name, 'rb') as fp:
+                    attachment.file.name = receipt_storage.save(name, fp)
+                thumbnails = attachment.thumbnails
+                attachment.thumbnails = {}
+                attachment.thumbnail_status = 'PENDING' if attachment.is_image() else 'NONE'
+                attachment.save(update_fields=['file', 'thumbnails', 'thumbnail_status'])
+                # 같은 기존 파일을 쓰는 첨부파일이 더 없으면 커밋 후 기존 파일 + 썸네일 삭제
+                release(name, thumbnails)
+            moved += 1
+            legacy_bytes += size
+
+        stored = (ReceiptBlob.objects.aggregate(total=Sum('size'))['total'] or 0) - blob_bytes
+        self.stdout.write(self.style.SUCCESS(
+            f'영수증 {moved:,}개 이동, 파일 {legacy_bytes:,} → {stored:,} bytes '
+            f'({legacy_bytes - stored:,} bytes 절약)'
+        ))
+        if missing:
+            self.stdout.write(self.style.WARNING(f'파일이 없는 영수증 {missing:,}개는 건너뜀'))
+        if moved:
+            self.stdout.write('썸네일 다시 만들기: python manage.py backfill_thumbnails')
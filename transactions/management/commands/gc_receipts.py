@@ -0,0 +1,183 @@
+"""
+고아 영수증 파일 정리
+- 사용법: python manage.py gc_receipts [--dry-run] [--workers 4] [--batch-size 1000] [--min-age 60]  (cron으로 하루 한 번)
+- MEDIA_ROOT/receipts 아래 파일 중 어떤 첨부파일도 쓰지 않는 파일을 지움
+  (삭제 작업 스레드가 끝나기 전에 프로세스가 종료된 경우, 업로드 임시 파일, 기능 도입 이전 파일 등)
+- 최상위 디렉터리(receipts/ab, receipts/2026 ...)마다 작업 스레드 하나가 파일을 훑고
+  --batch-size개씩 Attachment.file과 비교 (경로 목록 전체를 메모리에 올리지 않음)
+- 썸네일(<원본>.<크기>.webp/jpg)은 같은 디렉터리의 원본을 쓰는 첨부파일이 있으면 유지
+- --min-age분보다 최근 파일은 건너뜀 (아직 커밋되지 않은 업로드)
+- --dry-run: 지우지 않고 지울 파일 수/용량만 보고 (-v 2: 경로도 출력)
+"""
+
+import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from transactions.models import Attachment
+from transactions.storage import PREFIX, reclaim
+
+
+# <원본 경로에서 확장자를 뺀 부분>.<크기 이름>.<webp|jpg> (thumbnails.thumbnail_name)
+THUMBNAIL_RE = re.compile(r'^(?P<root>.+)\.[A-Za-z0-9_-]+\.(webp|jpg)$')
+
+
+@dataclass
+class Report:
+    scanned: int = 0
+    scanned_bytes: int = 0
+    orphans: int = 0
+    orphan_bytes: int = 0
+    recent: int = 0
+    paths: list = field(default_factory=list)
+
+    def merge(self, other):
+        for name in ('scanned', 'scanned_bytes', 'orphans', 'orphan_bytes', 'recent'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.paths += other.paths
+
+
+def stat_entries(names):
+    """
+    파일 → (MEDIA_ROOT 기준 경로, 크기, 수정 시각)
+    - 목록을 읽은 뒤 지워진 파일(삭제 작업 스레드, 업로드 정리)은 건너뜀
+    """
+    entries = []
+    for name in names:
+        try:
+            stat = os.stat(default_storage.path(name))
+        except FileNotFoundError:
+            continue
+        entries.append((name, stat.st_size, stat.st_mtime))
+    return entries
+
+
+def walk(root):
+    """디렉터리 아래 파일 (MEDIA_ROOT 기준 경로, 크기, 수정 시각), 디렉터리 하나씩 → 같은 디렉터리 파일끼리 묶음"""
+    for dirpath, _, filenames in os.walk(default_storage.path(root)):
+        entries = stat_entries(
+            os.path.relpath(os.path.join(dirpath, filename), default_storage.location).replace(os.sep, '/')
+            for filename in filenames
+        )
+        if entries:
+            yield entries
+
+
+def owners(entries):
+    """
+    파일 → 주인 원본 경로
+    - 썸네일 모양이고 같은 디렉터리에 원본(확장자만 다른 파일)이 있으면 그 원본
+    - 그 밖에는 자기 자신 (원본, 원본이 없는 썸네일, 임시 파일)
+    """
+    roots = {os.path.splitext(name)[0]: name for name, _, _ in entries}
+    result = {}
+    for name, _, _ in entries:
+        match = THUMBNAIL_RE.match(name)
+        original = roots.get(match.group('root')) if match else None
+        result[name] = original if original and original != name else name
+    return result
+
+
+class Command(BaseCommand):
+    help = '어떤 첨부파일도 쓰지 않는 영수증 파일을 지웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='지우지 않고 보고만 함')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='작업 스레드 수 (1이면 현재 스레드에서 처리)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 DB와 비교할 파일 수')
+        parser.add_argument('--min-age', type=int, default=60, help='이보다 최근(분) 파일은 건너뜀')
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.batch_size = max(options['batch_size'], 1)
+        self.cutoff = time.time() - options['min_age'] * 60
+
+        start = time.perf_counter()
+        if not default_storage.exists(PREFIX):
+            roots = []
+        else:
+            directories, files = default_storage.listdir(PREFIX)
+            roots = [f'{PREFIX}/{name}' for name in directories]
+            if files:  # receipts/ 바로 아래 파일(초기 버전 업로드 등)은 따로 한 묶음
+                roots.append(None)
+
+        workers = max(options['workers'], 1)
+        if workers == 1 or len(roots) <= 1:
+            reports = [self.scan(root) for root in roots]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                reports = list(pool.map(self.scan_in_worker, roots))
+
+        report = Report()
+        for part in reports:
+            report.merge(part)
+        if options['verbosity'] >= 2:
+            for path in sorted(report.paths):
+                self.stdout.write(path)
+
+        action = '삭제 예정 (dry-run)' if self.dry_run else '삭제'
+        self.stdout.write(self.style.SUCCESS(
+            f'파일 {report.scanned:,}개 ({report.scanned_bytes:,} bytes) 검사, '
+            f'고아 파일 {report.orphans:,}개 ({report.orphan_bytes:,} bytes) {action}, '
+            f'최근 파일 {report.recent:,}개 건너뜀 ({time.perf_counter() - start:.2f}s)'
+        ))
+
+    def scan_in_worker(self, root):
+        try:
+            return self.scan(root)
+        finally:
+            connection.close()  # 스레드 전용 DB 연결 정리
+
+    def scan(self, root):
+        """최상위 디렉터리 하나 (None: receipts/ 바로 아래 파일)"""
+        report = Report()
+        batch = []
+        for entries in self._entries(root):
+            batch += entries
+            if len(batch) >= self.batch_size:
+                self.diff(batch, report)
+                batch = []
+        if batch:
+            self.diff(batch, report)
+        return report
+
+    def _entries(self, root):
+        if root is not None:
+            yield from walk(root)
+            return
+        entries = stat_entries(f'{PREFIX}/{filename}' for filename in default_storage.listdir(PREFIX)[1])
+        if entries:
+            yield entries
+
+    def diff(self, entries, report):
+        """파일 묶음(디렉터리 단위로 모은 것) ↔ Attachment.file 비교 후 고아 파일 정리"""
+        owner_of = owners(entries)
+        candidates = set(owner_of) | set(owner_of.values())
+        used = set(Attachment.objects.filter(file__in=candidates).values_list('file', flat=True))
+
+        groups = defaultdict(list)
+        for name, size, mtime in entries:
+            report.scanned += 1
+            report.scanned_bytes += size
+            if name in used or owner_of[name] in used:
+                continue
+            groups[owner_of[name]].append((name, size, mtime))
+
+        for owner, files in groups.items():
+            if any(mtime > self.cutoff for _, _, mtime in files):
+                report.recent += len(files)
+                continue
+            names = [name for name, _, _ in files]
+            if not self.dry_run and not reclaim(owner, names):
+                continue  # 그 사이 다시 참조됨
+            report.orphans += len(files)
+            report.orphan_bytes += sum(size for _, size, _ in files)
+            report.paths += names
@@ -0,0 +1,22 @@
+"""
+오래된 동기화 툼스톤 정리
+- 사용법: python manage.py prune_sync_tombstones [--days 90]  (cron으로 하루 한 번)
+- 삭제된 거래/계좌/카테고리의 기록 중 --days일보다 오래된 것을 지움
+  → 그보다 오래 동기화하지 않은 앱은 다음 동기화에서 reset을 받고 전체를 다시 받음
+"""
+
+from django.core.management.base import BaseCommand
+
+from transactions.sync import TOMBSTONE_DAYS, prune_tombstones
+
+
+class Command(BaseCommand):
+    help = '오래된 동기화 툼스톤(삭제 기록)을 지웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=TOMBSTONE_DAYS,
+                            help=f'보관 기간 (기본 {TOMBSTONE_DAYS}일, settings.SYNC_TOMBSTONE_DAYS)')
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'툼스톤 {deleted:,}개 삭제'))
@@ -0,0 +1,17 @@
+"""
+만료된 멱등 키 정리
+- 사용법: python manage.py purge_idempotency_keys  (cron으로 하루 한 번)
+- IDEMPOTENCY_KEY_TTL이 지난 키 행을 지움 (만료된 키는 조회에서도 무시되므로 정리 시점은 자유)
+"""
+
+from django.core.management.base import BaseCommand
+
+from transactions.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = '만료된 멱등 키를 지웁니다.'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'멱등 키 {deleted:,}개 삭제'))
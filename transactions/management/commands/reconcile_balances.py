@@ -0,0 +1,104 @@
+"""
+계좌 잔액 대사 (야간 배치용)
+- 사용법: python manage.py reconcile_balances [--dry-run] [--workers 4] [--range-size 1000]
+- 거래 내역으로 계좌 잔액을 다시 계산해서 저장된 잔액과 다르면 보고/복구
+- 계좌 id 구간별로 나눠 여러 프로세스에서 동시에 처리 (transactions/reconcile.py 참고)
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from transactions.reconcile import account_id_ranges, reconcile_range
+
+
+def _init_worker():
+    """
+    작업 프로세스 초기화
+    - spawn/forkserver 방식이면 Django 설정을 새로 로드
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _reconcile_range(lo, hi, chunk_size, repair):
+    """작업 프로세스에서 실행 (구간마다 DB 연결을 정리해서 연결이 쌓이지 않게 함)"""
+    try:
+        return lo, hi, reconcile_range(lo, hi, chunk_size=chunk_size, repair=repair)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = '거래 내역으로 계좌 잔액을 다시 계산해서 저장된 잔액과 비교/복구합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='차이만 보고하고 잔액은 고치지 않음')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='작업 프로세스 수 (1이면 현재 프로세스에서 처리)')
+        parser.add_argument('--range-size', type=int, default=1000,
+                            help='작업 하나가 맡는 계좌 수')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='서버 사이드 커서에서 한 번에 읽을 행 수')
+
+    def handle(self, *args, **options):
+        repair = not options['dry_run']
+        chunk_size = options['chunk_size']
+        workers = max(options['workers'], 1)
+        self.verbosity = options['verbosity']
+
+        start = time.perf_counter()
+        ranges = account_id_ranges(options['range_size'])
+
+        if workers == 1 or len(ranges) <= 1:
+            results = (
+                (lo, hi, reconcile_range(lo, hi, chunk_size=chunk_size, repair=repair))
+                for lo, hi in ranges
+            )
+            self._report(results, len(ranges), repair, start)
+            return
+
+        # 부모 프로세스의 DB 연결을 작업 프로세스가 물려받지 않도록 먼저 닫음
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), initializer=_init_worker) as pool:
+            futures = [
+                pool.submit(_reconcile_range, lo, hi, chunk_size, repair)
+                for lo, hi in ranges
+            ]
+            self._report((future.result() for future in futures), len(ranges), repair, start)
+
+    def _report(self, results, total_ranges, repair, start):
+        accounts = transactions = initialized = drifted = 0
+        for done, (lo, hi, result) in enumerate(results, 1):
+            accounts += result.accounts
+            transactions += result.transactions
+            initialized += result.initialized
+            drifted += len(result.drifts)
+            for drift in result.drifts:
+                self.stdout.write(self.style.WARNING(
+                    f'계좌 {drift.account_id}: 저장 {drift.stored:,} / 계산 {drift.expected:,} '
+                    f'(차이 {drift.difference:+,})' + (' → 복구' if repair else '')
+                ))
+            if self.verbosity >= 2:
+                self.stdout.write(f'[{done}/{total_ranges}] 계좌 id {lo}~{hi} 완료')
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        summary = (
+            f'계좌 {accounts:,}개, 거래 {transactions:,}건 확인 ({elapsed:.2f}s, '
+            f'계좌 {accounts / elapsed:,.0f}개/s, 거래 {transactions / elapsed:,.0f}건/s)\n'
+            f'잔액 불일치 {drifted:,}개' + (' 복구' if repair else ' (dry-run: 변경 없음)')
+        )
+        if initialized:
+            summary += (
+                f'\n기준 잔액이 없던 계좌 {initialized:,}개'
+                + (' → 현재 잔액 기준으로 기록' if repair else ' (dry-run: 기록하지 않음)')
+            )
+        style = self.style.WARNING if drifted else self.style.SUCCESS
+        self.stdout.write(style(summary))
@@ -6,10 +6,21 @@
 """
 
 from django.db import models
+from django.db import transaction as db_transaction
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from decimal import Decimal
 
+from accountbook_project.versioning import StaleObjectError, VersionedModel
+
+from .balance import apply_balance_deltas, collect_deltas
+from .checkpoints import apply_checkpoint_deltas, collect_checkpoint_deltas
+from .rollups import apply_rollup_deltas, collect_rollup_deltas
+from .storage import receipt_storage
+from .sync import ACCOUNT, TRANSACTION, record_changes
+
 
 class Category(models.Model):
     """
@@ -56,11 +67,12 @@ class Category(models.Model):
         return f"{self.name} ({self.get_type_display()})"
 
 
-class Transaction(models.Model):
+class Transaction(VersionedModel):
     """
     거래 내역 모델
     - 계좌에서 발생한 입금/출금 기록
     - 프로젝트의 핵심 비즈니스 데이터
+    - version: 수정할 때마다 +1, 다른 곳에서 먼저 수정된 거래를 저장하면 StaleObjectError
     """
     # 거래 타입 선택지
     TX_TYPE_CHOICES = [
@@ -132,6 +144,9 @@ class Transaction(models.Model):
     # 4. 자동 생성 필드
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # 키워드 검색용 tsvector (PostgreSQL 트리거가 가맹점/메모로 채움, search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     
     class Meta:
@@ -141,6 +156,17 @@ class Transaction(models.Model):
         
         indexes = [
             models.Index(fields=['-occurred_at']),  # 거래일 기준 조회 최적화
+            # 사용자별 기간 조회 (대시보드 월 통계, 거래 목록 기간 필터)
+            models.Index(fields=['user', 'occurred_at'], name='tx_user_occurred_idx'),
+            # 계좌를 고른 경우 (대시보드/거래 목록 계좌 필터)
+            models.Index(fields=['user', 'account', 'occurred_at'], name='tx_user_account_occurred_idx'),
+            # 카테고리 + 입출금 타입 필터
+            models.Index(
+                fields=['user', 'category', 'tx_type', 'occurred_at'],
+                name='tx_user_cat_type_occurred_idx',
+            ),
+            # 사용자별 수정 시각 (일괄 자동 분류가 이번 실행에 표시한 행 찾기, categorizer.categorize_uncategorized)
+            models.Index(fields=['user', 'updated_at'], name='tx_user_updated_idx'),
         ]
     
     
@@ -150,43 +176,47 @@ class Transaction(models.Model):
         """
         return f"{self.get_tx_type_display()} {self.amount:,.0f}원 - {self.merchant or '메모 없음'}"
 
+    # 잔액/집계 반영에 필요한 필드 (수정 전 값과 비교하는 기준)
+    TRACKED_FIELDS = ('user_id', 'account_id', 'category_id', 'tx_type', 'amount', 'occurred_at')
+
     def save(self, *args, **kwargs):
         """
         거래 저장 시 계좌 잔액 자동 업데이트
 
         처리 로직:
-        1. 거래 수정인 경우: 기존 금액을 되돌림
+        1. 거래 수정인 경우: 이 인스턴스 버전의 기존 값을 읽어 기존 금액을 되돌림
+           - 계좌가 바뀌었으면 기존 계좌는 복원, 새 계좌에 반영
+           - 행을 미리 잠그지 않음: UPDATE ... WHERE version = n 이 0행이면 그 사이 다른 저장이 있었던 것
+             → StaleObjectError로 전체 롤백 (읽은 기존 값이 UPDATE 직전 값과 같음이 보장됨)
         2. 새로운 거래 금액 반영
            - 수입(IN): 계좌 잔액 증가
            - 지출(OUT): 계좌 잔액 감소
+        3. 계좌별 증감액을 F() 식으로 한 번에 반영 (balance.apply_balance_deltas)
+        4. 일별 잔액 체크포인트 갱신 (checkpoints.apply_checkpoint_deltas)
+        5. 월별 집계 갱신 (rollups.apply_rollup_deltas)
+        6. 동기화 변경 기록: 거래 + 잔액이 바뀐 계좌 (sync.record_changes)
         """
-        # 기존 거래인 경우 (수정)
-        if self.pk:
-            # 기존 거래 정보 조회
-            old_transaction = Transaction.objects.get(pk=self.pk)
-
-            # 기존 금액을 되돌림
-            if old_transaction.tx_type == 'IN':
-                # 기존 수입을 취소 (잔액 감소)
-                old_transaction.account.balance -= old_transaction.amount
-            else:
-                # 기존 지출을 취소 (잔액 증가)
-                old_transaction.account.balance += old_transaction.amount
-            old_transaction.account.save()
-            # 메모리의 self.account와 DB를 동기화
-            self.account.refresh_from_db()
-
-        # 거래 저장
-        super().save(*args, **kwargs)
-
-        # 새로운 금액 반영
-        if self.tx_type == 'IN':
-            # 수입: 계좌 잔액 증가
-            self.account.balance += self.amount
-        else:
-            # 지출: 계좌 잔액 감소
-            self.account.balance -= self.amount
-        self.account.save()
+        with db_transaction.atomic():
+            changes = []
+
+            # 기존 거래인 경우 (수정): 기존 금액을 되돌림
+            if self.pk:
+                old = Transaction.objects.filter(
+                    pk=self.pk
+                ).values('version', *self.TRACKED_FIELDS).first()
+                if old:
+                    if old.pop('version') != self.version:
+                        raise StaleObjectError(self)  # 이미 최신이 아님 → UPDATE 없이 바로
+                    changes.append((-1, old))
+
+            # 거래 저장
+            super().save(*args, **kwargs)
+
+            # 새로운 금액 반영
+            changes.append((1, {f: getattr(self, f) for f in self.TRACKED_FIELDS}))
+            deltas = self._apply_changes(changes, synced=[(TRANSACTION, self.pk, False)])
+
+        self._sync_cached_account_balance(deltas)
 
     def delete(self, *args, **kwargs):
         """
@@ -195,18 +225,57 @@ class Transaction(models.Model):
         처리 로직:
         - 수입(IN) 삭제: 계좌 잔액 감소
         - 지출(OUT) 삭제: 계좌 잔액 증가
+        - DB에 저장된 값 기준으로 복원 (메모리 값이 수정되어 있어도 안전)
         """
-        # 잔액 복원
-        if self.tx_type == 'IN':
-            # 수입 삭제: 잔액 감소
-            self.account.balance -= self.amount
-        else:
-            # 지출 삭제: 잔액 증가
-            self.account.balance += self.amount
-        self.account.save()
+        pk = self.pk  # 삭제 후에는 None이 됨
+        with db_transaction.atomic():
+            old = Transaction.objects.select_for_update().filter(
+                pk=pk
+            ).values(*self.TRACKED_FIELDS).first()
+
+            # 거래 삭제
+            result = super().delete(*args, **kwargs)
+
+            # 잔액 복원 + 툼스톤 기록 (이미 삭제된 거래면 아무것도 하지 않음)
+            deltas = self._apply_changes([(-1, old)], synced=[(TRANSACTION, pk, True)]) if old else {}
 
-        # 거래 삭제
-        super().delete(*args, **kwargs)
+        self._sync_cached_account_balance(deltas)
+        return result
+
+    @staticmethod
+    def _apply_changes(changes, synced=()):
+        """
+        거래 변경분을 잔액/체크포인트/월별 집계에 반영하고 계좌별 증감액 반환
+
+        changes: [(부호, 거래 값 dict), ...]  (모두 같은 사용자의 거래)
+        - 부호 +1: 새로 반영할 값, -1: 되돌릴 기존 값
+        - 예: 수정 → [(-1, 수정 전 값), (+1, 수정 후 값)]
+        synced: 잔액이 바뀐 계좌와 함께 동기화 변경으로 기록할 [(종류, id, 삭제 여부), ...]
+        """
+        deltas = collect_deltas(
+            (values['account_id'], values['tx_type'], sign * Decimal(str(values['amount'])))
+            for sign, values in changes
+        )
+        apply_balance_deltas(deltas)
+        # 체크포인트도 계좌 행을 잠근 뒤 갱신 (잔액 증감이 0인 계좌 포함) → 같은 계좌끼리 직렬화됨
+        apply_checkpoint_deltas(collect_checkpoint_deltas(changes))
+        apply_rollup_deltas(collect_rollup_deltas(changes))
+        # 동기화 카운터는 다른 행을 모두 잠근 뒤 마지막에 (sync.py)
+        if changes:
+            record_changes(changes[0][1]['user_id'], list(synced) + [
+                (ACCOUNT, account_id, False) for account_id, delta in deltas.items() if delta
+            ])
+        return deltas
+
+    def _sync_cached_account_balance(self, deltas):
+        """
+        메모리에 올라와 있는 self.account의 잔액도 DB와 같게 맞춤
+        - 호출한 쪽에서 account.save()를 다시 불러도 잔액이 덮어써지지 않도록
+        """
+        if Transaction.account.is_cached(self):
+            delta = deltas.get(self.account_id)
+            if delta:
+                self.account.balance += delta
 
 
 class Attachment(models.Model):
@@ -214,7 +283,16 @@ class Attachment(models.Model):
     영수증/첨부파일 모델
     - 거래에 첨부되는 영수증 이미지 또는 PDF 파일
     - 파일 자체는 MEDIA 폴더에 저장, DB에는 경로만 저장
+    - 같은 내용의 파일은 한 번만 저장하고 여러 첨부파일이 공유 (storage.py, ReceiptBlob)
+      → 첨부파일을 지워도 파일은 마지막 첨부파일이 지워질 때 삭제 (signals.py)
+    - 이미지는 업로드 후 크기별 썸네일을 원본 옆에 만들어 미리보기에 사용 (thumbnails.py)
     """
+    THUMBNAIL_STATUS_CHOICES = [
+        ('PENDING', '대기'),
+        ('DONE', '완료'),
+        ('FAILED', '실패'),
+        ('NONE', '해당 없음'),   # 이미지가 아님 (PDF 등)
+    ]
     
     # 1. 관계 필드
     user = models.ForeignKey(
@@ -234,7 +312,8 @@ class Attachment(models.Model):
     
     # 2. 파일 정보
     file = models.FileField(
-        upload_to='receipts/%Y/%m/%d/',  # 업로드 경로: media/receipts/2026/01/29/
+        upload_to='receipts/',
+        storage=receipt_storage,         # 경로는 내용 해시로 정함: media/receipts/ab/cd/abcd...ef.jpg
         verbose_name='파일'
     )
     
@@ -254,8 +333,21 @@ class Attachment(models.Model):
         verbose_name='파일 타입'
     )
     # 예: "image/jpeg", "image/png", "application/pdf"
+
+    # 3. 썸네일 (thumbnails.py에서 채움)
+    thumbnails = models.JSONField(default=dict, blank=True, verbose_name='썸네일')
+    # 예: {"small": {"width": 150, "height": 200,
+    #                "webp": "receipts/ab/cd/<sha256>.small.webp", "jpeg": "receipts/ab/cd/<sha256>.small.jpg"},
+    #      "medium": {...}}
+
+    thumbnail_status = models.CharField(
+        max_length=10,
+        choices=THUMBNAIL_STATUS_CHOICES,
+        default='PENDING',
+        verbose_name='썸네일 상태'
+    )
     
-    # 3. 자동 생성 필드
+    # 4. 자동 생성 필드
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
     
@@ -268,14 +360,40 @@ class Attachment(models.Model):
         return f"{self.transaction} - {self.original_name}"
     
     
-    def delete(self, *args, **kwargs):
+    def save(self, *args, **kwargs):
         """
-        모델 삭제 시 실제 파일도 함께 삭제
-        - DB 레코드만 삭제되고 파일이 남지 않도록
+        파일 저장(참조 수 +1)과 행 INSERT를 한 DB 트랜잭션으로 → INSERT가 실패하면 참조 수도 롤백
         """
-        if self.file:
-            self.file.delete(save=False)
-        super().delete(*args, **kwargs)
+        # 이미지가 아니면 썸네일을 만들지 않음
+        if self._state.adding and not self.is_image():
+            self.thumbnail_status = 'NONE'
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+    def _thumbnail(self, size):
+        entry = self.thumbnails.get(size)
+        if not entry:
+            return None
+        storage = self.file.storage
+        return {
+            'webp': storage.url(entry['webp']),
+            'jpeg': storage.url(entry['jpeg']),
+            'width': entry['width'],
+            'height': entry['height'],
+        }
+
+
+    @property
+    def preview(self):
+        """거래 상세 화면용 썸네일 {webp, jpeg, width, height} (아직 없으면 None → 원본)"""
+        return self._thumbnail('medium')
+
+
+    @property
+    def small_preview(self):
+        """관리자 목록용 작은 썸네일"""
+        return self._thumbnail('small')
     
     
     def is_image(self):
@@ -295,6 +413,373 @@ class Attachment(models.Model):
         return self.content_type == 'application/pdf'
 
 
+class DailyBalance(models.Model):
+    """
+    계좌 일별 잔액 체크포인트
+    - 거래가 있었던 날(Asia/Seoul 기준)마다 계좌별로 한 행
+    - 거래 생성/수정/삭제 시 checkpoints.py에서 증분 갱신
+
+    running_total: 그날까지 모든 거래의 누적 증감액 (수입 +, 지출 -)
+    → X일 마감 잔액 = 현재 잔액 - 최신 running_total + X일 이전 마지막 running_total
+      (행 2개만 읽으면 되고, 초기 잔액을 수정해도 체크포인트를 다시 만들 필요 없음)
+    """
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='daily_balances',
+        verbose_name='계좌'
+    )
+
+    date = models.DateField(verbose_name='날짜')
+
+    net_amount = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=0,
+        verbose_name='당일 증감액'
+    )
+
+    running_total = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=0,
+        verbose_name='누적 증감액'
+    )
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name = '일별 잔액'
+        verbose_name_plural = '일별 잔액 목록'
+        constraints = [
+            # (계좌, 날짜) 인덱스 겸용: "X일 이전 마지막 체크포인트" 조회가 인덱스 한 번으로 끝남
+            models.UniqueConstraint(fields=['account', 'date'], name='unique_daily_balance'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} {self.date} ({self.running_total:,.0f})"
+
+
+class ImportJob(models.Model):
+    """
+    거래 일괄 가져오기(CSV) 작업 모델
+    - 업로드한 CSV 파일과 처리 진행 상황을 저장
+    - 실제 처리는 transactions/importer.py 에서 배치 단위로 수행
+    """
+    STATUS_CHOICES = [
+        ('PENDING', '대기'),
+        ('RUNNING', '진행중'),
+        ('DONE', '완료'),
+        ('FAILED', '실패'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='import_jobs',
+        verbose_name='사용자'
+    )
+
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='import_jobs',
+        verbose_name='계좌'
+    )
+
+    file = models.FileField(
+        upload_to='imports/%Y/%m/%d/',
+        blank=True,
+        verbose_name='CSV 파일'
+    )
+    # 처리가 끝나면 파일은 삭제 (은행 거래내역 원본을 남겨두지 않음)
+
+    original_name = models.CharField(max_length=255, verbose_name='원본 파일명')
+    encoding = models.CharField(max_length=20, default='utf-8-sig', verbose_name='인코딩')
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='PENDING',
+        verbose_name='상태'
+    )
+
+    # 진행 상황 (배치가 끝날 때마다 갱신)
+    total_rows = models.IntegerField(default=0, verbose_name='전체 행 수')
+    processed_rows = models.IntegerField(default=0, verbose_name='처리한 행 수')
+    imported_rows = models.IntegerField(default=0, verbose_name='가져온 행 수')
+    error_rows = models.IntegerField(default=0, verbose_name='오류 행 수')
+    errors = models.JSONField(default=list, blank=True, verbose_name='오류 내역')
+    # 예: [{"row": 3, "error": "amount: 금액은 0보다 커야 합니다."}, ...]
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = '거래 가져오기'
+        verbose_name_plural = '거래 가져오기 목록'
+
+    def __str__(self):
+        return f"{self.original_name} ({self.get_status_display()})"
+
+    @property
+    def progress(self):
+        """진행률 (0~100)"""
+        if self.status == 'DONE':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, int(self.processed_rows * 100 / self.total_rows))
+
+    @property
+    def is_finished(self):
+        return self.status in ('DONE', 'FAILED')
+
+
+class MonthlyRollup(models.Model):
+    """
+    월별 거래 집계
+    - (사용자, 계좌, 월, 카테고리, 거래 타입)마다 한 행: 합계 금액과 거래 수
+    - 거래 생성/수정/삭제 시 rollups.py에서 증분 갱신
+    → 대시보드 월 통계가 그 달 거래 수와 무관하게 집계 행 몇 개만 읽음
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='monthly_rollups',
+        verbose_name='사용자'
+    )
+
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='monthly_rollups',
+        verbose_name='계좌'
+    )
+
+    month = models.DateField(verbose_name='월')
+    # 그 달 1일 (Asia/Seoul 기준), 예: 2026-02-01
+
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,        # 카테고리 삭제 전에 미분류 행으로 합쳐짐 (signals.py)
+        null=True,
+        blank=True,
+        related_name='monthly_rollups',
+        verbose_name='카테고리'
+    )
+
+    tx_type = models.CharField(
+        max_length=3,
+        choices=Transaction.TX_TYPE_CHOICES,
+        verbose_name='거래 타입'
+    )
+
+    total = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=0,
+        verbose_name='합계 금액'
+    )
+
+    count = models.IntegerField(default=0, verbose_name='거래 수')
+
+    class Meta:
+        ordering = ['-month']
+        verbose_name = '월별 집계'
+        verbose_name_plural = '월별 집계 목록'
+        constraints = [
+            # NULL은 서로 다른 값으로 취급되므로 미분류(category NULL) 행은 따로 제약
+            models.UniqueConstraint(
+                fields=['user', 'account', 'month', 'category', 'tx_type'],
+                condition=models.Q(category__isnull=False),
+                name='unique_monthly_rollup',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'account', 'month', 'tx_type'],
+                condition=models.Q(category__isnull=True),
+                name='unique_monthly_rollup_uncategorized',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} {self.month:%Y-%m} {self.tx_type} ({self.total:,.0f}, {self.count}건)"
+
+
+class CategoryRule(models.Model):
+    """
+    자동 분류 규칙
+    - 가맹점 이름이 패턴과 일치하는 미분류 거래에 카테고리를 지정 (categorizer.py)
+    - 사용자가 직접 만든 규칙이 거래 내역에서 배운 분류보다 먼저 적용됨
+    - 여러 규칙이 일치하면 우선순위(priority) 숫자가 작은 규칙, 같으면 먼저 만든 규칙
+    """
+    MATCH_CHOICES = [
+        ('contains', '포함'),
+        ('startswith', '시작'),
+        ('exact', '일치'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='category_rules',
+        verbose_name='사용자'
+    )
+
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,        # 카테고리를 지우면 규칙도 의미가 없음
+        related_name='rules',
+        verbose_name='카테고리'
+    )
+    # 카테고리 타입(수입/지출/공통)에 맞는 거래에만 적용
+
+    pattern = models.CharField(max_length=100, verbose_name='가맹점 패턴')
+    # 예: "스타벅스" (대소문자 구분 없음)
+
+    match_type = models.CharField(
+        max_length=10,
+        choices=MATCH_CHOICES,
+        default='contains',
+        verbose_name='일치 방식'
+    )
+
+    priority = models.PositiveIntegerField(default=100, verbose_name='우선순위')
+    is_active = models.BooleanField(default=True, verbose_name='사용')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['priority', 'id']
+        verbose_name = '자동 분류 규칙'
+        verbose_name_plural = '자동 분류 규칙 목록'
+
+    def __str__(self):
+        return f"'{self.pattern}' {self.get_match_type_display()} → {self.category.name}"
+
+
+class SyncCounter(models.Model):
+    """
+    동기화 변경 번호 카운터 (sync.py)
+    - 범위마다 한 행: 사용자 id, 공통 카테고리는 0
+    - 변경을 기록할 때 seq를 올리고 그 번호를 씀 → 커밋까지 행이 잠겨 번호 순서 = 커밋 순서
+    """
+    scope = models.BigIntegerField(primary_key=True, verbose_name='범위')
+    seq = models.BigIntegerField(default=0, verbose_name='마지막 변경 번호')
+    pruned_seq = models.BigIntegerField(default=0, verbose_name='정리한 툼스톤 번호')
+    # 이 번호 이전의 툼스톤은 지워졌으므로 더 오래된 커서는 전체를 다시 받아야 함
+
+    class Meta:
+        verbose_name = '동기화 카운터'
+        verbose_name_plural = '동기화 카운터 목록'
+
+    def __str__(self):
+        return f"{self.scope}: {self.seq}"
+
+
+class SyncChange(models.Model):
+    """
+    동기화 변경 기록 (sync.py)
+    - 거래/계좌/카테고리마다 한 행: 마지막으로 바뀐 변경 번호와 삭제 여부
+    - 삭제된 객체는 deleted=True 행(툼스톤)으로 남아 클라이언트가 지울 수 있음
+    """
+    KIND_CHOICES = [
+        ('transaction', '거래'),
+        ('account', '계좌'),
+        ('category', '카테고리'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,                       # NULL: 공통 카테고리
+        blank=True,
+        related_name='sync_changes',
+        verbose_name='사용자'
+    )
+    kind = models.CharField(max_length=11, choices=KIND_CHOICES, verbose_name='종류')
+    object_id = models.BigIntegerField(verbose_name='객체 id')
+    seq = models.BigIntegerField(verbose_name='변경 번호')
+    deleted = models.BooleanField(default=False, verbose_name='삭제됨')
+    changed_at = models.DateTimeField(default=timezone.now, verbose_name='변경 시각')
+
+    class Meta:
+        verbose_name = '동기화 변경'
+        verbose_name_plural = '동기화 변경 목록'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_sync_change'),
+        ]
+        indexes = [
+            # 커서 이후 변경 조회: WHERE user_id = ? AND seq > ? ORDER BY seq
+            models.Index(fields=['user', 'seq'], name='sync_change_user_seq_idx'),
+            # 오래된 툼스톤 정리
+            models.Index(fields=['deleted', 'changed_at'], name='sync_change_tombstone_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} #{self.seq}{' (삭제)' if self.deleted else ''}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    멱등 키 (idempotency.py)
+    - 거래 생성 요청 하나에 한 행: 사용자가 보낸 키 + 그 요청의 응답
+    - 같은 키로 다시 오면 거래를 만들지 않고 저장된 응답을 돌려줌
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys',
+        verbose_name='사용자'
+    )
+    key = models.CharField(max_length=100, verbose_name='키')
+    fingerprint = models.CharField(max_length=64, verbose_name='요청 해시')
+    # 같은 키로 내용이 다른 요청이 오면 거절
+
+    status_code = models.PositiveSmallIntegerField(verbose_name='응답 상태 코드')
+    content_type = models.CharField(max_length=100, blank=True, verbose_name='응답 형식')
+    location = models.CharField(max_length=500, blank=True, verbose_name='이동 주소')
+    body = models.TextField(blank=True, verbose_name='응답 본문')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(verbose_name='만료 시각')
+
+    class Meta:
+        verbose_name = '멱등 키'
+        verbose_name_plural = '멱등 키 목록'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key'),
+        ]
+        indexes = [
+            # 만료된 키 정리 (purge_idempotency_keys)
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.key} ({self.status_code})"
+
+
+class ReceiptBlob(models.Model):
+    """
+    영수증 파일 본체 (내용 해시마다 한 행, storage.py)
+    - 같은 내용을 올린 첨부파일들이 파일 하나를 공유
+    - ref_count: 이 파일을 쓰는 첨부파일 수, 0이 되면 파일과 함께 삭제
+    """
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name='SHA-256')
+    name = models.CharField(max_length=255, unique=True, verbose_name='저장 경로')
+    # 예: receipts/ab/cd/abcd...ef.jpg (Attachment.file 값과 같음)
+
+    size = models.BigIntegerField(verbose_name='파일 크기(bytes)')
+    ref_count = models.PositiveIntegerField(default=0, verbose_name='참조 수')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = '영수증 파일'
+        verbose_name_plural = '영수증 파일 목록'
+
+    def __str__(self):
+        return f"{self.name} (참조 {self.ref_count})"
+
+
 # 사용 예시:
 # 
 # # 거래 생성
@@ -327,4 +812,4 @@ class Attachment(models.Model):
 # if attachment.is_image():
 #     print("이미지 파일입니다")
 # elif attachment.is_pdf():
-#     print("PDF 파일입니다")
\ No newline at end of file
+#     print("PDF 파일입니다")
@@ -0,0 +1,189 @@
+"""
+키셋(커서) 페이지네이션
+- 역할: 거래 목록을 OFFSET 대신 마지막으로 본 행의 정렬 키 다음부터 읽음
+- 담당: 팀원 B
+
+OFFSET 방식은 N페이지를 보려면 앞의 모든 행을 읽고 버림 + 매번 전체 COUNT(*)
+→ 키셋 방식은 (occurred_at, id) < (마지막 값) 조건으로 인덱스에서 바로 다음 행부터 읽으므로
+  몇 번째 페이지든 비용이 같음
+- 커서: 정렬 키 값 + 방향을 담은 base64 문자열 (클라이언트는 내용을 몰라도 됨)
+- 전체 건수: 필요할 때만 count() 호출 (호출하는 쪽에서 캐시해서 넘김)
+"""
+
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values, direction):
+    """정렬 키 값 목록 → 커서 문자열 (datetime은 마이크로초까지 보존)"""
+    payload = [
+        value.isoformat() if isinstance(value, datetime)
+        else str(value) if isinstance(value, Decimal)
+        else value
+        for value in values
+    ]
+    raw = json.dumps([direction, payload], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """
+    커서 문자열 → (방향, 값 목록)
+    - 값은 JSON 그대로 (필드 형식으로 바꾸는 것은 KeysetPaginator._parse)
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(cursor)
+    return direction, values
+
+
+class KeysetPage:
+    """한 페이지 (Django Page처럼 템플릿에서 순회/has_next 등 사용)"""
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    사용법:
+        paginator = KeysetPaginator(queryset, 20)
+        page = paginator.page(request.GET.get('cursor'))
+
+    - 정렬: 쿼리셋의 order_by (없으면 모델 Meta.ordering) + 마지막에 pk (같은 시각 거래 구분)
+    - 정렬 키는 필드 또는 annotate 값 (예: 검색 관련도 rank)
+    - 잘못된 커서(형식이 틀리거나 값이 정렬 키 필드 형식이 아님)는 첫 페이지로 처리
+    - count: 전체 건수를 구하는 함수 (없으면 queryset.count), paginator.count를 읽을 때만 실행
+    """
+
+    def __init__(self, queryset, per_page, count=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self._count = count or queryset.count
+
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not {'pk', '-pk', 'id', '-id'} & set(ordering):
+            # 마지막 키와 같은 방향으로 pk를 붙여서 정렬을 유일하게 만듦
+            ordering.append('-pk' if ordering and ordering[-1].startswith('-') else 'pk')
+        self.ordering = ordering
+        self.keys = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+    @cached_property
+    def count(self):
+        return self._count()
+
+    def _seek(self, values, backwards):
+        """
+        정렬 순서상 values 다음(backwards면 이전) 행 조건
+        (k1, k2, k3) 다음 = k1 다음 OR (k1 같음 AND k2 다음) OR (k1, k2 같음 AND k3 다음)
+        - 첫 키 범위 조건(k1 <= v1)을 따로 AND 해서 인덱스 범위 검색이 되도록 함
+        """
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.keys, values):
+            after = descending != backwards
+            condition |= Q(**equal, **{f'{name}__{"lt" if after else "gt"}': value})
+            equal[name] = value
+        first_name, first_descending = self.keys[0]
+        bound = 'lte' if first_descending != backwards else 'gte'
+        return Q(**{f'{first_name}__{bound}': values[0]}) & condition
+
+    def _parse(self, values):
+        """
+        커서 값 → 정렬 키 필드 형식 (필드/annotate의 to_python)
+        - 변환할 수 없거나 None이면 InvalidCursor (필터에 넣으면 DB 오류 → 500)
+        """
+        parsed = []
+        for (name, _), value in zip(self.keys, values):
+            annotation = self.queryset.query.annotations.get(name)
+            if annotation is not None:
+                field = annotation.output_field
+            else:
+                field = self.queryset.model._meta.pk if name == 'pk' else self.queryset.model._meta.get_field(name)
+            try:
+                value = field.to_python(value)
+            except (ValidationError, ValueError, TypeError):
+                raise InvalidCursor(values)
+            if value is None:
+                raise InvalidCursor(values)
+            parsed.append(value)
+        return parsed
+
+    def _values(self, obj):
+        return [getattr(obj, name) for name, _ in self.keys]
+
+    def page(self, cursor=None):
+        direction, values = NEXT, None
+        if cursor:
+            try:
+                direction, values = decode_cursor(cursor, len(self.keys))
+                values = self._parse(values)
+            except InvalidCursor:
+                direction, values = NEXT, None
+
+        backwards = direction == PREVIOUS
+        queryset = self.queryset
+        if backwards:
+            queryset = queryset.order_by(*[
+                name.lstrip('-') if name.startswith('-') else f'-{name}' for name in self.ordering
+            ])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+
+        # 한 건 더 읽어서 다음(이전) 페이지가 있는지 확인
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows, self)
+        if backwards:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=encode_cursor(self._values(rows[-1]), NEXT) if has_next else None,
+            previous_cursor=encode_cursor(self._values(rows[0]), PREVIOUS) if has_previous else None,
+        )
@@ -0,0 +1,53 @@
+"""
+기간 → 거래일시(occurred_at) 범위 변환
+- 역할: 날짜/월 조건을 반열린 구간 [start, end) 의 aware datetime으로 변환
+- 담당: 팀원 B
+
+occurred_at__year / __month / __date 조회는 컬럼에 함수를 씌우므로 인덱스를 못 탐
+→ occurred_at__gte=start, occurred_at__lt=end 로 바꿔서 (user, occurred_at) 인덱스 범위 검색
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+def parse_day(value):
+    """'2026-01-15' → date, 비어 있거나 잘못된 값(예: 2026-02-30)은 None"""
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
+def local_midnight(day):
+    """day 날짜 0시 (현재 시간대 = Asia/Seoul)"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def day_range(start, end):
+    """
+    start ~ end 날짜(양 끝 포함) → [start 0시, end 다음날 0시)
+    - 둘 중 하나가 None이면 그쪽은 None (열린 구간)
+    """
+    return (
+        local_midnight(start) if start else None,
+        local_midnight(end + timedelta(days=1)) if end else None,
+    )
+
+
+def month_range(year, month):
+    """year년 month월 → [그 달 1일 0시, 다음 달 1일 0시)"""
+    first = date(year, month, 1)
+    next_first = date(year + month // 12, month % 12 + 1, 1)
+    return local_midnight(first), local_midnight(next_first)
+
+
+def filter_occurred_between(queryset, start, end):
+    """반열린 구간 [start, end) 로 거래 필터 (None인 쪽은 제한 없음)"""
+    if start is not None:
+        queryset = queryset.filter(occurred_at__gte=start)
+    if end is not None:
+        queryset = queryset.filter(occurred_at__lt=end)
+    return queryset
@@ -0,0 +1,186 @@
+"""
+계좌 잔액 대사(reconciliation)
+- 역할: 저장된 Account.balance와 거래 내역으로 다시 계산한 잔액을 비교/복구
+- 담당: 팀원 B
+
+기대 잔액 = Account.opening_balance + 거래 합계(수입 - 지출)
+
+처리 흐름 (reconcile_balances 명령어가 계좌 id 구간마다 프로세스 풀에서 실행):
+1. 구간 안의 계좌별 거래 합계를 GROUP BY 한 번으로 계산하고
+   결과를 서버 사이드 커서(iterator)로 조금씩 읽음 → 거래 수와 무관하게 메모리 일정
+2. 같은 구간의 계좌를 id 순으로 읽어 합계와 병합, 차이(drift)가 있는 계좌만 후보로 추림
+3. 후보 계좌는 행을 잠근 뒤 다시 계산해서 확인
+   (1~2 사이에 들어온 거래 때문에 생기는 오탐 방지) → 보고 또는 복구
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import Count, Sum
+
+from .balance import signed_amount_expression
+from .cache import bump_data_version
+from .sync import ACCOUNT, record_changes
+
+
+@dataclass
+class Drift:
+    account_id: int
+    stored: Decimal
+    expected: Decimal
+
+    @property
+    def difference(self):
+        return self.stored - self.expected
+
+
+@dataclass
+class RangeResult:
+    """계좌 id 구간 하나의 대사 결과 (프로세스 간 전달용)"""
+    accounts: int = 0
+    transactions: int = 0
+    initialized: int = 0  # opening_balance가 비어 있어 현재 잔액 기준으로 채운 계좌 수
+    drifts: list = field(default_factory=list)
+
+
+def account_id_ranges(range_size):
+    """
+    계좌 id를 range_size개씩 [lo, hi] 구간으로 나눔
+    - id에 빈 번호가 있어도 구간마다 계좌 수가 고르게 나뉨
+    """
+    from accounts.models import Account  # 순환 import 방지
+
+    ranges = []
+    ids = Account.objects.order_by('pk').values_list('pk', flat=True)
+    lo = previous = None
+    count = 0
+    for pk in ids.iterator(chunk_size=range_size):
+        if lo is None:
+            lo = pk
+        previous = pk
+        count += 1
+        if count == range_size:
+            ranges.append((lo, previous))
+            lo, count = None, 0
+    if lo is not None:
+        ranges.append((lo, previous))
+    return ranges
+
+
+def transaction_totals(account_filter, chunk_size=2000):
+    """
+    계좌별 (account_id, 거래 합계, 거래 수) 를 account_id 순으로 반환하는 제너레이터
+    - 집계는 DB에서, 결과는 chunk_size행씩 서버 사이드 커서로 읽음 (PostgreSQL)
+    """
+    from .models import Transaction
+
+    rows = Transaction.objects.filter(**account_filter).values('account_id').annotate(
+        total=Sum(signed_amount_expression()),
+        count=Count('id'),
+    ).order_by('account_id').values_list('account_id', 'total', 'count')
+    return rows.iterator(chunk_size=chunk_size)
+
+
+def account_total(account_id):
+    """계좌 한 건의 거래 합계 (거래가 없으면 0)"""
+    from .models import Transaction
+
+    total = Transaction.objects.filter(account_id=account_id).aggregate(
+        total=Sum(signed_amount_expression())
+    )['total']
+    return total or Decimal(0)
+
+
+def verify_account(account_id, repair=False):
+    """
+    계좌 한 건을 잠근 상태에서 다시 계산해서 확인
+    - 차이가 있으면 Drift 반환 (repair=True면 기대 잔액으로 복구), 없으면 None
+    - 거래 저장(Transaction.save)도 같은 계좌 행을 잠그므로 계산 도중 잔액이 바뀌지 않음
+    """
+    from accounts.models import Account
+
+    with db_transaction.atomic():
+        account = Account.objects.select_for_update().filter(pk=account_id).values(
+            'user_id', 'balance', 'opening_balance'
+        ).first()
+        if account is None or account['opening_balance'] is None:
+            return None  # 그 사이 삭제된 계좌 / 아직 기준 잔액이 없는 계좌
+
+        total = account_total(account_id)
+        expected = account['opening_balance'] + total
+        if account['balance'] == expected:
+            return None
+
+        if repair:
+            Account.objects.filter(pk=account_id).update(balance=expected)
+            bump_data_version(account['user_id'])  # queryset.update()는 시그널이 없음
+            record_changes(account['user_id'], [(ACCOUNT, account_id, False)])
+        return Drift(account_id, account['balance'], expected)
+
+
+def reconcile_range(lo, hi, chunk_size=2000, repair=False):
+    """
+    계좌 id 구간 [lo, hi] 대사 (프로세스 풀의 작업 단위)
+    """
+    from accounts.models import Account
+
+    result = RangeResult()
+    account_filter = {'account_id__gte': lo, 'account_id__lte': hi}
+    totals = transaction_totals(account_filter, chunk_size)
+    pending = next(totals, None)
+
+    candidates = []
+    to_initialize = []
+    accounts = Account.objects.filter(pk__gte=lo, pk__lte=hi).order_by('pk').values_list(
+        'pk', 'balance', 'opening_balance'
+    )
+    for account_id, balance, opening_balance in accounts.iterator(chunk_size=chunk_size):
+        # 거래 합계도 account_id 순이므로 두 스트림을 병합
+        while pending is not None and pending[0] < account_id:
+            pending = next(totals, None)  # 계좌 없이 남은 거래 (정상이라면 없음)
+        total, count = Decimal(0), 0
+        if pending is not None and pending[0] == account_id:
+            _, total, count = pending
+            pending = next(totals, None)
+
+        result.accounts += 1
+        result.transactions += count
+        if opening_balance is None:
+            to_initialize.append(account_id)
+        elif opening_balance + total != balance:
+            candidates.append(account_id)
+
+    totals.close()
+
+    for account_id in candidates:
+        drift = verify_account(account_id, repair=repair)
+        if drift:
+            result.drifts.append(drift)
+
+    if repair:
+        result.initialized = initialize_opening_balances(to_initialize)
+    else:
+        result.initialized = len(to_initialize)
+    return result
+
+
+def initialize_opening_balances(account_ids):
+    """
+    opening_balance가 없는 계좌(기능 도입 이전 계좌)는 현재 잔액이 맞다고 보고
+    opening_balance = 현재 잔액 - 거래 합계 로 채움
+    """
+    from accounts.models import Account
+
+    initialized = 0
+    for account_id in account_ids:
+        with db_transaction.atomic():
+            balance = Account.objects.select_for_update().filter(
+                pk=account_id, opening_balance__isnull=True
+            ).values_list('balance', flat=True).first()
+            if balance is None:
+                continue
+            total = account_total(account_id)
+            Account.objects.filter(pk=account_id).update(opening_balance=balance - total)
+            initialized += 1
+    return initialized
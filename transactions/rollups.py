@@ -0,0 +1,130 @@
+"""
+월별 거래 집계 (MonthlyRollup) 관리
+- 역할: 거래 변경 시 월별 집계 증분 갱신, 카테고리 삭제 시 집계 이동, 전체 재계산
+- 담당: 팀원 B
+
+대시보드의 월 수입/지출/거래 수/카테고리 통계를
+거래를 전부 훑지 않고 집계 행 몇 개만 읽도록 하기 위한 모듈
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError
+from django.db import transaction as db_transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def month_of(occurred_at):
+    """거래일시가 속한 달의 1일 (Asia/Seoul 기준)"""
+    return timezone.localdate(occurred_at).replace(day=1)
+
+
+def collect_rollup_deltas(changes):
+    """
+    거래 변경분을 집계 키별 (금액, 거래 수) 증감으로 합산
+
+    changes: [(부호, 거래 값 dict), ...]  (Transaction._apply_changes 참고)
+    → {(user_id, account_id, month, category_id, tx_type): [Decimal, int]}
+    - 같은 달/카테고리 안에서 금액만 바뀐 수정은 키 하나의 금액 증감으로 합쳐짐
+    """
+    deltas = defaultdict(lambda: [Decimal(0), 0])
+    for sign, values in changes:
+        key = (
+            values['user_id'],
+            values['account_id'],
+            month_of(values['occurred_at']),
+            values['category_id'],
+            values['tx_type'],
+        )
+        deltas[key][0] += sign * Decimal(str(values['amount']))
+        deltas[key][1] += sign
+    return deltas
+
+
+def _sort_key(item):
+    user_id, account_id, month, category_id, tx_type = item[0]
+    return (user_id, account_id, month, category_id is not None, category_id or 0, tx_type)
+
+
+def apply_rollup_deltas(deltas):
+    """
+    집계 키별 증감을 반영
+
+    처리 로직:
+    1. UPDATE ... SET total = total + 금액, count = count + 거래 수 (F 식)
+    2. 갱신된 행이 없으면 새 집계 행 생성
+       - 동시에 같은 행을 만들다 유니크 제약에 걸리면 다시 UPDATE
+    - 항상 같은 순서로 갱신해서 교착 상태(deadlock) 방지
+    """
+    from .models import MonthlyRollup  # 순환 import 방지
+
+    for key, (amount, count) in sorted(deltas.items(), key=_sort_key):
+        if not amount and not count:
+            continue
+
+        user_id, account_id, month, category_id, tx_type = key
+        lookup = {
+            'user_id': user_id,
+            'account_id': account_id,
+            'month': month,
+            'category_id': category_id,
+            'tx_type': tx_type,
+        }
+        rows = MonthlyRollup.objects.filter(**lookup)
+        if rows.update(total=F('total') + amount, count=F('count') + count):
+            continue
+        try:
+            with db_transaction.atomic():
+                MonthlyRollup.objects.create(total=amount, count=count, **lookup)
+        except IntegrityError:
+            rows.update(total=F('total') + amount, count=F('count') + count)
+
+
+def merge_into_uncategorized(category_id):
+    """
+    카테고리 삭제 시 해당 카테고리 집계를 미분류(category NULL) 집계로 옮김
+    - 거래는 category가 NULL로 바뀌므로 (on_delete=SET_NULL) 집계도 같은 모양으로 맞춤
+    """
+    from .models import MonthlyRollup
+
+    with db_transaction.atomic(savepoint=False):
+        rows = MonthlyRollup.objects.filter(category_id=category_id)
+        deltas = {
+            (row.user_id, row.account_id, row.month, None, row.tx_type): [row.total, row.count]
+            for row in rows
+        }
+        rows.delete()
+        apply_rollup_deltas(deltas)
+
+
+def rebuild_rollups(user_id=None):
+    """
+    거래 내역에서 월별 집계를 다시 계산 (집계 쿼리 1번 + bulk_create)
+    - user_id 없음: 전체 사용자
+    - 반환값: 생성한 집계 행 수
+    """
+    from .models import MonthlyRollup, Transaction
+
+    with db_transaction.atomic(savepoint=False):
+        transactions = Transaction.objects.all()
+        rollups = MonthlyRollup.objects.all()
+        if user_id is not None:
+            transactions = transactions.filter(user_id=user_id)
+            rollups = rollups.filter(user_id=user_id)
+        rollups.delete()
+
+        rows = transactions.annotate(
+            month=TruncMonth('occurred_at', output_field=DateField())
+        ).values(
+            'user_id', 'account_id', 'month', 'category_id', 'tx_type'
+        ).annotate(
+            total=Sum('amount'),
+            count=Count('id'),
+        ).order_by()
+
+        objs = [MonthlyRollup(**row) for row in rows]
+        MonthlyRollup.objects.bulk_create(objs, batch_size=1000)
+        return len(objs)
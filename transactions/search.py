@@ -0,0 +1,143 @@
+"""
+거래 키워드 검색 (가맹점/메모)
+- 역할: 거래 목록의 ?q= 검색을 인덱스로 처리하고 관련도 순으로 정렬
+- 담당: 팀원 B
+
+PostgreSQL
+- Transaction.search_vector: 가맹점(가중치 A) + 메모(가중치 B)의 tsvector
+  트리거가 INSERT/UPDATE 때 채우므로 bulk_create(CSV 가져오기)도 그대로 반영됨
+- 'simple' 설정 + 접두어 검색(스타벅:*) → 한국어 형태소 분석 없이도 "스타벅" → "스타벅스 강남점"
+- 검색 조건은 항상 인덱스로 처리 (순차 검색 없음)
+  - 트라이그램 인덱스가 있으면: tsvector 일치 OR 부분 문자열(icontains) 일치
+    → 두 GIN 인덱스의 BitmapOr, 단어 중간 부분 검색("벅스")도 됨
+  - 없으면(pg_trgm을 쓸 수 없는 DB): tsvector 일치만 → 단어 앞부분 검색만 됨
+    (icontains를 OR로 붙이면 그 조건 때문에 표 전체를 훑게 됨)
+- pg_trgm이 있으면 UPPER(merchant/memo) 트라이그램 GIN 인덱스를 만듦
+- 트리거/인덱스는 migrate 뒤 install_search()가 만듦 (post_migrate, 여러 번 실행해도 안전)
+
+SQLite 등 (로컬 개발)
+- 기존처럼 icontains 부분 검색, 정렬은 최신순
+"""
+
+import logging
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db import transaction as db_transaction
+from django.db.models import F, Q
+
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'simple'
+# tsquery 문법에 쓰이는 문자 (검색어에서 제거)
+TSQUERY_SPECIAL = re.compile(r"[&|!():*<>'\\]")
+
+
+INSTALL_SQL = """
+CREATE OR REPLACE FUNCTION transactions_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('{config}', coalesce(NEW.merchant, '')), 'A') ||
+        setweight(to_tsvector('{config}', coalesce(NEW.memo, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS transactions_search_vector_trigger ON transactions_transaction;
+CREATE TRIGGER transactions_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF merchant, memo ON transactions_transaction
+    FOR EACH ROW EXECUTE FUNCTION transactions_search_vector_update();
+
+CREATE INDEX IF NOT EXISTS tx_search_vector_idx
+    ON transactions_transaction USING gin (search_vector);
+""".format(config=SEARCH_CONFIG)
+
+# 트리거를 만들기 전에 저장된 거래 채우기 (이미 채워진 행은 건너뜀)
+BACKFILL_SQL = """
+UPDATE transactions_transaction SET merchant = merchant WHERE search_vector IS NULL
+"""
+
+TRIGRAM_SQL = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS tx_merchant_trgm_idx
+    ON transactions_transaction USING gin ((UPPER(merchant::text)) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS tx_memo_trgm_idx
+    ON transactions_transaction USING gin ((UPPER(memo::text)) gin_trgm_ops);
+"""
+
+TRIGRAM_INDEXES = ('tx_merchant_trgm_idx', 'tx_memo_trgm_idx')
+
+# DB 별칭 → 트라이그램 인덱스가 모두 있는지 (프로세스마다 처음 검색할 때 한 번 확인)
+_has_trigram = {}
+
+
+def install_search(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    검색용 트리거/인덱스 설치 (PostgreSQL만, post_migrate에서 호출)
+    - 트라이그램 인덱스의 식은 Django icontains가 만드는 UPPER("merchant"::text) LIKE ... 와 같아야 함
+    - pg_trgm 확장을 만들 권한이 없거나 설치되어 있지 않으면 경고만 남김
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(INSTALL_SQL)
+        cursor.execute(BACKFILL_SQL)
+
+    try:
+        with db_transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(TRIGRAM_SQL)
+    except DatabaseError as exc:
+        logger.warning('pg_trgm을 사용할 수 없어 단어 중간 부분 검색을 하지 않습니다: %s', exc)
+    _has_trigram.pop(using, None)
+
+
+def has_trigram_indexes(using=DEFAULT_DB_ALIAS):
+    """가맹점/메모 트라이그램 인덱스가 모두 있으면 True (PostgreSQL만)"""
+    if using not in _has_trigram:
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                'SELECT count(*) FROM pg_indexes WHERE indexname = ANY(%s)', [list(TRIGRAM_INDEXES)]
+            )
+            _has_trigram[using] = cursor.fetchone()[0] == len(TRIGRAM_INDEXES)
+    return _has_trigram[using]
+
+
+def build_tsquery(q):
+    """
+    검색어 → 접두어 tsquery 문자열
+    - 예: '스타벅 강남' → "스타벅:* & 강남:*"
+    - 단어가 없으면 None
+    """
+    terms = TSQUERY_SPECIAL.sub(' ', q).split()
+    if not terms:
+        return None
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def search_transactions(queryset, q):
+    """
+    가맹점/메모 키워드 검색
+
+    PostgreSQL: tsvector 접두어 일치 (트라이그램 인덱스가 있으면 OR 부분 문자열 일치)
+                → 관련도(rank), 최신순 정렬
+    그 외: 부분 문자열 일치 (기존 icontains 검색)
+    """
+    contains = Q(memo__icontains=q) | Q(merchant__icontains=q)
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.filter(contains)
+    tsquery = build_tsquery(q)
+    if tsquery is None:
+        # 검색할 단어가 없음 (tsquery 문법 문자만): 트라이그램 인덱스가 없으면 표 전체를 훑으므로 결과 없음
+        return queryset.filter(contains) if has_trigram_indexes(queryset.db) else queryset.none()
+
+    query = SearchQuery(tsquery, config=SEARCH_CONFIG, search_type='raw')
+    condition = Q(search_vector=query)
+    if has_trigram_indexes(queryset.db):
+        condition |= contains
+    return queryset.filter(condition).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    ).order_by('-rank', '-occurred_at', '-id')
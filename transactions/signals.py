@@ -0,0 +1,177 @@
+"""
+거래 앱 시그널
+- 역할: 모델 save()/delete()를 거치지 않는 변경(관리자 일괄 삭제, CASCADE/SET_NULL 등)에도
+  파생 데이터를 맞춤
+- 담당: 팀원 B
+- 연결: TransactionsConfig.ready()
+"""
+
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from accounts.models import Account
+
+from .autocomplete import invalidate_merchants
+from .cache import bump_data_version
+from .models import Attachment, Category, Transaction
+from .rollups import merge_into_uncategorized
+from .storage import release
+from .sync import ACCOUNT, CATEGORY, SHARED, TRANSACTION, record_changes
+
+
+@receiver(pre_delete, sender=Category)
+def move_rollups_to_uncategorized(sender, instance, **kwargs):
+    """
+    카테고리 삭제 직전: 월별 집계를 미분류로 옮김
+    - 거래의 category는 DB에서 SET_NULL 처리되므로 Transaction.save()가 호출되지 않음
+    """
+    merge_into_uncategorized(instance.pk)
+
+
+@receiver(pre_delete, sender=Category)
+def bump_versions_of_uncategorized(sender, instance, origin=None, **kwargs):
+    """
+    카테고리 삭제 직전: 미분류가 될 거래의 버전을 올림 (SET_NULL은 save()를 거치지 않음)
+    - 그 사이 열어 둔 수정 화면/API 수정이 옛 버전으로 저장되지 않도록 (versioning.py)
+    """
+    if _is_user_cascade(origin):
+        return
+    Transaction.objects.filter(category=instance).update(version=F('version') + 1)
+
+
+# ============================================
+# 사용자별 캐시 버전 갱신 (cache.py)
+# ============================================
+
+def _is_cascade(instance, origin):
+    """
+    다른 모델을 지우면서 딸려 지워지는 경우인지 (예: 계좌 삭제 → 거래 삭제)
+    - 처음 삭제된 모델의 시그널에서 버전을 올리므로 행마다 또 올리지 않음
+    """
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not type(instance)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_save, sender=Account)
+@receiver(post_save, sender=Category)
+def bump_version_on_save(sender, instance, **kwargs):
+    # 공통 카테고리(user=None)는 모든 사용자의 캐시에 영향 → 공통 버전을 올림
+    bump_data_version(instance.user_id)
+
+
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Account)
+@receiver(post_delete, sender=Category)
+def bump_version_on_delete(sender, instance, origin=None, **kwargs):
+    if not _is_cascade(instance, origin):
+        bump_data_version(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_version_on_user_change(sender, instance, created=False, **kwargs):
+    """
+    사용자 생성/삭제 시 버전을 새로 시작
+    - 삭제된 사용자의 id가 다시 쓰이는 DB(SQLite 등)에서 이전 사용자의 캐시를 읽지 않도록
+    """
+    if created or kwargs['signal'] is post_delete:
+        bump_data_version(instance.pk)
+
+
+# ============================================
+# 가맹점 자동완성 색인 (autocomplete.py)
+# ============================================
+
+@receiver(post_save, sender=Transaction)
+def update_merchant_index_on_save(sender, instance, created=False, update_fields=None, **kwargs):
+    """
+    거래 추가/수정: 다음 조회 때 다시 만듦 (커밋된 뒤에도 한 번 더, 롤백된 거래는 DB에 없으므로 반영되지 않음)
+    - 가맹점 없는 거래 추가, 가맹점을 건드리지 않는 수정은 그대로 둠
+    """
+    if created and not instance.merchant:
+        return
+    if created or update_fields is None or 'merchant' in update_fields:
+        invalidate_merchants(instance.user_id)
+
+
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Account)
+def update_merchant_index_on_delete(sender, instance, origin=None, **kwargs):
+    # 계좌 삭제로 딸려 지워지는 거래는 계좌 시그널에서 한 번만 처리
+    if not _is_cascade(instance, origin):
+        invalidate_merchants(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def reset_merchant_index_on_user_create(sender, instance, created=False, **kwargs):
+    # 삭제된 사용자의 id가 다시 쓰이는 DB(SQLite 등)에서 이전 사용자의 색인을 쓰지 않도록
+    if created:
+        invalidate_merchants(instance.pk)
+
+
+# ============================================
+# 동기화 변경 기록 (sync.py)
+# - 거래 저장/삭제는 Transaction.save()/delete()에서 잔액과 함께 기록
+# ============================================
+
+def _is_user_cascade(origin):
+    """사용자 삭제로 딸려 지워지는 경우 (변경 기록도 함께 지워지므로 남기지 않음)"""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is User
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_save, sender=Category)
+def record_sync_change_on_save(sender, instance, **kwargs):
+    # 공통 카테고리(user=None)는 공통 범위에 기록
+    record_changes(instance.user_id, [(ACCOUNT if sender is Account else CATEGORY, instance.pk, False)])
+
+
+@receiver(pre_delete, sender=Account)
+@receiver(pre_delete, sender=Category)
+def collect_affected_transactions(sender, instance, origin=None, **kwargs):
+    """
+    삭제 직전: 함께 바뀌는 거래 id를 읽어 둠 (삭제 후에는 찾을 수 없음)
+    - 계좌 삭제 → 딸려 지워지는 거래, 카테고리 삭제 → 미분류가 되는 거래 (공통 카테고리면 여러 사용자)
+    """
+    if _is_user_cascade(origin):
+        return
+    field = 'account' if sender is Account else 'category'
+    instance._sync_transactions = list(
+        Transaction.objects.filter(**{field: instance}).values_list('user_id', 'pk')
+    )
+
+
+@receiver(post_delete, sender=Account)
+@receiver(post_delete, sender=Category)
+def record_sync_change_on_delete(sender, instance, origin=None, **kwargs):
+    """툼스톤 기록: 계좌/카테고리 + 딸려 지워진 거래(툼스톤) 또는 미분류가 된 거래(변경)"""
+    if _is_user_cascade(origin):
+        return
+    changes = defaultdict(list)
+    for user_id, pk in getattr(instance, '_sync_transactions', ()):
+        changes[user_id].append((TRANSACTION, pk, sender is Account))
+    changes[instance.user_id].append((ACCOUNT if sender is Account else CATEGORY, instance.pk, True))
+    # 여러 범위의 카운터를 잠글 때는 항상 범위 순서대로
+    for user_id in sorted(changes, key=lambda user_id: SHARED if user_id is None else user_id):
+        record_changes(user_id, changes[user_id])
+
+
+# ============================================
+# 영수증 파일 참조 수 (storage.py)
+# ============================================
+
+@receiver(post_delete, sender=Attachment)
+def release_receipt_file(sender, instance, **kwargs):
+    """
+    첨부파일 삭제 후: 파일 참조 -1 (마지막이면 커밋 후 파일 + 썸네일 삭제)
+    - 거래/계좌/사용자 삭제로 딸려 지워지는 경우도 포함 (Attachment.delete()를 거치지 않음)
+    """
+    release(instance.file.name, instance.thumbnails)
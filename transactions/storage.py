@@ -0,0 +1,207 @@
+"""
+영수증 내용 주소 저장소
+- 역할: 같은 영수증을 여러 번 올려도 파일은 한 번만 저장하고, 마지막 첨부파일이 지워질 때만 파일을 지움
+- 담당: 팀원 B
+
+저장 (ContentAddressedStorage)
+- 업로드를 임시 파일로 옮겨 쓰면서 SHA-256을 함께 계산 (파일을 두 번 읽지 않음)
+  스트리밍 업로드(uploads.py)는 받으면서 계산한 해시와 임시 파일을 그대로 사용 (다시 쓰지 않음)
+- 경로: receipts/ab/cd/abcd...ef.jpg (해시 앞 2+2자리 디렉터리 → 디렉터리 하나에 최대 수백 개 수준으로 분산)
+- 내용(해시)마다 ReceiptBlob 한 행: ref_count = 이 파일을 쓰는 첨부파일 수
+
+참조 수 (acquire / release)
+- 첨부파일 저장: 해시 행을 잠그고 ref_count + 1, 새 내용이면 임시 파일을 제자리로 이동 (이미 있으면 버림)
+- 첨부파일 삭제(CASCADE 포함, signals.py): ref_count - 1
+  → 0이 되면 커밋 후 행을 다시 잠그고 여전히 0일 때만 파일(+썸네일)과 행 삭제
+  → 그 사이 같은 내용이 다시 올라오면(ref_count 0 → 1) 파일을 다시 두므로 지워진 파일을 가리키는 일이 없음
+- 썸네일(thumbnails.py)도 파일 옆에 한 벌만 두고 같은 파일을 쓰는 첨부파일끼리 공유
+
+파일 삭제
+- 요청 안에서 지우지 않음: 커밋 후 삭제 작업 스레드(1개)에 넘기고 바로 응답 (RECEIPT_DELETE_ASYNC)
+- 프로세스가 그 전에 종료되는 등으로 남은 파일은 python manage.py gc_receipts 로 정리 (reclaim)
+
+기존 receipts/%Y/%m/%d/ 파일: python manage.py dedupe_receipts
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import connection
+from django.db import transaction as db_transaction
+from django.db.models import F
+
+
+logger = logging.getLogger(__name__)
+
+
+PREFIX = 'receipts'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def blob_name(sha256, ext):
+    """해시 → 저장 경로 (receipts/ab/cd/<해시><확장자>)"""
+    return f'{PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext.lower()}'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    내용(SHA-256)으로 경로를 정하는 저장소 (MEDIA_ROOT 아래)
+    - 넘겨받은 이름에서는 확장자만 사용
+    - 같은 내용이면 같은 경로를 돌려줌 (새로 쓰지 않음)
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name  # 같은 경로 = 같은 내용이므로 이름 뒤에 무작위 문자를 붙이지 않음
+
+    def _save(self, name, content):
+        ext = os.path.splitext(name)[1]
+        sha256 = getattr(content, 'sha256', None)
+        if sha256 and hasattr(content, 'temporary_file_path'):
+            # 받으면서 해시를 계산한 임시 파일 (MEDIA_ROOT/receipts/tmp) → 이름만 바꿔 둠
+            return acquire(sha256, ext, content.size, lambda final: self._place(content.temporary_file_path(), final))
+        tmp_dir = self.path(f'{PREFIX}/tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=ext)  # 같은 파일 시스템 → 이동이 원자적
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+            return acquire(digest.hexdigest(), ext, size, lambda final: self._place(tmp_path, final))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _place(self, tmp_path, name):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(tmp_path, self.file_permissions_mode)
+        os.replace(tmp_path, path)
+
+
+receipt_storage = ContentAddressedStorage()
+
+
+def acquire(sha256, ext, size, place):
+    """
+    내용 하나에 대한 참조 +1 → 저장 경로
+    - place(경로): 파일이 아직 없을 때(새 내용, 또는 지워지기 직전 다시 올라온 내용) 파일을 두는 함수
+    - 호출한 쪽의 DB 트랜잭션 안에서: 첨부파일 INSERT가 롤백되면 참조 수도 함께 롤백
+    """
+    from .models import ReceiptBlob
+
+    with db_transaction.atomic(savepoint=False):
+        # 행 잠금 먼저: 같은 내용의 삭제(collect)와 순서를 맞춤
+        # 행이 없으면 만들고 다시 잠금 (그 사이 collect가 참조 0인 행을 지웠으면 다시 만듦)
+        while True:
+            blob = ReceiptBlob.objects.select_for_update().filter(sha256=sha256).first()
+            if blob is not None:
+                break
+            ReceiptBlob.objects.bulk_create(
+                [ReceiptBlob(sha256=sha256, name=blob_name(sha256, ext), size=size)], ignore_conflicts=True
+            )
+        ReceiptBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+        if blob.ref_count == 0 or not receipt_storage.exists(blob.name):
+            place(blob.name)
+    return blob.name
+
+
+def release(name, thumbnails=None):
+    """
+    첨부파일 하나가 파일 참조를 놓음 (삭제/파일 교체 후)
+    - 마지막 참조였으면 커밋 후 파일과 썸네일 삭제 (collect)
+    - 해시 행이 없는 기존 경로 파일: 다른 첨부파일이 쓰지 않으면 커밋 후 바로 삭제
+    """
+    from .models import Attachment, ReceiptBlob
+
+    if not name:
+        return
+    released = ReceiptBlob.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+    if released:
+        _defer(collect, name)
+    elif not ReceiptBlob.objects.filter(name=name).exists() and not Attachment.objects.filter(file=name).exists():
+        _defer(_delete_files, name, thumbnails)
+
+
+def _deleter():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='receipt-deleter')
+        return _executor
+
+
+def _run_in_worker(func, *args):
+    """삭제 작업 스레드에서 실행 (예외는 로그로 남기고, 스레드 전용 DB 연결 정리)"""
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('영수증 파일 삭제 중 오류 (%s)', args[0])
+    finally:
+        connection.close()
+
+
+def _defer(func, *args):
+    """
+    커밋 후 파일 삭제 예약 (롤백되면 하지 않음)
+    - RECEIPT_DELETE_ASYNC=True: 삭제 작업 스레드에서, False: 커밋 직후 바로 (테스트용)
+    """
+    if getattr(settings, 'RECEIPT_DELETE_ASYNC', True):
+        db_transaction.on_commit(lambda: _deleter().submit(_run_in_worker, func, *args))
+    else:
+        db_transaction.on_commit(lambda: func(*args))
+
+
+def collect(name):
+    """참조가 0인 파일 삭제 (행을 잠근 채로 다시 확인 → 그 사이 다시 참조되었으면 그대로 둠)"""
+    from .models import ReceiptBlob
+
+    with db_transaction.atomic():
+        blob = ReceiptBlob.objects.select_for_update().filter(name=name, ref_count=0).first()
+        if blob is None:
+            return False
+        _delete_files(name)
+        blob.delete()
+    return True
+
+
+def reclaim(owner, names):
+    """
+    어떤 첨부파일도 쓰지 않는 파일 묶음 삭제 (gc_receipts) → 삭제했으면 True
+    - owner: 원본 경로, names: 원본과 그 썸네일 중 실제로 있는 파일
+    - 해시 행이 있으면 잠근 채로 참조가 0인지 다시 확인 (그 사이 같은 내용이 올라왔으면 그대로 둠)
+    """
+    from .models import Attachment, ReceiptBlob
+
+    with db_transaction.atomic():
+        blob = ReceiptBlob.objects.select_for_update().filter(name=owner).first()
+        if blob is not None and blob.ref_count:
+            return False
+        if Attachment.objects.filter(file=owner).exists():
+            return False
+        for name in names:
+            default_storage.delete(name)
+        if blob is not None:
+            blob.delete()
+    return True
+
+
+def _delete_files(name, thumbnails=None):
+    from .thumbnails import delete_thumbnail_files, thumbnail_names
+
+    delete_thumbnail_files(default_storage, thumbnails or {})
+    for thumbnail in thumbnail_names(name):
+        default_storage.delete(thumbnail)
+    receipt_storage.delete(name)
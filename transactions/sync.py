@@ -0,0 +1,242 @@
+"""
+증분 동기화
+- 역할: 오프라인 앱이 마지막 동기화 이후 바뀐 거래/계좌/카테고리만 받아 가도록 변경을 기록하고 조회
+- 담당: 팀원 B
+
+변경 기록 (SyncChange)
+- 객체마다 한 행: (종류, id) → 마지막 변경 번호(seq), 삭제 여부
+  → 같은 거래를 여러 번 고쳐도 행이 늘지 않음, 삭제된 객체는 deleted=True 행(툼스톤)으로 남음
+- 변경 번호는 범위(사용자 id, 공통 카테고리는 0)마다 SyncCounter 행에서 받음
+  UPDATE ... SET seq = seq + n → 카운터 행이 커밋까지 잠기므로 같은 범위의 변경은 번호 순서대로 커밋됨
+  → 클라이언트가 받은 번호보다 작은 번호가 나중에 커밋되어 건너뛰는 일이 없음
+- 카운터는 DB 트랜잭션 안에서 마지막에 잠금
+  (거래 → 계좌 잔액 → 체크포인트/월별 집계 → 카운터 순서, 교착 상태 방지)
+
+기록하는 곳
+- Transaction.save()/delete(): 거래 + 잔액이 바뀐 계좌 (Transaction._apply_changes)
+- 일괄 변경(api.apply_batch), CSV 가져오기, 미분류 일괄 분류, 잔액 대사 복구: 직접 기록
+- 계좌/카테고리 저장/삭제, 그 때문에 함께 지워지거나 미분류가 된 거래: signals.py
+
+조회 (changes_since)
+- 커서 "사용자 번호.공통 번호" 이후의 변경만 (user, seq) 인덱스로 읽음 → 전체 데이터 크기와 무관
+- 커서 없이(처음) 조회하면 살아 있는 객체 전체 (툼스톤 제외)
+- 툼스톤은 SYNC_TOMBSTONE_DAYS일 뒤 prune_sync_tombstones로 정리
+  → 정리한 번호보다 오래된 커서는 reset (클라이언트가 전체를 다시 받음)
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db import transaction as db_transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+
+TRANSACTION = 'transaction'
+ACCOUNT = 'account'
+CATEGORY = 'category'
+
+SHARED = 0  # 공통 카테고리(user=None)의 카운터 범위
+
+PAGE_SIZE = getattr(settings, 'TRANSACTION_SYNC_PAGE_SIZE', 500)
+TOMBSTONE_DAYS = getattr(settings, 'SYNC_TOMBSTONE_DAYS', 90)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def parse_cursor(value):
+    """'12.3' → (12, 3), 없으면 (0, 0)"""
+    if not value:
+        return 0, 0
+    try:
+        user_seq, shared_seq = (int(part) for part in value.split('.'))
+    except ValueError:
+        raise InvalidCursor(value)
+    if user_seq < 0 or shared_seq < 0:
+        raise InvalidCursor(value)
+    return user_seq, shared_seq
+
+
+def format_cursor(user_seq, shared_seq):
+    return f'{user_seq}.{shared_seq}'
+
+
+# ============================================
+# 변경 기록
+# ============================================
+
+def _allocate(scope, n):
+    """
+    범위의 변경 번호 n개 확보 → 마지막 번호
+    - RETURNING을 지원하면 UPDATE 한 번, 카운터 행이 없으면 만든 뒤 다시
+    """
+    from .models import SyncCounter
+
+    counters = SyncCounter.objects.filter(scope=scope)
+    for _ in range(2):
+        if connection.features.can_return_columns_from_insert:
+            # PostgreSQL / SQLite 3.35+: UPDATE ... RETURNING
+            table = connection.ops.quote_name(SyncCounter._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {table} SET seq = seq + %s WHERE scope = %s RETURNING seq', [n, scope]
+                )
+                row = cursor.fetchone()
+            if row:
+                return row[0]
+        elif counters.update(seq=F('seq') + n):
+            return counters.values_list('seq', flat=True).get()
+        SyncCounter.objects.bulk_create([SyncCounter(scope=scope)], ignore_conflicts=True)
+    raise RuntimeError(f'동기화 카운터를 만들 수 없습니다: {scope}')
+
+
+def record_changes(user_id, changes):
+    """
+    변경 기록 (호출한 쪽의 DB 트랜잭션 안에서, 다른 행을 모두 바꾼 뒤에)
+    - changes: [(종류, id, 삭제 여부), ...]  같은 객체가 여러 번 있으면 마지막 것
+    - user_id None: 공통 카테고리
+    - 쿼리 2번 (카운터 UPDATE + 변경 기록 upsert), 객체 수와 무관
+    """
+    from .models import SyncChange
+
+    latest = {}
+    for kind, object_id, deleted in changes:
+        latest[(kind, object_id)] = deleted
+    if not latest:
+        return
+
+    with db_transaction.atomic(savepoint=False):
+        last = _allocate(SHARED if user_id is None else user_id, len(latest))
+        now = timezone.now()
+        SyncChange.objects.bulk_create(
+            [
+                SyncChange(
+                    user_id=user_id, kind=kind, object_id=object_id, deleted=deleted, seq=seq, changed_at=now
+                )
+                for seq, ((kind, object_id), deleted) in enumerate(latest.items(), start=last - len(latest) + 1)
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id'],
+            update_fields=['seq', 'deleted', 'changed_at'],
+        )
+
+
+# ============================================
+# 조회
+# ============================================
+
+def changes_since(user_id, cursor=None, limit=PAGE_SIZE):
+    """
+    커서 이후 변경 (사용자 범위 + 공통 범위 각각 최대 limit개, 번호 순)
+    - 반환값: {
+        'reset': 커서가 너무 오래됨 (전체를 다시 받아야 함, 나머지 값은 비어 있음),
+        'changed': {종류: [id, ...]}, 'deleted': {종류: [id, ...]},
+        'cursor': 다음 커서, 'has_more': 더 받을 변경이 있는지,
+      }
+    - InvalidCursor: 커서 형식이 틀림
+    """
+    from .models import SyncChange, SyncCounter
+
+    user_seq, shared_seq = parse_cursor(cursor)
+    counters = {
+        scope: (seq, pruned_seq)
+        for scope, seq, pruned_seq in SyncCounter.objects.filter(
+            scope__in=[user_id, SHARED]
+        ).values_list('scope', 'seq', 'pruned_seq')
+    }
+    for scope, since in ((user_id, user_seq), (SHARED, shared_seq)):
+        current, pruned = counters.get(scope, (0, 0))
+        # 툼스톤이 정리된 구간 / DB 복원 등으로 카운터보다 앞선 커서
+        if since and (since < pruned or since > current):
+            return {'reset': True, 'changed': {}, 'deleted': {}, 'cursor': None, 'has_more': False}
+
+    changed, deleted = defaultdict(list), defaultdict(list)
+    has_more = False
+    next_seqs = []
+    for scope_filter, since in ((Q(user_id=user_id), user_seq), (Q(user__isnull=True), shared_seq)):
+        rows = SyncChange.objects.filter(scope_filter, seq__gt=since)
+        if not since:
+            rows = rows.filter(deleted=False)  # 처음 받는 클라이언트에는 툼스톤이 필요 없음
+        rows = list(rows.order_by('seq').values_list('kind', 'object_id', 'deleted', 'seq')[:limit + 1])
+        if len(rows) > limit:
+            has_more = True
+            rows = rows[:limit]
+        for kind, object_id, is_deleted, _ in rows:
+            (deleted if is_deleted else changed)[kind].append(object_id)
+        next_seqs.append(rows[-1][3] if rows else since)
+
+    return {
+        'reset': False,
+        'changed': dict(changed),
+        'deleted': dict(deleted),
+        'cursor': format_cursor(*next_seqs),
+        'has_more': has_more,
+    }
+
+
+def current_cursor(user_id):
+    """지금까지의 모든 변경을 받은 상태의 커서"""
+    from .models import SyncCounter
+
+    seqs = dict(SyncCounter.objects.filter(scope__in=[user_id, SHARED]).values_list('scope', 'seq'))
+    return format_cursor(seqs.get(user_id, 0), seqs.get(SHARED, 0))
+
+
+# ============================================
+# 백필 / 툼스톤 정리
+# ============================================
+
+def backfill_changes(user_id):
+    """
+    기능 도입 이전 데이터: 사용자의 거래/계좌/카테고리 전체를 변경으로 기록 (여러 번 실행해도 됨)
+    - 반환값: 기록한 객체 수
+    """
+    from accounts.models import Account
+    from .models import Category, Transaction
+
+    changes = [
+        (kind, pk, False)
+        for kind, model in ((ACCOUNT, Account), (CATEGORY, Category), (TRANSACTION, Transaction))
+        for pk in model.objects.filter(user_id=user_id).values_list('pk', flat=True).iterator()
+    ]
+    with db_transaction.atomic():
+        record_changes(user_id, changes)
+    return len(changes)
+
+
+def backfill_shared_changes():
+    """공통 카테고리 전체를 변경으로 기록"""
+    from .models import Category
+
+    changes = [
+        (CATEGORY, pk, False) for pk in Category.objects.filter(user__isnull=True).values_list('pk', flat=True)
+    ]
+    with db_transaction.atomic():
+        record_changes(None, changes)
+    return len(changes)
+
+
+def prune_tombstones(days=TOMBSTONE_DAYS):
+    """
+    days일보다 오래된 툼스톤 삭제
+    - 범위마다 지운 가장 큰 번호를 pruned_seq에 남김 → 그보다 오래된 커서는 reset
+    - 반환값: 삭제한 툼스톤 수
+    """
+    from .models import SyncChange, SyncCounter
+
+    cutoff = timezone.now() - timedelta(days=days)
+    with db_transaction.atomic():
+        old = SyncChange.objects.filter(deleted=True, changed_at__lt=cutoff)
+        scopes = {
+            SHARED if user_id is None else user_id: last
+            for user_id, last in old.values_list('user_id').annotate(last=Max('seq')).order_by()
+        }
+        for scope in sorted(scopes):  # 카운터는 항상 범위 순서대로 잠금
+            SyncCounter.objects.filter(scope=scope, pruned_seq__lt=scopes[scope]).update(pruned_seq=scopes[scope])
+        deleted, _ = old.delete()
+    return deleted
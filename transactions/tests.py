@@ -2,15 +2,40 @@
 transactions/tests.py
 거래 앱 테스트 - 모델, 폼, 뷰, API
 """
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.query import QuerySet
 from django.urls import reverse
 from django.utils import timezone
 from decimal import Decimal
+from io import StringIO
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock, skipUnless
+import csv
+import io
 import json
-
-from .models import Transaction, Category, Attachment
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from accountbook_project.query_budget import QueryBudgetTestMixin, QueryRecorder
+
+from .models import Transaction, Category, CategoryRule, Attachment, ImportJob, DailyBalance, MonthlyRollup, ReceiptBlob
+from .checkpoints import balance_on, balance_history, rebuild_checkpoints
+from .rollups import rebuild_rollups
+from .periods import month_range
+from .autocomplete import MerchantIndex, choseong, jamo, suggest_merchants
+from .cache import bump_data_version, cached_for_user
+from .categorizer import Categorizer, categorize_uncategorized
 from .forms import TransactionForm, CategoryForm
+from .views import TransactionExportView
 from accounts.models import Account
 
 
@@ -181,6 +206,88 @@ class TransactionModelTest(TestCase):
         transactions = Transaction.objects.all()
         self.assertEqual(transactions[0], tx2)
 
+    def test_balance_moves_between_accounts_on_edit(self):
+        """거래 계좌 변경 시 기존 계좌 복원, 새 계좌에 반영"""
+        other_account = Account.objects.create(
+            user=self.user,
+            name='두번째계좌',
+            bank_name='테스트은행',
+            account_number='987-654-321098',
+            balance=Decimal('50000')
+        )
+        tx = Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type='OUT',
+            amount=Decimal('5000'),
+            occurred_at=timezone.now(),
+        )
+        tx.account = other_account
+        tx.amount = Decimal('7000')
+        tx.save()
+
+        self.account.refresh_from_db()
+        other_account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('100000'))
+        self.assertEqual(other_account.balance, Decimal('43000'))
+
+    def test_balance_update_on_type_change(self):
+        """거래 타입 변경(지출→수입) 시 잔액 재계산"""
+        tx = Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type='OUT',
+            amount=Decimal('5000'),
+            occurred_at=timezone.now(),
+        )
+        tx.tx_type = 'IN'
+        tx.save()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('105000'))
+
+    def test_delete_twice_restores_once(self):
+        """같은 거래를 두 번 삭제해도 잔액은 한 번만 복원"""
+        tx = Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type='OUT',
+            amount=Decimal('5000'),
+            occurred_at=timezone.now(),
+        )
+        stale = Transaction.objects.get(pk=tx.pk)
+        tx.delete()
+        stale.delete()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('100000'))
+
+    def test_cached_account_balance_in_sync(self):
+        """거래 저장 후 메모리의 계좌 잔액도 DB와 동일 (account.save() 덮어쓰기 방지)"""
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type='OUT',
+            amount=Decimal('5000'),
+            occurred_at=timezone.now(),
+        )
+        self.account.name = '이름변경'
+        self.account.save()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('95000'))
+
+    def test_save_query_count(self):
+        """거래 수정 시 쿼리 수 (기존 조회 + 거래 UPDATE + 잔액 UPDATE + 체크포인트 잠금/확인/UPDATE + 동기화 기록)"""
+        tx = Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type='OUT',
+            amount=Decimal('5000'),
+            occurred_at=timezone.now(),
+        )
+        tx.amount = Decimal('6000')
+        # SAVEPOINT/RELEASE 제외 실제 쿼리 9개 (월별 집계 UPDATE, 동기화 카운터 UPDATE + 변경 기록 포함)
+        with self.assertNumQueries(9 + 2 * connection.features.uses_savepoints):
+            tx.save()
+
 
 # ============================================
 # 3. 폼 테스트
@@ -719,3 +826,2984 @@ class CategoryViewTest(TestCase):
             reverse('transactions:category_delete', kwargs={'pk': other_cat.pk})
         )
         self.assertEqual(response.status_code, 404)
+
+
+# ============================================
+# 8. 잔액 동시성 스트레스 테스트
+# ============================================
+
+@skipUnless(
+    connection.features.has_select_for_update,
+    '행 잠금(select_for_update)을 지원하는 DB(PostgreSQL)에서만 실행'
+)
+class BalanceConcurrencyTest(TransactionTestCase):
+    """
+    여러 스레드가 같은 계좌에 동시에 거래를 생성/수정/삭제해도
+    최종 잔액 = 초기 잔액 + 남아있는 거래들의 합계 여야 함
+    """
+
+    THREADS = 8
+    OPS_PER_THREAD = 40
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.accounts = [
+            Account.objects.create(
+                user=self.user,
+                name=f'계좌{i}',
+                bank_name='테스트은행',
+                account_number=f'123-456-78901{i}',
+                balance=Decimal('1000000')
+            )
+            for i in range(2)
+        ]
+
+    def _worker(self, seed, errors):
+        rng = random.Random(seed)
+        try:
+            mine = []
+            for _ in range(self.OPS_PER_THREAD):
+                op = rng.random()
+                if op < 0.5 or not mine:
+                    tx = Transaction.objects.create(
+                        user=self.user,
+                        account=rng.choice(self.accounts),
+                        tx_type=rng.choice(['IN', 'OUT']),
+                        amount=Decimal(rng.randint(1, 10000)),
+                        occurred_at=timezone.now(),
+                    )
+                    mine.append(tx.pk)
+                elif op < 0.8:
+                    # 계좌 이동 + 금액/타입 변경
+                    tx = Transaction.objects.get(pk=rng.choice(mine))
+                    tx.account = rng.choice(self.accounts)
+                    tx.tx_type = rng.choice(['IN', 'OUT'])
+                    tx.amount = Decimal(rng.randint(1, 10000))
+                    tx.save()
+                else:
+                    pk = mine.pop(rng.randrange(len(mine)))
+                    Transaction.objects.get(pk=pk).delete()
+        except Exception as exc:  # 스레드 예외는 메인 스레드에서 확인
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    def test_concurrent_writes_keep_balance_exact(self):
+        errors = []
+        threads = [
+            threading.Thread(target=self._worker, args=(seed, errors))
+            for seed in range(self.THREADS)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        for account in self.accounts:
+            account.refresh_from_db()
+            expected = Decimal('1000000')
+            for tx in Transaction.objects.filter(account=account):
+                expected += tx.amount if tx.tx_type == 'IN' else -tx.amount
+            self.assertEqual(account.balance, expected)
+
+
+# ============================================
+# 9. 거래 일괄 가져오기(CSV) 테스트
+# ============================================
+
+@override_settings(TRANSACTION_IMPORT_ASYNC=False, TRANSACTION_IMPORT_BATCH_SIZE=2000)
+class TransactionImportTest(TestCase):
+    """CSV 가져오기 테스트"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='테스트계좌',
+            bank_name='테스트은행',
+            account_number='123-456-789012',
+            balance=Decimal('100000')
+        )
+        self.category = Category.objects.create(name='식비', type='OUT', user=self.user)
+        self.client.login(username='testuser', password='testpass123')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _upload(self, content, encoding='utf-8-sig', name='bank.csv'):
+        return self.client.post(reverse('transactions:transaction_import'), {
+            'account': self.account.pk,
+            'encoding': encoding,
+            'file': SimpleUploadedFile(name, content.encode(encoding), content_type='text/csv'),
+        })
+
+    def test_import_creates_transactions_and_updates_balance(self):
+        """유효한 행 저장 + 계좌 잔액 반영"""
+        response = self._upload(
+            'occurred_at,tx_type,amount,merchant,memo,category\n'
+            '2026-01-15 12:30,OUT,15000,스타벅스,아메리카노,식비\n'
+            '2026-01-16,IN,"1,000,000",월급,,\n'
+        )
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, reverse('transactions:import_detail', kwargs={'pk': job.pk}))
+        self.assertEqual(job.status, 'DONE')
+        self.assertEqual(job.imported_rows, 2)
+        self.assertEqual(job.error_rows, 0)
+        self.assertFalse(job.file)  # 처리 후 원본 파일 삭제
+
+        tx = Transaction.objects.get(merchant='스타벅스')
+        self.assertEqual(tx.category, self.category)
+        self.assertEqual(tx.user, self.user)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('1085000'))
+        # 일별 잔액 체크포인트도 함께 생성
+        self.assertEqual(balance_on(self.account, date(2026, 1, 14)), Decimal('100000'))
+        self.assertEqual(balance_on(self.account, date(2026, 1, 15)), Decimal('85000'))
+
+    def test_import_reports_invalid_rows(self):
+        """잘못된 행은 건너뛰고 줄 번호와 함께 오류 기록"""
+        self._upload(
+            'occurred_at,tx_type,amount,merchant\n'
+            '2026-01-15,OUT,0,금액오류\n'
+            'not-a-date,OUT,1000,날짜오류\n'
+            '2026-01-15,XX,1000,타입오류\n'
+            '2026-01-15,OUT,3000,정상\n'
+        )
+        job = ImportJob.objects.get()
+        self.assertEqual(job.imported_rows, 1)
+        self.assertEqual(job.error_rows, 3)
+        self.assertEqual([e['row'] for e in job.errors], [2, 3, 4])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('97000'))
+
+    def test_import_korean_headers_and_signed_amount(self):
+        """한글 헤더 + 구분 없이 금액 부호로 입출금 판단 (CP949)"""
+        self._upload(
+            '거래일시,금액,적요\n'
+            '2026-01-15 09:00,-5000,편의점\n'
+            '2026-01-15 10:00,20000,용돈\n',
+            encoding='cp949',
+        )
+        self.assertEqual(Transaction.objects.get(merchant='편의점').tx_type, 'OUT')
+        self.assertEqual(Transaction.objects.get(merchant='용돈').tx_type, 'IN')
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('115000'))
+
+    def test_import_rejects_other_users_category(self):
+        """다른 사용자의 카테고리는 사용할 수 없음 (TransactionForm과 같은 범위)"""
+        other = User.objects.create_user(username='other', password='otherpass123')
+        Category.objects.create(name='남의카테고리', type='OUT', user=other)
+        self._upload(
+            'occurred_at,tx_type,amount,category\n'
+            '2026-01-15,OUT,1000,남의카테고리\n'
+        )
+        job = ImportJob.objects.get()
+        self.assertEqual(job.imported_rows, 0)
+        self.assertEqual(job.error_rows, 1)
+
+    def test_import_query_count_independent_of_rows(self):
+        """행 수가 늘어도 쿼리 수는 일정 (bulk_create + 계좌당 잔액 UPDATE 1회)"""
+        from .importer import run_import_job
+
+        def make_job(rows, month):
+            lines = ['occurred_at,tx_type,amount,merchant']
+            lines += [f'2026-{month:02d}-15,OUT,{i + 1},가게{i}' for i in range(rows)]
+            return ImportJob.objects.create(
+                user=self.user,
+                account=self.account,
+                file=SimpleUploadedFile('bank.csv', '\n'.join(lines).encode()),
+                original_name='bank.csv',
+            )
+
+        # 서로 다른 달: 두 작업 모두 월별 집계 행을 새로 만드는 같은 경로
+        small, large = make_job(5, 1), make_job(50, 2)
+        with CaptureQueriesContext(connection) as small_ctx:
+            run_import_job(small.pk)
+        with CaptureQueriesContext(connection) as large_ctx:
+            run_import_job(large.pk)
+        self.assertEqual(len(small_ctx.captured_queries), len(large_ctx.captured_queries))
+        self.assertEqual(Transaction.objects.count(), 55)
+
+    def test_import_rejects_non_csv(self):
+        """CSV가 아닌 파일 거부"""
+        response = self._upload('hello', name='bank.txt')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ImportJob.objects.exists())
+
+    def test_import_progress_json_own_only(self):
+        """진행 상황 JSON은 본인 작업만 조회"""
+        self._upload('occurred_at,tx_type,amount\n2026-01-15,OUT,1000\n')
+        job = ImportJob.objects.get()
+        response = self.client.get(reverse('transactions:import_progress', kwargs={'pk': job.pk}))
+        data = json.loads(response.content)
+        self.assertEqual(data['status'], 'DONE')
+        self.assertEqual(data['progress'], 100)
+
+        User.objects.create_user(username='other', password='otherpass123')
+        self.client.login(username='other', password='otherpass123')
+        response = self.client.get(reverse('transactions:import_progress', kwargs={'pk': job.pk}))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('transactions:import_detail', kwargs={'pk': job.pk}))
+        self.assertEqual(response.status_code, 404)
+
+
+# ============================================
+# 10. 일별 잔액 체크포인트 테스트
+# ============================================
+
+class DailyBalanceTest(TestCase):
+    """일별 잔액 체크포인트 증분 갱신 / 과거 잔액 조회 테스트"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='테스트계좌',
+            bank_name='테스트은행',
+            account_number='123-456-789012',
+            balance=Decimal('100000')
+        )
+
+    def _create(self, day, tx_type, amount):
+        return Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type=tx_type,
+            amount=Decimal(amount),
+            occurred_at=timezone.make_aware(datetime(2026, 1, day, 12, 0)),
+        )
+
+    def _balance_on(self, day):
+        self.account.refresh_from_db()
+        return balance_on(self.account, date(2026, 1, day))
+
+    def test_balance_on_past_dates(self):
+        """날짜별 마감 잔액 조회"""
+        self._create(5, 'IN', '50000')
+        self._create(10, 'OUT', '20000')
+        self._create(10, 'OUT', '5000')
+
+        self.assertEqual(self._balance_on(1), Decimal('100000'))   # 첫 거래 이전
+        self.assertEqual(self._balance_on(5), Decimal('150000'))
+        self.assertEqual(self._balance_on(9), Decimal('150000'))   # 거래 없는 날
+        self.assertEqual(self._balance_on(10), Decimal('125000'))
+        self.assertEqual(self._balance_on(31), Decimal('125000'))
+
+    def test_backdated_transaction_shifts_later_days(self):
+        """과거 날짜 거래 추가 시 이후 날짜 잔액도 반영"""
+        self._create(10, 'OUT', '20000')
+        self._create(3, 'IN', '1000')
+        self.assertEqual(self._balance_on(2), Decimal('100000'))
+        self.assertEqual(self._balance_on(3), Decimal('101000'))
+        self.assertEqual(self._balance_on(10), Decimal('81000'))
+
+    def test_edit_date_and_delete(self):
+        """거래 날짜 수정/삭제 시 체크포인트 갱신"""
+        tx = self._create(5, 'OUT', '10000')
+        tx.occurred_at = timezone.make_aware(datetime(2026, 1, 20, 12, 0))
+        tx.save()
+        self.assertEqual(self._balance_on(5), Decimal('100000'))
+        self.assertEqual(self._balance_on(20), Decimal('90000'))
+
+        tx.delete()
+        self.assertEqual(self._balance_on(20), Decimal('100000'))
+
+    def test_initial_balance_edit_keeps_history_consistent(self):
+        """계좌 초기 잔액을 수정해도 체크포인트 재계산 불필요"""
+        self._create(5, 'OUT', '10000')
+        self.account.refresh_from_db()
+        self.account.balance += Decimal('5000')
+        self.account.save()
+        self.assertEqual(self._balance_on(1), Decimal('105000'))
+        self.assertEqual(self._balance_on(5), Decimal('95000'))
+
+    def test_rebuild_matches_incremental(self):
+        """백필(재계산) 결과 = 증분 갱신 결과"""
+        for day, tx_type, amount in [(3, 'IN', '500'), (7, 'OUT', '300'), (3, 'OUT', '50'), (15, 'IN', '10')]:
+            self._create(day, tx_type, amount)
+        incremental = list(DailyBalance.objects.values_list('date', 'net_amount', 'running_total'))
+
+        rebuild_checkpoints(self.account.pk)
+        rebuilt = list(DailyBalance.objects.values_list('date', 'net_amount', 'running_total'))
+        self.assertEqual(incremental, rebuilt)
+
+    def test_balance_history_reads_constant_queries(self):
+        """잔액 추이 조회는 거래/기간 수와 무관하게 쿼리 3번"""
+        for day in range(1, 29):
+            self._create(day, 'OUT', '100')
+        self.account.refresh_from_db()
+        with self.assertNumQueries(3):
+            history = balance_history(self.account, date(2026, 1, 1), date(2026, 1, 31))
+        self.assertEqual(len(history), 31)
+        self.assertEqual(history[0][1], Decimal('99900'))
+        self.assertEqual(history[-1][1], Decimal('97200'))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL 전용 (동시 수정)')
+class DailyBalanceConcurrencyTest(TransactionTestCase):
+    """
+    같은 계좌 안에서 날짜만 바꾸는 수정(잔액 증감 0)이 동시에 일어나도
+    체크포인트 = 거래 내역으로 재계산한 값 이어야 함
+    """
+
+    THREADS = 6
+    OPS_PER_THREAD = 15
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='테스트계좌', bank_name='테스트은행',
+            account_number='123-456-789012', balance=Decimal('100000'),
+        )
+        self.tx_ids = [
+            Transaction.objects.create(
+                user=self.user, account=self.account, tx_type='OUT', amount=Decimal(100 * (i + 1)),
+                occurred_at=timezone.make_aware(datetime(2026, 1, 1 + i, 12, 0)),
+            ).pk
+            for i in range(self.THREADS)
+        ]
+
+    def test_concurrent_date_moves_keep_checkpoints_exact(self):
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def worker(pk, seed):
+            rng = random.Random(seed)
+            try:
+                barrier.wait()
+                for _ in range(self.OPS_PER_THREAD):
+                    tx = Transaction.objects.get(pk=pk)
+                    tx.occurred_at = timezone.make_aware(datetime(2026, 1, rng.randint(1, 10), 12, 0))
+                    tx.save()
+            except Exception as exc:  # 스레드 예외는 메인 스레드에서 확인
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(pk, i)) for i, pk in enumerate(self.tx_ids)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        incremental = list(
+            DailyBalance.objects.exclude(net_amount=0).values_list('date', 'net_amount', 'running_total')
+        )
+        rebuild_checkpoints(self.account.pk)
+        rebuilt = list(DailyBalance.objects.values_list('date', 'net_amount', 'running_total'))
+        self.assertEqual(incremental, rebuilt)
+
+
+# ============================================
+# 11. 잔액 대사(reconcile_balances) 테스트
+# ============================================
+
+class ReconcileBalancesTest(TestCase):
+    """거래 내역 기준 잔액 재계산/복구 테스트"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='reconcile', password='testpass123')
+        self.accounts = [
+            Account.objects.create(
+                user=self.user, name=f'계좌{i}', bank_name='은행',
+                account_number=f'111-{i}', balance=Decimal('10000'),
+            )
+            for i in range(5)
+        ]
+        for account in self.accounts:
+            for tx_type, amount in [('IN', '3000'), ('OUT', '1200')]:
+                Transaction.objects.create(
+                    user=self.user, account=account, tx_type=tx_type,
+                    amount=Decimal(amount), occurred_at=timezone.now(),
+                )
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command('reconcile_balances', '--workers', '1', '--range-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def _balance(self, account):
+        account.refresh_from_db()
+        return account.balance
+
+    def test_opening_balance_set_on_create(self):
+        """계좌 생성 시 입력한 잔액이 기준 잔액"""
+        self.assertEqual(self.accounts[0].opening_balance, Decimal('10000'))
+        self.assertEqual(self._balance(self.accounts[0]), Decimal('11800'))
+
+    def test_no_drift(self):
+        output = self._run()
+        self.assertIn('계좌 5개, 거래 10건', output)
+        self.assertIn('잔액 불일치 0개', output)
+
+    def test_dry_run_reports_without_changes(self):
+        drifted = self.accounts[3]
+        Account.objects.filter(pk=drifted.pk).update(balance=Decimal('999'))
+
+        output = self._run('--dry-run')
+        self.assertIn(f'계좌 {drifted.pk}:', output)
+        self.assertIn('잔액 불일치 1개', output)
+        self.assertEqual(self._balance(drifted), Decimal('999'))
+
+    def test_repair(self):
+        drifted = self.accounts[1]
+        Account.objects.filter(pk=drifted.pk).update(balance=Decimal('999'))
+
+        self._run()
+        self.assertEqual(self._balance(drifted), Decimal('11800'))
+        self.assertIn('잔액 불일치 0개', self._run())
+
+    def test_missing_opening_balance_initialized(self):
+        """기준 잔액이 없는 기존 계좌는 현재 잔액 기준으로 채움 (불일치로 보지 않음)"""
+        legacy = self.accounts[0]
+        Account.objects.filter(pk=legacy.pk).update(opening_balance=None)
+
+        self.assertIn('잔액 불일치 0개', self._run('--dry-run'))
+        legacy.refresh_from_db()
+        self.assertIsNone(legacy.opening_balance)
+
+        self._run()
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.opening_balance, Decimal('10000'))
+        self.assertEqual(legacy.balance, Decimal('11800'))
+
+
+# ============================================
+# 12. 월별 집계(MonthlyRollup) 테스트
+# ============================================
+
+class MonthlyRollupTest(TestCase):
+    """거래 변경 시 월별 집계 증분 갱신 테스트"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rollup', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='집계계좌', bank_name='은행',
+            account_number='333-1', balance=Decimal('100000'),
+        )
+        self.food = Category.objects.create(name='식비', type='OUT', user=self.user)
+        self.cafe = Category.objects.create(name='카페', type='OUT', user=self.user)
+
+    def _create(self, month, day, tx_type, amount, category=None):
+        return Transaction.objects.create(
+            user=self.user, account=self.account, category=category,
+            tx_type=tx_type, amount=Decimal(amount),
+            occurred_at=timezone.make_aware(datetime(2026, month, day, 12, 0)),
+        )
+
+    def _rollups(self):
+        return sorted(
+            ((row.month, row.category_id, row.tx_type, row.total, row.count)
+             for row in MonthlyRollup.objects.filter(count__gt=0)),
+            key=lambda row: (row[0], row[1] or 0, row[2]),
+        )
+
+    def test_create_accumulates(self):
+        self._create(1, 3, 'OUT', '1000', self.food)
+        self._create(1, 20, 'OUT', '2500', self.food)
+        self._create(1, 5, 'IN', '50000')
+        self.assertEqual(self._rollups(), [
+            (date(2026, 1, 1), None, 'IN', Decimal('50000'), 1),
+            (date(2026, 1, 1), self.food.pk, 'OUT', Decimal('3500'), 2),
+        ])
+
+    def test_edit_moves_between_keys(self):
+        """금액/카테고리/월 변경 시 기존 집계에서 빼고 새 집계에 더함"""
+        tx = self._create(1, 31, 'OUT', '1000', self.food)
+        tx.amount = Decimal('1200')
+        tx.category = self.cafe
+        tx.occurred_at = timezone.make_aware(datetime(2026, 2, 1, 9, 0))
+        tx.save()
+        self.assertEqual(self._rollups(), [
+            (date(2026, 2, 1), self.cafe.pk, 'OUT', Decimal('1200'), 1),
+        ])
+
+        tx.delete()
+        self.assertEqual(self._rollups(), [])
+
+    def test_month_boundary_in_seoul_time(self):
+        """월 경계는 Asia/Seoul 기준 (UTC 1월 31일 16시 = 서울 2월 1일 1시)"""
+        Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT', amount=Decimal('100'),
+            occurred_at=datetime(2026, 1, 31, 16, 0, tzinfo=dt_timezone.utc),
+        )
+        self.assertEqual(MonthlyRollup.objects.get().month, date(2026, 2, 1))
+
+    def test_category_delete_moves_to_uncategorized(self):
+        self._create(1, 3, 'OUT', '1000', self.food)
+        self._create(1, 4, 'OUT', '500')
+        self.food.delete()
+        self.assertEqual(self._rollups(), [
+            (date(2026, 1, 1), None, 'OUT', Decimal('1500'), 2),
+        ])
+
+    def test_rebuild_matches_incremental(self):
+        """백필(재계산) 결과 = 증분 갱신 결과"""
+        for month, day, tx_type, amount, category in [
+            (1, 3, 'OUT', '1000', self.food), (1, 9, 'IN', '300', None),
+            (2, 1, 'OUT', '70', self.cafe), (2, 1, 'OUT', '30', self.cafe),
+        ]:
+            self._create(month, day, tx_type, amount, category)
+        self._create(3, 1, 'OUT', '999').delete()
+        incremental = self._rollups()
+
+        self.assertEqual(rebuild_rollups(self.user.pk), 3)
+        self.assertEqual(self._rollups(), incremental)
+
+    def test_import_updates_rollups(self):
+        from .importer import run_import_job
+
+        content = '날짜,구분,금액,카테고리\n2026-01-05 10:00,출금,1000,식비\n2026-01-06 10:00,출금,2000,식비\n'
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            job = ImportJob.objects.create(
+                user=self.user, account=self.account, original_name='a.csv',
+                file=SimpleUploadedFile('a.csv', content.encode()),
+            )
+            run_import_job(job.pk)
+        self.assertEqual(self._rollups(), [
+            (date(2026, 1, 1), self.food.pk, 'OUT', Decimal('3000'), 2),
+        ])
+
+    def test_admin_cannot_delete_rollups(self):
+        """Admin에서 집계 행을 지울 수 없음 (대시보드 통계가 거래와 어긋나지 않도록)"""
+        self._create(1, 5, 'OUT', '1000', self.food)
+        User.objects.create_superuser(username='admin', password='testpass123')
+        self.client.login(username='admin', password='testpass123')
+        rollup = MonthlyRollup.objects.get()
+
+        response = self.client.get(reverse('admin:transactions_monthlyrollup_changelist'))
+        self.assertNotContains(response, 'delete_selected')  # 일괄 삭제 동작 없음
+        response = self.client.post(reverse('admin:transactions_monthlyrollup_delete', args=[rollup.pk]), {'post': 'yes'})
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(MonthlyRollup.objects.filter(pk=rollup.pk).exists())
+
+
+# ============================================
+# 13. 기간 조회 인덱스(EXPLAIN) 테스트
+# ============================================
+
+class PeriodQueryPlanTest(TestCase):
+    """기간 필터가 반열린 구간으로 바뀌어 복합 인덱스를 타는지 확인"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='plan', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='444-1',
+        )
+        self.category = Category.objects.create(name='식비', type='OUT', user=self.user)
+        for day in (1, 15, 31):
+            Transaction.objects.create(
+                user=self.user, account=self.account, category=self.category,
+                tx_type='OUT', amount=Decimal('1000'),
+                occurred_at=timezone.make_aware(datetime(2026, 1, day, 23, 30)),
+            )
+        # 통계상 복합 인덱스가 선택되도록 배경 데이터를 섞음
+        # - 다른 사용자의 같은 기간 거래 → 사용자 조건이 앞에 있는 인덱스가 유리
+        # - 같은 사용자의 비활성 계좌/다른 카테고리 거래 → 계좌/카테고리 복합 인덱스가 유리
+        #   (비활성 계좌라 목록/대시보드 결과 건수에는 포함되지 않음)
+        other = User.objects.create_user(username='plan-other', password='testpass123')
+        other_account = Account.objects.create(
+            user=other, name='계좌', bank_name='은행', account_number='444-3',
+        )
+        closed = Account.objects.create(
+            user=self.user, name='해지계좌', bank_name='은행', account_number='444-2', is_active=False,
+        )
+        other_category = Category.objects.create(name='교통', type='OUT', user=self.user)
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user, account=closed, category=other_category,
+                tx_type='OUT', amount=Decimal('1000'),
+                occurred_at=timezone.make_aware(datetime(2026 - (i % 4 > 0), 1, i % 28 + 1)),
+            )
+            for i in range(300)
+        ] + [
+            Transaction(
+                user=other, account=other_account, tx_type='OUT', amount=Decimal('1000'),
+                occurred_at=timezone.make_aware(datetime(2026, 1, i % 28 + 1)),
+            )
+            for i in range(300)
+        ])
+        self.factory = RequestFactory()
+
+    def _plan(self, queryset):
+        """
+        실행 계획 (PostgreSQL은 테스트 데이터가 작아도 인덱스 사용 가능 여부를 보도록 seq scan 끔)
+        - 앞선 테스트들의 롤백으로 autovacuum 통계가 바뀌어도 같은 계획이 나오도록 통계를 새로 수집
+        - 정렬(최신순)까지 인덱스로 처리하는지 보도록 별도 Sort 단계도 끔
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE transactions_transaction')
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_sort = off')
+        return queryset.explain()
+
+    def _list_queryset(self, **params):
+        from .views import TransactionListView
+
+        request = self.factory.get('/transactions/', params)
+        request.user = self.user
+        view = TransactionListView()
+        view.setup(request)
+        return view.get_queryset()
+
+    def _dashboard_queryset(self, year, month):
+        from dashboard.views import DashboardView
+
+        request = self.factory.get('/dashboard/')
+        request.user = self.user
+        view = DashboardView()
+        view.setup(request)
+        return view.get_month_transactions(year, month)
+
+    def test_month_range_half_open(self):
+        start, end = month_range(2026, 12)
+        self.assertEqual(timezone.localtime(start), timezone.make_aware(datetime(2026, 12, 1)))
+        self.assertEqual(timezone.localtime(end), timezone.make_aware(datetime(2027, 1, 1)))
+        self.assertEqual(self._dashboard_queryset(2026, 1).count(), 3)
+        self.assertEqual(self._dashboard_queryset(2026, 2).count(), 0)
+
+    def test_list_date_filter_inclusive_end(self):
+        qs = self._list_queryset(start_date='2026-01-15', end_date='2026-01-31')
+        self.assertEqual(qs.count(), 2)
+        # 잘못된 날짜는 무시
+        self.assertEqual(self._list_queryset(start_date='2026-02-30').count(), 3)
+
+    def test_dashboard_month_uses_user_occurred_index(self):
+        plan = self._plan(self._dashboard_queryset(2026, 1))
+        self.assertIn('tx_user_occurred_idx', plan)
+
+    def test_list_account_filter_uses_account_index(self):
+        plan = self._plan(self._list_queryset(
+            account=self.account.pk, start_date='2026-01-01', end_date='2026-01-31',
+        ))
+        self.assertIn('tx_user_account_occurred_idx', plan)
+
+    def test_list_category_type_filter_uses_category_index(self):
+        plan = self._plan(self._list_queryset(
+            category=self.category.pk, tx_type='OUT', start_date='2026-01-01',
+        ))
+        self.assertIn('tx_user_cat_type_occurred_idx', plan)
+
+
+# ============================================
+# 14. 사용자별 데이터 버전 캐시 테스트
+# ============================================
+
+class UserDataCacheTest(TestCase):
+    """cached_for_user / bump_data_version 테스트"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='cache', password='testpass123')
+        self.other = User.objects.create_user(username='cache2', password='testpass123')
+        self.calls = 0
+
+    def _build(self):
+        self.calls += 1
+        return {'calls': self.calls}
+
+    def _get(self, user):
+        return cached_for_user(user.pk, 'test-summary', self._build)
+
+    def test_cached_until_version_bump(self):
+        self.assertEqual(self._get(self.user), {'calls': 1})
+        self.assertEqual(self._get(self.user), {'calls': 1})
+
+        bump_data_version(self.user.pk)
+        self.assertEqual(self._get(self.user), {'calls': 2})
+
+    def test_lost_version_bump_still_invalidates(self):
+        """파일 캐시의 incr가 겹쳐서 버전 증가를 잃어도 커밋된 변경은 동기화 커서로 새 키"""
+        self._get(self.user)
+        with mock.patch('transactions.cache._bump'):
+            Account.objects.create(user=self.user, name='계좌', bank_name='은행', account_number='555-0')
+        self.assertEqual(self._get(self.user), {'calls': 2})
+
+    def test_versions_are_per_user(self):
+        self._get(self.user)
+        self._get(self.other)
+        Account.objects.create(user=self.other, name='계좌', bank_name='은행', account_number='555-1')
+        self.assertEqual(self._get(self.user), {'calls': 1})
+        self.assertEqual(self._get(self.other), {'calls': 3})
+
+    def test_common_category_bumps_everyone(self):
+        """공통 카테고리(user=None) 변경은 모든 사용자 캐시 무효화"""
+        self._get(self.user)
+        Category.objects.create(name='공통', type='OUT')
+        self.assertEqual(self._get(self.user), {'calls': 2})
+
+    def test_bumped_again_after_commit(self):
+        """트랜잭션 안에서 바뀌면 커밋 후 한 번 더 올림 (커밋 전 캐시된 값 무효화)"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Account.objects.create(user=self.user, name='계좌', bank_name='은행', account_number='555-2')
+            self._get(self.user)  # 커밋 전 다른 요청이 캐시했다고 가정
+        self.assertEqual(self._get(self.user), {'calls': 2})
+
+    def test_cascade_delete_bumps(self):
+        account = Account.objects.create(user=self.user, name='계좌', bank_name='은행', account_number='555-3')
+        Transaction.objects.create(
+            user=self.user, account=account, tx_type='IN',
+            amount=Decimal('1000'), occurred_at=timezone.now(),
+        )
+        self._get(self.user)
+        account.delete()
+        self.assertEqual(self._get(self.user), {'calls': 2})
+
+
+# ============================================
+# 15. 키워드 검색 (search.py) 테스트
+# ============================================
+
+class TransactionSearchTest(TestCase):
+    """가맹점/메모 검색: PostgreSQL은 tsvector + 관련도 정렬, 그 외는 icontains"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='search', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='666-1',
+        )
+        self.in_memo = self._tx('편의점', '스타벅스 기프티콘', day=20)
+        self.in_merchant = self._tx('스타벅스 강남점', '아메리카노', day=10)
+        self.other = self._tx('이마트', '장보기', day=15)
+        self.factory = RequestFactory()
+
+    def _tx(self, merchant, memo, day):
+        return Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT', amount=Decimal('5000'),
+            occurred_at=timezone.make_aware(datetime(2026, 1, day, 12, 0)),
+            merchant=merchant, memo=memo,
+        )
+
+    def _search(self, q):
+        from .views import TransactionListView
+
+        request = self.factory.get('/transactions/', {'q': q})
+        request.user = self.user
+        view = TransactionListView()
+        view.setup(request)
+        return list(view.get_queryset())
+
+    def test_build_tsquery(self):
+        from .search import build_tsquery
+
+        self.assertEqual(build_tsquery('스타벅 강남'), '스타벅:* & 강남:*')
+        self.assertEqual(build_tsquery("a&b | (c)'"), 'a:* & b:* & c:*')
+        self.assertIsNone(build_tsquery(':*!'))
+
+    def test_partial_korean_match(self):
+        """'스타벅' → '스타벅스 ...' (가맹점/메모 모두)"""
+        self.assertEqual(
+            {tx.pk for tx in self._search('스타벅')},
+            {self.in_memo.pk, self.in_merchant.pk},
+        )
+
+    def test_infix_match(self):
+        """단어 중간 부분 검색 ('벅스'): PostgreSQL은 트라이그램 인덱스가 있을 때만"""
+        from .search import has_trigram_indexes
+
+        if connection.vendor == 'postgresql' and not has_trigram_indexes():
+            self.assertEqual(self._search('벅스'), [])  # 표 전체를 훑지 않고 단어 앞부분 검색만
+            return
+        self.assertEqual(
+            {tx.pk for tx in self._search('벅스')},
+            {self.in_memo.pk, self.in_merchant.pk},
+        )
+
+    def test_special_characters_only(self):
+        """tsquery 문법 문자만 있어도 오류 없이 부분 문자열 검색"""
+        self.assertEqual(self._search("':*"), [])
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL 전용')
+    def test_ranked_by_field_weight(self):
+        """가맹점 일치(가중치 A)가 메모 일치(B)보다 먼저 (날짜는 메모 쪽이 최신)"""
+        self.assertEqual(
+            [tx.pk for tx in self._search('스타벅')],
+            [self.in_merchant.pk, self.in_memo.pk],
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL 전용')
+    def test_vector_maintained_by_trigger(self):
+        """저장/수정/bulk_create 모두 트리거가 search_vector를 채움"""
+        self.other.merchant = '투썸플레이스'
+        self.other.save()
+        Transaction.objects.bulk_create([Transaction(
+            user=self.user, account=self.account, tx_type='OUT', amount=Decimal('1000'),
+            occurred_at=timezone.make_aware(datetime(2026, 1, 1)), merchant='투썸 역삼점',
+        )])
+        self.assertEqual(len(self._search('투썸')), 2)
+        self.assertFalse(Transaction.objects.filter(search_vector__isnull=True).exists())
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL 전용')
+    def test_search_vector_uses_gin_index(self):
+        from django.contrib.postgres.search import SearchQuery
+
+        # GIN은 비트맵 검색으로만 쓰이므로 seq scan/일반 index scan을 끄고 확인
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_indexscan = off')
+        plan = Transaction.objects.filter(
+            search_vector=SearchQuery('스타벅:*', config='simple', search_type='raw')
+        ).explain()
+        self.assertIn('tx_search_vector_idx', plan)
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL 전용')
+    def test_search_condition_never_scans_table(self):
+        """검색 조건 전체(부분 문자열 OR 포함)가 인덱스로 처리됨 → Seq Scan 없음"""
+        from .search import has_trigram_indexes, search_transactions
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_indexscan = off')
+        # 검색할 단어가 없는 검색어("':*")는 트라이그램 인덱스가 없으면 쿼리 없이 빈 결과
+        for q in ('스타벅', '벅스', "':*") if has_trigram_indexes() else ('스타벅', '벅스'):
+            plan = search_transactions(Transaction.objects.all(), q).explain()
+            self.assertNotIn('Seq Scan', plan, q)
+        plan = search_transactions(Transaction.objects.all(), '스타벅').explain()
+        self.assertIn('tx_search_vector_idx', plan)
+        if has_trigram_indexes():
+            self.assertIn('tx_merchant_trgm_idx', plan)
+
+
+# ============================================
+# 16. 키셋(커서) 페이지네이션 테스트
+# ============================================
+
+class KeysetPaginationTest(TestCase):
+    """(occurred_at, id) 기준 커서 페이지 이동, 건수 캐시"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='pager', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='777-1',
+        )
+        # 같은 시각 거래가 페이지 경계에 걸치도록 2건씩 같은 시각
+        base = timezone.make_aware(datetime(2026, 1, 1, 12, 0))
+        self.txs = [
+            Transaction.objects.create(
+                user=self.user, account=self.account, tx_type='OUT', amount=Decimal('1000'),
+                occurred_at=base + timedelta(hours=i // 2), merchant=f'가게{i}',
+            )
+            for i in range(45)
+        ]
+        # 목록 순서: 최신순, 같은 시각이면 id 큰 것부터
+        self.expected = sorted(self.txs, key=lambda tx: (tx.occurred_at, tx.pk), reverse=True)
+        self.client.login(username='pager', password='testpass123')
+        self.url = reverse('transactions:transaction_list')
+
+    def _pages(self, query=''):
+        """다음 링크를 따라가며 모든 페이지의 거래 id"""
+        pages, url = [], f'{self.url}?{query}'
+        while url:
+            response = self.client.get(url)
+            pages.append([tx.pk for tx in response.context['transactions']])
+            next_query = response.context.get('next_query')
+            url = f'{self.url}?{next_query}' if next_query else None
+        return pages, response
+
+    def test_walk_forward_and_back(self):
+        pages, last = self._pages()
+        self.assertEqual([len(page) for page in pages], [20, 20, 5])
+        self.assertEqual(sum(pages, []), [tx.pk for tx in self.expected])
+        self.assertIsNone(last.context.get('next_query'))
+
+        # 마지막 페이지에서 이전 → 두 번째 페이지, 다시 이전 → 첫 페이지
+        response = self.client.get(f'{self.url}?{last.context["previous_query"]}')
+        self.assertEqual([tx.pk for tx in response.context['transactions']], pages[1])
+        response = self.client.get(f'{self.url}?{response.context["previous_query"]}')
+        self.assertEqual([tx.pk for tx in response.context['transactions']], pages[0])
+        self.assertIsNone(response.context.get('previous_query'))
+        self.assertTrue(response.context['next_query'])
+
+    def test_filters_kept_in_links(self):
+        """검색어가 다음 링크에 유지됨 (PostgreSQL은 관련도 순이라 집합으로 비교)"""
+        pages, _ = self._pages('q=가게1&tx_type=OUT')
+        found = sum(pages, [])
+        self.assertEqual(len(found), len(set(found)))
+        self.assertEqual(set(found), {tx.pk for tx in self.txs if '가게1' in tx.merchant})
+
+    def test_invalid_cursor_is_first_page(self):
+        response = self.client.get(self.url + '?cursor=!!not-a-cursor')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [tx.pk for tx in response.context['transactions']],
+            [tx.pk for tx in self.expected[:20]],
+        )
+
+    def test_malformed_cursor_values_are_first_page(self):
+        """형식은 맞지만 값이 정렬 키 형식이 아닌 커서 → 500 대신 첫 페이지 (목록 화면, API)"""
+        import base64
+
+        api_url = reverse('transactions:api_transaction_list')
+        first = [tx.pk for tx in self.expected[:20]]
+        for payload in (
+            ['n', ['not-a-date', 5]],
+            ['n', ['2026-01-01T00:00:00+09:00', 'abc']],
+            ['n', [None, None]],
+            ['p', [{'a': 1}, [1]]],
+            ['n', [5, 5]],
+        ):
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+            with self.subTest(payload=payload):
+                response = self.client.get(self.url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([tx.pk for tx in response.context['transactions']], first)
+                response = self.client.get(api_url, {'cursor': cursor, 'limit': 20, 'fields': 'id'})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([item['id'] for item in response.json()['results']], first)
+
+    def test_deep_page_has_no_offset_or_count(self):
+        """다음 페이지 조회는 OFFSET 없이 커서 조건 + LIMIT, 건수는 캐시에서"""
+        first = self.client.get(self.url)
+        self.assertEqual(first.context['page_obj'].paginator.count, 45)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'{self.url}?{first.context["next_query"]}')
+            self.assertEqual(response.context['page_obj'].paginator.count, 45)
+        sql = [query['sql'].upper() for query in ctx.captured_queries]
+        self.assertFalse(any('OFFSET' in query for query in sql))
+        self.assertFalse(any('COUNT(' in query for query in sql))
+
+    def test_count_refreshed_after_change(self):
+        self.assertEqual(self.client.get(self.url).context['page_obj'].paginator.count, 45)
+        self.txs[0].delete()
+        self.assertEqual(self.client.get(self.url).context['page_obj'].paginator.count, 44)
+
+    def test_cursor_keeps_microseconds(self):
+        from .pagination import NEXT, decode_cursor, encode_cursor
+
+        value = timezone.make_aware(datetime(2026, 1, 1, 12, 0, 0, 123456))
+        direction, values = decode_cursor(encode_cursor([value, 7], NEXT), 2)
+        self.assertEqual(direction, NEXT)
+        self.assertEqual(values, [value.isoformat(), 7])
+
+
+# ============================================
+# 17. 쿼리 예산 / N+1 감지 테스트
+# ============================================
+
+class QueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    """거래 목록/관리자 목록의 선언된 쿼리 예산, N+1 감지 도구 자체"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='budget', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='902-1',
+        )
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        for i in range(6):
+            category = Category.objects.create(user=self.user, name=f'카테고리{i}', type='OUT')
+            tx = Transaction.objects.create(
+                user=self.user, account=self.account, category=category, tx_type='OUT',
+                amount=Decimal('1000'), occurred_at=timezone.now() - timedelta(days=i),
+                merchant=f'가게{i}',
+            )
+            if i % 2:
+                Attachment.objects.create(
+                    user=self.user, transaction=tx, original_name='r.pdf', size=3,
+                    content_type='application/pdf',
+                    file=SimpleUploadedFile('r.pdf', b'pdf', content_type='application/pdf'),
+                )
+        ImportJob.objects.create(
+            user=self.user, account=self.account, original_name='a.csv',
+            file=SimpleUploadedFile('a.csv', b'date,amount\n'),
+        )
+        ImportJob.objects.create(
+            user=self.user, account=self.account, original_name='b.csv',
+            file=SimpleUploadedFile('b.csv', b'date,amount\n'),
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_query_shape_folds_in_lists(self):
+        from accountbook_project.query_budget import query_shape
+
+        self.assertEqual(
+            query_shape('SELECT * FROM t WHERE id IN (%s, %s, %s) AND u = %s'),
+            query_shape('SELECT * FROM t WHERE id IN (%s) AND u = %s'),
+        )
+
+    def test_recorder_detects_repeated_queries(self):
+        from accountbook_project.query_budget import QueryRecorder
+
+        with QueryRecorder().record() as recorder:
+            for tx in Transaction.objects.filter(user=self.user):
+                tx.account.name  # 행마다 계좌 조회 (N+1)
+        self.assertEqual(recorder.count, 7)
+        self.assertEqual(len(recorder.repeated()), 1)
+        self.assertEqual(recorder.repeated()[0][1], 6)
+
+    def test_transaction_list_budget(self):
+        """영수증 아이콘(transaction.attachment)도 목록 쿼리에서 함께 읽음"""
+        self.client.login(username='budget', password='testpass123')
+        response = self.assertQueryBudget(reverse('transactions:transaction_list'))
+        self.assertContains(response, 'bi-receipt text-success', count=3)
+
+    def test_transaction_list_budget_with_filters(self):
+        self.client.login(username='budget', password='testpass123')
+        url = reverse('transactions:transaction_list')
+        self.assertQueryBudget(url + '?q=가게')
+        self.assertQueryBudget(url + f'?tx_type=OUT&account={self.account.pk}')
+
+    def test_admin_changelists_budget(self):
+        """프로젝트 앱(계좌/거래/고객센터)의 모든 관리자 목록 화면"""
+        from django.contrib import admin
+        from report.models import FAQ, Inquiry
+
+        for i in range(3):
+            Inquiry.objects.create(
+                user=self.user, name=f'문의{i}', phone='010', email='a@example.com', content='내용',
+            )
+            FAQ.objects.create(question=f'질문{i}', answer='답변', order=i)
+        Account.objects.create(user=self.user, name='계좌2', bank_name='은행', account_number='902-2')
+        User.objects.create_superuser(username='admin', password='testpass123')
+        self.client.login(username='admin', password='testpass123')
+        rebuild_rollups(self.user.pk)
+        models = [
+            model for model in admin.site._registry
+            if model._meta.app_label in ('accounts', 'transactions', 'report')
+        ]
+        self.assertEqual(len(models), 12)
+        for model in models:
+            with self.subTest(model=model.__name__):
+                self.assertQueryBudget(
+                    reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+                )
+
+    def test_middleware_reports_count_and_warns(self):
+        """개발 모드 미들웨어: X-Query-Count 헤더, 예산 초과 시 경고 로그"""
+        from .views import TransactionListView
+
+        self.client.login(username='budget', password='testpass123')
+        url = reverse('transactions:transaction_list')
+        with override_settings(QUERY_BUDGET_ENABLED=True):
+            client = Client()
+            client.login(username='budget', password='testpass123')
+            response = client.get(url)
+            self.assertGreater(int(response['X-Query-Count']), 0)
+
+            original = TransactionListView.query_budget
+            TransactionListView.query_budget = 1
+            try:
+                with self.assertLogs('accountbook_project.query_budget', 'WARNING') as logs:
+                    client.get(url)
+            finally:
+                TransactionListView.query_budget = original
+        self.assertIn('쿼리 예산 초과', logs.output[0])
+
+
+# ============================================
+# 18. 거래 CSV 내보내기 테스트
+# ============================================
+
+class TransactionExportTest(TestCase):
+    """목록과 같은 필터, 엑셀 호환 CSV, 스트리밍, 쿼리 수 일정"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='exporter', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='월급통장', bank_name='은행', account_number='888-1',
+        )
+        self.other_account = Account.objects.create(
+            user=self.user, name='카드', bank_name='은행', account_number='888-2',
+        )
+        self.food = Category.objects.create(user=self.user, name='식비', type='OUT')
+        self.base = timezone.make_aware(datetime(2026, 1, 10, 9, 30))
+        self.coffee = Transaction.objects.create(
+            user=self.user, account=self.account, category=self.food, tx_type='OUT',
+            amount=Decimal('4500'), occurred_at=self.base, merchant='스타벅스 강남점', memo='아침 커피',
+        )
+        self.salary = Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='IN',
+            amount=Decimal('3000000'), occurred_at=self.base + timedelta(days=1), merchant='회사',
+        )
+        self.card = Transaction.objects.create(
+            user=self.user, account=self.other_account, tx_type='OUT',
+            amount=Decimal('12000'), occurred_at=self.base + timedelta(days=2), merchant='=HYPERLINK("x")',
+            memo='-10',
+        )
+        stranger = User.objects.create_user(username='stranger', password='testpass123')
+        stranger_account = Account.objects.create(
+            user=stranger, name='남의 계좌', bank_name='은행', account_number='888-3',
+        )
+        Transaction.objects.create(
+            user=stranger, account=stranger_account, tx_type='OUT',
+            amount=Decimal('1000'), occurred_at=self.base, merchant='스타벅스',
+        )
+        self.client.login(username='exporter', password='testpass123')
+        self.url = reverse('transactions:transaction_export')
+
+    def _rows(self, response):
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(content.startswith('\ufeff'))
+        return list(csv.reader(StringIO(content[1:])))
+
+    def test_login_required(self):
+        response = Client().get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_streams_excel_compatible_csv(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertTrue(response['Content-Disposition'].startswith('attachment; filename="transactions-'))
+
+        rows = self._rows(response)
+        self.assertEqual(rows[0], ['거래일시', '구분', '금액', '계좌', '카테고리', '가맹점', '메모'])
+        # 최신순, 본인 거래만
+        self.assertEqual([row[5] for row in rows[1:]], ["'=HYPERLINK(\"x\")", '회사', '스타벅스 강남점'])
+        self.assertEqual(
+            rows[3], ['2026-01-10 09:30:00', '출금', '4500.00', '월급통장', '식비', '스타벅스 강남점', '아침 커피']
+        )
+        self.assertEqual(rows[2][1:5], ['입금', '3000000.00', '월급통장', ''])
+        # 수식으로 해석될 수 있는 값은 ' 로 시작
+        self.assertEqual(rows[1][6], "'-10")
+
+    def test_uses_list_filters(self):
+        response = self.client.get(self.url, {'account': self.account.pk, 'tx_type': 'OUT'})
+        self.assertEqual([row[5] for row in self._rows(response)[1:]], ['스타벅스 강남점'])
+
+        response = self.client.get(self.url, {'q': '스타벅'})
+        self.assertEqual([row[5] for row in self._rows(response)[1:]], ['스타벅스 강남점'])
+
+        response = self.client.get(self.url, {'start_date': '2026-01-11', 'end_date': '2026-01-11'})
+        self.assertEqual([row[5] for row in self._rows(response)[1:]], ['회사'])
+
+        # 커서는 무시하고 조건에 맞는 전체를 내보냄
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+        self.assertEqual(len(self._rows(response)), 4)
+
+    def test_exported_rows_can_be_imported(self):
+        """헤더가 가져오기 별칭과 같아서 내보낸 파일을 그대로 다시 가져올 수 있음"""
+        from .importer import RowValidator, normalize_header
+
+        rows = self._rows(self.client.get(self.url, {'account': self.account.pk}))
+        header = [normalize_header(name) for name in rows[0]]
+        validator = RowValidator(self.user, self.account)
+        built = [validator.build(dict(zip(header, row))) for row in rows[1:]]
+        self.assertEqual(
+            [(tx.tx_type, tx.amount, tx.occurred_at, tx.category, tx.merchant) for tx in built],
+            [
+                ('IN', Decimal('3000000'), self.salary.occurred_at, None, '회사'),
+                ('OUT', Decimal('4500'), self.coffee.occurred_at, self.food, '스타벅스 강남점'),
+            ],
+        )
+
+    def test_query_count_does_not_grow_with_rows(self):
+        """행 수와 무관하게 거래 조회 1번 (계좌/카테고리는 JOIN, 행마다 쿼리 없음)"""
+        def count_queries():
+            with QueryRecorder().record() as recorder:
+                response = self.client.get(self.url)
+                rows = self._rows(response)
+            return recorder.count, len(rows)
+
+        few, few_rows = count_queries()
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user, account=self.account, category=self.food, tx_type='OUT',
+                amount=Decimal('100'), occurred_at=self.base - timedelta(hours=i), merchant=f'가게{i}',
+            )
+            for i in range(50)
+        ])
+        many, many_rows = count_queries()
+        self.assertEqual(many_rows, few_rows + 50)
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, TransactionExportView.query_budget)
+
+
+# ============================================
+# 19. 가맹점 자동완성 테스트
+# ============================================
+
+class MerchantAutocompleteTest(TestCase):
+    """접두어/초성/입력 중인 글자 일치, 자주 쓴 순, 거래 변경 반영, 조회 시 DB 미사용"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='typer', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='999-1',
+        )
+        for merchant, n in [('스타벅스 강남점', 3), ('스타벅스 역삼점', 1), ('서브웨이', 2), ('GS25 역삼점', 4)]:
+            for _ in range(n):
+                self._create(merchant)
+        stranger = User.objects.create_user(username='stranger', password='testpass123')
+        stranger_account = Account.objects.create(
+            user=stranger, name='남의 계좌', bank_name='은행', account_number='999-2',
+        )
+        Transaction.objects.create(
+            user=stranger, account=stranger_account, tx_type='OUT', amount=Decimal('1000'),
+            occurred_at=timezone.now(), merchant='스타필드',
+        )
+        self.client.login(username='typer', password='testpass123')
+        self.url = reverse('transactions:api_merchant_autocomplete')
+
+    def _create(self, merchant):
+        return Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT', amount=Decimal('1000'),
+            occurred_at=timezone.now(), merchant=merchant,
+        )
+
+    def _suggest(self, q):
+        return [merchant for merchant, _ in suggest_merchants(self.user.pk, q)]
+
+    def test_jamo_and_choseong(self):
+        self.assertEqual(jamo('스타벅'), 'ㅅㅡㅌㅏㅂㅓㄱ')
+        self.assertEqual(jamo('닭과'), 'ㄷㅏㄹㄱㄱㅗㅏ')  # 겹자모는 입력 순서대로
+        self.assertEqual(choseong('스타벅스 GS25'), 'ㅅㅌㅂㅅ GS25')
+
+    def test_index_matching_and_ranking(self):
+        index = MerchantIndex({'스타벅스 강남점': 3, '스타벅스 역삼점': 1, '서브웨이': 2, 'GS25 역삼점': 4})
+        suggest = lambda q: [merchant for merchant, _ in index.suggest(q)]
+
+        self.assertEqual(suggest('스타'), ['스타벅스 강남점', '스타벅스 역삼점'])
+        self.assertEqual(suggest('ㅅ'), ['스타벅스 강남점', '서브웨이', '스타벅스 역삼점'])
+        # 입력 중인 글자: "스타벅" 입력 도중 "스타버", "스탑"
+        self.assertEqual(suggest('스타버'), ['스타벅스 강남점', '스타벅스 역삼점'])
+        self.assertEqual(suggest('스탑'), ['스타벅스 강남점', '스타벅스 역삼점'])
+        # 초성, 두 번째 단어, 대소문자/공백 무시
+        self.assertEqual(suggest('ㅅㅂㅇ'), ['서브웨이'])
+        self.assertEqual(suggest('역삼'), ['GS25 역삼점', '스타벅스 역삼점'])
+        self.assertEqual(suggest('gs 25'), ['GS25 역삼점'])
+        self.assertEqual(suggest('스타벅스 강'), ['스타벅스 강남점'])
+        self.assertEqual(suggest('벅스'), [])
+        self.assertEqual(suggest('  '), [])
+
+    def test_long_query_and_suggestion_limit(self):
+        long_name = '가나다라마바사아자차카타파하 주식회사'
+        index = MerchantIndex({long_name: 1, '가나다라마바사아자차카 상사': 2})
+        self.assertEqual([m for m, _ in index.suggest('가나다라마바사아자차카타')], [long_name])
+
+        index = MerchantIndex({f'가게{i:02d}': i for i in range(30)})
+        self.assertEqual(len(index.suggest('가게')), 10)
+        self.assertEqual(index.suggest('가게', limit=2), [('가게29', 29), ('가게28', 28)])
+
+    def test_view_returns_own_merchants(self):
+        response = self.client.get(self.url, {'q': 'ㅅㅌ'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'merchants': [
+            {'merchant': '스타벅스 강남점', 'count': 3},
+            {'merchant': '스타벅스 역삼점', 'count': 1},
+        ]})
+        self.assertEqual(Client().get(self.url, {'q': '스'}).status_code, 302)
+
+    def test_lookups_after_first_do_not_query_transactions(self):
+        self.client.get(self.url, {'q': '스'})
+        with self.assertNumQueries(8):  # 요청마다 세션/사용자 2개뿐
+            for q in ('스', '스타', '스타벅', 'ㅅㅌㅂ'):
+                self.client.get(self.url, {'q': q})
+
+    def test_new_transaction_rebuilds_index_once(self):
+        self.assertEqual(self._suggest('서')[:1], ['서브웨이'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create('서울우유')
+            self._create('서울우유')
+            self._create('서울우유')
+        with self.assertNumQueries(1):
+            self.assertEqual(self._suggest('서'), ['서울우유', '서브웨이'])
+            self.assertEqual(self._suggest('서울'), ['서울우유'])
+
+    def test_lost_revision_bump_still_rebuilds(self):
+        """파일 캐시의 incr가 겹쳐서 두 워커의 리비전 증가가 한 번만 남아도 두 가맹점 모두 반영"""
+        from . import autocomplete
+
+        self._suggest('서')
+        with mock.patch.object(autocomplete, '_bump'):  # 다른 워커: 커밋됐지만 리비전 증가를 잃음
+            self._create('서울우유')
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create('서부식당')
+        self.assertEqual(sorted(self._suggest('서')), ['서부식당', '서브웨이', '서울우유'])
+
+    def test_rolled_back_transaction_is_not_indexed(self):
+        from django.db import transaction as db_transaction
+
+        self._suggest('서')
+        with self.captureOnCommitCallbacks(execute=True):
+            with db_transaction.atomic():
+                self._create('서울우유')
+                db_transaction.set_rollback(True)
+        self.assertEqual(self._suggest('서'), ['서브웨이'])
+
+    def test_update_delete_and_import_rebuild_index(self):
+        self.assertEqual(self._suggest('gs'), ['GS25 역삼점'])
+
+        tx = Transaction.objects.filter(user=self.user, merchant='서브웨이').first()
+        tx.merchant = 'GS편의점'
+        tx.save()
+        self.assertEqual(self._suggest('gs'), ['GS25 역삼점', 'GS편의점'])
+
+        Transaction.objects.filter(user=self.user, merchant__startswith='GS25').delete()
+        self.assertEqual(self._suggest('gs'), ['GS편의점'])
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        upload = SimpleUploadedFile('bank.csv', '거래일시,구분,금액,가맹점\n2026-01-05 10:00,출금,5000,GS칼텍스\n'.encode())
+        with override_settings(MEDIA_ROOT=media_root, TRANSACTION_IMPORT_ASYNC=False):
+            self.client.post(reverse('transactions:transaction_import'), {
+                'account': self.account.pk, 'file': upload, 'encoding': 'utf-8-sig',
+            })
+        self.assertEqual(self._suggest('gs'), ['GS칼텍스', 'GS편의점'])
+
+
+# ============================================
+# 20. 자동 분류 테스트
+# ============================================
+
+class CategorizerTest(TestCase):
+    """규칙 + 거래 내역 분류, 거래 생성/가져오기 시 자동 지정, 미분류 일괄 분류"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='sorter', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='555-1',
+        )
+        self.cafe = Category.objects.create(user=self.user, name='카페', type='OUT')
+        self.food = Category.objects.create(user=self.user, name='식비', type='OUT')
+        self.salary = Category.objects.create(user=self.user, name='급여', type='IN')
+        # 거래 내역: 서브웨이는 식비 2번, 카페 1번 → 식비
+        for category in (self.food, self.food, self.cafe):
+            self._create('서브웨이', category)
+        self._create('회사', self.salary, tx_type='IN')
+        self.client.login(username='sorter', password='testpass123')
+
+    def _create(self, merchant, category=None, tx_type='OUT', month=1, amount='1000'):
+        return Transaction.objects.create(
+            user=self.user, account=self.account, category=category, tx_type=tx_type,
+            amount=Decimal(amount), occurred_at=timezone.make_aware(datetime(2026, month, 10, 12, 0)),
+            merchant=merchant,
+        )
+
+    def _rollups(self):
+        return sorted(
+            (row.month, row.category_id or 0, row.tx_type, row.total, row.count)
+            for row in MonthlyRollup.objects.filter(user=self.user, count__gt=0)
+        )
+
+    def test_rules_then_history(self):
+        CategoryRule.objects.create(user=self.user, category=self.cafe, pattern='커피', priority=10)
+        CategoryRule.objects.create(user=self.user, category=self.food, pattern='스타벅스 커피', priority=20)
+        CategoryRule.objects.create(user=self.user, category=self.food, pattern='BURGER', match_type='startswith')
+        CategoryRule.objects.create(user=self.user, category=self.salary, pattern='환불')
+        CategoryRule.objects.create(user=self.user, category=self.cafe, pattern='회사', is_active=False)
+
+        categorizer = Categorizer(self.user.pk)
+        self.assertEqual(categorizer.suggest('스타벅스 커피', 'OUT'), self.cafe.pk)  # 우선순위
+        self.assertEqual(categorizer.suggest('burger king', 'OUT'), self.food.pk)  # 대소문자 무시
+        self.assertIsNone(categorizer.suggest('king burger', 'OUT'))
+        self.assertIsNone(categorizer.suggest('환불', 'OUT'))  # 수입 카테고리는 출금에 쓰지 않음
+        self.assertEqual(categorizer.suggest(' 서브웨이 ', 'OUT'), self.food.pk)  # 거래 내역 최다
+        self.assertIsNone(categorizer.suggest('서브웨이', 'IN'))
+        self.assertEqual(categorizer.suggest('회사', 'IN'), self.salary.pk)  # 꺼진 규칙은 무시
+        self.assertIsNone(categorizer.suggest('', 'OUT'))
+
+    def test_create_assigns_category_when_blank(self):
+        url = reverse('transactions:transaction_create')
+        data = {'account': self.account.pk, 'tx_type': 'OUT', 'amount': '8000',
+                'occurred_at': '2026-02-01T12:00', 'merchant': '서브웨이', 'memo': ''}
+        self.client.post(url, data)
+        self.client.post(url, {**data, 'merchant': '처음 가는 곳'})
+        self.client.post(url, {**data, 'category': self.cafe.pk})
+
+        created = Transaction.objects.filter(user=self.user, occurred_at__month=2).order_by('id')
+        self.assertEqual([tx.category_id for tx in created], [self.food.pk, None, self.cafe.pk])
+
+    def test_import_assigns_category_when_blank(self):
+        from .importer import RowValidator
+
+        CategoryRule.objects.create(user=self.user, category=self.cafe, pattern='스타벅스')
+        validator = RowValidator(self.user, self.account)
+        row = {'occurred_at': '2026-01-05 10:00', 'tx_type': '출금', 'amount': '5000'}
+        with self.assertNumQueries(0):
+            built = [
+                validator.build({**row, 'merchant': '스타벅스 강남점'}),
+                validator.build({**row, 'merchant': '서브웨이'}),
+                validator.build({**row, 'merchant': '서브웨이', 'category': '카페'}),
+                validator.build({**row, 'merchant': '모르는 가게'}),
+            ]
+        self.assertEqual(
+            [tx.category_id for tx in built], [self.cafe.pk, self.food.pk, self.cafe.pk, None]
+        )
+
+    def test_categorize_uncategorized_updates_rows_and_rollups(self):
+        CategoryRule.objects.create(user=self.user, category=self.cafe, pattern='스타벅스')
+        for month in (1, 2, 3):
+            self._create('스타벅스 강남점', month=month, amount='4500')
+            self._create('서브웨이', month=month, amount='7000')
+            self._create('SUBWAY', month=month)
+        unknown = self._create('모르는 가게')
+        manual = self._create('서브웨이')
+        before = manual.updated_at
+
+        result = categorize_uncategorized(self.user.pk)
+
+        self.assertEqual(result, {self.cafe.pk: 3, self.food.pk: 4})
+        self.assertEqual(Transaction.objects.filter(user=self.user, merchant='SUBWAY', category=None).count(), 3)
+        unknown.refresh_from_db()
+        manual.refresh_from_db()
+        self.assertIsNone(unknown.category_id)
+        self.assertEqual(manual.category_id, self.food.pk)
+        self.assertGreater(manual.updated_at, before)
+
+        # 증분 갱신한 월별 집계 = 처음부터 다시 계산한 집계
+        incremental = self._rollups()
+        rebuild_rollups(self.user.pk)
+        self.assertEqual(incremental, self._rollups())
+
+        # 다시 실행하면 바꿀 것이 없음
+        self.assertEqual(categorize_uncategorized(self.user.pk), {})
+
+    def test_categorize_query_count_does_not_grow_with_rows(self):
+        def run(n):
+            # bulk_create는 월별 집계를 갱신하지 않으므로 여기서는 집계 값이 아니라 쿼리 수만 봄
+            Transaction.objects.bulk_create([
+                Transaction(
+                    user=self.user, account=self.account, tx_type='OUT', amount=Decimal('1000'),
+                    occurred_at=timezone.make_aware(datetime(2026, 1, 10, 12, 0)), merchant='서브웨이',
+                )
+                for _ in range(n)
+            ])
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(categorize_uncategorized(self.user.pk), {self.food.pk: n})
+            return len(queries)
+
+        run(1)  # 처음 한 번은 월별 집계 행 생성 쿼리가 더 있음
+        # SQLite는 파라미터 수 제한으로 동기화 기록 INSERT를 166행씩 나눠 보냄 → 한 번에 들어가는 만큼만
+        self.assertEqual(run(3), run(150))
+
+    def test_rule_views_and_categorize_view(self):
+        response = self.client.post(reverse('transactions:category_rule_create'), {
+            'pattern': ' 스타벅스 ', 'match_type': 'contains', 'category': self.cafe.pk, 'priority': 10,
+        })
+        self.assertRedirects(response, reverse('transactions:category_list'))
+        rule = CategoryRule.objects.get(user=self.user)
+        self.assertEqual(rule.pattern, '스타벅스')
+
+        self._create('스타벅스 역삼점')
+        response = self.client.get(reverse('transactions:category_list'))
+        self.assertEqual(response.context['uncategorized_count'], 1)
+        self.assertEqual(list(response.context['rules']), [rule])
+
+        response = self.client.post(reverse('transactions:categorize'), follow=True)
+        self.assertContains(response, '미분류 거래 1건을 자동 분류했습니다.')
+        self.assertFalse(Transaction.objects.filter(user=self.user, category=None).exists())
+
+        # 다른 사용자의 규칙은 지울 수 없음
+        other = User.objects.create_user(username='other', password='testpass123')
+        other_rule = CategoryRule.objects.create(user=other, category=self.cafe, pattern='x')
+        response = self.client.post(reverse('transactions:category_rule_delete', args=[other_rule.pk]))
+        self.assertEqual(response.status_code, 404)
+        self.client.post(reverse('transactions:category_rule_delete', args=[rule.pk]))
+        self.assertFalse(CategoryRule.objects.filter(pk=rule.pk).exists())
+
+    def test_command_dry_run(self):
+        self._create('서브웨이')
+        out = StringIO()
+        call_command('categorize_transactions', '--dry-run', stdout=out)
+        self.assertIn('거래 1건 분류 가능', out.getvalue())
+        self.assertTrue(Transaction.objects.filter(user=self.user, category=None).exists())
+
+        call_command('categorize_transactions', '--user', str(self.user.pk), stdout=StringIO())
+        self.assertFalse(Transaction.objects.filter(user=self.user, category=None).exists())
+
+
+# ============================================
+# 21. 거래 JSON API 테스트
+# ============================================
+
+class TransactionApiTest(TestCase):
+    """목록/상세 조회, 필드 선택, 일괄 생성/수정/삭제 (잔액/월별 집계 반영, 전부 성공 또는 전부 취소)"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='apiuser', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌1', bank_name='은행', account_number='600-1', balance=Decimal('100000'),
+        )
+        self.other_account = Account.objects.create(
+            user=self.user, name='계좌2', bank_name='은행', account_number='600-2', balance=Decimal('50000'),
+        )
+        self.cafe = Category.objects.create(user=self.user, name='카페', type='OUT')
+        self.salary = Category.objects.create(user=self.user, name='급여', type='IN')
+        self.txs = [
+            Transaction.objects.create(
+                user=self.user, account=self.account, category=self.cafe, tx_type='OUT',
+                amount=Decimal('1000') * (day + 1), merchant=f'가게{day}',
+                occurred_at=timezone.make_aware(datetime(2026, 1, day + 1, 12, 0)),
+            )
+            for day in range(5)
+        ]
+        self.client.login(username='apiuser', password='testpass123')
+
+    def _batch(self, payload, query=''):
+        return self.client.post(
+            reverse('transactions:api_transaction_batch') + query,
+            data=json.dumps(payload), content_type='application/json',
+        )
+
+    def _balances(self):
+        return [
+            Account.objects.get(pk=account.pk).balance for account in (self.account, self.other_account)
+        ]
+
+    def _rollups(self):
+        return sorted(
+            (row.account_id, row.month, row.category_id or 0, row.tx_type, row.total, row.count)
+            for row in MonthlyRollup.objects.filter(user=self.user, count__gt=0)
+        )
+
+    def test_login_required(self):
+        self.client.logout()
+        response = self.client.get(reverse('transactions:api_transaction_list'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self._batch({'delete': [self.txs[0].pk]}).status_code, 401)
+
+    def test_list_filters_fields_and_cursor(self):
+        url = reverse('transactions:api_transaction_list')
+        response = self.client.get(url, {'limit': 2, 'fields': 'id,amount'})
+        data = response.json()
+        self.assertEqual(data['results'], [
+            {'id': self.txs[4].pk, 'amount': '5000.00'},
+            {'id': self.txs[3].pk, 'amount': '4000.00'},
+        ])
+        self.assertIsNone(data['previous_cursor'])
+
+        data = self.client.get(url, {'limit': 2, 'fields': 'id', 'cursor': data['next_cursor']}).json()
+        self.assertEqual([row['id'] for row in data['results']], [self.txs[2].pk, self.txs[1].pk])
+
+        # 거래 목록 화면과 같은 필터
+        data = self.client.get(url, {'start_date': '2026-01-02', 'end_date': '2026-01-03'}).json()
+        self.assertEqual([row['merchant'] for row in data['results']], ['가게2', '가게1'])
+        self.assertEqual(set(data['results'][0]), {
+            'id', 'account', 'category', 'tx_type', 'amount', 'occurred_at', 'merchant', 'memo',
+            'created_at', 'updated_at', 'version',
+        })
+        self.assertEqual(data['results'][0]['occurred_at'], '2026-01-03T12:00:00+09:00')
+
+        response = self.client.get(url, {'fields': 'id,balance'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('balance', response.json()['error'])
+
+    def test_list_selects_only_requested_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('transactions:api_transaction_list'), {'fields': 'merchant'})
+        sql = [q['sql'] for q in queries if 'transactions_transaction' in q['sql']][-1]
+        self.assertIn('merchant', sql)
+        self.assertNotIn('memo', sql)
+
+    def test_detail_only_own_transaction(self):
+        response = self.client.get(
+            reverse('transactions:api_transaction_detail', args=[self.txs[0].pk]), {'fields': 'merchant,category'}
+        )
+        self.assertEqual(response.json(), {'merchant': '가게0', 'category': self.cafe.pk})
+
+        other = User.objects.create_user(username='apiother', password='testpass123')
+        other_account = Account.objects.create(user=other, name='남', bank_name='은행', account_number='600-3')
+        other_tx = Transaction.objects.create(
+            user=other, account=other_account, tx_type='OUT', amount=Decimal('1'), occurred_at=timezone.now(),
+        )
+        response = self.client.get(reverse('transactions:api_transaction_detail', args=[other_tx.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_batch_create_update_delete(self):
+        response = self._batch({
+            'create': [
+                {'account': self.account.pk, 'tx_type': 'OUT', 'amount': '3000',
+                 'occurred_at': '2026-02-01T09:00:00+09:00', 'merchant': '가게0'},
+                {'account': self.other_account.pk, 'tx_type': 'IN', 'amount': '20000',
+                 'occurred_at': '2026-02-02T09:00:00+09:00', 'category': self.salary.pk},
+            ],
+            'update': [
+                {'id': self.txs[1].pk, 'amount': '500'},
+                {'id': self.txs[2].pk, 'account': self.other_account.pk, 'memo': '계좌 이동'},
+            ],
+            'delete': [self.txs[3].pk],
+        }, query='?fields=id,account,category,amount')
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()
+
+        # 카테고리를 생략한 생성은 자동 분류 (가게0 → 카페)
+        self.assertEqual([row['category'] for row in data['created']], [self.cafe.pk, self.salary.pk])
+        self.assertEqual(data['updated'][0], {
+            'id': self.txs[1].pk, 'account': self.account.pk, 'category': self.cafe.pk, 'amount': '500.00',
+        })
+        self.assertEqual(data['deleted'], [self.txs[3].pk])
+        self.assertFalse(Transaction.objects.filter(pk=self.txs[3].pk).exists())
+        moved = Transaction.objects.get(pk=self.txs[2].pk)
+        self.assertEqual((moved.account_id, moved.memo), (self.other_account.pk, '계좌 이동'))
+
+        # 계좌1: 85000(setUp 거래 반영 후) - 3000(생성) + 1500(2000→500) + 3000(이동) + 4000(삭제)
+        # 계좌2: 50000 + 20000(생성) - 3000(이동)
+        self.assertEqual(self._balances(), [Decimal('90500'), Decimal('67000')])
+        incremental = self._rollups()
+        rebuild_rollups(self.user.pk)
+        self.assertEqual(incremental, self._rollups())
+
+    def test_batch_updates_each_balance_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self._batch({
+                'create': [
+                    {'account': self.account.pk, 'tx_type': 'OUT', 'amount': '100',
+                     'occurred_at': '2026-01-20T09:00:00+09:00', 'category': self.cafe.pk}
+                    for _ in range(20)
+                ],
+                'delete': [tx.pk for tx in self.txs],
+            })
+        self.assertEqual(response.status_code, 200)
+        balance_updates = [
+            q['sql'] for q in queries
+            if q['sql'].startswith('UPDATE') and 'accounts_account' in q['sql']
+        ]
+        self.assertEqual(len(balance_updates), 1)
+        self.assertEqual(self._balances()[0], Decimal('85000') + Decimal('15000') - Decimal('2000'))
+
+    def test_batch_checkpoint_queries_do_not_grow_with_days(self):
+        """체크포인트 갱신 쿼리 수는 날짜 수와 무관 (확인 + 직전값 조회 + bulk_create + 계좌별 UPDATE)"""
+        def checkpoint_queries(days):
+            with CaptureQueriesContext(connection) as queries:
+                response = self._batch({'create': [
+                    {'account': self.account.pk, 'tx_type': 'IN', 'amount': '10',
+                     'occurred_at': f'2026-{month:02d}-{day:02d}T09:00:00+09:00', 'category': self.salary.pk}
+                    for month, day in days
+                ]})
+            self.assertEqual(response.status_code, 200, response.content)
+            return [q['sql'] for q in queries if 'transactions_dailybalance' in q['sql']]
+
+        few = checkpoint_queries([(3, day) for day in range(1, 3)])
+        many = checkpoint_queries([(4, day) for day in range(1, 21)] + [(1, 3), (1, 4)])
+        self.assertEqual(len(few), 4)
+        self.assertEqual(len(many), len(few))
+
+        incremental = list(DailyBalance.objects.filter(account=self.account).values_list(
+            'date', 'net_amount', 'running_total'
+        ))
+        rebuild_checkpoints(self.account.pk)
+        self.assertEqual(incremental, list(DailyBalance.objects.filter(account=self.account).values_list(
+            'date', 'net_amount', 'running_total'
+        )))
+
+    def test_batch_is_all_or_nothing(self):
+        before = (self._balances(), self._rollups(), Transaction.objects.count())
+        response = self._batch({
+            'create': [
+                {'account': self.account.pk, 'tx_type': 'OUT', 'amount': '100',
+                 'occurred_at': '2026-01-20T09:00:00+09:00'},
+                {'account': self.account.pk, 'tx_type': 'OUT', 'amount': '-5',
+                 'occurred_at': '2026-01-20T09:00:00+09:00', 'balance': 1},
+                {'account': self.account.pk, 'tx_type': 'OUT', 'amount': '100',
+                 'occurred_at': '2026-01-20T09:00:00+09:00', 'category': self.salary.pk},
+            ],
+            'update': [{'id': self.txs[0].pk, 'amount': '1'}, {'amount': '1'}],
+            'delete': [self.txs[0].pk, 999999],
+        })
+        self.assertEqual(response.status_code, 400)
+        errors = {(error['op'], error['index']): error['errors'] for error in response.json()['errors']}
+        self.assertEqual(set(errors), {('create', 1), ('create', 2), ('update', 1), ('delete', 0), ('delete', 1)})
+        self.assertEqual(set(errors[('create', 1)]), {'amount', 'balance'})
+        self.assertIn('category', errors[('create', 2)])
+        self.assertEqual(before, (self._balances(), self._rollups(), Transaction.objects.count()))
+        self.assertEqual(Transaction.objects.get(pk=self.txs[0].pk).amount, Decimal('1000'))
+
+    def test_batch_limit_and_bad_payload(self):
+        from .api import BATCH_LIMIT
+
+        ids = [tx.pk for tx in self.txs]
+        response = self._batch({'delete': ids, 'update': [{'id': 0}] * (BATCH_LIMIT - len(ids) + 1)})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(f'최대 {BATCH_LIMIT}개', response.json()['error'])
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 5)
+
+        self.assertEqual(self._batch({}).status_code, 400)
+        self.assertEqual(self._batch({'create': {}}).status_code, 400)
+        response = self.client.post(
+            reverse('transactions:api_transaction_batch'), data='{', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+# ============================================
+# 22. 증분 동기화 (sync.py) 테스트
+# ============================================
+
+class SyncTest(TestCase):
+    """변경 번호 커서, 툼스톤, 일괄 변경 경로의 기록, 오래된 커서 reset"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='syncer', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='700-1', balance=Decimal('10000'),
+        )
+        self.cafe = Category.objects.create(user=self.user, name='카페', type='OUT')
+        self.txs = [self._create(f'가게{i}') for i in range(3)]
+        self.client.login(username='syncer', password='testpass123')
+
+    def _create(self, merchant, account=None, category=None):
+        return Transaction.objects.create(
+            user=self.user, account=account or self.account, category=category or self.cafe, tx_type='OUT',
+            amount=Decimal('1000'), occurred_at=timezone.make_aware(datetime(2026, 1, 10, 12, 0)),
+            merchant=merchant,
+        )
+
+    def _sync(self, cursor=None, **params):
+        if cursor:
+            params['cursor'] = cursor
+        response = self.client.get(reverse('transactions:api_sync'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_initial_then_incremental(self):
+        shared = Category.objects.create(name='공통', type='BOTH')
+        data = self._sync()
+        self.assertEqual([tx['id'] for tx in data['transactions']], [tx.pk for tx in self.txs])
+        self.assertEqual(data['accounts'][0]['balance'], '7000.00')
+        self.assertEqual(data['accounts'][0]['account_number'], '***00-1')
+        self.assertEqual(
+            {(c['name'], c['shared']) for c in data['categories']}, {('카페', False), ('공통', True)}
+        )
+        self.assertFalse(data['has_more'])
+        cursor = data['cursor']
+
+        # 바뀐 것이 없으면 빈 응답, 커서 그대로
+        data = self._sync(cursor)
+        self.assertEqual((data['transactions'], data['accounts'], data['cursor']), ([], [], cursor))
+
+        self.txs[0].memo = '수정'
+        self.txs[0].save()
+        removed = self.txs[1].pk
+        self.txs[1].delete()
+        shared.name = '공통2'
+        shared.save()
+
+        data = self._sync(cursor)
+        self.assertEqual([(tx['id'], tx['memo']) for tx in data['transactions']], [(self.txs[0].pk, '수정')])
+        self.assertEqual(data['deleted']['transactions'], [removed])
+        self.assertEqual([a['balance'] for a in data['accounts']], ['8000.00'])  # 삭제로 잔액 복원
+        self.assertEqual([c['name'] for c in data['categories']], ['공통2'])
+
+        # 다른 사용자의 변경은 보이지 않음 (공통 카테고리만 공유)
+        other = User.objects.create_user(username='other-sync', password='testpass123')
+        other_account = Account.objects.create(user=other, name='남', bank_name='은행', account_number='700-2')
+        Transaction.objects.create(
+            user=other, account=other_account, tx_type='IN', amount=Decimal('1'), occurred_at=timezone.now(),
+        )
+        self.assertEqual(self._sync(data['cursor'])['transactions'], [])
+
+    def test_paging_and_query_count_independent_of_data_size(self):
+        data = self._sync(limit=2)
+        self.assertTrue(data['has_more'])
+        seen = len(data['transactions']) + len(data['accounts']) + len(data['categories'])
+        while data['has_more']:
+            data = self._sync(data['cursor'], limit=2)
+            seen += len(data['transactions']) + len(data['accounts']) + len(data['categories'])
+        self.assertEqual(seen, 5)  # 거래 3 + 계좌 1 + 카테고리 1
+        cursor = data['cursor']
+
+        def changed_after(n):
+            nonlocal cursor
+            Transaction.objects.bulk_create([
+                Transaction(user=self.user, account=self.account, tx_type='OUT', amount=Decimal('1'),
+                            occurred_at=timezone.now())
+                for _ in range(n)
+            ])  # 동기화 기록 없이 데이터만 늘림
+            self._create('바뀐 거래')
+            with CaptureQueriesContext(connection) as queries:
+                data = self._sync(cursor)
+            self.assertEqual([tx['merchant'] for tx in data['transactions']], ['바뀐 거래'])
+            cursor = data['cursor']
+            return len(queries)
+
+        self.assertEqual(changed_after(1), changed_after(500))
+
+    def test_account_and_category_deletion_tombstones(self):
+        cursor = self._sync()['cursor']
+        other_account = Account.objects.create(
+            user=self.user, name='계좌2', bank_name='은행', account_number='700-3',
+        )
+        on_other = [self._create('다른 계좌', account=other_account) for _ in range(2)]
+        cursor = self._sync(cursor)['cursor']
+
+        account_id, category_id = other_account.pk, self.cafe.pk
+        other_account.delete()
+        self.cafe.delete()
+        data = self._sync(cursor)
+        self.assertEqual(data['deleted']['accounts'], [account_id])
+        self.assertEqual(sorted(data['deleted']['transactions']), [tx.pk for tx in on_other])
+        self.assertEqual(data['deleted']['categories'], [category_id])
+        # 카테고리가 지워진 거래는 미분류로 바뀐 값이 내려감
+        self.assertEqual(
+            sorted((tx['id'], tx['category']) for tx in data['transactions']),
+            [(tx.pk, None) for tx in self.txs],
+        )
+
+    def test_batch_import_and_categorize_are_recorded(self):
+        cursor = self._sync()['cursor']
+        response = self.client.post(
+            reverse('transactions:api_transaction_batch'), content_type='application/json',
+            data=json.dumps({
+                'create': [{'account': self.account.pk, 'tx_type': 'OUT', 'amount': '10',
+                            'occurred_at': '2026-02-01T09:00:00+09:00', 'merchant': '새 가게'}],
+                'delete': [self.txs[0].pk],
+            }),
+        )
+        self.assertEqual(response.status_code, 200)
+        created = response.json()['created'][0]['id']
+        data = self._sync(cursor)
+        self.assertEqual([tx['id'] for tx in data['transactions']], [created])
+        self.assertEqual(data['deleted']['transactions'], [self.txs[0].pk])
+        self.assertEqual(len(data['accounts']), 1)
+
+        # 미분류 일괄 분류 (UPDATE로 바뀐 행)
+        cursor = data['cursor']
+        uncategorized = Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT', amount=Decimal('1'),
+            occurred_at=timezone.now(), merchant='가게2',
+        )
+        cursor = self._sync(cursor)['cursor']
+        categorize_uncategorized(self.user.pk)
+        data = self._sync(cursor)
+        self.assertEqual([(tx['id'], tx['category']) for tx in data['transactions']],
+                         [(uncategorized.pk, self.cafe.pk)])
+
+        # CSV 가져오기 (bulk_create)
+        from .importer import RowValidator, import_batch
+
+        cursor = data['cursor']
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with override_settings(MEDIA_ROOT=media_root):
+            job = ImportJob.objects.create(
+                user=self.user, account=self.account, file=SimpleUploadedFile('a.csv', b''), original_name='a.csv',
+            )
+        row = {'occurred_at': '2026-01-05 10:00', 'tx_type': '출금', 'amount': '5000', 'merchant': '가져온 거래'}
+        import_batch(job, RowValidator(self.user, self.account), [(2, row)])
+        data = self._sync(cursor)
+        self.assertEqual([tx['merchant'] for tx in data['transactions']], ['가져온 거래'])
+        self.assertEqual(len(data['accounts']), 1)
+
+    def test_pruned_tombstones_reset_old_cursor(self):
+        from .models import SyncChange
+
+        old_cursor = self._sync()['cursor']
+        self.txs[0].delete()
+        recent_cursor = self._sync(old_cursor)['cursor']
+        self.txs[1].delete()
+
+        # 첫 번째 툼스톤만 보관 기간이 지난 것으로
+        SyncChange.objects.filter(deleted=True, seq__lte=int(recent_cursor.split('.')[0])).update(
+            changed_at=timezone.now() - timedelta(days=100)
+        )
+        out = StringIO()
+        call_command('prune_sync_tombstones', stdout=out)
+        self.assertIn('툼스톤 1개 삭제', out.getvalue())
+
+        self.assertTrue(self._sync(old_cursor)['reset'])
+        data = self._sync(recent_cursor)
+        self.assertFalse(data['reset'])
+        self.assertEqual(len(data['deleted']['transactions']), 1)
+
+    def test_backfill_errors_and_user_deletion(self):
+        from .models import SyncChange
+
+        SyncChange.objects.all().delete()
+        self.assertEqual(self._sync()['transactions'], [])
+        call_command('backfill_sync_changes', stdout=StringIO())
+        self.assertEqual(len(self._sync()['transactions']), 3)
+
+        self.assertEqual(self.client.get(reverse('transactions:api_sync'), {'cursor': 'abc'}).status_code, 400)
+        self.assertTrue(self._sync('999999.0')['reset'])  # 카운터보다 앞선 커서
+
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('transactions:api_sync')).status_code, 401)
+
+        # 사용자 삭제: 변경 기록도 함께 지워짐 (툼스톤을 남기지 않음)
+        self.user.delete()
+        self.assertFalse(SyncChange.objects.filter(user_id=self.user.pk).exists())
+
+
+# ============================================
+# 23. 멱등 키 (idempotency.py) 테스트
+# ============================================
+
+class IdempotencyTest(TestCase):
+    """같은 키로 다시 온 거래 생성 요청은 처음 결과를 그대로 (거래/잔액 변경 없음)"""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='retry', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='800-1', balance=Decimal('10000'),
+        )
+        self.client.login(username='retry', password='testpass123')
+        self.url = reverse('transactions:transaction_create')
+        self.data = {
+            'account': self.account.pk, 'tx_type': 'OUT', 'amount': '3000',
+            'occurred_at': '2026-02-01T12:00', 'merchant': '가게', 'memo': '',
+        }
+
+    def _balance(self):
+        return Account.objects.get(pk=self.account.pk).balance
+
+    def test_form_renders_key_and_repeated_submit_creates_once(self):
+        key = self.client.get(self.url).context['idempotency_key']
+        self.assertNotEqual(key, self.client.get(self.url).context['idempotency_key'])  # 화면마다 새 키
+
+        with self.captureOnCommitCallbacks(execute=True):  # 커밋 후 캐시에 저장
+            first = self.client.post(self.url, {**self.data, 'idempotency_key': key})
+        self.assertRedirects(first, reverse('transactions:transaction_list'), fetch_redirect_response=False)
+        # 재전송: 세션/사용자 조회 외에 DB를 건드리지 않음
+        with self.assertNumQueries(2):
+            second = self.client.post(self.url, {**self.data, 'idempotency_key': key})
+        self.assertEqual((second.status_code, second['Location']), (first.status_code, first['Location']))
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(self._balance(), Decimal('7000'))
+
+    def test_replay_from_table_when_cache_is_empty(self):
+        from django.core.cache import cache
+
+        self.client.post(self.url, {**self.data, 'idempotency_key': 'k1'})
+        cache.clear()
+        response = self.client.post(self.url, {**self.data, 'idempotency_key': 'k1'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+
+    def test_invalid_form_keeps_key_and_changed_resubmit_is_rejected(self):
+        response = self.client.post(self.url, {**self.data, 'amount': '-1', 'idempotency_key': 'k2'})
+        self.assertEqual(response.context['idempotency_key'], 'k2')  # 저장 안 됨 → 같은 키 유지
+        self.client.post(self.url, {**self.data, 'idempotency_key': 'k2'})
+
+        # 저장 후 뒤로 가기 → 금액을 바꿔 같은 화면(키)으로 다시 제출
+        response = self.client.post(self.url, {**self.data, 'amount': '5000', 'idempotency_key': 'k2'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '이미 저장된 입력 화면입니다')
+        self.assertNotEqual(response.context['idempotency_key'], 'k2')
+        self.assertEqual(self._balance(), Decimal('7000'))
+
+        # 다른 사용자는 같은 키를 써도 별개
+        User.objects.create_user(username='retry2', password='testpass123')
+        other = Client()
+        other.login(username='retry2', password='testpass123')
+        other_account = Account.objects.create(
+            user=User.objects.get(username='retry2'), name='계좌', bank_name='은행', account_number='800-2',
+        )
+        other.post(self.url, {**self.data, 'account': other_account.pk, 'idempotency_key': 'k2'})
+        self.assertEqual(Transaction.objects.filter(account=other_account).count(), 1)
+
+    def test_api_batch_with_idempotency_key(self):
+        url = reverse('transactions:api_transaction_batch')
+        body = json.dumps({'create': [{
+            'account': self.account.pk, 'tx_type': 'OUT', 'amount': '1000',
+            'occurred_at': '2026-02-01T09:00:00+09:00',
+        }]})
+
+        def post(payload=body, key='batch-1'):
+            return self.client.post(url, data=payload, content_type='application/json', HTTP_IDEMPOTENCY_KEY=key)
+
+        first = post()
+        second = post()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['Content-Type'], 'application/json')
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(self._balance(), Decimal('9000'))
+
+        self.assertEqual(post(body.replace('1000', '2000')).status_code, 422)
+        self.assertEqual(post(key='a b').status_code, 400)
+        self.assertEqual(post(key='batch-2').status_code, 200)  # 새 키 → 새로 처리
+        self.assertEqual(self._balance(), Decimal('8000'))
+
+    def test_expired_key_is_processed_again_and_purged(self):
+        from django.core.cache import cache
+        from .models import IdempotencyKey
+
+        self.client.post(self.url, {**self.data, 'idempotency_key': 'k3'})
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        cache.clear()
+        self.client.post(self.url, {**self.data, 'idempotency_key': 'k3'})
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        out = StringIO()
+        call_command('purge_idempotency_keys', stdout=out)
+        self.assertIn('멱등 키 1개 삭제', out.getvalue())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL 전용 (동시 요청)')
+class IdempotencyConcurrencyTest(TransactionTestCase):
+    """같은 키로 동시에 들어온 요청 중 하나만 거래를 만들고 나머지는 같은 응답"""
+
+    THREADS = 6
+
+    def test_concurrent_retries_create_once(self):
+        user = User.objects.create_user(username='burst', password='testpass123')
+        account = Account.objects.create(
+            user=user, name='계좌', bank_name='은행', account_number='800-3', balance=Decimal('10000'),
+        )
+        body = json.dumps({'create': [{
+            'account': account.pk, 'tx_type': 'OUT', 'amount': '1000',
+            'occurred_at': '2026-02-01T09:00:00+09:00',
+        }]})
+        barrier = threading.Barrier(self.THREADS)
+        results, errors = [], []
+
+        def worker():
+            try:
+                client = Client()
+                client.force_login(user)
+                barrier.wait()
+                response = client.post(
+                    reverse('transactions:api_transaction_batch'), data=body,
+                    content_type='application/json', HTTP_IDEMPOTENCY_KEY='same',
+                )
+                results.append((response.status_code, response.json()))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len({json.dumps(result) for result in results}), 1)
+        self.assertEqual(Transaction.objects.filter(user=user).count(), 1)
+        account.refresh_from_db()
+        self.assertEqual(account.balance, Decimal('9000'))
+
+
+# ============================================
+# 24. 낙관적 동시성 제어 (버전 컬럼) 테스트
+# ============================================
+
+class OptimisticConcurrencyTest(TestCase):
+    """화면/인스턴스를 읽은 뒤 다른 곳에서 먼저 수정된 거래는 저장하지 않음"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='editor', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='900-1', balance=Decimal('10000'),
+        )
+        self.category = Category.objects.create(user=self.user, name='식비', type='OUT')
+        self.tx = Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT', amount=Decimal('1000'),
+            occurred_at=timezone.now(), merchant='가게',
+        )
+        self.client.login(username='editor', password='testpass123')
+
+    def _balance(self):
+        return Account.objects.get(pk=self.account.pk).balance
+
+    def test_save_bumps_version_and_stale_instance_is_rejected(self):
+        from accountbook_project.versioning import StaleObjectError
+
+        self.assertEqual(self.tx.version, 1)
+        stale = Transaction.objects.get(pk=self.tx.pk)
+        self.tx.amount = Decimal('2000')
+        self.tx.save()
+        self.assertEqual(self.tx.version, 2)
+
+        stale.amount = Decimal('5000')
+        with self.assertRaises(StaleObjectError):
+            stale.save()
+        self.tx.refresh_from_db()
+        self.assertEqual((self.tx.amount, self.tx.version), (Decimal('2000'), 2))
+        self.assertEqual(self._balance(), Decimal('8000'))  # 잔액도 한 번만 반영
+
+        self.tx.save(update_fields=['memo'])  # 일부 필드만 저장해도 버전은 올림
+        self.assertEqual(Transaction.objects.get(pk=self.tx.pk).version, 3)
+
+    def test_save_after_concurrent_delete_is_rejected(self):
+        """읽은 뒤 다른 곳에서 삭제된 거래를 저장해도 다시 INSERT하지 않음 (잔액/체크포인트/집계 이중 반영 방지)"""
+        from accountbook_project.versioning import StaleObjectError
+
+        stale = Transaction.objects.get(pk=self.tx.pk)
+        Transaction.objects.get(pk=self.tx.pk).delete()
+        self.assertEqual(self._balance(), Decimal('10000'))
+
+        stale.amount = Decimal('3000')
+        with self.assertRaises(StaleObjectError):
+            stale.save()
+        self.assertFalse(Transaction.objects.filter(pk=self.tx.pk).exists())
+        self.assertEqual(self._balance(), Decimal('10000'))
+        self.assertFalse(DailyBalance.objects.exclude(net_amount=0).exists())
+        self.assertFalse(MonthlyRollup.objects.filter(count__gt=0).exists())
+
+        # 기존 값을 읽은 직후 삭제되는 경우 (UPDATE가 0행)
+        tx = Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT', amount=Decimal('1000'),
+            occurred_at=timezone.now(),
+        )
+        original = QuerySet.first
+        deleted = []
+
+        def first_then_delete(queryset):
+            row = original(queryset)
+            if queryset.model is Transaction and not deleted:
+                deleted.append(tx.pk)
+                Transaction.objects.get(pk=tx.pk).delete()
+            return row
+
+        tx.amount = Decimal('3000')
+        with mock.patch.object(QuerySet, 'first', first_then_delete):
+            with self.assertRaises(StaleObjectError):
+                tx.save()
+        # 삭제도 save()의 atomic 블록 안에서 일어났으므로 함께 롤백 → 저장 전 상태 그대로
+        self.assertEqual(deleted, [tx.pk])
+        self.assertEqual(Transaction.objects.get(pk=tx.pk).amount, Decimal('1000'))
+        self.assertEqual(self._balance(), Decimal('9000'))
+        incremental = list(DailyBalance.objects.exclude(net_amount=0).values_list('date', 'net_amount', 'running_total'))
+        rebuild_checkpoints(self.account.pk)
+        self.assertEqual(incremental, list(DailyBalance.objects.values_list('date', 'net_amount', 'running_total')))
+
+    def test_update_view_conflict_returns_409_with_latest_values(self):
+        url = reverse('transactions:transaction_update', kwargs={'pk': self.tx.pk})
+        version = self.client.get(url).context['version']
+        data = {
+            'account': self.account.pk, 'tx_type': 'OUT', 'amount': '3000',
+            'occurred_at': '2026-02-01T12:00', 'merchant': '늦은 수정', 'memo': '', 'version': version,
+        }
+        other = Transaction.objects.get(pk=self.tx.pk)  # 다른 화면에서 먼저 저장
+        other.amount = Decimal('1500')
+        other.save()
+
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, '다른 곳에서 먼저 수정되었습니다', status_code=409)
+        self.assertEqual(response.context['form']['amount'].value(), Decimal('1500.00'))
+        self.tx.refresh_from_db()
+        self.assertEqual((self.tx.amount, self.tx.merchant), (Decimal('1500'), '가게'))
+        self.assertEqual(self._balance(), Decimal('8500'))
+
+        # 최신 버전으로 다시 저장하면 반영, 검증 오류로 다시 보여 줄 때는 보낸 버전 유지
+        response = self.client.post(url, {**data, 'amount': '-1', 'version': response.context['version']})
+        self.assertEqual(response.context['version'], self.tx.version)
+        response = self.client.post(url, {**data, 'version': self.tx.version})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self._balance(), Decimal('7000'))
+
+    def test_bulk_writes_bump_versions(self):
+        # 미분류 일괄 분류
+        Transaction.objects.create(
+            user=self.user, account=self.account, category=self.category, tx_type='OUT',
+            amount=Decimal('100'), occurred_at=timezone.now(), merchant='가게',
+        )
+        categorize_uncategorized(self.user.pk)
+        self.assertEqual(Transaction.objects.get(pk=self.tx.pk).version, 2)
+
+        # 카테고리 삭제 → 미분류 (SET_NULL)
+        self.category.delete()
+        self.assertEqual(Transaction.objects.get(pk=self.tx.pk).version, 3)
+
+        # 거래 반영으로 잔액만 바뀐 계좌는 버전 유지 (열어 둔 계좌 수정 화면이 충돌하지 않도록)
+        version = Account.objects.get(pk=self.account.pk).version
+        Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='IN', amount=Decimal('1'), occurred_at=timezone.now(),
+        )
+        self.assertEqual(Account.objects.get(pk=self.account.pk).version, version)
+
+    def test_api_batch_update_checks_version(self):
+        url = reverse('transactions:api_transaction_batch')
+
+        def post(item):
+            return self.client.post(url, data=json.dumps({'update': [item]}), content_type='application/json')
+
+        response = post({'id': self.tx.pk, 'amount': '2000', 'version': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'][0]['version'], 2)
+
+        response = post({'id': self.tx.pk, 'amount': '3000', 'version': 1})
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('version', response.json()['errors'][0]['errors'])
+        self.assertEqual(post({'id': self.tx.pk, 'version': '2'}).status_code, 400)
+        self.assertEqual(post({'id': self.tx.pk, 'memo': '버전 없이'}).status_code, 200)  # 확인하지 않음
+
+        self.tx.refresh_from_db()
+        self.assertEqual((self.tx.amount, self.tx.version), (Decimal('2000'), 3))
+        self.assertEqual(self._balance(), Decimal('8000'))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL 전용 (동시 수정)')
+class OptimisticConcurrencyRaceTest(TransactionTestCase):
+    """같은 버전을 읽은 여러 요청이 동시에 저장해도 하나만 성공하고 잔액은 그 하나만 반영"""
+
+    THREADS = 6
+
+    def test_concurrent_saves_of_same_version(self):
+        from accountbook_project.versioning import StaleObjectError
+
+        user = User.objects.create_user(username='racer', password='testpass123')
+        account = Account.objects.create(
+            user=user, name='계좌', bank_name='은행', account_number='900-2', balance=Decimal('10000'),
+        )
+        tx = Transaction.objects.create(
+            user=user, account=account, tx_type='OUT', amount=Decimal('1000'), occurred_at=timezone.now(),
+        )
+        barrier = threading.Barrier(self.THREADS)
+        saved, stale, errors = [], [], []
+
+        def worker(amount):
+            try:
+                mine = Transaction.objects.get(pk=tx.pk)
+                mine.amount = amount
+                barrier.wait()
+                mine.save()
+                saved.append(amount)
+            except StaleObjectError:
+                stale.append(amount)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(Decimal(100 * (i + 1)),)) for i in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual((len(saved), len(stale)), (1, self.THREADS - 1))
+        tx.refresh_from_db()
+        account.refresh_from_db()
+        self.assertEqual((tx.amount, tx.version), (saved[0], 2))
+        self.assertEqual(account.balance, Decimal('10000') - saved[0])
+
+
+# ============================================
+# 25. 영수증 썸네일 (thumbnails.py) 테스트
+# ============================================
+
+class TempMediaRootMixin:
+    """
+    영수증 테스트 공통: 테스트마다 임시 MEDIA_ROOT, 썸네일 생성/파일 삭제는 작업 스레드 없이 바로
+    - media_settings: 함께 바꿀 설정 (클래스마다 덮어씀)
+    - _attachment()는 self.user / self.account로 거래 + 첨부파일을 만듦
+    """
+    media_settings = {'RECEIPT_THUMBNAIL_ASYNC': False, 'RECEIPT_DELETE_ASYNC': False}
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, **self.media_settings)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _image(self, size=(400, 300), color='white', fmt='JPEG', mode='RGB', **save_options):
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new(mode, size, color).save(buffer, fmt, **save_options)
+        return buffer.getvalue()
+
+    def _attachment(self, content, name='r.jpg', content_type='image/jpeg', user=None, original_name=None):
+        """거래 하나에 첨부파일 하나 (썸네일 생성 결과까지 읽어 옴)"""
+        user = user or self.user
+        account = self.account if user == self.user else Account.objects.create(
+            user=user, name='계좌', bank_name='은행', account_number=f'receipts-{user.pk}',
+        )
+        tx = Transaction.objects.create(
+            user=user, account=account, tx_type='OUT', amount=Decimal('1'), occurred_at=timezone.now(),
+        )
+        attachment = Attachment.objects.create(
+            user=user, transaction=tx, file=SimpleUploadedFile(name, content),
+            original_name=original_name or name, size=len(content), content_type=content_type,
+        )
+        attachment.refresh_from_db()
+        return attachment
+
+    def _exists(self, name):
+        from django.core.files.storage import default_storage
+
+        return default_storage.exists(name)
+
+
+class ReceiptThumbnailTest(TempMediaRootMixin, TestCase):
+    """업로드한 영수증 이미지의 크기별 썸네일(WebP + JPEG) 생성/사용/정리"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.user = User.objects.create_user(username='receipts', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='700-1', balance=Decimal('10000'),
+        )
+        self.tx = Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT', amount=Decimal('1000'), occurred_at=timezone.now(),
+        )
+        self.client.login(username='receipts', password='testpass123')
+
+    def _open(self, name):
+        from django.core.files.storage import default_storage
+        from PIL import Image
+
+        with default_storage.open(name) as fp:
+            image = Image.open(fp)
+            return image.format, image.size
+
+    def test_upload_generates_sizes_next_to_original(self):
+        response = self.client.post(
+            reverse('transactions:attachment_upload', kwargs={'pk': self.tx.pk}),
+            {'file': SimpleUploadedFile('receipt.jpg', self._image((2000, 1000)), content_type='image/jpeg')},
+        )
+        self.assertEqual(response.status_code, 302)
+        attachment = Attachment.objects.get(transaction=self.tx)
+        self.assertEqual(attachment.thumbnail_status, 'DONE')
+        root = attachment.file.name.rsplit('.', 1)[0]
+        self.assertEqual(attachment.thumbnails['small']['webp'], f'{root}.small.webp')
+        self.assertEqual(self._open(attachment.thumbnails['medium']['webp']), ('WEBP', (800, 400)))
+        self.assertEqual(self._open(attachment.thumbnails['medium']['jpeg']), ('JPEG', (800, 400)))
+        self.assertEqual(self._open(attachment.thumbnails['small']['jpeg']), ('JPEG', (200, 100)))
+
+        # 거래 상세: 썸네일을 미리보기로, 원본은 클릭/다운로드
+        response = self.client.get(reverse('transactions:transaction_detail', kwargs={'pk': self.tx.pk}))
+        self.assertContains(response, f'<source type="image/webp" srcset="{attachment.preview["webp"]}">', html=False)
+        self.assertContains(response, f'src="{attachment.preview["jpeg"]}"')
+        self.assertNotContains(response, f'<img src="{attachment.file.url}"')
+
+        # 관리자 미리보기: 작은 썸네일
+        from dashboard.admin import DashboardAttachmentAdmin
+        from django.contrib.admin.sites import site
+
+        preview = DashboardAttachmentAdmin(Attachment, site).file_preview(attachment)
+        self.assertIn(attachment.small_preview['webp'], preview)
+        self.assertIn('width="200"', preview)
+
+    def test_exif_rotation_transparency_and_no_upscaling(self):
+        from PIL import Image
+
+        exif = Image.Exif()
+        exif[0x0112] = 6  # 90도 회전해서 봐야 하는 휴대폰 사진
+        attachment = self._attachment(self._image((300, 100), exif=exif.tobytes()))
+        png = self._attachment(self._image((50, 40), fmt='PNG', mode='RGBA'), 'scan.png', 'image/png')
+        from .thumbnails import generate_thumbnails
+
+        self.assertEqual(generate_thumbnails(attachment.pk), 'DONE')
+        self.assertEqual(generate_thumbnails(png.pk), 'DONE')
+        attachment.refresh_from_db()
+        png.refresh_from_db()
+        self.assertEqual(self._open(attachment.thumbnails['medium']['jpeg']), ('JPEG', (100, 300)))
+        self.assertEqual(self._open(attachment.thumbnails['small']['jpeg']), ('JPEG', (67, 200)))
+        self.assertEqual(self._open(png.thumbnails['medium']['jpeg']), ('JPEG', (50, 40)))
+
+    def test_non_image_and_broken_image(self):
+        from .thumbnails import generate_thumbnails
+
+        pdf = self._attachment(b'%PDF-1.4', 'r.pdf', 'application/pdf')
+        self.assertEqual((pdf.thumbnail_status, pdf.preview), ('NONE', None))
+        broken = self._attachment(b'not an image')
+        with self.assertLogs('transactions.thumbnails', 'WARNING'):
+            self.assertEqual(generate_thumbnails(broken.pk), 'FAILED')
+        broken.refresh_from_db()
+        self.assertEqual((broken.thumbnail_status, broken.thumbnails), ('FAILED', {}))
+
+        # 썸네일이 없으면 원본으로 미리보기
+        response = self.client.get(reverse('transactions:transaction_detail', kwargs={'pk': broken.transaction_id}))
+        self.assertContains(response, f'<img src="{broken.file.url}"')
+
+    def test_delete_removes_thumbnails(self):
+        from django.core.files.storage import default_storage
+        from .thumbnails import generate_thumbnails
+
+        attachment = self._attachment(self._image())
+        generate_thumbnails(attachment.pk)
+        attachment.refresh_from_db()
+        names = [attachment.file.name] + [
+            entry[fmt] for entry in attachment.thumbnails.values() for fmt in ('webp', 'jpeg')
+        ]
+        self.assertEqual(len(names), 5)
+        with self.captureOnCommitCallbacks(execute=True):  # 파일은 커밋 후 삭제 (storage.py)
+            attachment.delete()
+        self.assertFalse(any(default_storage.exists(name) for name in names))
+
+    def test_upload_schedules_after_commit_when_async(self):
+        with override_settings(RECEIPT_THUMBNAIL_ASYNC=True):
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                self.client.post(
+                    reverse('transactions:attachment_upload', kwargs={'pk': self.tx.pk}),
+                    {'file': SimpleUploadedFile('receipt.jpg', self._image(), content_type='image/jpeg')},
+                )
+        self.assertEqual(len(callbacks), 1)  # 응답 전에는 만들지 않음
+        self.assertEqual(Attachment.objects.get(transaction=self.tx).thumbnail_status, 'PENDING')
+
+    def test_backfill_command(self):
+        done = self._attachment(self._image())
+        legacy = self._attachment(self._image())
+        broken = self._attachment(b'not an image')
+        pdf = self._attachment(b'%PDF-1.4', 'r.pdf', 'application/pdf')
+        Attachment.objects.filter(pk=pdf.pk).update(thumbnail_status='PENDING')  # 기능 도입 이전 행
+        from .thumbnails import generate_thumbnails
+        generate_thumbnails(done.pk)
+
+        out = StringIO()
+        with self.assertLogs('transactions.thumbnails', 'WARNING'):
+            call_command('backfill_thumbnails', '--workers', '1', stdout=out)
+        self.assertIn('영수증 2개 중 1개 생성, 1개 실패', out.getvalue())
+        statuses = dict(Attachment.objects.values_list('pk', 'thumbnail_status'))
+        self.assertEqual(
+            [statuses[a.pk] for a in (done, legacy, broken, pdf)], ['DONE', 'DONE', 'FAILED', 'NONE']
+        )
+
+        out = StringIO()
+        with self.assertLogs('transactions.thumbnails', 'WARNING'):
+            call_command('backfill_thumbnails', '--workers', '1', '--force', stdout=out)
+        self.assertIn('영수증 3개 중 2개 생성', out.getvalue())
+
+    def test_backfill_force_renders_shared_file_once(self):
+        from . import thumbnails
+
+        content = self._image()
+        first = self._attachment(content)
+        second = self._attachment(content)
+        self.assertEqual(first.file.name, second.file.name)  # 같은 내용 → 파일 하나 공유 (storage.py)
+
+        out = StringIO()
+        with mock.patch.object(thumbnails, 'render_thumbnails', wraps=thumbnails.render_thumbnails) as render:
+            call_command('backfill_thumbnails', '--workers', '1', '--force', stdout=out)
+        self.assertEqual(render.call_count, 1)
+        self.assertIn('영수증 2개 중 2개 생성', out.getvalue())
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(second.thumbnail_status, 'DONE')
+        self.assertEqual(second.thumbnails, first.thumbnails)
+        root = first.file.name.rsplit('.', 1)[0]
+        self.assertEqual(first.thumbnails['small']['webp'], f'{root}.small.webp')  # 새 이름이 붙지 않음
+
+
+# ============================================
+# 26. 영수증 내용 주소 저장소 테스트 (storage.py)
+# ============================================
+
+class ReceiptStorageTest(TempMediaRootMixin, TestCase):
+    """같은 내용의 영수증은 파일 하나를 공유하고, 마지막 참조가 없어질 때 삭제"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='blobs', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='800-1', balance=Decimal('10000'),
+        )
+
+    def test_same_content_is_stored_once(self):
+        import hashlib
+
+        content = self._image()
+        first = self._attachment(content, 'a.JPG')
+        second = self._attachment(content, 'b.jpg')
+        other = self._attachment(self._image(color='black'))
+
+        sha = hashlib.sha256(content).hexdigest()
+        self.assertEqual(first.file.name, f'receipts/{sha[:2]}/{sha[2:4]}/{sha}.jpg')
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertNotEqual(other.file.name, first.file.name)
+        blob = ReceiptBlob.objects.get(sha256=sha)
+        self.assertEqual((blob.name, blob.size, blob.ref_count), (first.file.name, len(content), 2))
+        with first.file.open('rb') as fp:
+            self.assertEqual(fp.read(), content)
+        self.assertEqual(second.original_name, 'b.jpg')  # 내려받을 때 이름은 첨부파일마다
+
+        # 썸네일도 한 벌만 만들어 공유
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(second.thumbnails, first.thumbnails)
+
+        # 임시 파일이 남지 않음
+        from django.core.files.storage import default_storage
+        self.assertEqual(default_storage.listdir('receipts/tmp')[1], [])
+
+    def test_acquire_survives_concurrent_collect(self):
+        """참조가 0인 행을 collect가 지우는 사이 같은 내용을 올려도 실패하지 않고 파일을 다시 둠"""
+        from .storage import collect
+
+        content = self._image()
+        first = self._attachment(content)
+        name = first.file.name
+        first.delete()  # ref_count 0, 파일 삭제(collect)는 커밋 후
+
+        original = QuerySet.select_for_update
+        collected = []
+
+        def collect_before_lock(queryset, *args, **kwargs):
+            if queryset.model is ReceiptBlob and not collected:
+                collected.append(None)
+                collected[0] = collect(name)  # acquire가 행을 잠그기 직전에 삭제가 끝남
+            return original(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'select_for_update', collect_before_lock):
+            second = self._attachment(content)
+        self.assertEqual(collected, [True])
+        self.assertEqual(second.file.name, name)
+        self.assertTrue(self._exists(name))
+        with second.file.open('rb') as fp:
+            self.assertEqual(fp.read(), content)
+        self.assertEqual(ReceiptBlob.objects.get(name=name).ref_count, 1)
+
+    def test_file_is_deleted_with_last_reference(self):
+        content = self._image()
+        first = self._attachment(content)
+        second = self._attachment(content)
+        first.refresh_from_db()
+        names = [first.file.name] + [entry['webp'] for entry in first.thumbnails.values()]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(all(self._exists(name) for name in names))
+        self.assertEqual(ReceiptBlob.objects.get(name=second.file.name).ref_count, 1)
+
+        # 거래 삭제로 딸려 지워져도 참조를 놓음
+        with self.captureOnCommitCallbacks(execute=True):
+            second.transaction.delete()
+        self.assertFalse(any(self._exists(name) for name in names))
+        self.assertFalse(ReceiptBlob.objects.exists())
+
+    def test_reupload_before_collect_keeps_file(self):
+        content = self._image()
+        first = self._attachment(content)
+        name = first.file.name
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            first.delete()
+            again = self._attachment(content)  # 지워지기 전에 같은 내용이 다시 올라옴
+        for callback in callbacks:
+            callback()
+        self.assertEqual(again.file.name, name)
+        self.assertTrue(self._exists(name))
+        self.assertEqual(ReceiptBlob.objects.get(name=name).ref_count, 1)
+
+        # 이미 지워진 뒤 다시 올라오면 파일을 다시 둠
+        from .storage import collect
+        with self.captureOnCommitCallbacks(execute=True):
+            again.delete()
+        self.assertFalse(self._exists(name))
+        self.assertFalse(collect(name))
+        self.assertEqual(self._attachment(content).file.name, name)
+        self.assertTrue(self._exists(name))
+
+    def test_user_delete_releases_files(self):
+        other = User.objects.create_user(username='blobs2', password='testpass123')
+        content = self._image()
+        mine = self._attachment(content)
+        self._attachment(content, user=other)
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(ReceiptBlob.objects.get(name=mine.file.name).ref_count, 1)
+        self.assertTrue(self._exists(mine.file.name))
+
+    def test_dedupe_command_moves_legacy_files(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        content = self._image()
+        current = self._attachment(content)
+        legacy = []
+        for day in ('01', '02'):  # 기능 도입 이전: 날짜별 경로에 따로 저장된 같은 영수증
+            attachment = self._attachment(self._image(color='gray'))
+            old_name = default_storage.save(f'receipts/2026/01/{day}/r.jpg', ContentFile(content))
+            thumbnail = default_storage.save(f'receipts/2026/01/{day}/r.small.webp', ContentFile(b'webp'))
+            Attachment.objects.filter(pk=attachment.pk).update(
+                file=old_name, thumbnails={'small': {'webp': thumbnail}}, thumbnail_status='DONE',
+            )
+            legacy.append((attachment.pk, old_name, thumbnail))
+        pdf = self._attachment(b'%PDF-1.4', 'r.pdf', 'application/pdf')
+        Attachment.objects.filter(pk=pdf.pk).update(file='receipts/2026/01/03/missing.pdf')
+
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('dedupe_receipts', stdout=out)
+        self.assertIn(f'영수증 2개 이동, 파일 {2 * len(content):,} → 0 bytes', out.getvalue())
+        self.assertIn('파일이 없는 영수증 1개', out.getvalue())
+        self.assertEqual(ReceiptBlob.objects.get(name=current.file.name).ref_count, 3)
+        for pk, old_name, thumbnail in legacy:
+            attachment = Attachment.objects.get(pk=pk)
+            self.assertEqual(
+                (attachment.file.name, attachment.thumbnails, attachment.thumbnail_status),
+                (current.file.name, {}, 'PENDING'),
+            )
+            self.assertFalse(self._exists(old_name))
+            self.assertFalse(self._exists(thumbnail))
+
+        # 다시 실행해도 옮길 파일 없음
+        out = StringIO()
+        call_command('dedupe_receipts', stdout=out)
+        self.assertIn('영수증 0개 이동', out.getvalue())
+
+
+# ============================================
+# 27. 영수증 스트리밍 업로드 테스트 (uploads.py)
+# ============================================
+
+class StreamingReceiptUploadTest(TempMediaRootMixin, TestCase):
+    """영수증을 조각 단위로 디스크에 쓰면서 형식/크기/해시를 확인"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.user = User.objects.create_user(username='stream', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='900-1', balance=Decimal('10000'),
+        )
+        self.tx = Transaction.objects.create(
+            user=self.user, account=self.account, tx_type='OUT', amount=Decimal('1000'), occurred_at=timezone.now(),
+        )
+        self.client.login(username='stream', password='testpass123')
+        self.url = reverse('transactions:attachment_upload', kwargs={'pk': self.tx.pk})
+
+    def _tmp_files(self):
+        from django.core.files.storage import default_storage
+
+        return default_storage.listdir('receipts/tmp')[1] if default_storage.exists('receipts/tmp') else []
+
+    def _stream(self, chunks, limit=1024):
+        """업로드 처리기에 조각을 직접 넣어 봄"""
+        from .uploads import ReceiptUploadHandler
+
+        handler = ReceiptUploadHandler(field_names=('file',))
+        with override_settings(RECEIPT_MAX_UPLOAD_SIZE=limit):
+            handler.new_file('file', 'r.jpg', 'application/octet-stream', None)
+        for chunk in chunks:
+            self.assertIsNone(handler.receive_data_chunk(chunk, 0))
+        uploaded = handler.file_complete(sum(map(len, chunks)))
+        self.addCleanup(uploaded.close)
+        return uploaded
+
+    def test_handler_hashes_and_detects_type_while_streaming(self):
+        import hashlib
+
+        content = self._image()
+        uploaded = self._stream([content[:2], content[2:100], content[100:]], limit=len(content))
+        self.assertEqual(uploaded.sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual((uploaded.content_type, uploaded.size, uploaded.upload_error), ('image/jpeg', len(content), None))
+        self.assertEqual(uploaded.read(), content)
+
+        # 다른 필드는 다음 처리기로 넘김
+        from .uploads import ReceiptUploadHandler
+        handler = ReceiptUploadHandler(field_names=('file',))
+        handler.new_file('csv', 'a.csv', 'text/csv', None)
+        self.assertEqual(handler.receive_data_chunk(b'a,b', 0), b'a,b')
+        self.assertIsNone(handler.file_complete(3))
+
+    def test_handler_stops_writing_over_limit_or_wrong_type(self):
+        content = self._image()
+        oversized = self._stream([content[:600], content[600:]], limit=1000)
+        self.assertEqual(oversized.size, len(content))  # 크기는 끝까지 셈 (오류 문구용)
+        self.assertIsNone(oversized.sha256)
+        self.assertLessEqual(len(oversized.read()), 1000)  # 디스크에는 제한까지만
+
+        fake = self._stream([b'MZ\x90\x00 not a receipt', b'x' * 100])
+        self.assertEqual(fake.upload_error, '파일 내용이 JPG, PNG, PDF 형식이 아닙니다.')
+        self.assertEqual(fake.read(), b'')
+
+    def test_upload_view_streams_and_stores_temp_file(self):
+        content = self._image()
+        response = self.client.post(
+            self.url, {'file': SimpleUploadedFile('receipt.jpg', content, content_type='application/octet-stream')},
+        )
+        self.assertEqual(response.status_code, 302)
+        attachment = Attachment.objects.get(transaction=self.tx)
+        self.assertEqual((attachment.content_type, attachment.size), ('image/jpeg', len(content)))
+        with attachment.file.open('rb') as fp:
+            self.assertEqual(fp.read(), content)
+        self.assertEqual(ReceiptBlob.objects.get(name=attachment.file.name).ref_count, 1)
+        self.assertEqual(self._tmp_files(), [])  # 임시 파일은 제자리로 옮겨짐
+
+    def test_upload_view_rejects_wrong_content_and_size(self):
+        response = self.client.post(
+            self.url, {'file': SimpleUploadedFile('receipt.jpg', b'<html>not an image</html>', content_type='image/jpeg')},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '파일 내용이 JPG, PNG, PDF 형식이 아닙니다.')
+
+        with override_settings(RECEIPT_MAX_UPLOAD_SIZE=1024 * 1024):
+            response = self.client.post(
+                self.url, {'file': SimpleUploadedFile('big.pdf', b'%PDF-1.4' + b'0' * (3 * 1024 * 1024))},
+            )
+        self.assertContains(response, '파일 크기는 1MB를 초과할 수 없습니다. (현재: 3.0MB)')
+        self.assertFalse(Attachment.objects.exists())
+        self.assertEqual(self._tmp_files(), [])
+
+    def test_csrf_is_still_checked(self):
+        client = Client(enforce_csrf_checks=True)
+        client.login(username='stream', password='testpass123')
+        response = client.post(self.url, {'file': SimpleUploadedFile('r.jpg', self._image())})
+        self.assertEqual(response.status_code, 403)
+
+        token = client.get(self.url).context['csrf_token']
+        response = client.post(self.url, {'file': SimpleUploadedFile('r.jpg', self._image()), 'csrfmiddlewaretoken': token})
+        self.assertEqual(response.status_code, 302)
+
+    def test_transaction_create_and_dashboard_upload(self):
+        data = {
+            'account': self.account.pk, 'tx_type': 'OUT', 'amount': '3000',
+            'occurred_at': '2026-02-01T12:00', 'merchant': '가게', 'memo': '',
+        }
+        response = self.client.post(
+            reverse('transactions:transaction_create'), {**data, 'receipt_file': SimpleUploadedFile('r.pdf', b'fake')},
+        )
+        self.assertContains(response, '영수증: 파일 내용이 JPG, PNG, PDF 형식이 아닙니다.')
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+
+        response = self.client.post(
+            reverse('transactions:transaction_create'),
+            {**data, 'receipt_file': SimpleUploadedFile('r.jpg', self._image())},
+        )
+        self.assertEqual(response.status_code, 302)
+        attachment = Attachment.objects.get(transaction__merchant='가게')
+        self.assertEqual((attachment.content_type, attachment.thumbnail_status), ('image/jpeg', 'DONE'))
+
+        response = self.client.post(
+            reverse('dashboard:upload_receipt', kwargs={'transaction_id': self.tx.pk}),
+            {'file': SimpleUploadedFile('scan.pdf', b'%PDF-1.4 receipt')},
+        )
+        self.assertEqual(response.status_code, 302)
+        attachment = Attachment.objects.get(transaction=self.tx)
+        self.assertEqual(
+            (attachment.original_name, attachment.content_type, attachment.thumbnail_status),
+            ('scan.pdf', 'application/pdf', 'NONE'),
+        )
+
+
+# ============================================
+# 28. 영수증 다운로드 테스트 (downloads.py)
+# ============================================
+
+class ReceiptDownloadTest(TempMediaRootMixin, TestCase):
+    """권한 확인 후 sendfile/앞단 서버 전송, Range/조건부 요청"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.user = User.objects.create_user(username='download', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='910-1', balance=Decimal('10000'),
+        )
+        self.content = b'%PDF-1.4\n' + bytes(range(256)) * 40
+        self.attachment = self._attachment(self.content, 'r.pdf', 'application/pdf', original_name='영수증 1월.pdf')
+        self.client.login(username='download', password='testpass123')
+        self.url = reverse('dashboard:download_receipt', kwargs={'pk': self.attachment.pk})
+
+    def _body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_full_download_with_validators(self):
+        import hashlib
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._body(response), self.content)
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['ETag'], f'"{hashlib.sha256(self.content).hexdigest()}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn("filename*=utf-8''%EC%98%81%EC%88%98%EC%A6%9D%201%EC%9B%94.pdf", response['Content-Disposition'])
+        self.assertTrue(response['Content-Disposition'].startswith('attachment'))
+        self.assertTrue(self.client.get(self.url + '?inline=1')['Content-Disposition'].startswith('inline'))
+
+        # 조건부 요청
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MATCH='"other"').status_code, 412)
+
+        # 다른 사용자의 영수증
+        User.objects.create_user(username='other', password='testpass123')
+        self.client.login(username='other', password='testpass123')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_range_requests(self):
+        size = len(self.content)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{size}')
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(self._body(response), self.content[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(self._body(response), self.content[-10:])
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={size - 5}-')
+        self.assertEqual((response['Content-Range'], self._body(response)), (f'bytes {size - 5}-{size - 1}/{size}', self.content[-5:]))
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes=0-{size * 2}')  # 끝이 넘치면 파일 끝까지
+        self.assertEqual(len(self._body(response)), size)
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={size}-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, f'bytes */{size}'))
+        # 여러 구간/잘못된 형식 → 전체
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=0-1,5-6').status_code, 200)
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='items=0-1').status_code, 200)
+
+        # If-Range: 같은 파일이면 부분, 바뀌었으면 전체
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"').status_code, 200)
+
+    def test_offload_to_front_server(self):
+        with override_settings(RECEIPT_DOWNLOAD_OFFLOAD='x-accel', RECEIPT_DOWNLOAD_ACCEL_PREFIX='/protected/'):
+            response = self.client.get(self.url, HTTP_RANGE='bytes=0-9')
+        self.assertEqual((response.status_code, response.content), (200, b''))  # Range는 nginx가 처리
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/' + self.attachment.file.name)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response['Content-Disposition'].startswith('attachment'))
+
+        with override_settings(RECEIPT_DOWNLOAD_OFFLOAD='x-sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.attachment.file.path)
+
+    def test_missing_file_is_404(self):
+        os.remove(self.attachment.file.path)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+# ============================================
+# 29. 영수증 파일 지연 삭제 / 고아 파일 정리 테스트 (storage.py, gc_receipts)
+# ============================================
+
+class ReceiptGarbageCollectTest(TempMediaRootMixin, TestCase):
+    """어떤 첨부파일도 쓰지 않는 파일만 지우고, 쓰는 파일과 그 썸네일/최근 파일은 유지"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='gc', password='testpass123')
+        self.account = Account.objects.create(
+            user=self.user, name='계좌', bank_name='은행', account_number='920-1', balance=Decimal('10000'),
+        )
+
+    def _names(self, attachment):
+        return [attachment.file.name] + [entry[fmt] for entry in attachment.thumbnails.values() for fmt in ('webp', 'jpeg')]
+
+    def _age(self, minutes=120):
+        """모든 파일을 오래된 파일로"""
+        from django.conf import settings
+
+        old = time.time() - minutes * 60
+        for dirpath, _, filenames in os.walk(settings.MEDIA_ROOT):
+            for filename in filenames:
+                os.utime(os.path.join(dirpath, filename), (old, old))
+
+    def test_gc_removes_only_orphans(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        kept = self._attachment(self._image(color='white'))
+        orphan = self._attachment(self._image(color='black'))
+        orphan_names = self._names(orphan)
+        # 삭제 작업 전에 프로세스가 종료된 경우처럼: 행만 지우고 파일은 남김
+        Attachment.objects.filter(pk=orphan.pk).delete()  # 커밋 후 삭제는 실행되지 않음 (TestCase)
+        self.assertEqual(ReceiptBlob.objects.get(name=orphan.file.name).ref_count, 0)
+        legacy = default_storage.save('receipts/2025/12/01/old.pdf', ContentFile(b'%PDF-1.4 old'))
+        stray_thumbnail = default_storage.save('receipts/2025/12/01/gone.small.webp', ContentFile(b'webp'))
+        leftover = default_storage.save('receipts/tmp/tmpabc.upload.jpg', ContentFile(b'partial'))
+        self._age()
+        recent = default_storage.save('receipts/tmp/tmpnew.upload.jpg', ContentFile(b'uploading'))
+
+        out = StringIO()
+        call_command('gc_receipts', '--dry-run', '--workers', '1', '--batch-size', '2', '-v', '2', stdout=out)
+        orphans = orphan_names + [legacy, stray_thumbnail, leftover]
+        self.assertIn(f'고아 파일 {len(orphans)}개', out.getvalue())
+        self.assertIn('삭제 예정 (dry-run)', out.getvalue())
+        self.assertIn('최근 파일 1개 건너뜀', out.getvalue())
+        for name in orphans:
+            self.assertIn(name, out.getvalue())
+        self.assertTrue(all(self._exists(name) for name in orphans))  # dry-run: 지우지 않음
+
+        out = StringIO()
+        call_command('gc_receipts', '--workers', '1', stdout=out)
+        self.assertIn(f'고아 파일 {len(orphans)}개', out.getvalue())
+        self.assertFalse(any(self._exists(name) for name in orphans))
+        self.assertFalse(ReceiptBlob.objects.filter(name=orphan.file.name).exists())
+        self.assertTrue(all(self._exists(name) for name in self._names(kept)))  # 쓰는 파일 + 썸네일 유지
+        self.assertTrue(self._exists(recent))
+
+        out = StringIO()
+        call_command('gc_receipts', '--workers', '1', stdout=out)
+        self.assertIn('고아 파일 0개', out.getvalue())
+
+    def test_gc_skips_top_level_file_removed_after_listing(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        gone = default_storage.save('receipts/gone.jpg', ContentFile(b'old'))
+        legacy = default_storage.save('receipts/legacy.jpg', ContentFile(b'old'))
+        self._age()
+        listdir = default_storage.listdir
+        calls = []
+
+        def listdir_then_delete(path):
+            result = listdir(path)
+            calls.append(path)
+            if len(calls) == 2:  # receipts/ 바로 아래 파일 목록을 읽은 직후 삭제 작업 스레드가 지움
+                os.remove(default_storage.path(gone))
+            return result
+
+        out = StringIO()
+        with mock.patch.object(default_storage, 'listdir', side_effect=listdir_then_delete):
+            call_command('gc_receipts', '--workers', '1', stdout=out)
+        self.assertEqual(len(calls), 2)
+        self.assertIn('파일 1개 (3 bytes) 검사', out.getvalue())
+        self.assertIn('고아 파일 1개', out.getvalue())
+        self.assertFalse(self._exists(legacy))
+
+    def test_reclaim_skips_rereferenced_blob(self):
+        from .storage import reclaim
+
+        attachment = self._attachment(self._image(color='white'))
+        name = attachment.file.name
+        # 파일을 쓰는 첨부파일은 없지만 참조 수가 남아 있음 (커밋 전 업로드 등) → 지우지 않음
+        Attachment.objects.filter(pk=attachment.pk).update(file='receipts/elsewhere.jpg')
+        self.assertFalse(reclaim(name, [name]))
+        self.assertTrue(self._exists(name))
+
+    def test_deletion_is_deferred_until_commit(self):
+        attachment = self._attachment(self._image(color='white'))
+        names = self._names(attachment)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            attachment.transaction.account.delete()  # 계좌 → 거래 → 첨부파일 CASCADE
+            self.assertTrue(all(self._exists(name) for name in names))  # 요청 안에서는 지우지 않음
+        self.assertTrue(all(self._exists(name) for name in names))
+        for callback in callbacks:
+            callback()
+        self.assertFalse(any(self._exists(name) for name in names))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL 전용 (삭제 작업 스레드)')
+class ReceiptDeleterThreadTest(TempMediaRootMixin, TransactionTestCase):
+    """커밋 후 삭제 작업 스레드가 파일을 지움 (요청 스레드는 기다리지 않음)"""
+
+    media_settings = {'RECEIPT_THUMBNAIL_ASYNC': False, 'RECEIPT_DELETE_ASYNC': True}
+
+    def test_background_deleter(self):
+        from .storage import _deleter
+
+        self.user = User.objects.create_user(username='deleter', password='testpass123')
+        self.account = Account.objects.create(user=self.user, name='계좌', bank_name='은행', account_number='920-2')
+        attachment = self._attachment(b'%PDF-1.4 deleter', 'r.pdf', 'application/pdf')
+        path = attachment.file.path
+        attachment.transaction.delete()
+        _deleter().submit(lambda: None).result()  # 작업 스레드는 하나 → 앞의 삭제가 끝날 때까지 대기
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(ReceiptBlob.objects.exists())
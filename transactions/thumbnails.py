@@ -0,0 +1,187 @@
+"""
+영수증 썸네일
+- 역할: 원본 영수증(최대 5MB) 대신 작은 미리보기 이미지를 내려주도록 크기별 썸네일 생성
+- 담당: 팀원 B
+
+생성
+- 업로드가 커밋된 뒤 작업 스레드 풀에서 생성 (RECEIPT_THUMBNAIL_WORKERS개) → 업로드 요청은 바로 응답
+  Pillow는 디코딩/리사이즈 중 GIL을 놓으므로 스레드로 충분
+- 크기(RECEIPT_THUMBNAIL_SIZES, 긴 변 기준)마다 WebP + JPEG (WebP를 못 쓰는 브라우저용)
+- 원본 옆에 저장: receipts/ab/cd/<해시>.png → <해시>.small.webp, <해시>.small.jpg, <해시>.medium.webp, ...
+  같은 파일을 쓰는 첨부파일끼리 공유 (이미 만든 첨부파일이 있으면 다시 만들지 않음, storage.py)
+  파일과 함께 마지막 참조가 없어질 때 삭제
+- 경로/크기는 Attachment.thumbnails, 진행 상태는 Attachment.thumbnail_status
+- JPEG 원본은 draft()로 디코딩하면서 줄임 → 큰 사진도 전체 해상도로 풀지 않음
+- 휴대폰 사진의 EXIF 회전 정보 반영
+
+기존 영수증: python manage.py backfill_thumbnails
+"""
+
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db import transaction as db_transaction
+from PIL import Image, ImageOps
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = {'small': 200, 'medium': 800}
+
+# 형식 → (Pillow 형식, 확장자, 저장 옵션)
+FORMATS = {
+    'webp': ('WEBP', '.webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', '.jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def thumbnail_sizes():
+    return getattr(settings, 'RECEIPT_THUMBNAIL_SIZES', DEFAULT_SIZES)
+
+
+def thumbnail_name(name, size, fmt):
+    """원본 경로 옆 썸네일 경로: receipts/r.png → receipts/r.small.webp"""
+    root, _ = os.path.splitext(name)
+    return f'{root}.{size}{FORMATS[fmt][1]}'
+
+
+def thumbnail_names(name):
+    """원본 하나의 썸네일 경로 전체 (현재 크기 설정 기준)"""
+    return [thumbnail_name(name, size, fmt) for size in thumbnail_sizes() for fmt in FORMATS]
+
+
+def _flatten(image):
+    """JPEG는 투명도가 없으므로 흰 배경에 합침 (영수증 스캔 PNG 등)"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_thumbnails(fp, sizes=None):
+    """
+    이미지 파일 → {크기 이름: (너비, 높이, {형식: 바이트})}
+    - 원본보다 크게 늘리지 않음
+    - 큰 크기부터 만들고 작은 크기는 그 결과에서 줄임 (원본을 한 번만 리사이즈)
+    """
+    sizes = sorted((sizes or thumbnail_sizes()).items(), key=lambda item: -item[1])
+    rendered = {}
+    with Image.open(fp) as original:
+        original.draft('RGB', (sizes[0][1], sizes[0][1]))  # JPEG: 1/2~1/8 크기로 디코딩
+        image = _flatten(ImageOps.exif_transpose(original))
+    for name, edge in sizes:
+        image.thumbnail((edge, edge), Image.LANCZOS)
+        encoded = {}
+        for fmt, (pil_format, _, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            image.save(buffer, pil_format, **options)
+            encoded[fmt] = buffer.getvalue()
+        rendered[name] = (image.width, image.height, encoded)
+    return rendered
+
+
+def delete_thumbnail_files(storage, thumbnails):
+    for entry in thumbnails.values():
+        for fmt in FORMATS:
+            if entry.get(fmt):
+                storage.delete(entry[fmt])
+
+
+def generate_thumbnails(attachment_id, force=False):
+    """
+    첨부파일 하나의 썸네일 생성 → 결과 상태 ('DONE', 'FAILED', 'NONE'), 첨부파일이 없으면 None
+    - 이미지가 아니면 'NONE'
+    - 같은 파일의 썸네일이 이미 있으면 그대로 씀 (force: 다시 만듦)
+    - 읽을 수 없는 이미지(손상, 너무 큰 이미지 등)면 'FAILED' (업로드 자체는 유지)
+    """
+    from .models import Attachment
+
+    attachment = Attachment.objects.filter(pk=attachment_id).first()
+    if attachment is None:
+        return None
+    rows = Attachment.objects.filter(pk=attachment.pk, file=attachment.file.name)
+    if not attachment.is_image():
+        rows.update(thumbnail_status='NONE')
+        return 'NONE'
+
+    if not force:
+        shared = Attachment.objects.filter(
+            file=attachment.file.name, thumbnail_status='DONE'
+        ).exclude(pk=attachment.pk).values_list('thumbnails', flat=True).first()
+        if shared:
+            rows.update(thumbnails=shared, thumbnail_status='DONE')
+            return 'DONE'
+
+    try:
+        with attachment.file.open('rb') as fp:
+            rendered = render_thumbnails(fp)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning('영수증 썸네일 생성 실패 (첨부파일 %s): %s', attachment.pk, e)
+        rows.update(thumbnail_status='FAILED')
+        return 'FAILED'
+
+    storage = default_storage  # 썸네일은 정해진 이름 그대로 저장 (원본과 같은 MEDIA_ROOT)
+    thumbnails = {}
+    for size, (width, height, encoded) in rendered.items():
+        entry = {'width': width, 'height': height}
+        for fmt, data in encoded.items():
+            name = thumbnail_name(attachment.file.name, size, fmt)
+            if storage.exists(name):
+                storage.delete(name)  # 다시 만들 때 같은 이름으로 덮어씀 (저장소가 새 이름을 붙이지 않도록)
+            entry[fmt] = storage.save(name, ContentFile(data))
+        thumbnails[size] = entry
+
+    # 그 사이 첨부파일이 삭제되었거나 파일이 바뀌었으면 기록하지 않음
+    # (썸네일 파일은 원본 파일이 정리될 때 함께 삭제됨, storage.py)
+    if not rows.update(thumbnails=thumbnails, thumbnail_status='DONE'):
+        return None
+    return 'DONE'
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'RECEIPT_THUMBNAIL_WORKERS', 2),
+                thread_name_prefix='receipt-thumbnails',
+            )
+        return _executor
+
+
+def run_in_worker(attachment_id, force=False):
+    """작업 스레드에서 실행 (예외는 로그로 남기고, 스레드 전용 DB 연결 정리)"""
+    try:
+        return generate_thumbnails(attachment_id, force=force)
+    except Exception:
+        logger.exception('영수증 썸네일 생성 중 오류 (첨부파일 %s)', attachment_id)
+        return 'FAILED'
+    finally:
+        connection.close()
+
+
+def schedule_thumbnails(attachment):
+    """
+    썸네일 생성 예약
+    - RECEIPT_THUMBNAIL_ASYNC=True: 커밋 후 작업 스레드 풀에서 (롤백되면 하지 않음)
+    - False: 바로 생성 (테스트/관리 명령어용)
+    """
+    if not attachment.is_image():
+        return
+    attachment_id = attachment.pk
+    if getattr(settings, 'RECEIPT_THUMBNAIL_ASYNC', True):
+        db_transaction.on_commit(lambda: _pool().submit(run_in_worker, attachment_id))
+    else:
+        generate_thumbnails(attachment_id)
@@ -0,0 +1,144 @@
+"""
+영수증 업로드 스트리밍 처리
+- 역할: 영수증 파일을 메모리에 모으지 않고 조각(chunk) 단위로 디스크에 쓰면서 검사
+- 담당: 팀원 B
+
+동작 (ReceiptUploadHandler)
+- 요청 본문을 64KB 조각으로 받으며 바로 임시 파일(MEDIA_ROOT/receipts/tmp)에 씀
+  → 크기 제한(RECEIPT_MAX_UPLOAD_SIZE)을 올려도 요청당 메모리는 조각 하나 수준
+- 첫 조각의 매직 바이트로 실제 형식 판별 (JPEG/PNG/PDF만, 브라우저가 보낸 content_type은 믿지 않음)
+- 형식이 맞지 않거나 크기 제한을 넘으면 그 뒤 조각은 버림 (디스크에도 제한만큼만 씀)
+  → 오류는 파일의 upload_error / size로 남기고 폼(validate_receipt_file)에서 표시
+- SHA-256도 조각마다 함께 계산 → 저장소(storage.py)가 파일을 다시 읽지 않고 임시 파일을 그대로 옮김
+
+연결 (StreamingReceiptUploadMixin)
+- 업로드 처리기는 request.POST/FILES를 처음 읽기 전에 바꿔야 하므로
+  CSRF 검사(POST를 읽음)를 뷰 안에서 처리기를 바꾼 뒤에 함 (Django 문서의 csrf_exempt + csrf_protect 방식)
+"""
+
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from .storage import PREFIX, receipt_storage
+
+
+DEFAULT_MAX_SIZE = 5 * 1024 * 1024  # 5MB
+
+# 매직 바이트 → 실제 형식
+SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'%PDF-', 'application/pdf'),
+]
+HEADER_SIZE = max(len(signature) for signature, _ in SIGNATURES)
+INVALID_TYPE_MESSAGE = '파일 내용이 JPG, PNG, PDF 형식이 아닙니다.'
+
+
+def max_receipt_size():
+    return getattr(settings, 'RECEIPT_MAX_UPLOAD_SIZE', DEFAULT_MAX_SIZE)
+
+
+def detect_content_type(header):
+    """파일 앞부분 → MIME 타입 (허용하지 않는 형식이면 None)"""
+    for signature, content_type in SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    return None
+
+
+class ReceiptUploadedFile(TemporaryUploadedFile):
+    """
+    스트리밍으로 받은 영수증 (임시 파일)
+    - sha256: 내용 해시 (끝까지 받은 경우만), upload_error: 받는 중 발견한 오류
+    - 임시 파일을 MEDIA_ROOT 아래에 두어 저장할 때 복사 없이 이름만 바꿈
+    """
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        tmp_dir = receipt_storage.path(f'{PREFIX}/tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        file = tempfile.NamedTemporaryFile(suffix='.upload' + os.path.splitext(name)[1], dir=tmp_dir)
+        UploadedFile.__init__(self, file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = None
+        self.upload_error = None
+
+
+class ReceiptUploadHandler(FileUploadHandler):
+    """
+    영수증 필드(field_names)만 스트리밍으로 받는 업로드 처리기
+    - 다른 파일 필드(CSV 등)는 다음 처리기(Django 기본)로 넘김
+    """
+    chunk_size = 64 * 1024
+
+    def __init__(self, request=None, field_names=('file',)):
+        super().__init__(request)
+        self.field_names = set(field_names)
+        self.active = False
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name in self.field_names
+        if not self.active:
+            return
+        self.file = ReceiptUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.digest = hashlib.sha256()
+        self.header = b''
+        self.received = 0
+        self.limit = max_receipt_size()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        self.received += len(raw_data)
+        if self.file.upload_error or self.received > self.limit:
+            return None  # 더 쓰지 않고 크기만 셈
+        if len(self.header) < HEADER_SIZE:
+            self.header += raw_data[:HEADER_SIZE - len(self.header)]
+            if len(self.header) == HEADER_SIZE and not self._check_header():
+                return None
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        self.active = False
+        if len(self.header) < HEADER_SIZE and not self.file.upload_error:
+            self._check_header()
+        if not self.file.upload_error and self.received <= self.limit:
+            self.file.sha256 = self.digest.hexdigest()
+        self.file.seek(0)
+        self.file.size = self.received
+        return self.file
+
+    def _check_header(self):
+        content_type = detect_content_type(self.header)
+        if content_type is None:
+            self.file.upload_error = INVALID_TYPE_MESSAGE
+            return False
+        self.file.content_type = content_type
+        return True
+
+
+class StreamingReceiptUploadMixin:
+    """
+    영수증 업로드 뷰용: 요청 본문을 읽기 전에 ReceiptUploadHandler를 맨 앞에 설치
+    - receipt_upload_fields: 스트리밍으로 받을 파일 필드 이름
+    - 미들웨어의 CSRF 검사는 건너뛰고(csrf_exempt) 처리기를 바꾼 뒤 dispatch에서 검사(csrf_protect)
+    """
+    receipt_upload_fields = ('file',)
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == 'POST':
+            request.upload_handlers.insert(0, ReceiptUploadHandler(request, self.receipt_upload_fields))
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 
 app_name = 'transactions'
@@ -7,18 +7,37 @@ app_name = 'transactions'
 urlpatterns = [
   # 거래 내역
     path('', views.TransactionListView.as_view(), name='transaction_list'),
+    path('export/', views.TransactionExportView.as_view(), name='transaction_export'),
     path('create/', views.TransactionCreateView.as_view(), name='transaction_create'),
     path('<int:pk>/', views.TransactionDetailView.as_view(), name='transaction_detail'),
     path('<int:pk>/update/', views.TransactionUpdateView.as_view(), name='transaction_update'),
     path('<int:pk>/delete/', views.TransactionDeleteView.as_view(), name='transaction_delete'),
+
+    # 거래 일괄 가져오기 (CSV)
+    path('import/', views.TransactionImportView.as_view(), name='transaction_import'),
+    path('import/<int:pk>/', views.ImportJobDetailView.as_view(), name='import_detail'),
+    path('import/<int:pk>/progress/', views.ImportJobProgressView.as_view(), name='import_progress'),
     
     # 영수증 업로드/삭제 (팀원 C 지원)
     path('<int:pk>/upload/', views.AttachmentUploadView.as_view(), name='attachment_upload'),
     path('attachment/<int:pk>/delete/', views.AttachmentDeleteView.as_view(), name='attachment_delete'),
     path('api/categories/', views.CategoryByTypeView.as_view(), name='api_categories_by_type'),
+    path('api/merchants/', views.MerchantAutocompleteView.as_view(), name='api_merchant_autocomplete'),
+
+    # 거래 JSON API (api.py)
+    path('api/transactions/', api.TransactionApiListView.as_view(), name='api_transaction_list'),
+    path('api/transactions/<int:pk>/', api.TransactionApiDetailView.as_view(), name='api_transaction_detail'),
+    path('api/transactions/batch/', api.TransactionApiBatchView.as_view(), name='api_transaction_batch'),
+    path('api/sync/', api.SyncApiView.as_view(), name='api_sync'),
+
     path('category/create/', views.CategoryCreateView.as_view(), name='category_create'),
     path('category/create/ajax/', views.category_create_ajax, name='category_create_ajax'),
     path('category/<int:pk>/delete/', views.CategoryDeleteView.as_view(), name='category_delete'),
     path('categories/', views.CategoryListView.as_view(), name='category_list'),
+
+    # 자동 분류
+    path('categories/rules/create/', views.CategoryRuleCreateView.as_view(), name='category_rule_create'),
+    path('categories/rules/<int:pk>/delete/', views.CategoryRuleDeleteView.as_view(), name='category_rule_delete'),
+    path('categories/categorize/', views.CategorizeView.as_view(), name='categorize'),
 ]
 
@@ -4,20 +4,38 @@
 - 담당: 팀원 B
 """
 
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, FormView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.db.models import Q  # OR 조건 검색용
 from django.shortcuts import get_object_or_404, redirect
 from django.views import View
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+import hashlib
 import json
+import uuid
 
-from .models import Transaction, Attachment, Category
+from .models import Transaction, Attachment, Category, CategoryRule, ImportJob
 from accounts.models import Account
-from .forms import TransactionForm, AttachmentForm, CategoryForm
+from accountbook_project.versioning import VersionedUpdateMixin
+from .forms import (
+    TransactionForm, AttachmentForm, CategoryForm, CategoryRuleForm, TransactionImportForm, validate_receipt_file,
+)
+from .autocomplete import suggest_merchants
+from .categorizer import categorize_uncategorized, suggest_category
+from .exporter import stream_csv
+from .importer import start_import
+from .cache import cached_for_user
+from .pagination import KeysetPaginator
+from .filters import filter_transactions
+from .idempotency import IdempotencyConflict, fingerprint, replay, run_once, valid_key
+from .thumbnails import schedule_thumbnails
+from .uploads import StreamingReceiptUploadMixin
 
 
 # ============================================
@@ -29,11 +47,14 @@ class TransactionListView(LoginRequiredMixin, ListView):
     거래 내역 목록 뷰 (필터링 포함)
     - 본인 거래만 표시
     - 계좌, 카테고리, 입출금, 기간, 키워드로 필터링 가능
+    - 키셋(커서) 페이지네이션: ?cursor=... (pagination.py), 전체 건수는 캐시
     """
     model = Transaction
     template_name = 'transactions/transaction_list.html'
     context_object_name = 'transactions'
     paginate_by = 20  # 페이지당 20개씩 표시
+    paginator_class = KeysetPaginator
+    query_budget = 6  # 세션/사용자 + 거래 페이지 + 건수 + 계좌 목록 (query_budget.py)
     
     def get_queryset(self):
         """
@@ -41,69 +62,88 @@ class TransactionListView(LoginRequiredMixin, ListView):
         - request.GET으로 전달된 필터 조건 적용
         """
         # 기본: 본인 거래만 + 활성 계좌만 + 관련 데이터 미리 로딩 (성능 최적화)
+        # attachment: 목록의 영수증 아이콘 (없으면 행마다 쿼리 1번)
         queryset = Transaction.objects.filter(
             user=self.request.user,
             account__is_active=True
-        ).select_related('account', 'category')
+        ).select_related('account', 'category', 'attachment')
         
-        # 1. 계좌 필터 (?account=1)
-        account_id = self.request.GET.get('account')
-        if account_id:
-            queryset = queryset.filter(account_id=account_id)
-        
-        # 2. 카테고리 필터 (?category=2)
-        category_id = self.request.GET.get('category')
-        if category_id:
-            queryset = queryset.filter(category_id=category_id)
-        
-        # 3. 입출금 타입 필터 (?tx_type=OUT)
-        tx_type = self.request.GET.get('tx_type')
-        if tx_type in ['IN', 'OUT']:
-            queryset = queryset.filter(tx_type=tx_type)
-        
-        # 4. 기간 필터 (?start_date=2026-01-01)
-        start_date = self.request.GET.get('start_date')
-        if start_date:
-            queryset = queryset.filter(occurred_at__gte=start_date)
-        
-        end_date = self.request.GET.get('end_date')
-        if end_date:
-            from datetime import timedelta
-            from django.utils.dateparse import parse_date
-            from django.utils import timezone as tz
-            parsed = parse_date(end_date)
-            if parsed:
-                end_dt = tz.make_aware(
-                    tz.datetime(parsed.year, parsed.month, parsed.day)
-                ) + timedelta(days=1)
-                queryset = queryset.filter(occurred_at__lt=end_dt)
-        
-        # 5. 키워드 검색 (?q=카페)
-        # 메모 또는 가맹점에서 검색
-        q = self.request.GET.get('q')
-        if q:
-            queryset = queryset.filter(
-                Q(memo__icontains=q) | Q(merchant__icontains=q)
-            )
-            # icontains: 대소문자 구분 없이 포함 검색
-            # Q(...) | Q(...): OR 조건
-        
-        return queryset
-    
+        # 계좌/카테고리/입출금/기간/키워드 필터 (filters.py, 내보내기/API와 같은 조건)
+        return filter_transactions(queryset, self.request.GET)
+
+    def get_filter_params(self):
+        """페이지 이동 시 유지할 필터 파라미터 (커서/예전 page 파라미터 제외)"""
+        params = self.request.GET.copy()
+        params.pop('cursor', None)
+        params.pop('page', None)
+        return params
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        OFFSET(?page=N) 대신 커서로 페이지 이동
+        - 전체 건수는 같은 필터 조건이면 데이터가 바뀔 때까지 캐시 (사용자별 데이터 버전 캐시)
+        """
+        filters = hashlib.sha1(self.get_filter_params().urlencode().encode()).hexdigest()
+        paginator = self.paginator_class(
+            queryset,
+            page_size,
+            count=lambda: cached_for_user(
+                self.request.user.pk, f'transaction-count:{filters}', queryset.count
+            ),
+        )
+        page = paginator.page(self.request.GET.get('cursor'))
+        return paginator, page, page.object_list, page.has_other_pages()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['accounts'] = Account.objects.filter(user=self.request.user, is_active=True)
+
+        # 처음/이전/다음 페이지 링크 (현재 필터 + 커서)
+        context['first_query'] = self.get_filter_params().urlencode()
+        page = context.get('page_obj')
+        for name, cursor in (
+            ('next_query', page and page.next_cursor),
+            ('previous_query', page and page.previous_cursor),
+        ):
+            if cursor:
+                params = self.get_filter_params()
+                params['cursor'] = cursor
+                context[name] = params.urlencode()
         return context
     
     # 예: GET /transactions/ → 전체 거래 목록
     #     GET /transactions/?account=1 → 1번 계좌 거래만
     #     GET /transactions/?q=카페 → "카페"가 포함된 거래 검색
+    #     GET /transactions/?q=카페&cursor=... → 다음/이전 페이지
 
 
-class TransactionCreateView(LoginRequiredMixin, CreateView):
+class TransactionExportView(TransactionListView):
+    """
+    거래 내보내기 (CSV 다운로드)
+    - 거래 목록과 같은 필터(get_queryset)를 그대로 사용 → 화면에 보이는 조건의 거래 전체
+    - 페이지 구분 없이 한 행씩 스트리밍 (exporter.py, 거래 수와 무관하게 메모리 일정)
+    """
+    query_budget = 3  # 세션/사용자 + 거래 조회 1번 (행 전송 중 추가 쿼리 없음)
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        if not queryset.query.order_by:
+            queryset = queryset.order_by('-occurred_at', '-id')  # 목록과 같은 순서 + 같은 시각은 id로 고정
+
+        filename = f'transactions-{timezone.localdate():%Y%m%d}.csv'
+        response = StreamingHttpResponse(stream_csv(queryset), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    # 예: GET /transactions/export/?account=1&start_date=2026-01-01 → 1번 계좌 2026년 거래 CSV
+
+
+class TransactionCreateView(StreamingReceiptUploadMixin, LoginRequiredMixin, CreateView):
     """
     거래 생성 뷰
+    - 영수증(receipt_file)은 조각 단위로 받으며 검사 (uploads.py)
     """
+    receipt_upload_fields = ('receipt_file',)
     model = Transaction
     form_class = TransactionForm
     template_name = 'transactions/transaction_form.html'
@@ -121,9 +161,82 @@ class TransactionCreateView(LoginRequiredMixin, CreateView):
 
         return kwargs
     
+    def _idempotency(self):
+        """
+        폼의 멱등 키와 요청 내용 해시 (키가 없거나 잘못됐으면 (None, None))
+        - 해시: CSRF 토큰/키를 뺀 입력값 + 영수증 파일 이름/크기
+        """
+        key = self.request.POST.get('idempotency_key', '')
+        if not valid_key(key):
+            return None, None
+        fields = sorted(
+            (name, values) for name, values in self.request.POST.lists()
+            if name not in ('csrfmiddlewaretoken', 'idempotency_key')
+        )
+        files = sorted((name, f.name, f.size) for name, f in self.request.FILES.items())
+        return key, fingerprint(fields, files)
+
+    def post(self, request, *args, **kwargs):
+        """같은 키로 이미 저장된 요청이면 폼을 다시 검증하지 않고 처음 결과(목록으로 이동)를 그대로 응답"""
+        self.idempotency_conflict = False
+        key, request_fingerprint = self._idempotency()
+        if key:
+            try:
+                response = replay(request.user.pk, key, request_fingerprint)
+            except IdempotencyConflict:
+                # 저장 후 뒤로 가기로 돌아와 내용을 바꿔 다시 제출한 경우 → form_valid에서 오류로 표시
+                self.idempotency_conflict = True
+                response = None
+            if response is not None:
+                return response
+        return super().post(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        """화면마다 새 멱등 키 (검증 오류로 다시 보여줄 때는 같은 키 유지, 이미 쓴 키면 새 키)"""
+        context = super().get_context_data(**kwargs)
+        key = self.request.POST.get('idempotency_key', '')
+        if not valid_key(key) or getattr(self, 'idempotency_conflict', False):
+            key = uuid.uuid4().hex
+        context['idempotency_key'] = key
+        return context
+
     def form_valid(self, form):
-        """자동으로 현재 사용자 설정 및 영수증 업로드 처리"""
+        """
+        멱등 키가 있으면 키당 한 번만 저장 (더블 클릭/재전송으로 거래가 중복 생성되지 않도록, idempotency.py)
+        """
+        if self.idempotency_conflict:
+            form.add_error(None, '이미 저장된 입력 화면입니다. 내용을 확인하고 다시 저장해주세요.')
+            return self.form_invalid(form)
+        receipt_file = self.request.FILES.get('receipt_file')
+        if receipt_file:
+            try:
+                validate_receipt_file(receipt_file)
+            except ValidationError as e:
+                form.add_error(None, f'영수증: {e.messages[0]}')
+                return self.form_invalid(form)
+        key, request_fingerprint = self._idempotency()
+        if key is None:
+            return self._create(form)
+        try:
+            return run_once(self.request.user.pk, key, request_fingerprint, lambda: self._create(form))
+        except IdempotencyConflict:
+            # 같은 키로 내용이 다른 요청이 동시에 먼저 저장됨
+            self.idempotency_conflict = True
+            form.add_error(None, '이미 저장된 입력 화면입니다. 내용을 확인하고 다시 저장해주세요.')
+            return self.form_invalid(form)
+
+    def _create(self, form):
+        """자동으로 현재 사용자 설정, 카테고리 자동 분류 및 영수증 업로드 처리"""
+        # run_once가 만료된 키를 지우고 다시 실행하는 경우: 롤백된 첫 저장의 pk를 버리고 새로 INSERT
+        # (pk가 남아 있으면 삭제된 행 저장으로 보고 StaleObjectError, versioning.py)
+        form.instance.pk = None
+        form.instance._state.adding = True
         form.instance.user = self.request.user
+        # 카테고리를 비워 두면 규칙/거래 내역으로 자동 분류 (categorizer.py)
+        if form.instance.category_id is None:
+            form.instance.category_id = suggest_category(
+                self.request.user.pk, form.instance.merchant, form.instance.tx_type
+            )
         response = super().form_valid(form)
 
         # 영수증 파일이 업로드된 경우 처리
@@ -139,6 +252,7 @@ class TransactionCreateView(LoginRequiredMixin, CreateView):
                 content_type=receipt_file.content_type
             )
             attachment.save()
+            schedule_thumbnails(attachment)
 
         return response
     
@@ -165,9 +279,10 @@ class TransactionDetailView(LoginRequiredMixin, DetailView):
     # {% endif %}
 
 
-class TransactionUpdateView(LoginRequiredMixin, UpdateView):
+class TransactionUpdateView(LoginRequiredMixin, VersionedUpdateMixin, UpdateView):
     """
     거래 수정 뷰
+    - 화면을 연 뒤 다른 곳에서 먼저 수정된 거래면 409 + 최신 내용으로 다시 표시 (VersionedUpdateMixin)
     """
     model = Transaction
     form_class = TransactionForm
@@ -203,14 +318,91 @@ class TransactionDeleteView(LoginRequiredMixin, DeleteView):
     # 삭제 시 연결된 영수증도 자동 삭제됨 (CASCADE)
 
 
+# ============================================
+# 1-1. 거래 일괄 가져오기 (CSV)
+# ============================================
+
+class TransactionImportView(LoginRequiredMixin, FormView):
+    """
+    거래 일괄 가져오기 뷰
+    - CSV 업로드 → ImportJob 생성 → 진행 상황 페이지로 이동
+    - 실제 저장은 importer.py에서 배치 단위로 처리
+    """
+    form_class = TransactionImportForm
+    template_name = 'transactions/transaction_import.html'
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['recent_jobs'] = ImportJob.objects.filter(
+            user=self.request.user
+        ).select_related('account')[:5]
+        return context
+
+    def form_valid(self, form):
+        uploaded_file = form.cleaned_data['file']
+        self.job = ImportJob.objects.create(
+            user=self.request.user,
+            account=form.cleaned_data['account'],
+            file=uploaded_file,
+            original_name=uploaded_file.name,
+            encoding=form.cleaned_data['encoding'],
+        )
+        start_import(self.job)
+        return super().form_valid(form)
+
+    def get_success_url(self):
+        return reverse_lazy('transactions:import_detail', kwargs={'pk': self.job.pk})
+
+    # 예: GET /transactions/import/ → 가져오기 폼
+    #     POST /transactions/import/ → 가져오기 시작
+
+
+class ImportJobDetailView(LoginRequiredMixin, DetailView):
+    """
+    가져오기 진행 상황 페이지
+    - 처리 중이면 몇 초마다 자동 새로고침 (JavaScript 없이 meta refresh)
+    """
+    model = ImportJob
+    template_name = 'transactions/import_job_detail.html'
+    context_object_name = 'job'
+
+    def get_queryset(self):
+        """본인 작업만 조회 가능"""
+        return ImportJob.objects.filter(user=self.request.user).select_related('account')
+
+
+class ImportJobProgressView(LoginRequiredMixin, View):
+    """
+    가져오기 진행 상황 JSON
+    - GET /transactions/import/1/progress/
+    """
+    def get(self, request, pk):
+        job = get_object_or_404(ImportJob, pk=pk, user=request.user)
+        return JsonResponse({
+            'status': job.status,
+            'progress': job.progress,
+            'total_rows': job.total_rows,
+            'processed_rows': job.processed_rows,
+            'imported_rows': job.imported_rows,
+            'error_rows': job.error_rows,
+            'errors': job.errors,
+        })
+
+
 # ============================================
 # 2. 영수증 업로드 뷰
 # ============================================
 
-class AttachmentUploadView(LoginRequiredMixin, CreateView):
+class AttachmentUploadView(StreamingReceiptUploadMixin, LoginRequiredMixin, CreateView):
     """
     영수증 업로드 뷰
     - 특정 거래에 영수증 첨부
+    - 파일은 조각 단위로 받으며 검사 (uploads.py)
     """
     model = Attachment
     form_class = AttachmentForm
@@ -245,7 +437,9 @@ class AttachmentUploadView(LoginRequiredMixin, CreateView):
         form.instance.size = uploaded_file.size
         form.instance.content_type = uploaded_file.content_type
         
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        schedule_thumbnails(self.object)  # 커밋 후 백그라운드에서 (thumbnails.py)
+        return response
     
 
     
@@ -301,6 +495,24 @@ class CategoryByTypeView(LoginRequiredMixin, View):
         return JsonResponse({'categories': categories})
 
 
+class MerchantAutocompleteView(LoginRequiredMixin, View):
+    """
+    가맹점 자동완성 (거래 입력 폼)
+    - GET /transactions/api/merchants/?q=스타 → 전에 쓴 가맹점 중 "스타"로 시작하는 것, 자주 쓴 순
+    - 초성(?q=ㅅㅌ)과 입력 중인 글자(?q=스타벅 입력 중의 스타버)도 일치
+    - 사용자별 접두어 색인에서 조회 (autocomplete.py), 입력할 때마다 거래를 조회하지 않음
+    """
+    query_budget = 3  # 세션/사용자 + 색인이 없을 때 처음 한 번 만드는 쿼리
+
+    def get(self, request):
+        q = request.GET.get('q', '')
+        merchants = [
+            {'merchant': merchant, 'count': count}
+            for merchant, count in suggest_merchants(request.user.pk, q)
+        ]
+        return JsonResponse({'merchants': merchants})
+
+
 @login_required
 @require_POST
 def category_create_ajax(request):
@@ -360,6 +572,17 @@ class CategoryListView(LoginRequiredMixin, ListView):
         # 💡 내가 만든 카테고리만 보여줘야 한다냐!
         return Category.objects.filter(user=self.request.user)
 
+    def get_context_data(self, **kwargs):
+        """자동 분류 규칙 목록 + 미분류 거래 수"""
+        context = super().get_context_data(**kwargs)
+        context['rules'] = CategoryRule.objects.filter(
+            user=self.request.user
+        ).select_related('category')
+        context['uncategorized_count'] = Transaction.objects.filter(
+            user=self.request.user, category__isnull=True
+        ).count()
+        return context
+
 class CategoryDeleteView(LoginRequiredMixin, DeleteView):
     model = Category
     # 삭제가 끝나면 카테고리 관리 페이지나 거래 목록으로 돌려보낸다냐!
@@ -369,6 +592,57 @@ class CategoryDeleteView(LoginRequiredMixin, DeleteView):
     def get_queryset(self):
         return Category.objects.filter(user=self.request.user)
 
+
+
+# ============================================
+# 자동 분류 (규칙 관리 + 미분류 일괄 분류)
+# ============================================
+
+class CategoryRuleCreateView(LoginRequiredMixin, CreateView):
+    """
+    자동 분류 규칙 생성
+    - 예: 가맹점에 "스타벅스" 포함 → 카페
+    """
+    model = CategoryRule
+    form_class = CategoryRuleForm
+    template_name = 'transactions/category_rule_form.html'
+    success_url = reverse_lazy('transactions:category_list')
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def form_valid(self, form):
+        form.instance.user = self.request.user
+        return super().form_valid(form)
+
+
+class CategoryRuleDeleteView(LoginRequiredMixin, DeleteView):
+    """자동 분류 규칙 삭제 (POST, 본인 규칙만)"""
+    model = CategoryRule
+    http_method_names = ['post']
+    success_url = reverse_lazy('transactions:category_list')
+
+    def get_queryset(self):
+        return CategoryRule.objects.filter(user=self.request.user)
+
+
+class CategorizeView(LoginRequiredMixin, View):
+    """
+    미분류 거래 일괄 자동 분류 (POST)
+    - 규칙 + 거래 내역으로 분류, 행마다 저장하지 않고 UPDATE 몇 번으로 처리 (categorizer.py)
+    """
+    def post(self, request):
+        result = categorize_uncategorized(request.user.pk)
+        total = sum(result.values())
+        if total:
+            messages.success(request, f'미분류 거래 {total:,}건을 자동 분류했습니다.')
+        else:
+            messages.info(request, '자동 분류할 수 있는 미분류 거래가 없습니다.')
+        return redirect('transactions:category_list')
+
+
 # ============================================
 # URL 패턴과의 연결 예시
 # ============================================